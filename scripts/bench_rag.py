@@ -0,0 +1,851 @@
+"""RAG indexing and search benchmark on a synthetic vault.
+
+Generates a Japanese/English vault of normalized notes (1k / 10k / 100k),
+starts a local stub embedding server (Ollama /api/embed and /api/embeddings
+with deterministic vectors and a configurable latency model) and runs the
+real RAG components against it:
+
+- scan:   header scan + document load of every vault
+- chunk:  MarkdownChunker per document
+- embed:  AdaptiveDocumentEmbedder per index batch (stub server)
+- write:  vector store / lexical index writers per index batch
+- search: dense / lexical / hybrid queries through the search pipeline
+
+Latency percentiles (ms), throughput and peak RSS per stage are written as a
+JSON report, with the SC-001 / SC-004 / SC-006 success criteria evaluated.
+
+Usage:
+    python scripts/bench_rag.py [--notes 1k|10k|100k|N] [--backend numpy|qdrant]
+                                [--output report.json] [--json]
+
+Generated vaults can be reused across runs with --vault-dir (regenerated only
+when notes / seed / ja-ratio change). Stores are built in a temporary directory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, replace
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from src.rag.config import COLLECTION_NAME, SEARCH_MODES, ollama_config, rag_config  # noqa: E402
+
+REPORT_VERSION = 1
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+# Success criteria (tests/rag/test_performance.py)
+SEARCH_P95_LIMIT_MS = 3000.0  # SC-001: search < 3s
+INDEX_SECONDS_PER_1K_NOTES = 600.0  # SC-004: index 1000 docs < 10min
+PEAK_RSS_LIMIT_BYTES = 8 * 1024**3  # SC-006: memory < 8GB
+
+# Share of generated notes without `normalized: true` (skipped by the header scan)
+UNNORMALIZED_RATIO = 0.05
+
+VAULT_MARKER = ".bench_vault.json"
+
+
+# =============================================================================
+# Synthetic Vault
+# =============================================================================
+
+# (vault, tag, ja terms, en terms)
+TOPICS: list[tuple[str, str, list[str], list[str]]] = [
+    (
+        "エンジニア",
+        "kubernetes",
+        ["Pod", "Deployment", "Service", "コンテナ", "再起動ポリシー", "名前空間"],
+        ["pod", "deployment", "service", "container", "restart policy", "namespace"],
+    ),
+    (
+        "エンジニア",
+        "python",
+        ["asyncio", "型ヒント", "仮想環境", "デコレータ", "例外処理", "ジェネレータ"],
+        ["asyncio", "type hints", "virtualenv", "decorator", "exception", "generator"],
+    ),
+    (
+        "エンジニア",
+        "database",
+        ["インデックス", "トランザクション", "正規化", "クエリ計画", "レプリカ", "ロック"],
+        ["index", "transaction", "normalization", "query plan", "replica", "lock"],
+    ),
+    (
+        "ビジネス",
+        "management",
+        ["1on1", "目標設定", "評価面談", "採用", "チームビルディング", "振り返り"],
+        ["one-on-one", "goal setting", "review", "hiring", "team building", "retrospective"],
+    ),
+    (
+        "ビジネス",
+        "marketing",
+        ["ペルソナ", "コンバージョン", "広告予算", "SEO", "ブランド", "顧客体験"],
+        ["persona", "conversion", "ad budget", "SEO", "brand", "customer experience"],
+    ),
+    (
+        "経済",
+        "investment",
+        ["インデックス投資", "配当", "為替", "金利", "分散投資", "NISA"],
+        ["index fund", "dividend", "exchange rate", "interest rate", "diversification", "ETF"],
+    ),
+    (
+        "日常",
+        "household",
+        ["家計簿", "食費", "固定費", "作り置き", "掃除", "買い出し"],
+        ["budget", "groceries", "fixed costs", "meal prep", "cleaning", "shopping"],
+    ),
+    (
+        "日常",
+        "travel",
+        ["温泉", "新幹線", "旅館", "観光地", "お土産", "旅程"],
+        ["hot spring", "bullet train", "inn", "sightseeing", "souvenir", "itinerary"],
+    ),
+    (
+        "その他",
+        "reading",
+        ["読書メモ", "小説", "要約", "引用", "感想", "積読"],
+        ["reading notes", "novel", "summary", "quote", "impression", "backlog"],
+    ),
+]
+
+JA_SENTENCES = [
+    "{a}は{b}と組み合わせて使うことが多い。",
+    "{a}の設定を見直したところ{b}の問題が解決した。",
+    "{a}を理解するには、まず{b}の仕組みを押さえておく必要がある。",
+    "今週は{a}について調べ、{b}との違いを整理した。",
+    "{a}で失敗した経験から、{b}を事前に確認するようにしている。",
+    "{b}が原因で{a}がうまく動かないケースがある。",
+]
+
+EN_SENTENCES = [
+    "{a} is often used together with {b}.",
+    "Revisiting the {a} settings fixed the {b} issue.",
+    "To understand {a}, start with how {b} works.",
+    "This week I compared {a} with {b} and wrote down the differences.",
+    "After a bad experience with {a}, I now check {b} first.",
+    "Some {a} problems are actually caused by {b}.",
+]
+
+JA_QUERIES = ["{a}と{b}の関係", "{a}の使い方", "{b}で困ったとき", "{a} {b}"]
+EN_QUERIES = ["how does {a} relate to {b}", "{a} best practices", "{b} troubleshooting"]
+
+
+@dataclass
+class VaultStats:
+    """Result of generate_vault"""
+
+    notes: int = 0
+    normalized: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+
+def parse_size(value: str) -> int:
+    """Note count from "1k" / "10k" / "100k" or an integer."""
+    if value in SIZES:
+        return SIZES[value]
+    try:
+        count = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected {'/'.join(SIZES)} or a number") from None
+    if count < 1:
+        raise argparse.ArgumentTypeError("note count must be positive")
+    return count
+
+
+def _sentence(rng: random.Random, ja: bool, terms: list[str]) -> str:
+    a, b = rng.sample(terms, 2)
+    return rng.choice(JA_SENTENCES if ja else EN_SENTENCES).format(a=a, b=b)
+
+
+def _note(index: int, rng: random.Random, ja_ratio: float) -> tuple[str, str, str]:
+    """One note: (vault, relative path, markdown)."""
+    vault, tag, ja_terms, en_terms = rng.choice(TOPICS)
+    ja = rng.random() < ja_ratio
+    terms = ja_terms if ja else en_terms
+    title = f"{rng.choice(terms)} {'メモ' if ja else 'notes'} {index}"
+    created = date(2020, 1, 1) + timedelta(days=rng.randrange(2000))
+
+    # Long-tailed length: most notes are short, a few span many sections
+    sections = []
+    for s in range(min(12, int(rng.lognormvariate(0.8, 0.7)) + 1)):
+        heading = f"## {rng.choice(terms)} {s + 1}"
+        paragraph = ("" if ja else " ").join(
+            _sentence(rng, ja, terms) for _ in range(rng.randint(2, 10))
+        )
+        if rng.random() < 0.2:
+            paragraph += "\n\n" + "\n".join(f"- {t}" for t in rng.sample(terms, 3))
+        sections.append(f"{heading}\n\n{paragraph}")
+
+    file_id = hashlib.sha256(f"bench-{index}".encode()).hexdigest()[:12]
+    summary = _sentence(rng, ja, terms)
+    normalized = "true" if rng.random() >= UNNORMALIZED_RATIO else "false"
+    markdown = (
+        "---\n"
+        f'title: "{title}"\n'
+        f"created: {created.isoformat()}\n"
+        f"tags:\n  - {tag}\n  - {'ja' if ja else 'en'}\n"
+        f'summary: "{summary}"\n'
+        f"file_id: {file_id}\n"
+        f"normalized: {normalized}\n"
+        "---\n\n" + "\n\n".join(sections) + "\n"
+    )
+    return vault, f"{tag}/{file_id}.md", markdown
+
+
+def generate_vault(
+    vaults_dir: Path, notes: int, seed: int = 42, ja_ratio: float = 0.7
+) -> VaultStats:
+    """
+    Write a deterministic synthetic vault tree (Vaults/<vault>/<tag>/<file_id>.md).
+
+    The same (notes, seed, ja_ratio) always produces the same files. An
+    existing tree generated with the same parameters is reused as is.
+    """
+    params = {"notes": notes, "seed": seed, "ja_ratio": ja_ratio}
+    marker = vaults_dir / VAULT_MARKER
+    if marker.exists():
+        cached = json.loads(marker.read_text())
+        if cached.get("params") == params:
+            return VaultStats(**cached["stats"])
+        shutil.rmtree(vaults_dir)
+
+    start = time.perf_counter()
+    rng = random.Random(seed)
+    stats = VaultStats()
+    for index in range(notes):
+        vault, relative, markdown = _note(index, rng, ja_ratio)
+        path = vaults_dir / vault / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = markdown.encode("utf-8")
+        path.write_bytes(data)
+        stats.notes += 1
+        stats.normalized += "normalized: true" in markdown
+        stats.bytes += len(data)
+    stats.seconds = round(time.perf_counter() - start, 3)
+
+    marker.write_text(json.dumps({"params": params, "stats": asdict(stats)}))
+    return stats
+
+
+def make_queries(count: int, seed: int = 42, ja_ratio: float = 0.7) -> list[str]:
+    """Distinct queries over the vault vocabulary (so each one misses the query cache)."""
+    rng = random.Random(seed + 1)
+    queries: list[str] = []
+    seen: set[str] = set()
+    while len(queries) < count:
+        _, _, ja_terms, en_terms = rng.choice(TOPICS)
+        ja = rng.random() < ja_ratio
+        a, b = rng.sample(ja_terms if ja else en_terms, 2)
+        query = rng.choice(JA_QUERIES if ja else EN_QUERIES).format(a=a, b=b)
+        if query in seen:
+            query = f"{query} {len(queries)}"
+        seen.add(query)
+        queries.append(query)
+    return queries
+
+
+# =============================================================================
+# Stub Embedding Server
+# =============================================================================
+
+
+@dataclass
+class LatencyModel:
+    """
+    Simulated embedding server latency: base_ms + per_item_ms * texts,
+    scaled by a uniform jitter of ±jitter. At most `workers` requests are
+    processed at once (others queue), like a single-GPU Ollama server.
+    """
+
+    base_ms: float = 20.0
+    per_item_ms: float = 10.0
+    jitter: float = 0.1
+    workers: int = 1
+
+    def seconds(self, items: int, rng: random.Random) -> float:
+        latency = self.base_ms + self.per_item_ms * items
+        return max(0.0, latency * rng.uniform(1 - self.jitter, 1 + self.jitter)) / 1000
+
+
+def stub_vector(text: str, dim: int) -> list[float]:
+    """Deterministic unit vector for a text (seeded by its hash)."""
+    seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+    vector = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    vector /= np.linalg.norm(vector)
+    return vector.tolist()
+
+
+class StubEmbeddingServer:
+    """
+    Local HTTP server answering Ollama embedding requests.
+
+    - POST /api/embed      {"input": str | [str]} -> {"embeddings": [[...]]}
+    - POST /api/embeddings {"prompt": str}        -> {"embedding": [...]}
+    - GET  /api/tags                              -> {"models": [...]}
+    """
+
+    def __init__(self, dim: int = 1024, latency: LatencyModel | None = None, seed: int = 0) -> None:
+        self.dim = dim
+        self.latency = latency or LatencyModel()
+        self.requests = 0
+        self.items = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(1, self.latency.workers))
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> StubEmbeddingServer:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> StubEmbeddingServer:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """Vectors for a request, after the simulated server latency."""
+        with self._lock:
+            self.requests += 1
+            self.items += len(texts)
+            delay = self.latency.seconds(len(texts), self._rng)
+        with self._slots:
+            time.sleep(delay)
+            return [stub_vector(text, self.dim) for text in texts]
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _reply(self, status: int, body: dict[str, Any]) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self) -> None:  # noqa: N802
+                if self.path == "/api/tags":
+                    self._reply(200, {"models": [{"name": ollama_config.embedding_model}]})
+                else:
+                    self._reply(404, {"error": "not found"})
+
+            def do_POST(self) -> None:  # noqa: N802
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                model = request.get("model", "")
+                if self.path == "/api/embed":
+                    texts = request.get("input", [])
+                    texts = [texts] if isinstance(texts, str) else texts
+                    self._reply(200, {"model": model, "embeddings": server.embed(texts)})
+                elif self.path == "/api/embeddings":
+                    embedding = server.embed([request.get("prompt", "")])[0]
+                    self._reply(200, {"embedding": embedding})
+                else:
+                    self._reply(404, {"error": "not found"})
+
+        return Handler
+
+
+# =============================================================================
+# Measurement
+# =============================================================================
+
+
+def reset_peak_rss() -> bool:
+    """Reset the peak RSS high-water mark (Linux only). Returns whether it was reset."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process (since the last reset on Linux)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentiles(latencies_ms: list[float]) -> dict[str, float | int]:
+    """count, mean, p50, p95, p99 and max of latencies (ms)."""
+    if not latencies_ms:
+        return {"count": 0}
+    if len(latencies_ms) == 1:
+        cuts = latencies_ms * 99
+    else:
+        cuts = statistics.quantiles(latencies_ms, n=100, method="inclusive")
+    return {
+        "count": len(latencies_ms),
+        "mean": round(statistics.fmean(latencies_ms), 3),
+        "p50": round(cuts[49], 3),
+        "p95": round(cuts[94], 3),
+        "p99": round(cuts[98], 3),
+        "max": round(max(latencies_ms), 3),
+    }
+
+
+@dataclass
+class Stage:
+    """Wall time, per-operation latencies and peak RSS of one benchmark stage"""
+
+    name: str
+    latencies_ms: list[float] = field(default_factory=list)
+    seconds: float = 0.0
+    peak_rss: int = 0
+    counts: dict[str, int] = field(default_factory=dict)
+
+    @contextmanager
+    def measure(self) -> Iterator[Stage]:
+        """Measure the whole stage (wall time and peak RSS)."""
+        reset_peak_rss()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.peak_rss = max(self.peak_rss, peak_rss_bytes())
+
+    @contextmanager
+    def op(self) -> Iterator[None]:
+        """Time one operation of the stage."""
+        start = time.perf_counter()
+        yield
+        self.latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    def report(self) -> dict[str, Any]:
+        report: dict[str, Any] = {"seconds": round(self.seconds, 3), **self.counts}
+        if self.latencies_ms:
+            report["latency_ms"] = percentiles(self.latencies_ms)
+        if self.peak_rss:
+            report["peak_rss_bytes"] = self.peak_rss
+        return report
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+
+def _open_store(
+    backend: str, work_dir: Path, dim: int, qdrant_url: str | None, summary_of: Any = None
+) -> Any:
+    """
+    Empty vector store for the benchmark (bench collection on a Qdrant server).
+
+    With summary_of, the summary store of that chunk store ("<collection>__docs",
+    sharing its Qdrant client).
+    """
+    from src.rag.stores.qdrant import _summary_collection
+
+    if backend == "numpy":
+        from src.rag.stores.numpy_store import NumpyDocumentStore
+
+        return NumpyDocumentStore(
+            work_dir / (_summary_collection(summary_of.path.name) if summary_of else "vectors"),
+            embedding_dim=dim,
+            similarity="cosine",
+            resident_bytes=rag_config.numpy_resident_bytes,
+        )
+
+    from src.rag.stores.qdrant import (
+        ProfiledQdrantDocumentStore,
+        _collection_kwargs,
+        _search_params,
+        get_storage_profile,
+    )
+
+    profile = get_storage_profile(rag_config.storage_profile)
+    location = {"url": qdrant_url} if qdrant_url else {"path": str(work_dir / "qdrant")}
+    index = f"{COLLECTION_NAME}__bench" if qdrant_url else COLLECTION_NAME
+    return ProfiledQdrantDocumentStore(
+        **location,
+        index=_summary_collection(summary_of.index) if summary_of else index,
+        client_from=summary_of,
+        embedding_dim=dim,
+        similarity="cosine",
+        recreate_index=True,
+        return_embedding=False,
+        progress_bar=False,
+        search_params=_search_params(profile),
+        payload_indexes=bool(qdrant_url),
+        **_collection_kwargs(profile),
+    )
+
+
+def run_benchmark(
+    vaults_dir: Path,
+    work_dir: Path,
+    server: StubEmbeddingServer,
+    backend: str = "numpy",
+    queries: list[str] | None = None,
+    modes: tuple[str, ...] = SEARCH_MODES,
+    top_k: int = 5,
+    qdrant_url: str | None = None,
+) -> dict[str, Any]:
+    """
+    Index vaults_dir into fresh stores under work_dir and run the queries.
+
+    Returns:
+        Stage reports keyed by stage name (scan, chunk, embed, write,
+        write_lexical, write_summary, index, search), plus store document counts.
+    """
+    from src.rag.pipelines.chunking import MarkdownChunker
+    from src.rag.pipelines.indexing import (
+        chunk_document,
+        create_indexing_pipeline,
+        find_eligible_files,
+        load_documents,
+        summary_document,
+    )
+    from src.rag.pipelines.query import create_search_pipeline, search
+    from src.rag.stores.embedding_cache import QueryEmbeddingCache
+    from src.rag.stores.lexical import LexicalIndex
+
+    config = replace(ollama_config, remote_url=server.url)
+    vaults = sorted(p for p in vaults_dir.iterdir() if p.is_dir())
+    stages = {
+        name: Stage(name)
+        for name in ("scan", "chunk", "embed", "write", "write_lexical", "write_summary", "index")
+    }
+
+    # Scan: header scan and body load, streamed (documents are not kept)
+    scan = stages["scan"]
+    with scan.measure():
+        scanned = eligible = 0
+        for vault in vaults:
+            result = find_eligible_files(vault, vault.name, rag_config.scan_workers)
+            scanned += result.scanned_files
+            eligible += sum(1 for _ in load_documents(result, rag_config.scan_workers))
+    scan.counts = {"files": scanned, "documents": eligible}
+
+    # Index: chunk → embed → write in index batches, like `rag index`
+    store = _open_store(backend, work_dir, rag_config.embedding_dim, qdrant_url)
+    summary_store = _open_store(
+        backend, work_dir, rag_config.embedding_dim, qdrant_url, summary_of=store
+    )
+    lexical = LexicalIndex(work_dir / "lexical.sqlite3")
+    pipeline = create_indexing_pipeline(store, config, lexical=lexical, summary_store=summary_store)
+    embedder = pipeline.get_component("embedder")
+    writer = pipeline.get_component("writer")
+    lexical_writer = pipeline.get_component("lexical_writer")
+    summary_embedder = pipeline.get_component("summary_embedder")
+    summary_writer = pipeline.get_component("summary_writer")
+    chunker = MarkdownChunker(
+        chunk_size=rag_config.chunk_size,
+        overlap=rag_config.chunk_overlap,
+        unit=rag_config.chunk_unit,
+    )
+
+    def write_batch(chunks: list[Any], docs: list[Any]) -> None:
+        with stages["embed"].op():
+            embedded = embedder.run(documents=chunks)["documents"]
+        with stages["write"].op():
+            writer.run(documents=embedded)
+        with stages["write_lexical"].op():
+            lexical_writer.run(documents=embedded)
+        with stages["write_summary"].op():
+            summaries = [summary_document(doc) for doc in docs]
+            summary_writer.run(documents=summary_embedder.run(documents=summaries)["documents"])
+
+    index = stages["index"]
+    requests_before = server.requests
+    with index.measure():
+        batch: list[Any] = []
+        batch_docs: list[Any] = []
+        documents = chunk_count = 0
+        for vault in vaults:
+            result = find_eligible_files(vault, vault.name, rag_config.scan_workers)
+            for doc in load_documents(result, rag_config.scan_workers):
+                with stages["chunk"].op():
+                    chunks = chunk_document(doc, chunker=chunker)
+                documents += 1
+                chunk_count += len(chunks)
+                batch.extend(chunks)
+                batch_docs.append(doc)
+                if len(batch) >= rag_config.index_batch_size:
+                    write_batch(batch, batch_docs)
+                    batch, batch_docs = [], []
+        if batch_docs:
+            write_batch(batch, batch_docs)
+
+    for name in ("chunk", "embed", "write", "write_lexical", "write_summary"):
+        stages[name].seconds = sum(stages[name].latencies_ms) / 1000
+    stages["chunk"].counts = {"documents": documents, "chunks": chunk_count}
+    stages["embed"].counts = {"chunks": chunk_count, "requests": server.requests - requests_before}
+    stages["write_summary"].counts = {"documents": documents}
+    index.counts = {"documents": documents, "chunks": chunk_count}
+
+    report: dict[str, Any] = {name: stage.report() for name, stage in stages.items()}
+    if index.seconds:
+        report["index"]["chunks_per_s"] = round(chunk_count / index.seconds, 1)
+    if scan.seconds:
+        report["scan"]["files_per_s"] = round(scanned / scan.seconds, 1)
+
+    # Search: distinct queries per mode (cold query embedding cache)
+    report["search"] = {}
+    for mode in modes:
+        search_pipeline = create_search_pipeline(
+            store,
+            config,
+            mode=mode,
+            lexical=lexical,
+            query_cache=QueryEmbeddingCache(),
+            summary_store=summary_store,
+        )
+        search(search_pipeline, "warm up", top_k=top_k, mode=mode)
+        stage = Stage(f"search_{mode}")
+        with stage.measure():
+            for query in queries or []:
+                with stage.op():
+                    search(search_pipeline, query, top_k=top_k, mode=mode)
+        report["search"][mode] = stage.report()
+        if stage.seconds:
+            report["search"][mode]["qps"] = round(len(stage.latencies_ms) / stage.seconds, 1)
+
+    report["store"] = {
+        "backend": backend,
+        "vector_documents": store.count_documents(),
+        "lexical_documents": lexical.count_documents(),
+        "summary_documents": summary_store.count_documents(),
+    }
+    lexical.close()
+    if qdrant_url:
+        store._client.delete_collection(store.index)
+        store._client.delete_collection(summary_store.index)
+    return report
+
+
+def evaluate_criteria(report: dict[str, Any], notes: int) -> dict[str, dict[str, Any]]:
+    """SC-001 (search p95), SC-004 (index time per 1k notes), SC-006 (peak RSS)."""
+    criteria: dict[str, dict[str, Any]] = {}
+    dense = report["stages"]["search"].get("dense", {}).get("latency_ms")
+    if dense:
+        criteria["SC-001"] = {
+            "metric": "search.dense.latency_ms.p95",
+            "value": dense["p95"],
+            "limit": SEARCH_P95_LIMIT_MS,
+            "passed": dense["p95"] < SEARCH_P95_LIMIT_MS,
+        }
+    per_1k = report["stages"]["index"]["seconds"] * 1000 / notes
+    criteria["SC-004"] = {
+        "metric": "index.seconds per 1k notes",
+        "value": round(per_1k, 3),
+        "limit": INDEX_SECONDS_PER_1K_NOTES,
+        "passed": per_1k < INDEX_SECONDS_PER_1K_NOTES,
+    }
+    criteria["SC-006"] = {
+        "metric": "peak_rss_bytes",
+        "value": report["peak_rss_bytes"],
+        "limit": PEAK_RSS_LIMIT_BYTES,
+        "passed": report["peak_rss_bytes"] < PEAK_RSS_LIMIT_BYTES,
+    }
+    return criteria
+
+
+def benchmark(
+    notes: int,
+    vaults_dir: Path | None = None,
+    seed: int = 42,
+    ja_ratio: float = 0.7,
+    backend: str = "numpy",
+    latency: LatencyModel | None = None,
+    query_count: int = 200,
+    modes: tuple[str, ...] = SEARCH_MODES,
+    qdrant_url: str | None = None,
+) -> dict[str, Any]:
+    """Generate (or reuse) the vault, run all stages and build the report."""
+    latency = latency or LatencyModel()
+    work_dir = Path(tempfile.mkdtemp(prefix="rag-bench-"))
+    vaults_dir = vaults_dir or work_dir / "Vaults"
+    try:
+        vault_stats = generate_vault(vaults_dir, notes, seed, ja_ratio)
+        queries = make_queries(query_count, seed, ja_ratio)
+        with StubEmbeddingServer(rag_config.embedding_dim, latency, seed) as server:
+            stages = run_benchmark(
+                vaults_dir,
+                work_dir,
+                server,
+                backend=backend,
+                queries=queries,
+                modes=modes,
+                qdrant_url=qdrant_url,
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report: dict[str, Any] = {
+        "version": REPORT_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "peak_rss_per_stage": os.access("/proc/self/clear_refs", os.W_OK),
+        },
+        "config": {
+            "notes": notes,
+            "seed": seed,
+            "ja_ratio": ja_ratio,
+            "backend": backend,
+            "qdrant_url": qdrant_url,
+            "queries": query_count,
+            "embedding_dim": rag_config.embedding_dim,
+            "chunk_size": rag_config.chunk_size,
+            "chunk_unit": rag_config.chunk_unit,
+            "index_batch_size": rag_config.index_batch_size,
+            "embedding_concurrency": ollama_config.embedding_concurrency,
+            "latency_model": asdict(latency),
+        },
+        "corpus": asdict(vault_stats),
+        "stages": stages,
+        "peak_rss_bytes": max(_stage_peaks(stages) + [peak_rss_bytes()]),
+    }
+    report["criteria"] = evaluate_criteria(report, notes)
+    return report
+
+
+def _stage_peaks(stages: dict[str, Any]) -> list[int]:
+    """Peak RSS of every stage (the process peak is reset between stages)."""
+    rows = [row for name, row in stages.items() if name not in ("search", "store")]
+    rows += list(stages.get("search", {}).values())
+    return [row["peak_rss_bytes"] for row in rows if "peak_rss_bytes" in row]
+
+
+def _print_summary(report: dict[str, Any]) -> None:
+    corpus = report["corpus"]
+    print(
+        f"corpus: {corpus['notes']} notes ({corpus['normalized']} normalized, "
+        f"{corpus['bytes'] / 1024**2:.1f} MiB), backend={report['config']['backend']}"
+    )
+    print(f"{'stage':<16} {'seconds':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak MiB':>9}")
+    rows = [
+        (name, row) for name, row in report["stages"].items() if name not in ("search", "store")
+    ]
+    rows += [(f"search {mode}", row) for mode, row in report["stages"]["search"].items()]
+    for name, row in rows:
+        latency = row.get("latency_ms", {})
+        peak = row.get("peak_rss_bytes")
+        print(
+            f"{name:<16} {row['seconds']:>9} {latency.get('p50', '-'):>9} "
+            f"{latency.get('p95', '-'):>9} {latency.get('p99', '-'):>9} "
+            f"{f'{peak / 1024**2:.0f}' if peak else '-':>9}"
+        )
+    for name, criterion in report["criteria"].items():
+        status = "PASS" if criterion["passed"] else "FAIL"
+        print(
+            f"{name}: {status} {criterion['metric']} = {criterion['value']} (< {criterion['limit']})"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--notes", type=parse_size, default=SIZES["1k"], help="1k, 10k, 100k or a number"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--ja-ratio", type=float, default=0.7, help="Share of Japanese notes")
+    parser.add_argument("--backend", choices=("numpy", "qdrant"), default=rag_config.store_backend)
+    parser.add_argument("--qdrant-url", help="Benchmark a Qdrant server (default: local mode)")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per search mode")
+    parser.add_argument(
+        "--modes", default=",".join(SEARCH_MODES), help="Search modes (comma-separated)"
+    )
+    parser.add_argument("--vault-dir", type=Path, help="Keep the generated vault here for reuse")
+    parser.add_argument("--latency-base-ms", type=float, default=LatencyModel.base_ms)
+    parser.add_argument("--latency-per-item-ms", type=float, default=LatencyModel.per_item_ms)
+    parser.add_argument("--latency-jitter", type=float, default=LatencyModel.jitter)
+    parser.add_argument(
+        "--server-workers",
+        type=int,
+        default=LatencyModel.workers,
+        help="Requests the stub server processes at once",
+    )
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file")
+    parser.add_argument("--json", action="store_true", help="Print the JSON report")
+    args = parser.parse_args()
+
+    modes = tuple(m for m in args.modes.split(",") if m)
+    unknown = [m for m in modes if m not in SEARCH_MODES]
+    if unknown:
+        parser.error(f"unknown search modes: {', '.join(unknown)}")
+
+    report = benchmark(
+        args.notes,
+        vaults_dir=args.vault_dir,
+        seed=args.seed,
+        ja_ratio=args.ja_ratio,
+        backend=args.backend,
+        latency=LatencyModel(
+            base_ms=args.latency_base_ms,
+            per_item_ms=args.latency_per_item_ms,
+            jitter=args.latency_jitter,
+            workers=args.server_workers,
+        ),
+        query_count=args.queries,
+        modes=modes,
+        qdrant_url=args.qdrant_url,
+    )
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        _print_summary(report)
+    return 0 if all(c["passed"] for c in report["criteria"].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""RAG CLI startup benchmark.
+
+Measures wall-clock time of short RAG CLI invocations in fresh interpreters
+and reports which heavy modules (Haystack, Qdrant client, NumPy) each one
+loaded. Use it to keep --help, argument errors and `status` fast.
+
+Usage:
+    python scripts/bench_rag_startup.py [--runs N] [--json]
+
+Each scenario runs `python -m src.rag.cli ...` N times; `status` answers from
+the collection stats cache when it is fresh (run `status` once to fill it).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS: dict[str, list[str]] = {
+    "version": ["--version"],
+    "help": ["--help"],
+    "args_error": ["search"],
+    "status": ["status"],
+}
+
+HEAVY_MODULES = ("haystack", "qdrant_client", "numpy")
+
+# Runs the CLI in-process and reports loaded heavy modules on stderr
+_PROBE = """
+import json, sys
+from src.rag.cli import main
+try:
+    main(sys.argv[1:])
+except SystemExit:
+    pass
+print(json.dumps([m for m in {heavy!r} if m in sys.modules]), file=sys.stderr)
+"""
+
+
+def _run(args: list[str]) -> tuple[float, list[str]]:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(heavy=HEAVY_MODULES), *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    last_line = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "[]"
+    try:
+        loaded = json.loads(last_line)
+    except json.JSONDecodeError:
+        loaded = []
+    return elapsed, loaded
+
+
+def benchmark(runs: int = 5) -> dict[str, dict[str, object]]:
+    """Run all scenarios; times are in milliseconds."""
+    report: dict[str, dict[str, object]] = {}
+    for name, args in SCENARIOS.items():
+        times: list[float] = []
+        loaded: list[str] = []
+        for _ in range(runs):
+            elapsed, loaded = _run(args)
+            times.append(elapsed * 1000)
+        report[name] = {
+            "args": args,
+            "min_ms": round(min(times), 1),
+            "median_ms": round(statistics.median(times), 1),
+            "max_ms": round(max(times), 1),
+            "heavy_modules": loaded,
+        }
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Runs per scenario (default: 5)")
+    parser.add_argument("--json", action="store_true", help="Print a JSON report")
+    args = parser.parse_args()
+
+    report = benchmark(args.runs)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{'scenario':<12} {'min':>8} {'median':>8} {'max':>8}  heavy modules")
+    for name, row in report.items():
+        heavy = ", ".join(row["heavy_modules"]) or "-"
+        print(f"{name:<12} {row['min_ms']:>8} {row['median_ms']:>8} {row['max_ms']:>8}  {heavy}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
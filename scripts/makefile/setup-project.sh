@@ -10,6 +10,7 @@ mkdir -p data/03_primary/transformed data/03_primary/transformed_knowledge
 mkdir -p data/04_feature/notes data/04_feature/review
 mkdir -p data/05_model_input/classified
 mkdir -p data/07_model_output/organized
+mkdir -p data/08_reporting
 mkdir -p logs
 
 echo "Setting up local config..."
@@ -3,5 +3,6 @@
 from __future__ import annotations
 
 from .binary_dataset import BinaryDataset
+from .file_path_dataset import FilePathDataset
 
-__all__ = ["BinaryDataset"]
+__all__ = ["BinaryDataset", "FilePathDataset"]
@@ -0,0 +1,32 @@
+"""FilePathDataset: Kedro AbstractDataset that exposes file paths without reading them."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+from kedro.io import AbstractDataset, DatasetError
+
+
+class FilePathDataset(AbstractDataset[None, Path]):
+    """Expose the path of an existing file instead of its content.
+
+    Used with PartitionedDataset so that nodes can copy files at the
+    file level (copy_file_range / reflink / hardlink) without decoding
+    them to str. Read-only: saving is not supported.
+    """
+
+    def __init__(self, filepath: str) -> None:
+        self._filepath = Path(filepath)
+
+    def _load(self) -> Path:
+        return self._filepath
+
+    def _save(self, data: None) -> None:
+        raise DatasetError(f"FilePathDataset is read-only: {self._filepath}")
+
+    def _exists(self) -> bool:
+        return self._filepath.is_file()
+
+    def _describe(self) -> dict[str, Any]:
+        return {"filepath": str(self._filepath)}
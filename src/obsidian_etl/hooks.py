@@ -28,6 +28,13 @@ class PreRunValidationHook:
     PLACEHOLDER_DIRS = [
         "data/03_primary/transformed_knowledge",
         "data/05_model_input/classified",
+        "data/06_models/rag_embeddings",
+    ]
+
+    # Single-file datasets that need an empty initial value
+    # (read on the first run before they have ever been written)
+    PLACEHOLDER_FILES = [
+        "data/08_reporting/vault_publish_journal.json",
     ]
 
     @hook_impl
@@ -87,26 +94,32 @@ class PreRunValidationHook:
         return False
 
     def _ensure_placeholder_files(self) -> None:
-        """Create placeholder files in directories used by PartitionedDataset inputs."""
+        """Create placeholder files for datasets used as resume/incremental inputs."""
         import json
 
         project_root = Path.cwd()
         env = os.environ.get("KEDRO_ENV", "base")
 
-        for dir_path in self.PLACEHOLDER_DIRS:
+        def _adjust(path: str) -> str:
             if env == "test":
-                adjusted_path = dir_path.replace("data/", "data/test/", 1)
-            elif env == "integration":
-                adjusted_path = dir_path.replace("data/", "test-data/", 1)
-            else:
-                adjusted_path = dir_path
+                return path.replace("data/", "data/test/", 1)
+            if env == "integration":
+                return path.replace("data/", "test-data/", 1)
+            return path
 
-            full_path = project_root / adjusted_path
+        for dir_path in self.PLACEHOLDER_DIRS:
+            full_path = project_root / _adjust(dir_path)
             full_path.mkdir(parents=True, exist_ok=True)
             placeholder = full_path / ".placeholder.json"
             if not placeholder.exists():
                 placeholder.write_text(json.dumps({"_placeholder": True}))
 
+        for file_path in self.PLACEHOLDER_FILES:
+            full_path = project_root / _adjust(file_path)
+            if not full_path.exists():
+                full_path.parent.mkdir(parents=True, exist_ok=True)
+                full_path.write_text(json.dumps({}))
+
     def _check_ollama(self) -> None:
         """Verify Ollama server is accessible."""
         import urllib.error
@@ -14,6 +14,7 @@ from obsidian_etl.pipelines.extract_claude import pipeline as extract_claude
 from obsidian_etl.pipelines.extract_github import pipeline as extract_github
 from obsidian_etl.pipelines.extract_openai import pipeline as extract_openai
 from obsidian_etl.pipelines.organize import pipeline as organize
+from obsidian_etl.pipelines.rag_embed import pipeline as rag_embed
 from obsidian_etl.pipelines.transform import pipeline as transform
 from obsidian_etl.pipelines.vault_output import pipeline as vault_output
 
@@ -40,19 +41,26 @@ def register_pipelines() -> dict[str, Pipeline]:
             f"Invalid provider '{provider}'. Valid providers: {sorted(VALID_PROVIDERS)}"
         )
 
+    # Organize stages shared by every import pipeline, optionally followed by
+    # precomputing RAG embeddings of the organized notes (rag_embed.enabled)
+    rag_embed_enabled = bool((config.get("rag_embed") or {}).get("enabled", False))
+    organize_stage = organize.create_pipeline()
+    if rag_embed_enabled:
+        organize_stage += rag_embed.create_pipeline()
+
     # Create import_claude pipeline: extract_claude + transform + organize
     import_claude_pipeline = (
-        extract_claude.create_pipeline() + transform.create_pipeline() + organize.create_pipeline()
+        extract_claude.create_pipeline() + transform.create_pipeline() + organize_stage
     )
 
     # Create import_openai pipeline: extract_openai + transform + organize
     import_openai_pipeline = (
-        extract_openai.create_pipeline() + transform.create_pipeline() + organize.create_pipeline()
+        extract_openai.create_pipeline() + transform.create_pipeline() + organize_stage
     )
 
     # Create import_github pipeline: extract_github + transform + organize
     import_github_pipeline = (
-        extract_github.create_pipeline() + transform.create_pipeline() + organize.create_pipeline()
+        extract_github.create_pipeline() + transform.create_pipeline() + organize_stage
     )
 
     # Build pipeline dictionary with dispatch
@@ -62,6 +70,7 @@ def register_pipelines() -> dict[str, Pipeline]:
         "import_github": import_github_pipeline,
         "organize_preview": vault_output.create_preview_pipeline(),
         "organize_to_vault": vault_output.create_vault_pipeline(),
+        "rag_embed": rag_embed.create_pipeline(),
     }
 
     # Set __default__ based on provider
@@ -0,0 +1 @@
+"""RAG embed pipeline for precomputing embeddings of organized notes."""
@@ -0,0 +1,122 @@
+"""Nodes for RAG Embed pipeline.
+
+This module implements the optional stage after organize:
+- embed_organized_notes: Chunk and embed organized notes for the RAG index
+
+Notes are chunked with the RAG indexer's own chunker and settings, so
+`rag index` can match the vectors to its chunks by text hash and skip the
+embedding server for every note that was not edited after the ETL.
+
+The RAG modules are imported inside the node so that the ETL package
+stays importable without the RAG dependencies (Haystack) installed.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from obsidian_etl.utils.timing import timed_node
+
+logger = logging.getLogger(__name__)
+
+
+@timed_node
+def embed_organized_notes(
+    organized_notes: dict[str, Callable[[], Any]],
+    existing_embeddings: dict[str, Callable[[], Any]],
+    params: dict[str, Any],
+) -> dict[str, dict[str, Any]]:
+    """Precompute RAG embeddings (chunks and summary) of organized notes.
+
+    Args:
+        organized_notes: Partition key -> markdown content (or callable returning it)
+        existing_embeddings: file_id -> stored record (or callable), to skip unchanged notes
+        params: rag_embed parameters (batch_size, timeout)
+
+    Returns:
+        dict[str, dict]: file_id -> precomputed embedding record.
+        Notes without file_id, not normalized, unchanged since the last run,
+        or whose embedding request failed are omitted.
+    """
+    from src.rag.clients.ollama import get_embeddings
+    from src.rag.config import ollama_config, rag_config
+    from src.rag.pipelines.chunking import MarkdownChunker
+    from src.rag.pipelines.indexing import (
+        Document,
+        embedding_texts,
+        extract_metadata,
+        parse_frontmatter,
+    )
+    from src.rag.stores.precomputed import encode_record, record_matches
+
+    model = ollama_config.embedding_model
+    batch_size = params.get("batch_size", 32)
+    timeout = params.get("timeout", ollama_config.embedding_timeout)
+    chunker = MarkdownChunker(
+        chunk_size=rag_config.chunk_size,
+        overlap=rag_config.chunk_overlap,
+        unit=rag_config.chunk_unit,
+    )
+
+    result: dict[str, dict[str, Any]] = {}
+    pending: list[tuple[str, list[str]]] = []
+    skipped = 0
+    failed = 0
+
+    def flush() -> None:
+        nonlocal failed
+        texts = [text for _, note_texts in pending for text in note_texts]
+        embeddings, error = get_embeddings(
+            texts, model=model, url=ollama_config.remote_url, timeout=timeout
+        )
+        if error or embeddings is None:
+            logger.warning(f"embed_organized_notes: {len(pending)} notes not embedded: {error}")
+            failed += len(pending)
+        else:
+            offset = 0
+            for file_id, note_texts in pending:
+                vectors = embeddings[offset : offset + len(note_texts)]
+                result[file_id] = encode_record(file_id, model, note_texts, vectors)
+                offset += len(note_texts)
+        pending.clear()
+
+    for key, load_func_or_content in organized_notes.items():
+        content = load_func_or_content() if callable(load_func_or_content) else load_func_or_content
+
+        frontmatter, body = parse_frontmatter(content)
+        metadata = extract_metadata(frontmatter)
+        if not metadata.file_id or not metadata.normalized:
+            skipped += 1
+            continue
+
+        file_path = Path(f"{key}.md")
+        doc = Document(
+            file_path=file_path,
+            title=frontmatter.get("title", file_path.stem),
+            content=body.strip(),
+            metadata=metadata,
+            vault_name="",
+        )
+        texts = embedding_texts(doc, chunker)
+
+        existing = existing_embeddings.get(metadata.file_id)
+        if existing is not None:
+            record = existing() if callable(existing) else existing
+            if record_matches(record, model, texts):
+                skipped += 1
+                continue
+
+        pending.append((metadata.file_id, texts))
+        if sum(len(note_texts) for _, note_texts in pending) >= batch_size:
+            flush()
+
+    if pending:
+        flush()
+
+    logger.info(
+        f"embed_organized_notes: embedded={len(result)}, skipped={skipped}, failed={failed}"
+    )
+    return result
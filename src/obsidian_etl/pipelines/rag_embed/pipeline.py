@@ -0,0 +1,36 @@
+"""RAG Embed pipeline definition.
+
+Optional stage after organize (enabled by rag_embed.enabled in parameters.yml):
+- embed_organized_notes: Chunk and embed organized notes, persisted per file_id
+
+`rag index` bulk-loads the persisted vectors instead of embedding the notes again.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from kedro.pipeline import Pipeline, node, pipeline
+
+from .nodes import embed_organized_notes
+
+
+def create_pipeline(**kwargs: Any) -> Pipeline:
+    """Create the RAG embed pipeline.
+
+    Args:
+        **kwargs: Ignored
+
+    Returns:
+        Pipeline: organized_notes → rag_embeddings
+    """
+    return pipeline(
+        [
+            node(
+                func=embed_organized_notes,
+                inputs=["organized_notes", "existing_rag_embeddings", "params:rag_embed"],
+                outputs="rag_embeddings",
+                name="embed_organized_notes",
+            ),
+        ]
+    )
@@ -5,18 +5,26 @@ This module implements the vault_output pipeline nodes:
 - resolve_vault_destination: Map genre to Vault and construct destination paths
 - check_conflicts: Detect existing files at destination paths
 - log_preview_summary: Generate and log preview summary information
+- copy_to_vault: Copy organized files to Vault destinations
+- log_copy_summary: Generate and log copy summary information
+- select_changed_partitions: Pick new/changed notes using the publish journal
+- update_publish_journal: Record published notes and remove stale destinations
 """
 
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
 from collections.abc import Callable
+from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+from obsidian_etl.utils.fast_copy import PUBLISH_MODES, copy_file
+
 logger = logging.getLogger(__name__)
 
 
@@ -58,6 +66,40 @@ def find_incremented_path(dst: Path) -> Path:
         counter += 1
 
 
+def content_hash(data: bytes) -> str:
+    """Compute content hash used to detect unchanged Vault files.
+
+    Args:
+        data: Raw file content.
+
+    Returns:
+        SHA-256 hex digest of the content.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def _is_unchanged(dst: Path, data: bytes) -> bool:
+    """Check whether the destination file already holds identical content.
+
+    Compares file size first so that differing files are detected without
+    reading them, then falls back to a content hash comparison.
+
+    Args:
+        dst: Existing destination path.
+        data: Content that would be written (UTF-8 encoded).
+
+    Returns:
+        True if the destination content matches, False otherwise
+        (including when the destination cannot be read).
+    """
+    try:
+        if dst.stat().st_size != len(data):
+            return False
+        return content_hash(dst.read_bytes()) == content_hash(data)
+    except OSError:
+        return False
+
+
 def resolve_vault_destination(
     organized_files: dict[str, Callable[[], str]] | dict[str, str],
     params: dict[str, Any],
@@ -259,6 +301,7 @@ def copy_to_vault(
     organized_files: dict[str, Callable[[], str]] | dict[str, str],
     destinations: dict[str, dict[str, str]],
     params: dict[str, Any],
+    source_paths: dict[str, Callable[[], Path]] | dict[str, Path] | None = None,
 ) -> list[dict[str, Any]]:
     """Copy organized files to Vault destinations.
 
@@ -266,39 +309,57 @@ def copy_to_vault(
     - skip: Skip existing files (default)
     - overwrite: Replace existing files
     - increment: Save as file_1.md, file_2.md, etc.
+    - sync: Replace existing files only when their content hash differs
+
+    Files are published either by writing the loaded str (publish_mode "write",
+    default) or, when source_paths is given, by copying the organized file
+    as-is at the file level (publish_mode "copy", "reflink" or "hardlink").
+    Organized notes are published verbatim, so no transformation is required.
 
     Args:
         organized_files: PartitionedDataset-style input (dict of callables or strings).
                         Keys must match destinations keys.
         destinations: dict[partition_key, VaultDestination] from resolve_vault_destination
-        params: Parameters dict with conflict_handling mode.
-                conflict_handling: "skip" (default), "overwrite", or "increment"
+        params: Parameters dict with conflict_handling and publish_mode.
+                conflict_handling: "skip" (default), "overwrite", "increment", or "sync"
+                publish_mode: "write" (default), "copy", "reflink", or "hardlink"
+        source_paths: Optional PartitionedDataset of FilePathDataset
+                     (dict of callables or Paths) pointing to the organized files.
+                     Required for file-level publish modes.
 
     Returns:
         list[CopyResult]: Results for each copy operation.
         CopyResult dict contains:
         - source: Source partition key
         - destination: Destination path string (or None if skipped/error)
-        - status: "copied", "skipped", "overwritten", "incremented", or "error"
+        - status: "copied", "skipped", "overwritten", "incremented",
+                  "unchanged", "updated", or "error"
         - error_message: Error description (or None if successful)
 
     Side effects:
         - Creates destination directories as needed (parents=True)
-        - Writes files to destination paths
+        - Writes files to destination paths (sync mode: only when content changed)
         - Logs copy operations to logger.info
         - Logs errors to logger.warning
 
     Error handling:
-        - PermissionError: Caught and returned as error status, does not raise
+        - OSError (PermissionError, ENOSPC, EXDEV, ...): Caught and returned as
+          error status, does not raise
         - Missing source: Returned as error status
         - Creates parent directories automatically
     """
     conflict_handling = params.get("conflict_handling", "skip")
+    publish_mode = params.get("publish_mode", "write")
+    if publish_mode != "write" and publish_mode not in PUBLISH_MODES:
+        raise ValueError(
+            f"Invalid publish_mode '{publish_mode}'. Valid modes: {['write', *PUBLISH_MODES]}"
+        )
     results = []
 
     for key, dest in destinations.items():
         content_or_func = organized_files.get(key)
-        if content_or_func is None:
+        path_or_func = source_paths.get(key) if source_paths and publish_mode != "write" else None
+        if content_or_func is None and path_or_func is None:
             results.append(
                 {
                     "source": key,
@@ -309,7 +370,13 @@ def copy_to_vault(
             )
             continue
 
-        content = content_or_func() if callable(content_or_func) else content_or_func
+        # File-level publishing: keep the source as a path, never decode it
+        src_path: Path | None = None
+        content = ""
+        if path_or_func is not None:
+            src_path = Path(path_or_func() if callable(path_or_func) else path_or_func)
+        else:
+            content = content_or_func() if callable(content_or_func) else content_or_func
         full_path = Path(dest["full_path"])
 
         # Handle existing file (conflict)
@@ -338,11 +405,24 @@ def copy_to_vault(
                 # Find next available incremented path
                 full_path = find_incremented_path(full_path)
                 is_incremented = True
+            elif conflict_handling == "sync":
+                data = src_path.read_bytes() if src_path else content.encode("utf-8")
+                if _is_unchanged(full_path, data):
+                    results.append(
+                        {
+                            "source": key,
+                            "destination": str(full_path),
+                            "status": "unchanged",
+                            "error_message": None,
+                        }
+                    )
+                    logger.debug(f"Unchanged: {full_path}")
+                    continue
 
         # Create parent directory if needed
         try:
             full_path.parent.mkdir(parents=True, exist_ok=True)
-        except PermissionError as e:
+        except OSError as e:
             results.append(
                 {
                     "source": key,
@@ -351,12 +431,16 @@ def copy_to_vault(
                     "error_message": str(e),
                 }
             )
-            logger.warning(f"Permission error creating directory for {key}: {e}")
+            logger.warning(f"Error creating directory for {key}: {e}")
             continue
 
         # Write file
         try:
-            full_path.write_text(content, encoding="utf-8")
+            if src_path is not None:
+                method = copy_file(src_path, full_path, mode=publish_mode)
+                logger.debug(f"Published {key} via {method}")
+            else:
+                full_path.write_text(content, encoding="utf-8")
             # Determine status based on conflict handling
             if is_incremented:
                 status = "incremented"
@@ -364,6 +448,9 @@ def copy_to_vault(
             elif file_exists and conflict_handling == "overwrite":
                 status = "overwritten"
                 logger.info(f"Overwritten {key} -> {full_path}")
+            elif file_exists and conflict_handling == "sync":
+                status = "updated"
+                logger.info(f"Updated {key} -> {full_path}")
             else:
                 status = "copied"
                 logger.info(f"Copied {key} -> {full_path}")
@@ -375,7 +462,8 @@ def copy_to_vault(
                     "error_message": None,
                 }
             )
-        except PermissionError as e:
+        except OSError as e:
+            # PermissionError, ENOSPC, cross-device links, ...: record and continue
             results.append(
                 {
                     "source": key,
@@ -384,7 +472,7 @@ def copy_to_vault(
                     "error_message": str(e),
                 }
             )
-            logger.warning(f"Permission error writing {key}: {e}")
+            logger.warning(f"Error writing {key}: {e}")
 
     return results
 
@@ -405,6 +493,8 @@ def log_copy_summary(copy_results: list[dict[str, Any]]) -> dict[str, int]:
         - overwritten: Count of replaced files
         - incremented: Count of files saved with incremented names
         - skipped: Count of skipped files (existing files in skip mode)
+        - unchanged: Count of files left untouched (identical content in sync mode)
+        - updated: Count of files rewritten because content changed (sync mode)
         - errors: Count of failed operations
 
     Side effects:
@@ -417,6 +507,8 @@ def log_copy_summary(copy_results: list[dict[str, Any]]) -> dict[str, int]:
     overwritten = sum(1 for r in copy_results if r["status"] == "overwritten")
     incremented = sum(1 for r in copy_results if r["status"] == "incremented")
     skipped = sum(1 for r in copy_results if r["status"] == "skipped")
+    unchanged = sum(1 for r in copy_results if r["status"] == "unchanged")
+    updated = sum(1 for r in copy_results if r["status"] == "updated")
     errors = sum(1 for r in copy_results if r["status"] == "error")
 
     logger.info("=" * 80)
@@ -428,6 +520,10 @@ def log_copy_summary(copy_results: list[dict[str, Any]]) -> dict[str, int]:
         logger.info(f"  Overwritten: {overwritten}")
     if incremented > 0:
         logger.info(f"  Incremented: {incremented}")
+    if updated > 0:
+        logger.info(f"  Updated: {updated}")
+    if unchanged > 0:
+        logger.info(f"  Unchanged: {unchanged}")
     logger.info(f"  Skipped: {skipped}")
     if errors > 0:
         logger.info(f"  Errors: {errors}")
@@ -442,5 +538,174 @@ def log_copy_summary(copy_results: list[dict[str, Any]]) -> dict[str, int]:
         "overwritten": overwritten,
         "incremented": incremented,
         "skipped": skipped,
+        "unchanged": unchanged,
+        "updated": updated,
         "errors": errors,
     }
+
+
+# Copy statuses meaning the destination holds the current content
+_PUBLISHED_STATUSES = {"copied", "overwritten", "incremented", "updated", "unchanged"}
+
+
+def select_changed_partitions(
+    organized_files: dict[str, Callable[[], str]] | dict[str, str],
+    source_paths: dict[str, Callable[[], Path]] | dict[str, Path],
+    journal: dict[str, dict[str, Any]],
+    params: dict[str, Any],
+) -> tuple[dict[str, Callable[[], str]] | dict[str, str], dict[str, dict[str, Any]]]:
+    """Select organized partitions that are new or changed since the last publish.
+
+    A partition is unchanged when the publish journal has an entry for it,
+    its journaled destination still exists, and its content hash matches.
+    The hash is only computed when the source size/mtime differ from the
+    journal, so an unchanged vault costs one stat per note.
+
+    Args:
+        organized_files: PartitionedDataset-style input (dict of callables or strings).
+        source_paths: PartitionedDataset of FilePathDataset for the same partitions.
+        journal: Existing publish journal (dict[partition_key, JournalEntry]).
+                 Empty dict when nothing has been published yet.
+        params: Parameters dict with incremental flag.
+                incremental: If True, only new/changed partitions are returned.
+                             If False (default), all partitions are returned.
+
+    Returns:
+        Tuple of:
+        - Subset of organized_files to resolve and copy
+        - dict[partition_key, SourceState] for the selected partitions, with
+          content_hash, size and mtime_ns of the source file
+    """
+    incremental = params.get("incremental", False)
+    journal = journal or {}
+
+    selected: dict[str, Any] = {}
+    states: dict[str, dict[str, Any]] = {}
+    unchanged = 0
+
+    for key, content_or_func in organized_files.items():
+        path_or_func = source_paths.get(key)
+        if path_or_func is None:
+            # No file on disk (e.g., in-memory input): always publish
+            selected[key] = content_or_func
+            continue
+
+        src_path = Path(path_or_func() if callable(path_or_func) else path_or_func)
+        stat = src_path.stat()
+        entry = journal.get(key)
+
+        if (
+            entry
+            and entry.get("size") == stat.st_size
+            and entry.get("mtime_ns") == stat.st_mtime_ns
+        ):
+            source_hash = entry["content_hash"]
+        else:
+            source_hash = content_hash(src_path.read_bytes())
+
+        if (
+            incremental
+            and entry is not None
+            and entry.get("content_hash") == source_hash
+            and Path(entry.get("destination", "")).is_file()
+        ):
+            unchanged += 1
+            continue
+
+        selected[key] = content_or_func
+        states[key] = {
+            "content_hash": source_hash,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+    logger.info(
+        f"Publish journal: {len(selected)} new/changed, {unchanged} unchanged "
+        f"(incremental={incremental})"
+    )
+    return selected, states
+
+
+def update_publish_journal(
+    journal: dict[str, dict[str, Any]],
+    source_states: dict[str, dict[str, Any]],
+    destinations: dict[str, dict[str, str]],
+    copy_results: list[dict[str, Any]],
+) -> dict[str, dict[str, Any]]:
+    """Record published partitions in the journal and clean up moved notes.
+
+    When a note's destination changed (e.g., genre or topic was updated),
+    the stale destination from the previous publish is removed if it still
+    holds the content that was published there. Files edited in the Vault
+    since then are left untouched.
+
+    Args:
+        journal: Existing publish journal (dict[partition_key, JournalEntry]).
+        source_states: dict[partition_key, SourceState] from select_changed_partitions.
+        destinations: dict[partition_key, VaultDestination] from resolve_vault_destination.
+        copy_results: list[CopyResult] from copy_to_vault.
+
+    Returns:
+        Updated journal. JournalEntry dict contains:
+        - content_hash: SHA-256 of the published content
+        - destination: Destination path string
+        - published_at: ISO 8601 timestamp (UTC) of the publish
+        - size: Source file size in bytes
+        - mtime_ns: Source file mtime in nanoseconds
+
+    Side effects:
+        Deletes stale destination files of moved notes.
+    """
+    updated = dict(journal or {})
+    published_at = datetime.now(tz=UTC).isoformat(timespec="seconds")
+
+    for result in copy_results:
+        key = result["source"]
+        state = source_states.get(key)
+        if state is None:
+            continue
+
+        if result["status"] in _PUBLISHED_STATUSES:
+            destination = result["destination"]
+        elif result["status"] == "skipped" and key in destinations:
+            # Existing file kept by skip mode: record it so it is not re-evaluated
+            destination = destinations[key]["full_path"]
+        else:
+            continue
+
+        previous = updated.get(key)
+        if (
+            previous
+            and result["status"] in _PUBLISHED_STATUSES
+            and previous.get("destination") != destination
+        ):
+            _remove_stale_destination(Path(previous["destination"]), previous["content_hash"])
+
+        updated[key] = {
+            "content_hash": state["content_hash"],
+            "destination": destination,
+            "published_at": published_at,
+            "size": state["size"],
+            "mtime_ns": state["mtime_ns"],
+        }
+
+    return updated
+
+
+def _remove_stale_destination(stale: Path, expected_hash: str) -> None:
+    """Remove a previously published file that has moved elsewhere.
+
+    Args:
+        stale: Previous destination path.
+        expected_hash: Content hash recorded when it was published.
+    """
+    try:
+        if not stale.is_file():
+            return
+        if content_hash(stale.read_bytes()) != expected_hash:
+            logger.warning(f"Stale destination modified in Vault, keeping: {stale}")
+            return
+        stale.unlink()
+        logger.info(f"Removed stale destination: {stale}")
+    except OSError as e:
+        logger.warning(f"Failed to remove stale destination {stale}: {e}")
@@ -15,6 +15,8 @@ from .nodes import (
     log_copy_summary,
     log_preview_summary,
     resolve_vault_destination,
+    select_changed_partitions,
+    update_publish_journal,
 )
 
 
@@ -55,22 +57,43 @@ def create_vault_pipeline(**kwargs: Any) -> Pipeline:
     """Create vault copy pipeline for organized files.
 
     Copies files to Vault with conflict handling (default: skip).
+    organized_file_paths is passed so that file-level publish modes
+    (publish_mode: copy/reflink/hardlink) can copy without decoding.
+    The publish journal limits work to new/changed notes when
+    organize.incremental is enabled, and removes stale destinations
+    of notes whose genre or topic changed.
 
     Returns:
-        Pipeline: Copy pipeline with destination resolution,
-                 file copying, and summary logging.
+        Pipeline: Copy pipeline with change selection, destination resolution,
+                 file copying, summary logging, and journal update.
     """
     return Pipeline(
         [
+            node(
+                func=select_changed_partitions,
+                inputs=[
+                    "organized_files",
+                    "organized_file_paths",
+                    "existing_vault_publish_journal",
+                    "params:organize",
+                ],
+                outputs=["changed_organized_files", "publish_source_states"],
+                name="select_changed_partitions_node",
+            ),
             node(
                 func=resolve_vault_destination,
-                inputs=["organized_files", "params:organize"],
+                inputs=["changed_organized_files", "params:organize"],
                 outputs="vault_destinations",
                 name="resolve_vault_destination_node",
             ),
             node(
                 func=copy_to_vault,
-                inputs=["organized_files", "vault_destinations", "params:organize"],
+                inputs=[
+                    "changed_organized_files",
+                    "vault_destinations",
+                    "params:organize",
+                    "organized_file_paths",
+                ],
                 outputs="copy_results",
                 name="copy_to_vault_node",
             ),
@@ -80,5 +103,16 @@ def create_vault_pipeline(**kwargs: Any) -> Pipeline:
                 outputs="copy_summary",
                 name="log_copy_summary_node",
             ),
+            node(
+                func=update_publish_journal,
+                inputs=[
+                    "existing_vault_publish_journal",
+                    "publish_source_states",
+                    "vault_destinations",
+                    "copy_results",
+                ],
+                outputs="vault_publish_journal",
+                name="update_publish_journal_node",
+            ),
         ]
     )
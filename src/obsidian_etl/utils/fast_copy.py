@@ -0,0 +1,138 @@
+"""File-level copy utilities for publishing notes without re-encoding.
+
+Copies are performed by the kernel (copy_file_range / sendfile) or by
+sharing data blocks (reflink / hardlink) so that file content never passes
+through Python-level str decode/encode.
+"""
+
+from __future__ import annotations
+
+import errno
+import logging
+import os
+import shutil
+import sys
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Linux FICLONE ioctl request number (_IOW(0x94, 9, int))
+FICLONE = 0x40049409
+
+PUBLISH_MODES = ("copy", "reflink", "hardlink")
+
+# errno values meaning "this fast path is not available here, try the next one"
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,  # Differs from EOPNOTSUPP on macOS
+    errno.ENOTTY,
+    errno.EPERM,
+}
+
+
+def copy_file(src: Path, dst: Path, mode: str = "copy") -> str:
+    """Copy src to dst at the file level.
+
+    Falls back to the next cheaper strategy when the filesystem does not
+    support the requested one (hardlink/reflink → copy_file_range → copyfile).
+
+    Args:
+        src: Existing source file.
+        dst: Destination file (overwritten if it exists).
+        mode: "copy" (kernel copy), "reflink" (copy-on-write clone),
+              or "hardlink" (share the inode with src).
+
+    Returns:
+        Name of the strategy actually used:
+        "hardlink", "reflink", "copy_file_range", or "copyfile".
+
+    Raises:
+        ValueError: If mode is not one of PUBLISH_MODES.
+        OSError: If every strategy fails (e.g., PermissionError).
+    """
+    if mode not in PUBLISH_MODES:
+        raise ValueError(f"Invalid publish mode '{mode}'. Valid modes: {list(PUBLISH_MODES)}")
+
+    if mode == "hardlink" and _try_hardlink(src, dst):
+        return "hardlink"
+    if mode == "reflink" and _try_reflink(src, dst):
+        return "reflink"
+    return _copy_data(src, dst)
+
+
+def _try_hardlink(src: Path, dst: Path) -> bool:
+    """Atomically replace dst with a hardlink to src.
+
+    Returns:
+        True on success, False if hardlinks are unsupported (e.g., cross-device).
+    """
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.link")
+    try:
+        os.link(src, tmp)
+        os.replace(tmp, dst)
+        return True
+    except OSError as e:
+        tmp.unlink(missing_ok=True)
+        if e.errno in _UNSUPPORTED_ERRNOS:
+            logger.debug(f"Hardlink unsupported for {dst}, falling back to copy: {e}")
+            return False
+        raise
+
+
+def _try_reflink(src: Path, dst: Path) -> bool:
+    """Clone src into dst with the FICLONE ioctl (btrfs, XFS, ...).
+
+    Returns:
+        True on success, False if reflinks are unsupported.
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+
+    import fcntl
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return True
+        except OSError as e:
+            if e.errno in _UNSUPPORTED_ERRNOS:
+                logger.debug(f"Reflink unsupported for {dst}, falling back to copy: {e}")
+                return False
+            raise
+
+
+def _copy_data(src: Path, dst: Path) -> str:
+    """Copy file data in the kernel.
+
+    Uses os.copy_file_range when available, otherwise shutil.copyfile
+    (which uses sendfile on Linux). copy_file_range returning 0 before the
+    whole file was copied (the source changed, or a filesystem that does
+    not support it without failing) also falls back to shutil.copyfile,
+    so a short copy is never reported as done.
+
+    Returns:
+        "copy_file_range" or "copyfile".
+    """
+    copy_file_range = getattr(os, "copy_file_range", None)
+    if copy_file_range is not None:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            try:
+                while remaining > 0:
+                    copied = copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return "copy_file_range"
+                logger.debug(f"copy_file_range stopped short for {dst}, copying again")
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED_ERRNOS:
+                    raise
+                logger.debug(f"copy_file_range unsupported for {dst}: {e}")
+
+    shutil.copyfile(src, dst)
+    return "copyfile"
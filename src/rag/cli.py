@@ -4,10 +4,16 @@ RAG CLI - Command Line Interface for RAG System
 Entry point: python -m src.rag.cli
 
 Subcommands:
-- index: Index vault documents
+- index: Index vault documents (--rebuild: blue/green rebuild into a new index version)
 - search: Semantic search
 - ask: Q&A with LLM
 - status: Show index status
+- migrate: Rebuild the vector collection under another storage profile
+- snapshot: Export the index to one file / restore it without re-embedding
+- serve: Run the query daemon (warm pipelines over a Unix socket or HTTP)
+
+search / ask / status go through the daemon when one is running
+(RAG_USE_DAEMON=0 to disable).
 """
 
 from __future__ import annotations
@@ -16,30 +22,40 @@ import argparse
 import json
 import sys
 import time
-from typing import TYPE_CHECKING
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 import structlog
 
-from src.rag.clients import check_connection
-from src.rag.config import VAULTS_DIR, OllamaConfig, ollama_config, rag_config
-from src.rag.exceptions import ConnectionError as RAGConnectionError
-from src.rag.exceptions import IndexingError, QueryError
-from src.rag.pipelines import (
-    Answer,
-    IndexingResult,
-    QueryFilters,
-    SearchResponse,
-    ask,
-    create_indexing_pipeline,
-    create_qa_pipeline,
-    create_search_pipeline,
-    index_all_vaults,
-    search,
+# Heavy dependencies (Haystack, Qdrant client, requests) are imported inside
+# the commands that need them, so --help, argument errors, status (cached
+# stats) and daemon-backed search/ask start quickly.
+from src.rag.clients.daemon import get_daemon_client
+from src.rag.config import (
+    COLLECTION_NAME,
+    DAEMON_SOCKET_PATH,
+    QDRANT_URL,
+    SEARCH_MODES,
+    SNAPSHOT_DIR,
+    STORAGE_PROFILES,
+    VAULTS_DIR,
+    OllamaConfig,
+    ollama_config,
+    rag_config,
+)
+from src.rag.exceptions import (
+    ConfigurationError,
+    DaemonUnavailableError,
+    IndexingError,
+    QueryError,
 )
-from src.rag.stores import COLLECTION_NAME, get_collection_stats, get_document_store
+from src.rag.exceptions import ConnectionError as RAGConnectionError
+from src.rag.pipelines.models import Answer, QueryFilters, SearchResponse, SearchResult
+from src.rag.stores.stats import load_collection_stats, save_collection_stats
 
 if TYPE_CHECKING:
-    pass
+    from src.rag.pipelines.batch import BatchQuery
+    from src.rag.pipelines.indexing import IndexingProgress, IndexingResult
 
 # Configure structlog
 structlog.configure(
@@ -110,6 +126,22 @@ def create_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Preview without actually indexing",
     )
+    index_parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rebuild the index from scratch (default: only new/changed files)",
+    )
+    index_parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Rebuild all vaults as a new index version and switch to it when complete "
+        "(searches keep using the current index meanwhile)",
+    )
+    index_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the local embedding cache",
+    )
     index_parser.add_argument(
         "--verbose",
         "-v",
@@ -127,7 +159,8 @@ def create_parser() -> argparse.ArgumentParser:
     )
     search_parser.add_argument(
         "query",
-        help="Search query",
+        nargs="?",
+        help="Search query (omit with --batch)",
     )
     search_parser.add_argument(
         "--vault",
@@ -147,12 +180,37 @@ def create_parser() -> argparse.ArgumentParser:
         default=5,
         help="Number of results (default: 5)",
     )
+    search_parser.add_argument(
+        "--mode",
+        choices=list(SEARCH_MODES),
+        default=rag_config.search_mode,
+        help=(
+            "Retrieval mode: dense (embeddings), lexical (full-text, no embedding "
+            "server), hybrid (rank fusion of both), staged (note summaries first, "
+            "then chunks of the best notes) (default: %(default)s)"
+        ),
+    )
     search_parser.add_argument(
         "--format",
         choices=["text", "json"],
         default="text",
         help="Output format (default: text)",
     )
+    search_parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        type=Path,
+        help=(
+            "Run every query of FILE (one per line, or JSON objects; '-' for stdin) "
+            "and write one JSON result per line"
+        ),
+    )
+    search_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Queries run concurrently with --batch (default: %(default)s)",
+    )
 
     # ==========================================================================
     # ask command
@@ -164,7 +222,8 @@ def create_parser() -> argparse.ArgumentParser:
     )
     ask_parser.add_argument(
         "question",
-        help="Question to ask",
+        nargs="?",
+        help="Question to ask (omit with --batch)",
     )
     ask_parser.add_argument(
         "--vault",
@@ -184,6 +243,16 @@ def create_parser() -> argparse.ArgumentParser:
         default=5,
         help="Number of source documents (default: 5)",
     )
+    ask_parser.add_argument(
+        "--mode",
+        choices=list(SEARCH_MODES),
+        default=rag_config.search_mode,
+        help=(
+            "Retrieval mode: dense (embeddings), lexical (full-text, no embedding "
+            "server), hybrid (rank fusion of both), staged (note summaries first, "
+            "then chunks of the best notes) (default: %(default)s)"
+        ),
+    )
     ask_parser.add_argument(
         "--format",
         choices=["text", "json"],
@@ -195,6 +264,31 @@ def create_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Hide source citations",
     )
+    ask_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always generate a new answer (skip the answer cache)",
+    )
+    ask_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print sources after retrieval and answer tokens as they are generated",
+    )
+    ask_parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        type=Path,
+        help=(
+            "Run every query of FILE (one per line, or JSON objects; '-' for stdin) "
+            "and write one JSON result per line"
+        ),
+    )
+    ask_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Queries run concurrently with --batch (default: %(default)s)",
+    )
 
     # ==========================================================================
     # status command
@@ -217,6 +311,93 @@ def create_parser() -> argparse.ArgumentParser:
         help="Verbose output",
     )
 
+    # ==========================================================================
+    # migrate command
+    # ==========================================================================
+    migrate_parser = subparsers.add_parser(
+        "migrate",
+        help="Rebuild the collection under a storage profile",
+        description=(
+            "Rebuild the vector collection with another storage profile "
+            "(quantization, on-disk vectors, HNSW settings) as a new index version, "
+            "switched in once the copy is verified. Stored vectors are copied; "
+            "nothing is re-embedded."
+        ),
+    )
+    migrate_parser.add_argument(
+        "--profile",
+        required=True,
+        choices=list(STORAGE_PROFILES),
+        help="Target storage profile",
+    )
+
+    # ==========================================================================
+    # snapshot command
+    # ==========================================================================
+    snapshot_parser = subparsers.add_parser(
+        "snapshot",
+        help="Export or restore the index",
+        description=(
+            "Write the index (chunk and summary vectors, payloads, settings and index "
+            "manifest) to one compressed file, or restore it on another machine. "
+            "Restoring bulk-loads the stored vectors into a new index version and "
+            "switches to it once verified; nothing is re-embedded."
+        ),
+    )
+    snapshot_actions = snapshot_parser.add_subparsers(dest="snapshot_action", required=True)
+    snapshot_create = snapshot_actions.add_parser("create", help="Write a snapshot file")
+    snapshot_create.add_argument(
+        "--output",
+        "-o",
+        default=None,
+        help=f"Snapshot file (default: {SNAPSHOT_DIR}/<collection>-<timestamp>.zip)",
+    )
+    snapshot_restore = snapshot_actions.add_parser(
+        "restore", help="Replace the index with a snapshot file"
+    )
+    snapshot_restore.add_argument("file", help="Snapshot file")
+    snapshot_restore.add_argument(
+        "--force",
+        action="store_true",
+        help="Restore even if the snapshot was built with another embedding model",
+    )
+
+    # ==========================================================================
+    # serve command
+    # ==========================================================================
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Run the query daemon",
+        description=(
+            "Keep the document store and search/Q&A pipelines warm and answer "
+            "search, ask and status requests over a Unix socket (default) or HTTP. "
+            "Other CLI invocations use the daemon automatically. With local Qdrant "
+            "storage, stop the daemon before indexing."
+        ),
+    )
+    serve_parser.add_argument(
+        "--socket",
+        default=str(DAEMON_SOCKET_PATH),
+        help=f"Unix socket path (default: {DAEMON_SOCKET_PATH})",
+    )
+    serve_parser.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="Listen on HTTP at this port instead of the Unix socket (set RAG_DAEMON_URL)",
+    )
+    serve_parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="HTTP bind address (default: 127.0.0.1)",
+    )
+    serve_parser.add_argument(
+        "--mode",
+        choices=list(SEARCH_MODES),
+        default=rag_config.search_mode,
+        help=f"Search mode whose pipelines are built at startup (default: {rag_config.search_mode})",
+    )
+
     return parser
 
 
@@ -225,24 +406,30 @@ def create_parser() -> argparse.ArgumentParser:
 # =============================================================================
 
 
-def verify_connections(config: OllamaConfig, check_local: bool = False) -> None:
+def verify_connections(
+    config: OllamaConfig, check_local: bool = False, check_remote: bool = True
+) -> None:
     """
     Verify connections to required servers.
 
     Args:
         config: Ollama configuration with server URLs.
         check_local: Also check local LLM server (for ask command).
+        check_remote: Check remote embedding server (not needed for lexical search).
 
     Raises:
         RAGConnectionError: If connection fails.
     """
+    from src.rag.clients.ollama import check_connection
+
     # Check remote embedding server
-    success, error = check_connection(config.remote_url)
-    if not success:
-        raise RAGConnectionError(
-            f"Cannot connect to embedding server: {error}",
-            server=config.remote_url,
-        )
+    if check_remote:
+        success, error = check_connection(config.remote_url)
+        if not success:
+            raise RAGConnectionError(
+                f"Cannot connect to embedding server: {error}",
+                server=config.remote_url,
+            )
 
     # Check local LLM server (only for ask command)
     if check_local:
@@ -254,6 +441,42 @@ def verify_connections(config: OllamaConfig, check_local: bool = False) -> None:
             )
 
 
+def _call_daemon(command: str, payload: dict[str, object] | None = None) -> dict | None:
+    """
+    Run a command on the running daemon.
+
+    Returns:
+        Daemon response, or None when no daemon is available (run locally).
+
+    Raises:
+        QueryError / RAGConnectionError: Raised by the daemon.
+    """
+    client = get_daemon_client()
+    if client is None:
+        return None
+    try:
+        if command == "status":
+            return client.status()
+        return client.search(payload or {}) if command == "search" else client.ask(payload or {})
+    except DaemonUnavailableError:
+        return None
+
+
+def _search_result_from_dict(data: dict) -> SearchResult:
+    return SearchResult(**data)
+
+
+def _open_stores(mode: str) -> tuple[Any, Any, Any]:
+    """Vector store, full-text index and summary store read by a search mode (None if unused)."""
+    from src.rag.stores.lexical import LexicalIndex
+    from src.rag.stores.qdrant import get_document_store, get_summary_store
+
+    store = get_document_store() if mode != "lexical" else None
+    lexical = LexicalIndex() if mode in ("lexical", "hybrid") else None
+    summary_store = get_summary_store(store) if mode == "staged" else None
+    return store, lexical, summary_store
+
+
 # =============================================================================
 # Index Command
 # =============================================================================
@@ -271,21 +494,95 @@ def cmd_index(args: argparse.Namespace) -> int:
     """
     vaults = args.vaults or rag_config.target_vaults
     dry_run = args.dry_run
+    full = args.full
     verbose = args.verbose
 
     if verbose:
-        logger.info("Starting indexing", vaults=vaults, dry_run=dry_run)
+        logger.info("Starting indexing", vaults=vaults, dry_run=dry_run, full=full)
+
+    if args.rebuild and (args.vaults or dry_run or full):
+        print("Error: --rebuild always indexes all vaults from scratch", file=sys.stderr)
+        return EXIT_ARGS_ERROR
+
+    from src.rag.pipelines.indexing import (
+        create_indexing_pipeline,
+        index_all_vaults,
+        rebuild_index,
+    )
+    from src.rag.stores.embedding_cache import EmbeddingCache
+    from src.rag.stores.lexical import LexicalIndex
+    from src.rag.stores.manifest import IndexManifest
+    from src.rag.stores.precomputed import import_precomputed_embeddings
+    from src.rag.stores.qdrant import (
+        get_collection_stats,
+        get_document_store,
+        get_summary_store,
+    )
 
     try:
         # Verify connection (not needed for dry_run, but check anyway for consistency)
         if not dry_run:
             verify_connections(ollama_config)
 
+        # Embedding cache (skip re-embedding chunks whose text is unchanged)
+        cache = None
+        if not dry_run and not args.no_cache:
+            cache = EmbeddingCache(
+                ollama_config.embedding_model,
+                max_bytes=rag_config.embedding_cache_max_bytes,
+            )
+            # Vectors computed during the ETL (rag_embed pipeline) become cache hits
+            imported = import_precomputed_embeddings(cache)
+            if imported.vectors:
+                print(
+                    f"Loaded {imported.vectors} precomputed embeddings "
+                    f"from {imported.files} notes"
+                )
+
+        # Blue/green: build a new index version, validate it, switch the active pointer
+        if args.rebuild:
+            start_time = time.time()
+            rebuilt = rebuild_index(
+                vaults_dir=VAULTS_DIR,
+                vault_names=vaults,
+                cache=cache,
+                progress=_print_index_progress,
+            )
+            elapsed = time.time() - start_time
+            save_collection_stats(rebuilt.stats)
+            _output_index_results(rebuilt.results, elapsed, dry_run, verbose)
+            counts = ", ".join(f"{v:,} {k}" for k, v in rebuilt.counts.items())
+            print(f"Switched index v{rebuilt.replaced} -> v{rebuilt.version} ({counts})")
+            if rebuilt.removed_versions:
+                removed = ", ".join(f"v{v}" for v in rebuilt.removed_versions)
+                print(f"Removed old index versions: {removed}")
+            return EXIT_SUCCESS
+
         # Get document store
         store = get_document_store()
 
+        # Full-text index kept in sync with the vector store
+        lexical = None if dry_run else LexicalIndex()
+
+        # One summary vector per note (staged search)
+        summary_store = (
+            get_summary_store(store) if rag_config.summary_vectors and not dry_run else None
+        )
+
         # Create indexing pipeline
-        pipeline = create_indexing_pipeline(store)
+        pipeline = create_indexing_pipeline(
+            store, cache=cache, lexical=lexical, summary_store=summary_store
+        )
+
+        # Load manifest of previously indexed files (incremental indexing)
+        manifest = IndexManifest.load()
+
+        if lexical is not None and not full and manifest.entries and not lexical.count_documents():
+            print(
+                "Note: the full-text index is empty; unchanged files are not added to it. "
+                "Run with --full once to build it.",
+                file=sys.stderr,
+            )
 
         # Index vaults
         start_time = time.time()
@@ -294,9 +591,19 @@ def cmd_index(args: argparse.Namespace) -> int:
             vaults_dir=VAULTS_DIR,
             vault_names=vaults,
             dry_run=dry_run,
+            store=store,
+            manifest=manifest,
+            full=full,
+            progress=_print_index_progress,
+            lexical=lexical,
+            summary_store=summary_store,
         )
         elapsed = time.time() - start_time
 
+        # Refresh cached stats for `status`
+        if not dry_run:
+            save_collection_stats(get_collection_stats(store))
+
         # Output results
         _output_index_results(results, elapsed, dry_run, verbose)
 
@@ -318,6 +625,16 @@ def cmd_index(args: argparse.Namespace) -> int:
         return EXIT_ERROR
 
 
+def _print_index_progress(progress: IndexingProgress) -> None:
+    """Report a committed indexing batch on stderr."""
+    print(
+        f"[{progress.vault_name}] batch {progress.batch}: "
+        f"{progress.indexed_docs} docs, {progress.total_chunks} chunks committed "
+        f"({progress.scanned_docs} scanned)",
+        file=sys.stderr,
+    )
+
+
 def _output_index_results(
     results: dict[str, IndexingResult],
     elapsed: float,
@@ -330,13 +647,21 @@ def _output_index_results(
     # Summary
     total_docs = sum(r.total_docs for r in results.values())
     indexed_docs = sum(r.indexed_docs for r in results.values())
+    unchanged_docs = sum(r.unchanged_docs for r in results.values())
+    deleted_docs = sum(r.deleted_docs for r in results.values())
     total_chunks = sum(r.total_chunks for r in results.values())
     total_errors = sum(len(r.errors) for r in results.values())
+    skipped_files = sum(r.skipped_files for r in results.values())
+    failed_files = sum(len(r.scan_errors) for r in results.values())
 
     print(f"\n{mode}Indexing Complete")
     print("=" * 50)
     print(f"Total documents: {total_docs}")
     print(f"Indexed documents: {indexed_docs}")
+    print(f"Unchanged documents: {unchanged_docs}")
+    print(f"Deleted documents: {deleted_docs}")
+    print(f"Skipped files (not normalized): {skipped_files}")
+    print(f"Unreadable files: {failed_files}")
     print(f"Total chunks: {total_chunks}")
     print(f"Errors: {total_errors}")
     print(f"Elapsed: {elapsed:.2f}s")
@@ -350,6 +675,8 @@ def _output_index_results(
             )
             for error in result.errors:
                 print(f"    - {error}")
+            for error in result.scan_errors:
+                print(f"    - [unreadable] {error}")
 
 
 # =============================================================================
@@ -367,21 +694,45 @@ def cmd_search(args: argparse.Namespace) -> int:
     Returns:
         Exit code.
     """
+    if args.batch is not None:
+        return _run_batch(args, "search")
+
     query = args.query
     vaults = args.vaults
     tags = args.tags
     top_k = args.top_k
     output_format = args.format
+    mode = args.mode
 
     try:
-        # Verify connection
-        verify_connections(ollama_config)
+        # Warm daemon, if running
+        start_time = time.time()
+        data = _call_daemon(
+            "search",
+            {"query": query, "vaults": vaults, "tags": tags, "top_k": top_k, "mode": mode},
+        )
+        if data is not None:
+            response = SearchResponse(
+                query=data["query"],
+                results=[_search_result_from_dict(r) for r in data["results"]],
+                total=data["total"],
+            )
+            _output_search(response, output_format, int((time.time() - start_time) * 1000))
+            return EXIT_SUCCESS
 
-        # Get document store
-        store = get_document_store()
+        # Verify connection (lexical search needs no embedding server)
+        if mode != "lexical":
+            verify_connections(ollama_config)
+
+        from src.rag.pipelines.query import create_search_pipeline, search
+
+        # Get document store / full-text index / summary store
+        store, lexical, summary_store = _open_stores(mode)
 
         # Create search pipeline
-        pipeline = create_search_pipeline(store)
+        pipeline = create_search_pipeline(
+            store, mode=mode, lexical=lexical, summary_store=summary_store
+        )
 
         # Build filters
         filters = (
@@ -395,14 +746,11 @@ def cmd_search(args: argparse.Namespace) -> int:
 
         # Execute search
         start_time = time.time()
-        response = search(pipeline, query, filters=filters, top_k=top_k)
+        response = search(pipeline, query, filters=filters, top_k=top_k, mode=mode)
         elapsed_ms = int((time.time() - start_time) * 1000)
 
         # Output results
-        if output_format == "json":
-            _output_search_json(response, elapsed_ms)
-        else:
-            _output_search_text(response)
+        _output_search(response, output_format, elapsed_ms)
 
         return EXIT_SUCCESS
 
@@ -417,6 +765,13 @@ def cmd_search(args: argparse.Namespace) -> int:
         return EXIT_ERROR
 
 
+def _output_search(response: SearchResponse, output_format: str, elapsed_ms: int) -> None:
+    if output_format == "json":
+        _output_search_json(response, elapsed_ms)
+    else:
+        _output_search_text(response)
+
+
 def _output_search_text(response: SearchResponse) -> None:
     """Output search results in text format."""
     print(f'\nFound {response.total} results for "{response.query}"\n')
@@ -434,7 +789,11 @@ def _output_search_text(response: SearchResponse) -> None:
 
 def _output_search_json(response: SearchResponse, elapsed_ms: int) -> None:
     """Output search results in JSON format."""
-    output = {
+    print(json.dumps(_search_json(response, elapsed_ms), ensure_ascii=False, indent=2))
+
+
+def _search_json(response: SearchResponse, elapsed_ms: int) -> dict[str, object]:
+    return {
         "query": response.query,
         "results": [
             {
@@ -451,7 +810,6 @@ def _output_search_json(response: SearchResponse, elapsed_ms: int) -> None:
         "total": response.total,
         "elapsed_ms": elapsed_ms,
     }
-    print(json.dumps(output, ensure_ascii=False, indent=2))
 
 
 # =============================================================================
@@ -459,32 +817,146 @@ def _output_search_json(response: SearchResponse, elapsed_ms: int) -> None:
 # =============================================================================
 
 
+class _AnswerStream:
+    """Prints a streamed answer (text format) and records its latency."""
+
+    def __init__(self, question: str, output_format: str, no_sources: bool) -> None:
+        self.question = question
+        self.echo = output_format == "text"
+        self.no_sources = no_sources
+        self.start_time = time.time()
+        self.retrieval_ms: int | None = None
+        self.ttft_ms: int | None = None
+
+    def _elapsed_ms(self) -> int:
+        return int((time.time() - self.start_time) * 1000)
+
+    def on_sources(self, sources: list[SearchResult]) -> None:
+        self.retrieval_ms = self._elapsed_ms()
+        if not self.echo:
+            return
+        print(f"\nQ: {self.question}\n")
+        if not self.no_sources and sources:
+            print("Sources:")
+            for i, src in enumerate(sources, 1):
+                print(f"- [{i}] {src.title} ({src.file_path})")
+            print()
+        print("A: ", end="", flush=True)
+
+    def on_token(self, token: str) -> None:
+        if self.ttft_ms is None:
+            self.ttft_ms = self._elapsed_ms()
+        if self.echo:
+            print(token, end="", flush=True)
+
+    def latency(self) -> dict[str, int | None]:
+        return {
+            "retrieval_ms": self.retrieval_ms,
+            "ttft_ms": self.ttft_ms,
+            "total_ms": self._elapsed_ms(),
+        }
+
+
+def _ask_via_daemon_stream(payload: dict[str, object], stream: _AnswerStream) -> Answer | None:
+    """
+    Streamed ask on the running daemon.
+
+    Returns:
+        Answer, or None when no daemon is available (run locally).
+    """
+    client = get_daemon_client()
+    if client is None:
+        return None
+    try:
+        for event in client.ask_stream(payload):
+            if event["event"] == "sources":
+                stream.on_sources([_search_result_from_dict(r) for r in event["sources"]])
+            elif event["event"] == "token":
+                stream.on_token(event["text"])
+            elif event["event"] == "done":
+                return _answer_from_dict(event["result"])
+    except DaemonUnavailableError:
+        if stream.retrieval_ms is None:
+            return None
+        raise
+    raise QueryError("RAG daemon closed the stream without an answer", stage="generation")
+
+
+def _answer_from_dict(data: dict) -> Answer:
+    return Answer(
+        text=data["text"],
+        sources=[_search_result_from_dict(r) for r in data["sources"]],
+        confidence=data["confidence"],
+        cached=data.get("cached", False),
+        similarity=data.get("similarity"),
+    )
+
+
 def cmd_ask(args: argparse.Namespace) -> int:
     """
     Execute ask command.
 
+    With --stream, sources are printed as soon as retrieval completes and
+    answer tokens as they are generated; JSON output records time to first
+    token and total latency. Answers to similar earlier questions come from
+    the answer cache unless --no-cache is given.
+
     Args:
         args: Parsed command line arguments.
 
     Returns:
         Exit code.
     """
+    if args.batch is not None:
+        return _run_batch(args, "ask")
+
     question = args.question
     vaults = args.vaults
     tags = args.tags
     top_k = args.top_k
     output_format = args.format
     no_sources = args.no_sources
+    mode = args.mode
+    stream = _AnswerStream(question, output_format, no_sources) if args.stream else None
 
     try:
+        # Warm daemon, if running
+        payload = {
+            "question": question,
+            "vaults": vaults,
+            "tags": tags,
+            "top_k": top_k,
+            "mode": mode,
+            "no_cache": args.no_cache,
+        }
+        start_time = time.time()
+        if stream is not None:
+            answer = _ask_via_daemon_stream(payload, stream)
+        else:
+            data = _call_daemon("ask", payload)
+            answer = _answer_from_dict(data) if data is not None else None
+        if answer is not None:
+            elapsed_ms = int((time.time() - start_time) * 1000)
+            _output_ask(answer, question, output_format, elapsed_ms, no_sources, stream)
+            return EXIT_SUCCESS
+
         # Verify connection (including local LLM)
-        verify_connections(ollama_config, check_local=True)
+        verify_connections(ollama_config, check_local=True, check_remote=mode != "lexical")
 
-        # Get document store
-        store = get_document_store()
+        from src.rag.pipelines.query import ask, create_qa_pipeline
+        from src.rag.stores.answer_cache import get_answer_cache
+
+        # Get document store / full-text index / summary store
+        store, lexical, summary_store = _open_stores(mode)
 
         # Create Q&A pipeline
-        pipeline = create_qa_pipeline(store)
+        pipeline = create_qa_pipeline(
+            store,
+            mode=mode,
+            lexical=lexical,
+            stream=stream is not None,
+            summary_store=summary_store,
+        )
 
         # Build filters
         filters = (
@@ -498,14 +970,22 @@ def cmd_ask(args: argparse.Namespace) -> int:
 
         # Execute Q&A
         start_time = time.time()
-        answer = ask(pipeline, question, filters=filters, top_k=top_k)
+        if stream is not None:
+            stream.start_time = start_time
+        answer = ask(
+            pipeline,
+            question,
+            filters=filters,
+            top_k=top_k,
+            mode=mode,
+            streaming_callback=stream.on_token if stream is not None else None,
+            on_sources=stream.on_sources if stream is not None else None,
+            answer_cache=None if args.no_cache else get_answer_cache(),
+        )
         elapsed_ms = int((time.time() - start_time) * 1000)
 
         # Output results
-        if output_format == "json":
-            _output_ask_json(answer, question, elapsed_ms, no_sources)
-        else:
-            _output_ask_text(answer, question, no_sources)
+        _output_ask(answer, question, output_format, elapsed_ms, no_sources, stream)
 
         return EXIT_SUCCESS
 
@@ -520,10 +1000,32 @@ def cmd_ask(args: argparse.Namespace) -> int:
         return EXIT_ERROR
 
 
+def _output_ask(
+    answer: Answer,
+    question: str,
+    output_format: str,
+    elapsed_ms: int,
+    no_sources: bool,
+    stream: _AnswerStream | None = None,
+) -> None:
+    if output_format == "json":
+        latency = stream.latency() if stream is not None else {"total_ms": elapsed_ms}
+        _output_ask_json(answer, question, elapsed_ms, no_sources, latency)
+    elif stream is not None:
+        # Question, sources and answer tokens were printed while streaming
+        print("\n")
+        if answer.cached:
+            print(f"{_cached_note(answer)}\n")
+    else:
+        _output_ask_text(answer, question, no_sources)
+
+
 def _output_ask_text(answer: Answer, question: str, no_sources: bool) -> None:
     """Output Q&A result in text format."""
     print(f"\nQ: {question}\n")
     print(f"A: {answer.text}\n")
+    if answer.cached:
+        print(f"{_cached_note(answer)}\n")
 
     if not no_sources and answer.sources:
         print("Sources:")
@@ -532,13 +1034,40 @@ def _output_ask_text(answer: Answer, question: str, no_sources: bool) -> None:
         print()
 
 
-def _output_ask_json(answer: Answer, question: str, elapsed_ms: int, no_sources: bool) -> None:
+def _cached_note(answer: Answer) -> str:
+    return f"(cached answer, question similarity {answer.similarity:.2f})"
+
+
+def _output_ask_json(
+    answer: Answer,
+    question: str,
+    elapsed_ms: int,
+    no_sources: bool,
+    latency: dict[str, int | None] | None = None,
+) -> None:
     """Output Q&A result in JSON format."""
-    output = {
+    output = _ask_json(answer, question, elapsed_ms, no_sources, latency)
+    print(json.dumps(output, ensure_ascii=False, indent=2))
+
+
+def _ask_json(
+    answer: Answer,
+    question: str,
+    elapsed_ms: int,
+    no_sources: bool,
+    latency: dict[str, int | None] | None = None,
+) -> dict[str, object]:
+    latency = latency or {}
+    output: dict[str, object] = {
         "question": question,
         "answer": answer.text,
         "confidence": answer.confidence,
+        "cached": answer.cached,
+        "similarity": answer.similarity,
         "elapsed_ms": elapsed_ms,
+        "retrieval_ms": latency.get("retrieval_ms"),
+        "ttft_ms": latency.get("ttft_ms"),  # Time to first token (streaming only)
+        "total_ms": latency.get("total_ms", elapsed_ms),
     }
 
     if not no_sources:
@@ -551,8 +1080,119 @@ def _output_ask_json(answer: Answer, question: str, elapsed_ms: int, no_sources:
             }
             for src in answer.sources
         ]
+    return output
 
-    print(json.dumps(output, ensure_ascii=False, indent=2))
+
+# =============================================================================
+# Batch Mode
+# =============================================================================
+
+
+def _run_batch(args: argparse.Namespace, kind: str) -> int:
+    """
+    Run search / ask for every query of a batch file, writing JSON Lines.
+
+    Pipelines are built once; uncached query embeddings are requested in
+    batches up front, then queries run concurrently. Lines are written as
+    queries complete (with their 0-based "index" in the file and per-query
+    "elapsed_ms"); a summary goes to stderr.
+
+    Args:
+        args: Parsed search / ask arguments.
+        kind: "search" or "ask".
+
+    Returns:
+        Exit code (EXIT_ERROR when any query failed).
+    """
+    mode = args.mode
+
+    try:
+        from src.rag.pipelines.batch import load_batch_queries, prime_query_embeddings, run_batch
+
+        if str(args.batch) == "-":
+            queries = load_batch_queries(sys.stdin)
+        else:
+            with args.batch.open(encoding="utf-8") as f:
+                queries = load_batch_queries(f)
+
+        verify_connections(ollama_config, check_local=kind == "ask", check_remote=mode != "lexical")
+
+        from src.rag.pipelines.query import ask, create_qa_pipeline, create_search_pipeline, search
+        from src.rag.stores.answer_cache import get_answer_cache
+        from src.rag.stores.embedding_cache import get_query_cache
+
+        store, lexical, summary_store = _open_stores(mode)
+        create = create_search_pipeline if kind == "search" else create_qa_pipeline
+        pipeline = create(store, mode=mode, lexical=lexical, summary_store=summary_store)
+        answer_cache = None if kind == "search" or args.no_cache else get_answer_cache()
+
+        start_time = time.time()
+        if mode != "lexical":
+            prime_query_embeddings([query.text for query in queries], get_query_cache())
+
+        def run(query: BatchQuery) -> SearchResponse | Answer:
+            vaults = query.vaults or args.vaults
+            tags = query.tags or args.tags
+            filters = QueryFilters(vaults=vaults, tags=tags) if vaults or tags else None
+            top_k = query.top_k or args.top_k
+            if kind == "search":
+                return search(pipeline, query.text, filters=filters, top_k=top_k, mode=mode)
+            return ask(
+                pipeline,
+                query.text,
+                filters=filters,
+                top_k=top_k,
+                mode=mode,
+                answer_cache=answer_cache,
+            )
+
+        latencies: list[int] = []
+        errors = 0
+        for item in run_batch(queries, run, concurrency=args.concurrency):
+            error = item.error
+            if error is None:
+                try:
+                    if kind == "search":
+                        record = _search_json(item.result, item.elapsed_ms)
+                    else:
+                        record = _ask_json(
+                            item.result, item.query.text, item.elapsed_ms, args.no_sources
+                        )
+                except Exception as e:
+                    error = str(e)
+            if error is not None:
+                errors += 1
+                record = {"query": item.query.text, "error": error, "elapsed_ms": item.elapsed_ms}
+            latencies.append(item.elapsed_ms)
+            print(
+                json.dumps(
+                    {"index": item.index, "id": item.query.id, **record}, ensure_ascii=False
+                ),
+                flush=True,
+            )
+
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] if latencies else 0
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0
+        print(
+            f"{len(queries)} queries, {errors} failed in {time.time() - start_time:.1f}s "
+            f"(p50 {p50} ms, p95 {p95} ms)",
+            file=sys.stderr,
+        )
+        return EXIT_ERROR if errors else EXIT_SUCCESS
+
+    except OSError as e:
+        print(f"Error: Cannot read batch file: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    except RAGConnectionError as e:
+        print(f"Error: {e.message}", file=sys.stderr)
+        return EXIT_CONNECTION_ERROR
+    except QueryError as e:
+        print(f"Batch error: {e.message}", file=sys.stderr)
+        return EXIT_ERROR
+    except Exception as e:
+        print(f"Batch failed: {e}", file=sys.stderr)
+        return EXIT_ERROR
 
 
 # =============================================================================
@@ -574,15 +1214,21 @@ def cmd_status(args: argparse.Namespace) -> int:
     verbose = args.verbose
 
     try:
-        # Get document store
-        store = get_document_store()
+        # Stats from the daemon if running (the local Qdrant store is locked by it),
+        # then from the stats cache; open the store only when both are unavailable
+        stats = _call_daemon("status") or load_collection_stats()
+        if stats is None:
+            from src.rag.stores.qdrant import get_collection_stats, get_document_store
 
-        # Get stats
-        stats = get_collection_stats(store)
+            store = get_document_store()
+            stats = get_collection_stats(store)
+            save_collection_stats(stats)
 
         # Check connections if verbose
         connection_status = {}
         if verbose:
+            from src.rag.clients.ollama import check_connection
+
             success, _ = check_connection(ollama_config.remote_url)
             connection_status["embedding_server"] = "OK" if success else "OFFLINE"
             success, _ = check_connection(ollama_config.local_url)
@@ -613,7 +1259,16 @@ def _output_status_text(
     print(f"Similarity: {stats['similarity']}")
 
     if verbose:
-        print(f"\nEmbedding Model: {ollama_config.embedding_model} @ {ollama_config.remote_url}")
+        from src.rag.stores.versions import active_version
+
+        print(f"\nStore Backend: {rag_config.store_backend}")
+        print(f"Index Version: v{active_version()}")
+        if "daemon" in stats:
+            daemon = stats["daemon"]
+            print(
+                f"Daemon: pid {daemon['pid']}, up {daemon['uptime_s']}s, {daemon['requests']} requests"
+            )
+        print(f"Embedding Model: {ollama_config.embedding_model} @ {ollama_config.remote_url}")
         print(f"LLM Model: {ollama_config.llm_model} @ {ollama_config.local_url}")
         print("\nServer Status:")
         for server, status in connection_status.items():
@@ -635,16 +1290,162 @@ def _output_status_json(
 
     if verbose:
         output["config"] = {
+            "store_backend": rag_config.store_backend,
             "embedding_model": ollama_config.embedding_model,
             "embedding_server": ollama_config.remote_url,
             "llm_model": ollama_config.llm_model,
             "llm_server": ollama_config.local_url,
         }
         output["connection_status"] = connection_status
+        if "daemon" in stats:
+            output["daemon"] = stats["daemon"]
 
     print(json.dumps(output, ensure_ascii=False, indent=2))
 
 
+# =============================================================================
+# Migrate Command
+# =============================================================================
+
+
+def cmd_migrate(args: argparse.Namespace) -> int:
+    """
+    Execute migrate command.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Exit code.
+    """
+    profile = args.profile
+
+    if not QDRANT_URL:
+        print(
+            "Note: local Qdrant storage searches exhaustively; quantization and HNSW "
+            "settings take effect with a Qdrant server (QDRANT_URL).",
+            file=sys.stderr,
+        )
+
+    from src.rag.stores.qdrant import (
+        close_document_store,
+        get_collection_stats,
+        get_document_store,
+        migrate_collection,
+    )
+
+    try:
+        start_time = time.time()
+        migrated = migrate_collection(profile)
+        elapsed = time.time() - start_time
+        # The cached stats describe the collection of the new active version
+        store = get_document_store()
+        try:
+            save_collection_stats(get_collection_stats(store))
+        finally:
+            close_document_store(store)
+    except ConfigurationError as e:
+        print(f"Error: {e.message}", file=sys.stderr)
+        return EXIT_ARGS_ERROR
+    except Exception as e:
+        print(f"Migration failed: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    print(f"Migrated {migrated:,} chunks to storage profile '{profile}' in {elapsed:.2f}s")
+    if rag_config.storage_profile != profile:
+        print(f"Set RAG_STORAGE_PROFILE={profile} so that searches use the new profile.")
+    return EXIT_SUCCESS
+
+
+# =============================================================================
+# Snapshot Command
+# =============================================================================
+
+
+def cmd_snapshot(args: argparse.Namespace) -> int:
+    """
+    Execute snapshot command (create / restore).
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Exit code.
+    """
+    from src.rag.stores.qdrant import get_document_store, get_summary_store
+    from src.rag.stores.snapshot import create_snapshot, restore_index
+
+    restored = None
+    try:
+        start_time = time.time()
+
+        if args.snapshot_action == "create":
+            store = get_document_store()
+            summary_store = get_summary_store(store) if rag_config.summary_vectors else None
+            timestamp = time.strftime("%Y%m%d-%H%M%S")
+            path = Path(args.output or SNAPSHOT_DIR / f"{COLLECTION_NAME}-{timestamp}.zip")
+            info = create_snapshot(path, store, summary_store=summary_store)
+            verb = "Wrote"
+        else:
+            # Restored into a new index version; the active one is kept on failure
+            path = Path(args.file)
+            restored = restore_index(path, force=args.force)
+            save_collection_stats(restored.stats)
+            info = restored.info
+            verb = "Restored"
+        elapsed = time.time() - start_time
+    except ConfigurationError as e:
+        print(f"Error: {e.message}", file=sys.stderr)
+        return EXIT_ARGS_ERROR
+    except IndexingError as e:
+        print(f"Snapshot error: {e.message}", file=sys.stderr)
+        return EXIT_ERROR
+    except Exception as e:
+        print(f"Snapshot failed: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    counts = ", ".join(f"{name}: {count:,}" for name, count in info.collections.items())
+    print(
+        f"{verb} {path} ({info.size_bytes / 1024**2:.1f} MiB, {counts}, "
+        f"model {info.embedding_model}) in {elapsed:.2f}s"
+    )
+    if restored is not None:
+        print(f"Switched index v{restored.replaced} -> v{restored.version}")
+        if restored.removed_versions:
+            removed = ", ".join(f"v{v}" for v in restored.removed_versions)
+            print(f"Removed old index versions: {removed}")
+    return EXIT_SUCCESS
+
+
+# =============================================================================
+# Serve Command
+# =============================================================================
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    """
+    Execute serve command.
+
+    Args:
+        args: Parsed command line arguments.
+
+    Returns:
+        Exit code.
+    """
+    from src.rag.server import serve
+
+    socket_path = Path(args.socket)
+    try:
+        serve(socket_path=socket_path, host=args.host, port=args.port, mode=args.mode)
+    except ConfigurationError as e:
+        print(f"Error: {e.message}", file=sys.stderr)
+        return EXIT_ARGS_ERROR
+    except Exception as e:
+        print(f"Daemon error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    return EXIT_SUCCESS
+
+
 # =============================================================================
 # Main
 # =============================================================================
@@ -667,12 +1468,19 @@ def main(argv: list[str] | None = None) -> int:
         parser.print_help()
         return EXIT_ARGS_ERROR
 
+    query_arg = {"search": "query", "ask": "question"}.get(args.command)
+    if query_arg and args.batch is None and getattr(args, query_arg) is None:
+        parser.error(f"{args.command}: a {query_arg} or --batch FILE is required")
+
     # Dispatch to command handler
     handlers = {
         "index": cmd_index,
         "search": cmd_search,
         "ask": cmd_ask,
         "status": cmd_status,
+        "migrate": cmd_migrate,
+        "snapshot": cmd_snapshot,
+        "serve": cmd_serve,
     }
 
     handler = handlers.get(args.command)
@@ -1,7 +1,42 @@
 """
-RAG Clients - Ollama API クライアント
+RAG Clients - Ollama API / RAG デーモンのクライアント
+
+Names are imported on first access (PEP 562), so the daemon client can be
+used without loading requests.
 """
 
-from src.rag.clients.ollama import check_connection, generate_response, get_embedding
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from src.rag.clients.daemon import DaemonClient, get_daemon_client
+    from src.rag.clients.ollama import (
+        check_connection,
+        generate_response,
+        get_embedding,
+        get_embeddings,
+    )
+
+_EXPORTS = {
+    "DaemonClient": "daemon",
+    "check_connection": "ollama",
+    "get_daemon_client": "daemon",
+    "get_embedding": "ollama",
+    "get_embeddings": "ollama",
+    "generate_response": "ollama",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f"{__name__}.{module}"), name)
+
 
-__all__ = ["check_connection", "get_embedding", "generate_response"]
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
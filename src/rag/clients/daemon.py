@@ -0,0 +1,188 @@
+"""
+Daemon Client - RAG デーモン (serve) への HTTP クライアント
+
+Unix ソケット (既定: DAEMON_SOCKET_PATH) または RAG_DAEMON_URL の HTTP で
+起動中のデーモンに search / ask / status を依頼する。
+標準ライブラリのみを使い、Haystack を import せずに呼び出せる。
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import socket
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from src.rag.config import DAEMON_SOCKET_PATH, RAG_DAEMON_URL, ollama_config, rag_config
+from src.rag.exceptions import (
+    ConfigurationError,
+    DaemonUnavailableError,
+    QueryError,
+    RAGError,
+)
+from src.rag.exceptions import ConnectionError as RAGConnectionError
+
+# Seconds to wait for a connection (the daemon is local; fail over to local execution fast)
+CONNECT_TIMEOUT = 0.5
+
+# Error types re-raised on the client side (others become RAGError)
+_ERRORS: dict[str, type[RAGError]] = {
+    "QueryError": QueryError,
+    "ConfigurationError": ConfigurationError,
+    "ConnectionError": RAGConnectionError,
+}
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket."""
+
+    def __init__(self, path: Path, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(str(self.path))
+        except OSError:
+            sock.close()
+            raise
+        sock.settimeout(self.timeout)
+        self.sock = sock
+
+
+# =============================================================================
+# Client
+# =============================================================================
+
+
+class DaemonClient:
+    """
+    RAG デーモンのクライアント
+
+    search / ask / status はデーモンの JSON 応答をそのまま返す。
+    デーモン側の QueryError などは同じ例外型で再送出し、
+    接続できない場合は DaemonUnavailableError を送出する。
+    """
+
+    def __init__(
+        self,
+        socket_path: Path | None = None,
+        url: str | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        self.socket_path = socket_path
+        self.url = url
+        # ask waits for the LLM
+        self.timeout = timeout if timeout is not None else ollama_config.llm_timeout + 30
+
+    @property
+    def address(self) -> str:
+        return self.url or str(self.socket_path)
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self.url:
+            parts = urlsplit(self.url)
+            return http.client.HTTPConnection(
+                parts.hostname or "localhost", parts.port or 80, timeout=self.timeout
+            )
+        return _UnixHTTPConnection(self.socket_path or DAEMON_SOCKET_PATH, self.timeout)
+
+    def _open(
+        self, method: str, path: str, payload: dict[str, Any] | None
+    ) -> tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload else None
+        headers = {"Content-Type": "application/json"} if body else {}
+        connection = self._connection()
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            return connection, connection.getresponse()
+        except OSError as e:
+            connection.close()
+            raise DaemonUnavailableError(
+                f"RAG daemon is not running: {e}", server=self.address
+            ) from e
+
+    @staticmethod
+    def _raise(error: dict[str, Any], status: int) -> None:
+        message = error.get("message", f"HTTP {status}")
+        error_type = _ERRORS.get(error.get("type", ""), RAGError)
+        if error_type is QueryError:
+            raise QueryError(message, stage=error.get("stage"))
+        raise error_type(message)
+
+    def request(self, method: str, path: str, payload: dict[str, Any] | None = None) -> Any:
+        """
+        Send a request and decode the JSON response.
+
+        Raises:
+            DaemonUnavailableError: Daemon is not reachable.
+            QueryError / ConfigurationError / RAGConnectionError: Raised by the daemon.
+        """
+        connection, response = self._open(method, path, payload)
+        try:
+            data = json.loads(response.read() or b"null")
+        finally:
+            connection.close()
+
+        if response.status >= 400:
+            self._raise(data.get("error", {}) if isinstance(data, dict) else {}, response.status)
+        return data
+
+    def events(self, path: str, payload: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        """
+        Send a streaming request and yield its NDJSON events until "done".
+
+        Raises:
+            DaemonUnavailableError: Daemon is not reachable.
+            QueryError / ConfigurationError / RAGConnectionError: Error event from the daemon.
+        """
+        connection, response = self._open("POST", path, payload)
+        try:
+            if response.status >= 400:
+                data = json.loads(response.read() or b"null")
+                self._raise(
+                    data.get("error", {}) if isinstance(data, dict) else {}, response.status
+                )
+            for line in response:
+                event = json.loads(line)
+                if event.get("event") == "error":
+                    self._raise(event.get("error", {}), response.status)
+                yield event
+                if event.get("event") == "done":
+                    return
+        finally:
+            connection.close()
+
+    def search(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return self.request("POST", "/search", payload)
+
+    def ask(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return self.request("POST", "/ask", payload)
+
+    def ask_stream(self, payload: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        """Events of a streamed answer: sources, token..., done (result = answer)."""
+        return self.events("/ask", {**payload, "stream": True})
+
+    def status(self) -> dict[str, Any]:
+        return self.request("GET", "/status")
+
+
+def get_daemon_client() -> DaemonClient | None:
+    """
+    Client for the running daemon, or None when none is configured.
+
+    RAG_DAEMON_URL selects an HTTP daemon; otherwise the Unix socket is used
+    when it exists. RAG_USE_DAEMON=0 disables the daemon.
+    """
+    if not rag_config.use_daemon:
+        return None
+    if RAG_DAEMON_URL:
+        return DaemonClient(url=RAG_DAEMON_URL)
+    if DAEMON_SOCKET_PATH.exists():
+        return DaemonClient(socket_path=DAEMON_SOCKET_PATH)
+    return None
@@ -106,6 +106,62 @@ def get_embedding(
         return (None, f"Request failed: {url} - {e}")
 
 
+def get_embeddings(
+    texts: list[str],
+    model: str = "bge-m3",
+    url: str = os.environ.get("OLLAMA_REMOTE_URL", "http://localhost:11434"),
+    timeout: int = 30,
+    session: requests.Session | None = None,
+) -> tuple[list[list[float]] | None, str | None]:
+    """
+    複数テキストの embedding を 1 リクエストで取得
+
+    Args:
+        texts: 入力テキストのリスト
+        model: embedding モデル名
+        url: Ollama サーバー URL
+        timeout: タイムアウト秒数
+        session: 接続を再利用する requests.Session (省略時は都度接続)
+
+    Returns:
+        (embeddings: list[list[float]] | None, error: str | None)
+        成功時: ([[0.1, ...], [0.2, ...]], None) - texts と同じ順序・件数
+        失敗時: (None, エラーメッセージ)
+    """
+    if not texts:
+        return ([], None)
+
+    post = session.post if session is not None else requests.post
+
+    try:
+        response = post(
+            f"{url}/api/embed",
+            json={"model": model, "input": texts},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+
+        data = response.json()
+
+        embeddings = data.get("embeddings")
+        if embeddings and len(embeddings) == len(texts):
+            return (embeddings, None)
+
+        count = len(embeddings) if embeddings else 0
+        return (None, f"Expected {len(texts)} embeddings, got {count}")
+
+    except requests.exceptions.Timeout:
+        return (None, f"Embedding timeout after {timeout}s: {url}")
+    except requests.exceptions.ConnectionError as e:
+        return (None, f"Connection failed: {url} - {e}")
+    except requests.exceptions.HTTPError as e:
+        return (None, f"HTTP error: {url} - {e}")
+    except json.JSONDecodeError as e:
+        return (None, f"Invalid JSON response: {e}")
+    except requests.exceptions.RequestException as e:
+        return (None, f"Request failed: {url} - {e}")
+
+
 # =============================================================================
 # LLM Generation
 # =============================================================================
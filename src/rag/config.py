@@ -15,8 +15,36 @@ from pathlib import Path
 BASE_DIR = Path(os.environ.get("OBSIDIAN_BASE_DIR", Path(__file__).resolve().parent.parent.parent))
 DATA_DIR = BASE_DIR / "data"
 QDRANT_PATH = DATA_DIR / "qdrant"
+NUMPY_STORE_PATH = DATA_DIR / "vectors"
+RAG_STATE_DIR = DATA_DIR / "rag"
+INDEX_MANIFEST_PATH = RAG_STATE_DIR / "index_manifest.json"
+EMBEDDING_CACHE_DIR = RAG_STATE_DIR / "embedding_cache"
+QUERY_EMBEDDING_CACHE_DIR = RAG_STATE_DIR / "query_embedding_cache"
+LEXICAL_INDEX_PATH = RAG_STATE_DIR / "lexical.sqlite3"
+DAEMON_SOCKET_PATH = RAG_STATE_DIR / "daemon.sock"
+COLLECTION_STATS_PATH = RAG_STATE_DIR / "collection_stats.json"
+ANSWER_CACHE_PATH = RAG_STATE_DIR / "answer_cache.sqlite3"
+# ETL (rag_embed パイプライン) が事前計算した embedding と、その取り込み状態
+PRECOMPUTED_EMBEDDINGS_DIR = DATA_DIR / "06_models" / "rag_embeddings"
+PRECOMPUTED_IMPORT_STATE_PATH = RAG_STATE_DIR / "precomputed_import.json"
+# アクティブなインデックス版 (blue/green 再構築で原子的に切り替えるポインタ)
+ACTIVE_INDEX_PATH = RAG_STATE_DIR / "active_index.json"
+# `rag snapshot create` の既定の出力先
+SNAPSHOT_DIR = DATA_DIR / "snapshots"
 VAULTS_DIR = BASE_DIR / "Vaults"
 
+# Qdrant サーバー URL (未設定時は QDRANT_PATH のローカルファイルモード)
+QDRANT_URL = os.environ.get("QDRANT_URL") or None
+
+# ベクトルコレクション名
+COLLECTION_NAME = "obsidian_knowledge"
+
+# ノート単位の要約ベクトル (タイトル + frontmatter の summary) のコレクション名
+SUMMARY_COLLECTION_NAME = f"{COLLECTION_NAME}__docs"
+
+# RAG デーモンの HTTP URL (未設定時は DAEMON_SOCKET_PATH の Unix ソケットを使う)
+RAG_DAEMON_URL = os.environ.get("RAG_DAEMON_URL") or None
+
 # =============================================================================
 # Ollama Configuration
 # =============================================================================
@@ -40,13 +68,68 @@ class OllamaConfig:
     embedding_timeout: int = 300  # リモートサーバーのバッチ処理用
     llm_timeout: int = 120
 
-    # バッチサイズ (リモートサーバーの処理能力に合わせて調整)
+    # バッチサイズ (初期値。レイテンシに応じて min〜max の範囲で自動調整)
     embedding_batch_size: int = 5
+    embedding_min_batch_size: int = 1
+    embedding_max_batch_size: int = 64
+
+    # 同時に送信する embedding バッチ数
+    embedding_concurrency: int = 4
+
+    # 1 バッチあたりの目標レイテンシ (秒)。超過するとバッチサイズを縮小
+    embedding_target_latency: float = 10.0
 
     # コンテキストウィンドウ
     num_ctx: int = 65536
 
 
+# =============================================================================
+# Vector Storage Profiles
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """Qdrant コレクションのストレージ設定 (メモリ使用量と検索精度のトレードオフ)"""
+
+    # "int8" = スカラー量子化 (RAM 上のベクトルを 1/4 に圧縮), None = float32 のみ
+    quantization: str | None = None
+    # 元の float32 ベクトルをディスクに置く (量子化ベクトルのみ RAM に常駐)
+    vectors_on_disk: bool = False
+
+    # HNSW グラフ設定
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+
+    # 検索時設定: ビーム幅, 量子化時の元ベクトルによる再スコアリング
+    search_ef: int = 128
+    rescore: bool = True
+    oversampling: float = 2.0
+
+
+# ローカルファイルモード (QDRANT_URL 未設定) は全件走査のため HNSW・量子化設定は無視される
+STORAGE_PROFILES: dict[str, StorageProfile] = {
+    # float32 ベクトルを RAM に保持 (Qdrant のデフォルト)
+    "default": StorageProfile(),
+    # int8 量子化 + 元ベクトルはディスク: ~500k チャンク x 1024 次元でも 8GB 未満
+    "lean": StorageProfile(quantization="int8", vectors_on_disk=True),
+    # lean よりさらに小さなグラフ (精度より省メモリ優先)
+    "minimal": StorageProfile(
+        quantization="int8",
+        vectors_on_disk=True,
+        hnsw_m=8,
+        hnsw_ef_construct=64,
+        search_ef=64,
+        oversampling=3.0,
+    ),
+}
+
+
+STORE_BACKENDS = ("qdrant", "numpy")
+
+SEARCH_MODES = ("dense", "lexical", "hybrid", "staged")
+
+
 # =============================================================================
 # RAG Pipeline Configuration
 # =============================================================================
@@ -56,17 +139,77 @@ class OllamaConfig:
 class RAGConfig:
     """RAG パイプライン設定"""
 
-    # チャンク設定
+    # チャンク設定 (chunk_unit: "token" = 推定トークン数, "char" = 文字数)
     chunk_size: int = 512
     chunk_overlap: int = 50
+    chunk_unit: str = "token"
+
+    # インデックス作成のバッチサイズ (チャンク数)。バッチ単位で書き込み・コミット
+    index_batch_size: int = 256
+
+    # Vault スキャンの並列読み込みスレッド数 (NAS 上の Vault 向け)
+    scan_workers: int = 16
 
     # 検索設定
     top_k: int = 5
     similarity_threshold: float = 0.5
 
+    # 検索モード ("dense" | "lexical" | "hybrid" | "staged")
+    # lexical: SQLite FTS5 全文検索 (embedding サーバー不要), hybrid: RRF で統合
+    # staged: 要約ベクトルで候補ノートを絞り、そのノートのチャンクのみ検索
+    search_mode: str = os.environ.get("RAG_SEARCH_MODE", "dense")
+
+    # hybrid で各検索器から取得する候補数 (top_k の倍数)
+    hybrid_candidate_factor: int = 3
+
+    # ノートごとの要約ベクトル (タイトル + summary) を SUMMARY_COLLECTION_NAME に索引する
+    summary_vectors: bool = os.environ.get("RAG_SUMMARY_VECTORS", "1") != "0"
+
+    # staged 検索: 要約ベクトルで選ぶ候補ノート数 (チャンク検索はこのノートに限定)
+    staged_candidate_docs: int = 50
+
     # Embedding 次元数 (bge-m3)
     embedding_dim: int = 1024
 
+    # ベクトルストアのバックエンド ("qdrant" | "numpy")
+    # numpy: float16 メモリマップ行列 (〜20 万チャンク向け、起動が速く読み取りはロック不要)
+    store_backend: str = os.environ.get("RAG_STORE_BACKEND", "qdrant")
+
+    # numpy バックエンドで float32 に展開して RAM に保持する上限 (バイト)
+    numpy_resident_bytes: int = 1024**3
+
+    # ベクトルストレージのプロファイル (STORAGE_PROFILES のキー, qdrant のみ)
+    storage_profile: str = os.environ.get("RAG_STORAGE_PROFILE", "default")
+
+    # rag index --rebuild の切り替え後も残す直前の版の数 (それより古い版は削除する)
+    # 切り替え時点で古い版を読んでいる検索を壊さないため 1 以上を推奨
+    index_versions_kept: int = 1
+
+    # Embedding キャッシュの上限サイズ (バイト, float16 ベクトルの合計)
+    embedding_cache_max_bytes: int = 2 * 1024**3
+
+    # クエリ embedding のインメモリ LRU キャッシュ件数
+    query_cache_size: int = 1024
+
+    # クエリ embedding をディスクにも保存する (CLI の繰り返し実行でも再利用)
+    query_cache_persist: bool = os.environ.get("RAG_QUERY_CACHE_PERSIST", "1") != "0"
+
+    # ask の回答キャッシュ: 同じフィルタで質問の類似度が閾値以上なら保存済みの回答を返す
+    # (インデックスが更新されると破棄)
+    answer_cache: bool = os.environ.get("RAG_ANSWER_CACHE", "1") != "0"
+    answer_cache_threshold: float = 0.95
+    answer_cache_size: int = 1000
+
+    # 起動中の RAG デーモン (serve) があれば search / ask / status をデーモン経由で実行する
+    use_daemon: bool = os.environ.get("RAG_USE_DAEMON", "1") != "0"
+
+    # Q&A コンテキストのトークン予算 (推定トークン数)。隣接チャンクの結合・重複除去の後に
+    # 予算内に詰め、LLM の num_ctx も予算に合わせて縮小する。0 = 検索結果をそのまま使う
+    context_token_budget: int = int(os.environ.get("RAG_CONTEXT_TOKENS", "4096"))
+
+    # num_ctx に確保する回答 (推論を含む) のトークン数
+    answer_token_reserve: int = 2048
+
     # 対象 Vault
     target_vaults: list[str] = field(
         default_factory=lambda: ["エンジニア", "ビジネス", "経済", "日常", "その他"]
@@ -32,6 +32,10 @@ class ConnectionError(RAGError):
         self.server = server
 
 
+class DaemonUnavailableError(ConnectionError):
+    """RAG デーモンに接続できない (呼び出し側はローカル実行にフォールバックする)"""
+
+
 class IndexingError(RAGError):
     """インデックス操作エラー"""
 
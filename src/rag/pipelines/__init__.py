@@ -1,51 +1,123 @@
 """
 RAG Pipelines - Indexing & Query Pipelines
+
+Names are imported on first access (PEP 562), so importing a single
+submodule (e.g. models) does not load Haystack.
 """
 
-from src.rag.pipelines.indexing import (
-    Document,
-    DocumentMeta,
-    IndexingResult,
-    chunk_document,
-    chunk_documents,
-    create_indexing_pipeline,
-    index_all_vaults,
-    index_vault,
-    parse_frontmatter,
-    scan_vault,
-)
-from src.rag.pipelines.query import (
-    Answer,
-    QueryFilters,
-    SearchResponse,
-    SearchResult,
-    ask,
-    build_qdrant_filters,
-    create_qa_pipeline,
-    create_search_pipeline,
-    search,
-)
-
-__all__ = [
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from src.rag.pipelines.batch import (
+        BatchQuery,
+        BatchResult,
+        load_batch_queries,
+        prime_query_embeddings,
+        run_batch,
+    )
+    from src.rag.pipelines.chunking import MarkdownChunker, estimate_tokens
+    from src.rag.pipelines.context import ContextPacker
+    from src.rag.pipelines.embedding import (
+        AdaptiveBatchSizer,
+        AdaptiveDocumentEmbedder,
+        CachedTextEmbedder,
+    )
+    from src.rag.pipelines.indexing import (
+        Document,
+        DocumentMeta,
+        IndexingProgress,
+        IndexingResult,
+        VaultScan,
+        chunk_document,
+        chunk_documents,
+        create_indexing_pipeline,
+        find_eligible_files,
+        index_all_vaults,
+        index_vault,
+        iter_chunk_batches,
+        iter_vault,
+        load_documents,
+        parse_frontmatter,
+        scan_vault,
+        scan_vaults,
+        summary_document,
+    )
+    from src.rag.pipelines.models import Answer, QueryFilters, SearchResponse, SearchResult
+    from src.rag.pipelines.query import (
+        LexicalRetriever,
+        SourcesTap,
+        SummaryScope,
+        ask,
+        build_qdrant_filters,
+        create_qa_pipeline,
+        create_retriever,
+        create_search_pipeline,
+        search,
+    )
+
+_EXPORTS = {
+    # Batch
+    "BatchQuery": "batch",
+    "BatchResult": "batch",
+    "load_batch_queries": "batch",
+    "prime_query_embeddings": "batch",
+    "run_batch": "batch",
+    # Chunking
+    "MarkdownChunker": "chunking",
+    "estimate_tokens": "chunking",
+    # Context packing
+    "ContextPacker": "context",
+    # Embedding
+    "AdaptiveBatchSizer": "embedding",
+    "AdaptiveDocumentEmbedder": "embedding",
+    "CachedTextEmbedder": "embedding",
     # Indexing
-    "Document",
-    "DocumentMeta",
-    "IndexingResult",
-    "chunk_document",
-    "chunk_documents",
-    "create_indexing_pipeline",
-    "index_all_vaults",
-    "index_vault",
-    "parse_frontmatter",
-    "scan_vault",
+    "Document": "indexing",
+    "DocumentMeta": "indexing",
+    "VaultScan": "indexing",
+    "IndexingProgress": "indexing",
+    "IndexingResult": "indexing",
+    "chunk_document": "indexing",
+    "chunk_documents": "indexing",
+    "create_indexing_pipeline": "indexing",
+    "find_eligible_files": "indexing",
+    "index_all_vaults": "indexing",
+    "index_vault": "indexing",
+    "iter_chunk_batches": "indexing",
+    "iter_vault": "indexing",
+    "load_documents": "indexing",
+    "parse_frontmatter": "indexing",
+    "scan_vault": "indexing",
+    "scan_vaults": "indexing",
+    "summary_document": "indexing",
     # Query
-    "Answer",
-    "QueryFilters",
-    "SearchResponse",
-    "SearchResult",
-    "ask",
-    "build_qdrant_filters",
-    "create_qa_pipeline",
-    "create_search_pipeline",
-    "search",
-]
+    "Answer": "models",
+    "LexicalRetriever": "query",
+    "QueryFilters": "models",
+    "SearchResponse": "models",
+    "SearchResult": "models",
+    "SourcesTap": "query",
+    "SummaryScope": "query",
+    "ask": "query",
+    "build_qdrant_filters": "query",
+    "create_qa_pipeline": "query",
+    "create_retriever": "query",
+    "create_search_pipeline": "query",
+    "search": "query",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f"{__name__}.{module}"), name)
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
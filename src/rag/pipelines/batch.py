@@ -0,0 +1,160 @@
+"""
+Batch Query - 評価セットなど多数のクエリを 1 プロセスで一括実行
+
+クエリファイル (1 行 1 クエリ、または JSON オブジェクト) を読み込み、
+キャッシュにないクエリの embedding をまとめて 1 リクエストずつ取得してから、
+検索 / Q&A を複数スレッドで並行実行する。結果は完了順に返す。
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any
+
+from src.rag.clients.ollama import get_embeddings
+from src.rag.config import OllamaConfig, ollama_config
+from src.rag.exceptions import QueryError
+from src.rag.stores.embedding_cache import QueryEmbeddingCache
+
+# Queries per embedding request (queries are short; one request embeds many)
+QUERY_EMBEDDING_BATCH_SIZE = 64
+
+
+@dataclass
+class BatchQuery:
+    """One query of a batch file (unset fields fall back to the CLI options)"""
+
+    text: str
+    id: str | None = None  # Caller's identifier, echoed in the output
+    vaults: list[str] | None = None
+    tags: list[str] | None = None
+    top_k: int | None = None
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one batch query"""
+
+    index: int  # 0-based position in the batch file
+    query: BatchQuery
+    result: Any = None  # SearchResponse / Answer
+    error: str | None = None
+    elapsed_ms: int = 0
+
+
+def load_batch_queries(lines: Iterable[str]) -> list[BatchQuery]:
+    """
+    Parse a batch file.
+
+    Each non-empty line is either a plain query or a JSON object with
+    "query" (or "question") and optional "id", "vaults", "tags", "top_k".
+
+    Raises:
+        QueryError: A JSON line is invalid or has no query.
+    """
+    queries: list[BatchQuery] = []
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if not line.startswith("{"):
+            queries.append(BatchQuery(text=line))
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise QueryError(f"Invalid JSON on line {line_number}: {e}", stage="validation") from e
+        text = data.get("query") or data.get("question")
+        if not isinstance(text, str) or not text.strip():
+            raise QueryError(f"No query on line {line_number}", stage="validation")
+        queries.append(
+            BatchQuery(
+                text=text,
+                id=str(data["id"]) if data.get("id") is not None else None,
+                vaults=data.get("vaults"),
+                tags=data.get("tags"),
+                top_k=data.get("top_k"),
+            )
+        )
+    return queries
+
+
+def prime_query_embeddings(
+    texts: list[str],
+    cache: QueryEmbeddingCache,
+    config: OllamaConfig | None = None,
+    batch_size: int = QUERY_EMBEDDING_BATCH_SIZE,
+) -> int:
+    """
+    Embed uncached queries in batches and add them to the query cache.
+
+    The pipelines' CachedTextEmbedder then finds every query in the cache,
+    so a batch costs len(texts) / batch_size embedding requests.
+
+    Returns:
+        Number of queries embedded.
+
+    Raises:
+        QueryError: The embedding server failed.
+    """
+    config = config or ollama_config
+    model = config.embedding_model
+    missing = list(dict.fromkeys(text for text in texts if cache.get(model, text) is None))
+
+    for start in range(0, len(missing), batch_size):
+        chunk = missing[start : start + batch_size]
+        embeddings, error = get_embeddings(
+            chunk, model=model, url=config.remote_url, timeout=config.embedding_timeout
+        )
+        if error is not None or embeddings is None:
+            raise QueryError(f"Query embedding failed: {error}", stage="embedding")
+        cache.put_many(model, chunk, embeddings)
+    return len(missing)
+
+
+def run_batch(
+    queries: list[BatchQuery],
+    run: Callable[[BatchQuery], Any],
+    concurrency: int = 4,
+) -> Iterator[BatchResult]:
+    """
+    Run queries concurrently and yield results as they complete.
+
+    A failing query yields a BatchResult with error set; the batch continues.
+
+    Args:
+        queries: Parsed batch queries.
+        run: Runs one query (e.g. search or ask on a shared pipeline).
+        concurrency: Number of queries in flight.
+    """
+
+    def timed(query: BatchQuery) -> tuple[Any, str | None, int]:
+        start = time.perf_counter()
+        try:
+            result, error = run(query), None
+        except Exception as e:
+            result, error = None, getattr(e, "message", str(e))
+        return result, error, int((time.perf_counter() - start) * 1000)
+
+    pending = iter(enumerate(queries))
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        in_flight: dict[Future, tuple[int, BatchQuery]] = {}
+
+        def submit() -> None:
+            for index, query in pending:
+                in_flight[executor.submit(timed, query)] = (index, query)
+                if len(in_flight) >= max(1, concurrency):
+                    return
+
+        submit()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, query = in_flight.pop(future)
+                result, error, elapsed_ms = future.result()
+                yield BatchResult(index, query, result, error, elapsed_ms)
+            submit()
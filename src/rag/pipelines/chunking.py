@@ -0,0 +1,226 @@
+"""
+Chunking - 日本語・Markdown 対応のチャンク分割
+
+空白で単語が区切られない日本語本文を、文字数または推定トークン数で測り、
+Markdown 見出し・日本語の文末・段落の境界で分割する。
+チャンク間には実際の重複 (overlap) を持たせる。
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+# =============================================================================
+# Length Measurement
+# =============================================================================
+
+# CJK ideographs, kana, full-width forms: roughly one token per character
+CJK_PATTERN = re.compile(r"[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]")
+WHITESPACE_PATTERN = re.compile(r"\s")
+
+# Non-CJK text (English, code, URLs): roughly four characters per token
+CHARS_PER_TOKEN = 4
+
+CHUNK_UNITS = ("token", "char")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of mixed Japanese/English text.
+
+    CJK characters count as one token each; other non-whitespace characters
+    count as one token per CHARS_PER_TOKEN characters.
+    """
+    cjk = len(CJK_PATTERN.findall(text))
+    other = len(text) - cjk - len(WHITESPACE_PATTERN.findall(text))
+    return cjk + math.ceil(other / CHARS_PER_TOKEN)
+
+
+# =============================================================================
+# Segmentation
+# =============================================================================
+
+HEADING_PATTERN = re.compile(r"^#{1,6}\s")
+FENCE_PATTERN = re.compile(r"^(```|~~~)")
+
+# Split after Japanese/English sentence endings and after line breaks. A closing
+# bracket stays with its sentence; a quote followed by text (「…？」と) does not
+# end the sentence. Zero-width so text is preserved.
+SENTENCE_BOUNDARY = re.compile(
+    r"(?<=[。！？!?])(?![」』）)\]!?！？])"
+    r"|(?<=[。！？!?][」』）)\]])(?=\s|$)"
+    r"|(?<=\.)(?=\s)"
+    r"|(?<=\n)"
+)
+
+
+@dataclass
+class Segment:
+    """Smallest unit packed into chunks (a sentence or line)."""
+
+    text: str
+    length: int
+    section_start: bool = False  # First segment after a Markdown heading boundary
+
+
+def split_sections(text: str) -> list[str]:
+    """
+    Split Markdown into sections starting at headings.
+
+    Headings inside fenced code blocks are ignored.
+    """
+    sections: list[str] = []
+    current: list[str] = []
+    in_fence = False
+
+    for line in text.splitlines(keepends=True):
+        if FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        elif not in_fence and HEADING_PATTERN.match(line) and current:
+            sections.append("".join(current))
+            current = []
+        current.append(line)
+
+    if current:
+        sections.append("".join(current))
+    return sections
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text at sentence and line boundaries (concatenation restores text)."""
+    return [part for part in SENTENCE_BOUNDARY.split(text) if part]
+
+
+# =============================================================================
+# Chunker
+# =============================================================================
+
+
+class MarkdownChunker:
+    """
+    Sentence- and heading-aware chunker for Japanese Markdown notes.
+
+    Create once per run and reuse for every document.
+
+    Chunks are packed greedily from sentences up to chunk_size (measured in
+    estimated tokens or characters). A heading starts a new chunk once the
+    current chunk is at least half full. Consecutive chunks within a section
+    share up to `overlap` units of trailing sentences. Sentences longer than
+    chunk_size are cut (at whitespace when possible) so no chunk exceeds it.
+    """
+
+    def __init__(self, chunk_size: int = 512, overlap: int = 50, unit: str = "token") -> None:
+        if unit not in CHUNK_UNITS:
+            raise ValueError(f"Invalid chunk unit '{unit}'. Valid units: {list(CHUNK_UNITS)}")
+        if chunk_size < 1 or not 0 <= overlap < chunk_size:
+            raise ValueError(f"Invalid chunk settings: chunk_size={chunk_size}, overlap={overlap}")
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.unit = unit
+        self.measure = estimate_tokens if unit == "token" else len
+
+    def segments(self, text: str) -> list[Segment]:
+        """Split text into segments no longer than chunk_size."""
+        segments: list[Segment] = []
+        for section in split_sections(text):
+            section_start = True
+            for sentence in split_sentences(section):
+                for piece in self._fit(sentence):
+                    segments.append(Segment(piece, self.measure(piece), section_start))
+                    section_start = False
+        return segments
+
+    def _fit(self, text: str) -> Iterable[str]:
+        """
+        Cut text longer than chunk_size into pieces.
+
+        Pieces leave room for the overlap so consecutive pieces still overlap.
+        Only the pieces are measured, so the cost stays linear in the text
+        length (the remaining length is updated by subtraction).
+        """
+        length = self.measure(text)
+        limit = self.chunk_size - self.overlap
+        while length > self.chunk_size:
+            cut = max(1, len(text) * limit // length)
+            measured = self.measure(text[:cut])
+            while cut > 1 and measured > limit:
+                # Rescale by the density of the slice itself (CJK vs ASCII)
+                cut = max(1, min(cut * 9 // 10, cut * limit // measured))
+                measured = self.measure(text[:cut])
+            space = text.rfind(" ", cut // 2, cut)
+            if space > 0:
+                cut = space + 1
+                measured = self.measure(text[:cut])
+            piece, text = text[:cut], text[cut:]
+            yield piece
+            # estimate_tokens rounds per call, so the difference may be one
+            # token short; measure the rest exactly once it looks short enough
+            length -= measured
+            if length <= self.chunk_size:
+                length = self.measure(text)
+        if text:
+            yield text
+
+    def _overlap_tail(self, segments: list[Segment]) -> list[Segment]:
+        """Trailing segments totalling at most `overlap` (a cut sentence tail if none fit)."""
+        if self.overlap == 0 or not segments:
+            return []
+
+        tail: list[Segment] = []
+        total = 0
+        for segment in reversed(segments):
+            if total + segment.length > self.overlap:
+                break
+            tail.insert(0, segment)
+            total += segment.length
+
+        if not tail:
+            last = segments[-1].text
+            cut = len(last) - max(1, len(last) * self.overlap // max(1, segments[-1].length))
+            space = last.find(" ", cut)
+            if 0 <= space < len(last) - 1:
+                cut = space + 1
+            text = last[cut:]
+            tail = [Segment(text, self.measure(text))]
+        return tail
+
+    def split(self, text: str) -> list[str]:
+        """
+        Split text into chunk strings.
+
+        Args:
+            text: Markdown body.
+
+        Returns:
+            Non-empty chunk texts in document order.
+        """
+        chunks: list[str] = []
+        current: list[Segment] = []
+        size = 0
+        has_new = False  # current contains segments not already emitted
+
+        def emit() -> None:
+            content = "".join(segment.text for segment in current).strip()
+            if content:
+                chunks.append(content)
+
+        for segment in self.segments(text):
+            at_heading = segment.section_start and has_new and size >= self.chunk_size // 2
+            if has_new and (at_heading or size + segment.length > self.chunk_size):
+                emit()
+                current = [] if at_heading else self._overlap_tail(current)
+                size = sum(s.length for s in current)
+                # Overlap must leave room for the next segment
+                while current and size + segment.length > self.chunk_size:
+                    size -= current.pop(0).length
+                has_new = False
+            current.append(segment)
+            size += segment.length
+            has_new = True
+
+        if has_new:
+            emit()
+        return chunks
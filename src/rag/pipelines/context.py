@@ -0,0 +1,195 @@
+"""
+Context Packing - Q&A プロンプトに入れるコンテキストの圧縮
+
+検索結果のチャンクをそのまま並べると、同じノートの隣接チャンクの重複部分や
+ほぼ同一の内容が何度もプロンプトに入る。ここでは
+1. 同じ file_path の隣接チャンク (position が連続) を重複部分を除いて結合し、
+2. ほぼ同一の内容 (文字 trigram の Jaccard 係数が閾値以上) を除外し、
+3. 推定トークン数の予算に収まるよう順位の高い順に詰める。
+予算が固定のため、LLM の num_ctx も予算に合わせて固定サイズにできる。
+"""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Any
+
+from haystack import Document, component
+
+from src.rag.pipelines.chunking import estimate_tokens
+
+# Similarity above which two contexts count as duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.9
+
+# Longest chunk overlap searched for when joining neighbours (characters)
+MAX_OVERLAP_CHARS = 4000
+
+# A document cut to fit the budget keeps at least this many tokens (else it is dropped)
+MIN_TRUNCATED_TOKENS = 64
+
+# Tokens of the prompt outside the context (instructions, question, source headers)
+PROMPT_OVERHEAD_TOKENS = 512
+
+
+# =============================================================================
+# Merging / Deduplication
+# =============================================================================
+
+
+def join_overlapping(first: str, second: str, max_overlap: int = MAX_OVERLAP_CHARS) -> str:
+    """
+    Concatenate two texts, writing the longest suffix of first that is a prefix of second once.
+    """
+    for size in range(min(len(first), len(second), max_overlap), 0, -1):
+        if first.endswith(second[:size]):
+            return first + second[size:]
+    return first + second
+
+
+def merge_adjacent_chunks(documents: list[Document]) -> list[Document]:
+    """
+    Merge chunks of the same file with consecutive positions.
+
+    A merged document keeps the best score of its chunks and is ranked where
+    its best chunk was; the meta of the first chunk is kept.
+    """
+    groups: dict[str, list[tuple[int, Document]]] = {}
+    for rank, doc in enumerate(documents):
+        key = doc.meta.get("file_path") or doc.id
+        groups.setdefault(key, []).append((rank, doc))
+
+    merged: list[tuple[int, Document]] = []
+    for chunks in groups.values():
+        chunks.sort(key=lambda item: item[1].meta.get("position", 0))
+        rank, current = chunks[0]
+        for next_rank, doc in chunks[1:]:
+            if doc.meta.get("position", 0) == current.meta.get("position", 0) + current.meta.get(
+                "_merged", 1
+            ):
+                current = replace(
+                    current,
+                    content=join_overlapping(current.content or "", doc.content or ""),
+                    score=max(current.score or 0.0, doc.score or 0.0),
+                    meta={**current.meta, "_merged": current.meta.get("_merged", 1) + 1},
+                )
+                rank = min(rank, next_rank)
+            else:
+                merged.append((rank, current))
+                rank, current = next_rank, doc
+        merged.append((rank, current))
+
+    merged.sort(key=lambda item: item[0])
+    return [
+        replace(doc, meta={k: v for k, v in doc.meta.items() if k != "_merged"})
+        for _, doc in merged
+    ]
+
+
+def _trigrams(text: str) -> set[str]:
+    text = "".join(text.split()).lower()
+    return {text[i : i + 3] for i in range(max(len(text) - 2, 1))}
+
+
+def drop_near_duplicates(
+    documents: list[Document], threshold: float = NEAR_DUPLICATE_THRESHOLD
+) -> list[Document]:
+    """Drop documents whose text is nearly identical to a higher-ranked one."""
+    kept: list[tuple[Document, set[str]]] = []
+    for doc in documents:
+        grams = _trigrams(doc.content or "")
+        if any(len(grams & other) / (len(grams | other) or 1) >= threshold for _, other in kept):
+            continue
+        kept.append((doc, grams))
+    return [doc for doc, _ in kept]
+
+
+# =============================================================================
+# Budget
+# =============================================================================
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens estimated tokens (binary search on length)."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low]
+
+
+def fit_token_budget(documents: list[Document], budget: int) -> tuple[list[Document], int]:
+    """
+    Take documents in rank order until the token budget is spent.
+
+    The first document that does not fit is truncated when at least
+    MIN_TRUNCATED_TOKENS remain; the rest are dropped.
+
+    Returns:
+        (documents, tokens used)
+    """
+    packed: list[Document] = []
+    used = 0
+    for doc in documents:
+        tokens = estimate_tokens(doc.content or "")
+        remaining = budget - used
+        if tokens <= remaining:
+            packed.append(doc)
+            used += tokens
+            continue
+        if remaining >= MIN_TRUNCATED_TOKENS:
+            content = truncate_to_tokens(doc.content or "", remaining)
+            packed.append(replace(doc, content=content))
+            used += estimate_tokens(content)
+        break
+    return packed, used
+
+
+def context_num_ctx(budget: int, answer_tokens: int, limit: int) -> int:
+    """
+    LLM context window for a context budget: the next power of two above
+    context, prompt overhead and answer, capped at limit.
+
+    Sized from the fixed budget (not per request), so Ollama keeps the model
+    loaded with one context size.
+    """
+    needed = budget + PROMPT_OVERHEAD_TOKENS + answer_tokens
+    size = 2048
+    while size < needed:
+        size *= 2
+    return min(size, limit)
+
+
+@component
+class ContextPacker:
+    """
+    Packs retrieved chunks into a token-budgeted Q&A context.
+
+    Adjacent chunks of a note are merged, near-duplicates dropped, and the
+    result cut to token_budget estimated tokens (best ranked first).
+    """
+
+    def __init__(
+        self, token_budget: int, duplicate_threshold: float = NEAR_DUPLICATE_THRESHOLD
+    ) -> None:
+        self.token_budget = token_budget
+        self.duplicate_threshold = duplicate_threshold
+
+    @component.output_types(documents=list[Document], meta=dict[str, Any])
+    def run(self, documents: list[Document]) -> dict[str, Any]:
+        """
+        Returns:
+            documents: Packed context documents
+            meta: retrieved, packed (document counts), tokens (estimated)
+        """
+        merged = merge_adjacent_chunks(documents)
+        unique = drop_near_duplicates(merged, self.duplicate_threshold)
+        packed, tokens = fit_token_budget(unique, self.token_budget)
+        return {
+            "documents": packed,
+            "meta": {"retrieved": len(documents), "packed": len(packed), "tokens": tokens},
+        }
@@ -0,0 +1,287 @@
+"""
+Embedding Stage - 並列・適応バッチサイズによる Document embedding
+
+複数バッチを同時にリモート Embedding サーバーへ送り、観測したレイテンシと
+タイムアウトに応じてバッチサイズを増減する。失敗したバッチは分割して再試行する。
+
+検索クエリ用の CachedTextEmbedder は、キャッシュ済みのクエリについて
+リモート Embedding サーバーへのリクエストを省略する。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import replace
+from typing import Any
+
+import requests
+from haystack import Document, component
+
+from src.rag.clients.ollama import get_embeddings
+from src.rag.exceptions import IndexingError
+from src.rag.stores.embedding_cache import EmbeddingCache, QueryEmbeddingCache
+
+# =============================================================================
+# Batch Size Controller
+# =============================================================================
+
+
+class AdaptiveBatchSizer:
+    """
+    レイテンシに基づくバッチサイズ制御
+
+    - 目標レイテンシの半分未満で完了: バッチサイズを 1.5 倍に拡大
+    - 目標レイテンシ超過: 超過率に応じて縮小
+    - 失敗 (タイムアウト・エラー): 半分に縮小
+
+    スレッドセーフ (複数ワーカーから record_* が呼ばれる)。
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_size: int = 1,
+        max_size: int = 64,
+        target_latency: float = 10.0,
+    ) -> None:
+        if min_size < 1 or max_size < min_size:
+            raise ValueError(f"Invalid batch size range: min={min_size}, max={max_size}")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_latency = target_latency
+        self._size = max(min_size, min(initial, max_size))
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """現在のバッチサイズ"""
+        with self._lock:
+            return self._size
+
+    def record_success(self, batch_size: int, latency: float) -> None:
+        """
+        成功したバッチのレイテンシを記録
+
+        Args:
+            batch_size: 完了したバッチの件数
+            latency: リクエスト所要時間 (秒)
+        """
+        with self._lock:
+            if latency > self.target_latency:
+                scaled = int(batch_size * self.target_latency / latency)
+                self._size = max(self.min_size, min(self._size, scaled))
+            elif latency < self.target_latency / 2 and batch_size >= self._size:
+                # 現在のサイズで送ったバッチが速い場合のみ拡大 (縮小前の小バッチは無視)
+                grown = max(self._size + 1, int(self._size * 1.5))
+                self._size = min(self.max_size, grown)
+
+    def record_failure(self) -> None:
+        """失敗 (タイムアウト・エラー) を記録"""
+        with self._lock:
+            self._size = max(self.min_size, self._size // 2)
+
+
+# =============================================================================
+# Embedder Component
+# =============================================================================
+
+
+@component
+class AdaptiveDocumentEmbedder:
+    """
+    Ollama /api/embed を使う並列 Document embedder
+
+    OllamaDocumentEmbedder と同じ入出力 (documents → documents) を持ち、
+    最大 max_concurrency 個のバッチを同時に処理する。
+    バッチサイズは AdaptiveBatchSizer により自動調整され、
+    失敗したバッチは二分割して再試行、1 件でも max_retries 回失敗した場合は
+    IndexingError を送出する。
+    cache を指定した場合はキャッシュ済みのチャンクをリクエストせず、
+    新たに取得した embedding をキャッシュに追加する。
+    """
+
+    def __init__(
+        self,
+        url: str,
+        model: str,
+        timeout: int = 300,
+        batch_size: int = 5,
+        min_batch_size: int = 1,
+        max_batch_size: int = 64,
+        max_concurrency: int = 4,
+        target_latency: float = 10.0,
+        max_retries: int = 2,
+        cache: EmbeddingCache | None = None,
+    ) -> None:
+        self.url = url
+        self.model = model
+        self.timeout = timeout
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.cache = cache
+        self.sizer = AdaptiveBatchSizer(
+            initial=batch_size,
+            min_size=min_batch_size,
+            max_size=max_batch_size,
+            target_latency=target_latency,
+        )
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        """ワーカースレッドごとの HTTP セッション (keep-alive 再利用)"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+
+    def _embed_batch(self, texts: list[str]) -> tuple[list[list[float]] | None, str | None, float]:
+        """1 バッチを embedding し、(embeddings, error, latency) を返す"""
+        start = time.perf_counter()
+        embeddings, error = get_embeddings(
+            texts,
+            model=self.model,
+            url=self.url,
+            timeout=self.timeout,
+            session=self._session(),
+        )
+        return (embeddings, error, time.perf_counter() - start)
+
+    @component.output_types(documents=list[Document], meta=dict[str, Any])
+    def run(self, documents: list[Document]) -> dict[str, Any]:
+        """
+        Documents の embedding を計算
+
+        Args:
+            documents: embedding 対象の Documents
+
+        Returns:
+            documents: embedding を設定した Documents のコピー (入力と同じ順序)
+            meta: model, batches, retries, batch_size (最終バッチサイズ), cache_hits
+
+        Raises:
+            IndexingError: 1 件単位まで分割しても embedding に失敗した場合
+        """
+        texts = [doc.content or "" for doc in documents]
+        embeddings: list[list[float] | None] = (
+            self.cache.get_many(texts) if self.cache is not None else [None] * len(texts)
+        )
+        cache_hits = sum(1 for embedding in embeddings if embedding is not None)
+        todo = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+        # 再試行待ちのバッチ (indices, attempt) は新規バッチより優先
+        retry_queue: deque[tuple[list[int], int]] = deque()
+        in_flight: dict[Future, tuple[list[int], int]] = {}
+        next_index = 0
+        batches = 0
+        retries = 0
+
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        try:
+            while next_index < len(todo) or retry_queue or in_flight:
+                while len(in_flight) < self.max_concurrency and (
+                    retry_queue or next_index < len(todo)
+                ):
+                    if retry_queue:
+                        indices, attempt = retry_queue.popleft()
+                    else:
+                        end = next_index + self.sizer.size
+                        indices, attempt = todo[next_index:end], 0
+                        next_index = min(end, len(todo))
+                    future = executor.submit(self._embed_batch, [texts[i] for i in indices])
+                    in_flight[future] = (indices, attempt)
+                    batches += 1
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    indices, attempt = in_flight.pop(future)
+                    result, error, latency = future.result()
+
+                    if error is None and result is not None:
+                        for i, embedding in zip(indices, result, strict=True):
+                            embeddings[i] = embedding
+                        if self.cache is not None:
+                            self.cache.put_many([texts[i] for i in indices], result)
+                        self.sizer.record_success(len(indices), latency)
+                        continue
+
+                    self.sizer.record_failure()
+                    retries += 1
+                    if len(indices) > 1:
+                        middle = len(indices) // 2
+                        retry_queue.append((indices[:middle], attempt))
+                        retry_queue.append((indices[middle:], attempt))
+                    elif attempt < self.max_retries:
+                        retry_queue.append((indices, attempt + 1))
+                    else:
+                        failed = documents[indices[0]]
+                        raise IndexingError(
+                            f"Embedding failed: {error}",
+                            file_path=failed.meta.get("file_path"),
+                            stage="embed",
+                        )
+        finally:
+            # 失敗時は未送信のバッチを取り消し、実行中のリクエストの完了は待たない
+            executor.shutdown(wait=False, cancel_futures=True)
+            # put_many already committed the new embeddings; save() only records
+            # the recency of this batch's cache hits (cost follows the batch size)
+            if self.cache is not None:
+                self.cache.save()
+
+        embedded = [
+            replace(doc, embedding=embedding)
+            for doc, embedding in zip(documents, embeddings, strict=True)
+        ]
+
+        return {
+            "documents": embedded,
+            "meta": {
+                "model": self.model,
+                "batches": batches,
+                "retries": retries,
+                "batch_size": self.sizer.size,
+                "cache_hits": cache_hits,
+            },
+        }
+
+
+# =============================================================================
+# Query Embedder
+# =============================================================================
+
+
+@component
+class CachedTextEmbedder:
+    """
+    キャッシュ付きのクエリ embedder
+
+    OllamaTextEmbedder と同じ入出力 (text → embedding) を持ち、
+    (モデル, 正規化したクエリ文) がキャッシュにあれば embedder を呼ばずに返す。
+    ミスした場合のみ embedder に問い合わせ、結果をキャッシュに追加する。
+    """
+
+    def __init__(self, embedder: Any, cache: QueryEmbeddingCache, model: str) -> None:
+        self.embedder = embedder
+        self.cache = cache
+        self.model = model
+
+    @component.output_types(embedding=list[float], meta=dict[str, Any])
+    def run(self, text: str) -> dict[str, Any]:
+        """
+        Embed a query text.
+
+        Returns:
+            embedding: Query embedding
+            meta: model, cached (True when served from the cache)
+        """
+        embedding = self.cache.get(self.model, text)
+        if embedding is not None:
+            return {"embedding": embedding, "meta": {"model": self.model, "cached": True}}
+
+        result = self.embedder.run(text=text)
+        embedding = result["embedding"]
+        self.cache.put(self.model, text, embedding)
+        return {"embedding": embedding, "meta": {"model": self.model, "cached": False}}
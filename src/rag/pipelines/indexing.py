@@ -4,7 +4,12 @@ Indexing Pipeline - Vault ドキュメントのスキャン・チャンキング
 
 from __future__ import annotations
 
+import hashlib
+import os
 import re
+from collections import Counter, deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
@@ -12,13 +17,21 @@ from typing import Any
 import yaml
 from haystack import Document as HaystackDocument
 from haystack import Pipeline
-from haystack.components.preprocessors import DocumentSplitter
 from haystack.components.writers import DocumentWriter
-from haystack_integrations.components.embedders.ollama import OllamaDocumentEmbedder
 from haystack_integrations.document_stores.qdrant import QdrantDocumentStore
 
 from src.rag.config import VAULTS_DIR, OllamaConfig, RAGConfig, ollama_config, rag_config
 from src.rag.exceptions import IndexingError
+from src.rag.pipelines.chunking import MarkdownChunker
+from src.rag.pipelines.embedding import AdaptiveDocumentEmbedder
+from src.rag.stores.embedding_cache import EmbeddingCache
+from src.rag.stores.lexical import LexicalIndex
+from src.rag.stores.manifest import IndexManifest, ManifestEntry
+from src.rag.stores.versions import (
+    index_manifest_path,
+    lexical_index_path,
+    load_pointer,
+)
 
 
 # =============================================================================
@@ -34,6 +47,7 @@ class DocumentMeta:
     created: str = ""
     normalized: bool = False
     file_id: str = ""
+    summary: str = ""  # LLM-written summary (extract_knowledge)
 
 
 @dataclass
@@ -45,6 +59,9 @@ class Document:
     content: str
     metadata: DocumentMeta
     vault_name: str
+    content_hash: str = ""  # SHA-256 of raw file content
+    mtime: float = 0.0  # File modification time
+    size: int = 0  # File size in bytes
 
 
 @dataclass
@@ -55,6 +72,37 @@ class IndexingResult:
     indexed_docs: int
     total_chunks: int
     errors: list[str] = field(default_factory=list)
+    unchanged_docs: int = 0  # Skipped by incremental indexing
+    deleted_docs: int = 0  # Removed (deleted or modified) from the store
+    batches: int = 0  # Committed batches (written to store and manifest)
+    skipped_files: int = 0  # Markdown files that are not normalized
+    scan_errors: list[str] = field(default_factory=list)  # Unreadable files ("path: error")
+
+
+@dataclass
+class IndexingProgress:
+    """Progress of a streaming indexing run, reported after each batch"""
+
+    vault_name: str
+    batch: int  # 1-based batch number
+    scanned_docs: int  # Normalized documents scanned so far
+    indexed_docs: int  # Documents committed so far
+    total_chunks: int  # Chunks committed so far
+
+
+ProgressCallback = Callable[[IndexingProgress], None]
+
+
+@dataclass
+class RebuildResult:
+    """Result of a blue/green rebuild"""
+
+    version: int  # New active index version
+    replaced: int  # Previously active version
+    results: dict[str, IndexingResult]  # Per-vault indexing results
+    counts: dict[str, int]  # Validated document counts (chunks, lexical, summaries)
+    stats: dict[str, object]  # get_collection_stats of the new chunk store
+    removed_versions: list[int] = field(default_factory=list)  # Garbage-collected versions
 
 
 # =============================================================================
@@ -111,6 +159,7 @@ def extract_metadata(frontmatter: dict[str, Any]) -> DocumentMeta:
         created=created,
         normalized=frontmatter.get("normalized", False) is True,
         file_id=frontmatter.get("file_id", ""),
+        summary=str(frontmatter.get("summary") or ""),
     )
 
 
@@ -119,18 +168,93 @@ def extract_metadata(frontmatter: dict[str, Any]) -> DocumentMeta:
 # =============================================================================
 
 
-def scan_vault(vault_path: Path, vault_name: str) -> list[Document]:
+# Bytes read to decide eligibility without reading the whole file
+HEADER_BYTES = 4096
+
+# `normalized: true` line in raw frontmatter (YAML 1.1 truthy spellings)
+NORMALIZED_LINE_PATTERN = re.compile(
+    rb"^[\"']?normalized[\"']?[ \t]*:[ \t]*(?:true|yes|on)[ \t]*(?:#.*)?\r?$",
+    re.IGNORECASE | re.MULTILINE,
+)
+FRONTMATTER_END_PATTERN = re.compile(rb"\n---[ \t]*\r?\n")
+
+
+@dataclass
+class VaultScan:
+    """Result of the header scan of a vault (eligible paths only, no bodies)"""
+
+    vault_name: str
+    vault_path: Path
+    eligible: list[Path] = field(default_factory=list)  # Sorted by path
+    file_stats: dict[Path, tuple[float, int]] = field(default_factory=dict)  # path -> mtime, size
+    scanned_files: int = 0  # Markdown files examined
+    skipped_files: int = 0  # Not normalized (or no frontmatter)
+    errors: list[str] = field(default_factory=list)  # "path: error" for unreadable files
+
+
+def _parallel_map(fn: Callable[[Path], Any], paths: Iterable[Path], workers: int) -> Iterator[Any]:
     """
-    Scan vault for normalized markdown files.
+    Apply fn to paths on a thread pool, yielding results in input order.
 
-    Only includes files with `normalized: true` in frontmatter.
+    At most workers * 4 calls are pending at once, so results are not
+    buffered without bound when the consumer is slower than the readers.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        window: deque[Future] = deque()
+        for path in paths:
+            window.append(executor.submit(fn, path))
+            if len(window) >= workers * 4:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+
+def is_normalized_header(header: bytes) -> bool | None:
+    """
+    Decide eligibility from the first bytes of a file.
+
+    Args:
+        header: Leading bytes of the file (up to HEADER_BYTES).
+
+    Returns:
+        False if the file is certainly not normalized (no frontmatter, or a
+        complete frontmatter without a `normalized: true` line); True if the
+        line is present; None if the frontmatter does not end within header.
+    """
+    if not header.startswith(b"---"):
+        return False
+    end = FRONTMATTER_END_PATTERN.search(header, 3)
+    frontmatter = header[: end.start()] if end else header
+    if NORMALIZED_LINE_PATTERN.search(frontmatter):
+        return True
+    return False if end else None
+
+
+def _check_header(path: Path) -> tuple[Path, bool, str | None, tuple[float, int]]:
+    """Read a bounded header. Returns (path, candidate, error, (mtime, size))."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(HEADER_BYTES)
+            stat = os.fstat(f.fileno())
+    except OSError as e:
+        return path, False, f"{path}: {e}", (0.0, 0)
+    return path, is_normalized_header(header) is not False, None, (stat.st_mtime, stat.st_size)
+
+
+def find_eligible_files(vault_path: Path, vault_name: str, workers: int = 16) -> VaultScan:
+    """
+    Find normalized markdown files by reading only a bounded header of each.
+
+    Headers are read in parallel. Files whose header proves they are not
+    normalized are skipped without reading the body or parsing YAML.
 
     Args:
         vault_path: Path to vault directory.
-        vault_name: Name of the vault (e.g., "エンジニア").
+        vault_name: Name of the vault.
+        workers: Number of reader threads.
 
     Returns:
-        List of Document objects for normalized files.
+        VaultScan with candidate paths (confirmed when the body is loaded).
 
     Raises:
         IndexingError: If vault path does not exist.
@@ -142,62 +266,217 @@ def scan_vault(vault_path: Path, vault_name: str) -> list[Document]:
             stage="scan",
         )
 
-    documents: list[Document] = []
-
-    for md_file in vault_path.rglob("*.md"):
-        try:
-            content = md_file.read_text(encoding="utf-8")
-            frontmatter, body = parse_frontmatter(content)
-            metadata = extract_metadata(frontmatter)
+    scan = VaultScan(vault_name=vault_name, vault_path=vault_path)
+    for path, candidate, error, file_stat in _parallel_map(
+        _check_header, vault_path.rglob("*.md"), workers
+    ):
+        scan.scanned_files += 1
+        if error is not None:
+            scan.errors.append(error)
+        elif candidate:
+            scan.eligible.append(path)
+            scan.file_stats[path] = file_stat
+        else:
+            scan.skipped_files += 1
+    # Stable order: the first of several notes sharing a file_id keeps the file_id key
+    scan.eligible.sort()
+    return scan
+
+
+def _load_document(path: Path, vault_name: str) -> tuple[Document | None, str | None]:
+    """Read and parse one file. Returns (document or None if not normalized, error)."""
+    try:
+        raw = path.read_bytes()
+        content = raw.decode("utf-8")
+        frontmatter, body = parse_frontmatter(content)
+        metadata = extract_metadata(frontmatter)
 
-            # Skip non-normalized files
-            if not metadata.normalized:
-                continue
+        # Header check is a fast path; YAML decides
+        if not metadata.normalized:
+            return None, None
 
-            # Extract title from frontmatter or filename
-            title = frontmatter.get("title", md_file.stem)
+        # Extract title from frontmatter or filename
+        title = frontmatter.get("title", path.stem)
 
-            doc = Document(
-                file_path=md_file,
+        return (
+            Document(
+                file_path=path,
                 title=title,
                 content=body.strip(),
                 metadata=metadata,
                 vault_name=vault_name,
-            )
-            documents.append(doc)
+                content_hash=hashlib.sha256(raw).hexdigest(),
+                mtime=path.stat().st_mtime,
+                size=len(raw),
+            ),
+            None,
+        )
+    except Exception as e:
+        return None, f"{path}: {e}"
 
-        except Exception:
-            # Skip files that cannot be read but log the error
-            # In production, this could be logged
-            continue
 
-    return documents
+def load_documents(
+    scan: VaultScan, workers: int = 16, paths: list[Path] | None = None
+) -> Iterator[Document]:
+    """
+    Read and parse eligible files in parallel, in scan order.
+
+    Files that turn out not to be normalized increment scan.skipped_files;
+    unreadable files are recorded in scan.errors.
+
+    Args:
+        scan: Header scan of the vault.
+        workers: Number of reader threads.
+        paths: Subset of scan.eligible to read (default: all).
+
+    Yields:
+        Document for each normalized file.
+    """
+    for doc, error in _parallel_map(
+        lambda path: _load_document(path, scan.vault_name),
+        scan.eligible if paths is None else paths,
+        workers,
+    ):
+        if error is not None:
+            scan.errors.append(error)
+        elif doc is None:
+            scan.skipped_files += 1
+        else:
+            yield doc
+
+
+def iter_vault(vault_path: Path, vault_name: str, workers: int = 16) -> Iterator[Document]:
+    """
+    Lazily scan vault for normalized markdown files.
+
+    Only yields files with `normalized: true` in frontmatter. Headers are
+    checked first; bodies are read only for eligible files.
+
+    Args:
+        vault_path: Path to vault directory.
+        vault_name: Name of the vault (e.g., "エンジニア").
+        workers: Number of reader threads.
+
+    Returns:
+        Iterator of Document objects for normalized files.
+
+    Raises:
+        IndexingError: If vault path does not exist (raised immediately).
+    """
+    return load_documents(find_eligible_files(vault_path, vault_name, workers), workers)
+
+
+def scan_vault(vault_path: Path, vault_name: str) -> list[Document]:
+    """
+    Scan vault for normalized markdown files.
+
+    Only includes files with `normalized: true` in frontmatter.
+
+    Args:
+        vault_path: Path to vault directory.
+        vault_name: Name of the vault (e.g., "エンジニア").
+
+    Returns:
+        List of Document objects for normalized files.
+
+    Raises:
+        IndexingError: If vault path does not exist.
+    """
+    return list(iter_vault(vault_path, vault_name))
+
+
+def scan_vaults(
+    vaults_dir: Path, vault_names: list[str], workers: int = 16
+) -> dict[str, VaultScan | IndexingError]:
+    """
+    Header-scan several vaults concurrently.
+
+    Args:
+        vaults_dir: Base directory for vaults.
+        vault_names: Vaults to scan.
+        workers: Reader threads per vault.
+
+    Returns:
+        Dictionary mapping vault names to VaultScan, or the IndexingError
+        raised for that vault (e.g., missing directory).
+    """
+    results: dict[str, VaultScan | IndexingError] = {}
+    if not vault_names:
+        return results
+
+    with ThreadPoolExecutor(max_workers=len(vault_names)) as executor:
+        futures = {
+            name: executor.submit(find_eligible_files, vaults_dir / name, name, workers)
+            for name in vault_names
+        }
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except IndexingError as e:
+                results[name] = e
+    return results
 
 
 # =============================================================================
 # Chunking
 # =============================================================================
 
+# Body characters standing in for the summary of notes without one
+SUMMARY_FALLBACK_CHARS = 500
+
 
 def chunk_document(
-    doc: Document, chunk_size: int = 512, overlap: int = 50
+    doc: Document,
+    chunk_size: int = 512,
+    overlap: int = 50,
+    chunker: MarkdownChunker | None = None,
 ) -> list[HaystackDocument]:
     """
     Split document into chunks with metadata.
 
-    Uses Haystack DocumentSplitter with word-based splitting.
+    Uses MarkdownChunker (Japanese sentence / Markdown heading boundaries,
+    length measured in estimated tokens).
 
     Args:
         doc: Document to chunk.
-        chunk_size: Target chunk size in words (default: 512).
-        overlap: Overlap between chunks in words (default: 50).
+        chunk_size: Target chunk size in estimated tokens (default: 512).
+        overlap: Overlap between chunks in estimated tokens (default: 50).
+        chunker: Shared chunker (overrides chunk_size/overlap when given).
 
     Returns:
         List of Haystack Document objects with metadata.
     """
-    # Create a Haystack document for splitting
-    haystack_doc = HaystackDocument(
-        content=doc.content,
+    if chunker is None:
+        chunker = MarkdownChunker(chunk_size=chunk_size, overlap=overlap)
+
+    return [
+        HaystackDocument(
+            content=text,
+            meta={
+                "file_path": str(doc.file_path),
+                "title": doc.title,
+                "vault": doc.vault_name,
+                "tags": doc.metadata.tags,
+                "created": doc.metadata.created,
+                "file_id": doc.metadata.file_id,
+                "position": i,
+            },
+        )
+        for i, text in enumerate(chunker.split(doc.content))
+    ]
+
+
+def summary_document(doc: Document) -> HaystackDocument:
+    """
+    Document-level entry for the summary vector store.
+
+    Text is the title and frontmatter summary (the leading SUMMARY_FALLBACK_CHARS
+    of the body for notes without one); meta matches the chunk meta without
+    position, so chunk searches can be restricted to the matched files.
+    """
+    summary = doc.metadata.summary.strip() or doc.content[:SUMMARY_FALLBACK_CHARS]
+    return HaystackDocument(
+        content=f"{doc.title}\n{summary}",
         meta={
             "file_path": str(doc.file_path),
             "title": doc.title,
@@ -208,21 +487,16 @@ def chunk_document(
         },
     )
 
-    # Use DocumentSplitter
-    splitter = DocumentSplitter(
-        split_by="word",
-        split_length=chunk_size,
-        split_overlap=overlap,
-    )
-
-    result = splitter.run(documents=[haystack_doc])
-    chunks: list[HaystackDocument] = result["documents"]
 
-    # Add position metadata to each chunk
-    for i, chunk in enumerate(chunks):
-        chunk.meta["position"] = i
+def embedding_texts(doc: Document, chunker: MarkdownChunker) -> list[str]:
+    """
+    Texts `rag index` embeds for a document: its chunks, then its summary.
 
-    return chunks
+    Used to precompute embeddings outside the indexer (ETL); the results
+    are matched to chunks by text_hash, so they must be built the same way.
+    """
+    chunks = [chunk.content for chunk in chunk_document(doc, chunker=chunker)]
+    return [*chunks, summary_document(doc).content]
 
 
 def chunk_documents(
@@ -231,6 +505,8 @@ def chunk_documents(
     """
     Chunk multiple documents.
 
+    A single MarkdownChunker is built from config and reused for every document.
+
     Args:
         docs: List of documents to chunk.
         config: RAG configuration for chunk settings.
@@ -241,33 +517,111 @@ def chunk_documents(
     if config is None:
         config = rag_config
 
+    chunker = MarkdownChunker(
+        chunk_size=config.chunk_size,
+        overlap=config.chunk_overlap,
+        unit=config.chunk_unit,
+    )
+
     all_chunks: list[HaystackDocument] = []
 
     for doc in docs:
-        chunks = chunk_document(doc, config.chunk_size, config.chunk_overlap)
-        all_chunks.extend(chunks)
+        all_chunks.extend(chunk_document(doc, chunker=chunker))
 
     return all_chunks
 
 
+def iter_chunk_batches(
+    documents: Iterable[Document], chunker: MarkdownChunker, batch_size: int
+) -> Iterator[tuple[list[Document], list[HaystackDocument]]]:
+    """
+    Chunk documents lazily and group them into bounded batches.
+
+    A batch is closed once it holds at least batch_size chunks; a document's
+    chunks are never split across batches.
+
+    Args:
+        documents: Documents to chunk (consumed lazily).
+        chunker: Shared chunker.
+        batch_size: Target number of chunks per batch.
+
+    Yields:
+        (documents, chunks) for each batch.
+
+    Raises:
+        IndexingError: If a document cannot be chunked.
+    """
+    batch_docs: list[Document] = []
+    batch_chunks: list[HaystackDocument] = []
+
+    for doc in documents:
+        try:
+            chunks = chunk_document(doc, chunker=chunker)
+        except Exception as e:
+            raise IndexingError(
+                f"Failed to chunk documents: {e}",
+                file_path=str(doc.file_path),
+                stage="chunk",
+            ) from e
+
+        batch_docs.append(doc)
+        batch_chunks.extend(chunks)
+        if len(batch_chunks) >= batch_size:
+            yield batch_docs, batch_chunks
+            batch_docs, batch_chunks = [], []
+
+    if batch_docs:
+        yield batch_docs, batch_chunks
+
+
 # =============================================================================
 # Indexing Pipeline
 # =============================================================================
 
 
+def _document_embedder(
+    config: OllamaConfig, cache: EmbeddingCache | None
+) -> AdaptiveDocumentEmbedder:
+    return AdaptiveDocumentEmbedder(
+        url=config.remote_url,
+        model=config.embedding_model,
+        timeout=config.embedding_timeout,
+        batch_size=config.embedding_batch_size,
+        min_batch_size=config.embedding_min_batch_size,
+        max_batch_size=config.embedding_max_batch_size,
+        max_concurrency=config.embedding_concurrency,
+        target_latency=config.embedding_target_latency,
+        cache=cache,
+    )
+
+
 def create_indexing_pipeline(
-    store: QdrantDocumentStore, config: OllamaConfig | None = None
+    store: QdrantDocumentStore,
+    config: OllamaConfig | None = None,
+    cache: EmbeddingCache | None = None,
+    lexical: LexicalIndex | None = None,
+    summary_store: QdrantDocumentStore | None = None,
 ) -> Pipeline:
     """
     Create Haystack indexing pipeline.
 
     Pipeline components:
-    1. OllamaDocumentEmbedder - Generate embeddings for documents
+    1. AdaptiveDocumentEmbedder - Generate embeddings for documents
+       (concurrent batches, batch size adapted to observed latency;
+       chunks found in the embedding cache are not sent to the server)
     2. DocumentWriter - Write documents to Qdrant store
+    3. DocumentWriter (lexical_writer) - Write chunk text to the full-text
+       index (only when `lexical` is given)
+    4. AdaptiveDocumentEmbedder (summary_embedder) + DocumentWriter
+       (summary_writer) - Embed one summary_document per note into the
+       summary store (only when `summary_store` is given)
 
     Args:
         store: QdrantDocumentStore instance.
         config: Ollama configuration for embedding server.
+        cache: Persistent embedding cache consulted before the embedding server.
+        lexical: Full-text index kept in sync with the vector store.
+        summary_store: Store of the document-level summary vectors.
 
     Returns:
         Configured Haystack Pipeline.
@@ -278,12 +632,7 @@ def create_indexing_pipeline(
     pipeline = Pipeline()
 
     # Embedder component
-    embedder = OllamaDocumentEmbedder(
-        url=config.remote_url,
-        model=config.embedding_model,
-        timeout=config.embedding_timeout,
-        batch_size=config.embedding_batch_size,
-    )
+    embedder = _document_embedder(config, cache)
 
     # Writer component
     writer = DocumentWriter(document_store=store)
@@ -295,9 +644,172 @@ def create_indexing_pipeline(
     # Connect components
     pipeline.connect("embedder.documents", "writer.documents")
 
+    # Full-text index receives the same chunks (same document ids)
+    if lexical is not None:
+        pipeline.add_component("lexical_writer", DocumentWriter(document_store=lexical))
+        pipeline.connect("embedder.documents", "lexical_writer.documents")
+
+    # One summary vector per note (coarse stage of staged search)
+    if summary_store is not None:
+        pipeline.add_component("summary_embedder", _document_embedder(config, cache))
+        pipeline.add_component("summary_writer", DocumentWriter(document_store=summary_store))
+        pipeline.connect("summary_embedder.documents", "summary_writer.documents")
+
     return pipeline
 
 
+# =============================================================================
+# Incremental Indexing
+# =============================================================================
+
+
+def document_key(doc: Document, claimed: dict[str, str] | None = None) -> str:
+    """
+    Get manifest key for a document.
+
+    Notes sharing a file_id (e.g. copies made by the vault increment mode)
+    must not share a manifest entry, or each run would treat the other copy
+    as changed and delete its chunks. With claimed (file_id -> path of the
+    note owning it in this run), only the first note seen with a file_id is
+    keyed by it; the others are keyed by path.
+
+    Args:
+        doc: Scanned document.
+        claimed: file_id ownership of the current run (updated in place).
+
+    Returns:
+        file_id from frontmatter, or file path if file_id is missing or
+        claimed by another note.
+    """
+    path = str(doc.file_path)
+    file_id = doc.metadata.file_id
+    if not file_id:
+        return path
+    if claimed is not None and claimed.setdefault(file_id, path) != path:
+        return path
+    return file_id
+
+
+def plan_incremental(
+    documents: list[Document], manifest: IndexManifest, vault_name: str, summaries: bool = False
+) -> tuple[list[Document], list[ManifestEntry], int]:
+    """
+    Compare scanned documents with the manifest.
+
+    Args:
+        documents: Documents scanned from the vault.
+        manifest: Index manifest from the previous run.
+        vault_name: Vault being indexed.
+        summaries: Summary vectors are indexed (documents without one are re-indexed).
+
+    Returns:
+        Tuple of:
+        - Documents to (re)index (new or changed content/path)
+        - Manifest entries whose chunks must be deleted (removed or changed files)
+        - Number of unchanged documents
+    """
+    to_index: list[Document] = []
+    stale: list[ManifestEntry] = []
+    unchanged = 0
+    claimed: dict[str, str] = {}
+    seen: set[str] = set()
+
+    for doc in sorted(documents, key=lambda doc: doc.file_path):
+        key = document_key(doc, claimed)
+        seen.add(key)
+        needs_index, entry = _classify(doc, manifest, summaries, key)
+        if not needs_index:
+            unchanged += 1
+            continue
+        to_index.append(doc)
+        if entry is not None:
+            stale.append(entry)
+
+    # Entries of paths still present (keyed differently now) only leave the manifest
+    paths = {str(doc.file_path) for doc in documents}
+    removed = _removed_entries(manifest, vault_name, seen)
+    stale.extend(entry for entry in removed if entry.file_path not in paths)
+
+    return to_index, stale, unchanged
+
+
+def _classify(
+    doc: Document, manifest: IndexManifest, summaries: bool = False, key: str | None = None
+) -> tuple[bool, ManifestEntry | None]:
+    """
+    Compare one scanned document with the manifest.
+
+    With summaries, documents indexed without a summary vector are re-indexed
+    as well (their chunk embeddings come from the embedding cache).
+
+    Returns:
+        (needs_index, stale_entry): stale_entry is the previous entry whose
+        chunks must be deleted before re-indexing (None for new documents).
+    """
+    entry = manifest.get(key or document_key(doc))
+    if entry is None:
+        return True, None
+    if entry.content_hash != doc.content_hash or entry.file_path != str(doc.file_path):
+        return True, entry
+    if summaries and not entry.summary:
+        return True, entry
+    return False, None
+
+
+def _removed_entries(
+    manifest: IndexManifest, vault_name: str, seen: set[str]
+) -> list[ManifestEntry]:
+    """Manifest entries of the vault whose files were not seen in this scan."""
+    return [entry for entry in manifest.entries_for_vault(vault_name) if entry.key not in seen]
+
+
+def delete_document_chunks(
+    store: QdrantDocumentStore,
+    entry: ManifestEntry,
+    lexical: LexicalIndex | None = None,
+    summary_store: QdrantDocumentStore | None = None,
+) -> None:
+    """
+    Delete all chunks of a previously indexed file from the store.
+
+    Args:
+        store: Document store.
+        entry: Manifest entry of the indexed file.
+        lexical: Full-text index to delete from as well.
+        summary_store: Summary vector store to delete the file's summary from.
+    """
+    filters = {"field": "meta.file_path", "operator": "==", "value": entry.file_path}
+    store.delete_by_filter(filters)
+    if lexical is not None:
+        lexical.delete_by_filter(filters)
+    if summary_store is not None:
+        summary_store.delete_by_filter(filters)
+
+
+def _update_manifest(
+    manifest: IndexManifest,
+    documents: list[Document],
+    chunks: list[HaystackDocument],
+    summaries: bool = False,
+    claimed: dict[str, str] | None = None,
+) -> None:
+    """Record indexed documents and their chunk counts in the manifest."""
+    chunk_counts = Counter(chunk.meta.get("file_path") for chunk in chunks)
+    for doc in documents:
+        manifest.set(
+            ManifestEntry(
+                key=document_key(doc, claimed),
+                file_path=str(doc.file_path),
+                vault=doc.vault_name,
+                content_hash=doc.content_hash,
+                mtime=doc.mtime,
+                size=doc.size,
+                chunk_count=chunk_counts.get(str(doc.file_path), 0),
+                summary=summaries,
+            )
+        )
+
+
 # =============================================================================
 # Index Vault
 # =============================================================================
@@ -309,93 +821,236 @@ def index_vault(
     vault_name: str,
     dry_run: bool = False,
     rag_config_override: RAGConfig | None = None,
+    store: QdrantDocumentStore | None = None,
+    manifest: IndexManifest | None = None,
+    full: bool = False,
+    progress: ProgressCallback | None = None,
+    scan: VaultScan | None = None,
+    lexical: LexicalIndex | None = None,
+    summary_store: QdrantDocumentStore | None = None,
 ) -> IndexingResult:
     """
     Index all documents in a vault.
 
+    Documents are streamed scan → chunk → embed → write in batches of about
+    RAGConfig.index_batch_size chunks, so memory stays flat regardless of
+    vault size. Each batch is committed (written to the store and recorded
+    in the manifest) before the next one starts; if indexing fails or is
+    interrupted, only the current batch is lost and the next incremental
+    run resumes from there.
+
+    When a manifest is given, only new or changed documents are embedded,
+    and chunks of removed or modified files are deleted from the store.
+    Without a manifest every document is indexed (no deletions).
+
+    With a summary store (the pipeline must have been created with it), one
+    summary vector per document is written along with its chunks.
+
     Args:
         pipeline: Configured indexing pipeline.
         vault_path: Path to vault directory.
         vault_name: Name of the vault.
         dry_run: If True, scan and chunk but don't write to store.
         rag_config_override: Optional RAG config override.
+        store: Document store used for deletions (required with manifest).
+        manifest: Optional index manifest enabling incremental indexing.
+        full: If True, delete all chunks of the vault and rebuild from scratch.
+        progress: Optional callback invoked after each committed batch.
+        scan: Header scan of the vault (scanned here when omitted).
+        lexical: Full-text index whose chunks are deleted along with the store's.
+        summary_store: Summary vector store kept in sync with the store.
 
     Returns:
-        IndexingResult with statistics.
+        IndexingResult with statistics. After a failed batch, counts cover
+        the documents scanned up to that point.
 
     Raises:
-        IndexingError: If vault path does not exist or indexing fails.
+        IndexingError: If vault path does not exist or a document cannot be chunked.
     """
     config = rag_config_override or rag_config
     errors: list[str] = []
 
-    # Scan vault for normalized documents
-    try:
-        documents = scan_vault(vault_path, vault_name)
-    except IndexingError:
-        raise
-    except Exception as e:
+    if manifest is not None and store is None:
         raise IndexingError(
-            f"Failed to scan vault: {e}",
+            "Incremental indexing requires a document store",
             file_path=str(vault_path),
-            stage="scan",
-        ) from e
-
-    total_docs = len(documents)
-
-    if total_docs == 0:
-        return IndexingResult(
-            total_docs=0,
-            indexed_docs=0,
-            total_chunks=0,
-            errors=[],
+            stage="delete",
         )
 
-    # Chunk documents
-    try:
-        chunks = chunk_documents(documents, config)
-    except Exception as e:
-        raise IndexingError(
-            f"Failed to chunk documents: {e}",
-            stage="chunk",
-        ) from e
-
-    total_chunks = len(chunks)
-
-    # Dry run - return without indexing
-    if dry_run:
+    if scan is None:
+        scan = find_eligible_files(vault_path, vault_name, config.scan_workers)
+    incremental = manifest is not None and not full
+    summaries = summary_store is not None
+
+    total_docs = 0
+    unchanged_docs = 0
+    indexed_docs = 0
+    total_chunks = 0
+    deleted_docs = 0
+    batches = 0
+    seen: set[str] = set()
+    seen_paths: set[str] = set()
+    claimed: dict[str, str] = {}  # file_id -> path of the note keyed by it
+    stale: dict[str, ManifestEntry] = {}  # file_path -> entry to delete before writing
+
+    # Fast path: files whose mtime and size match the manifest are unchanged
+    # (not read or hashed)
+    paths = scan.eligible
+    if incremental:
+        by_path = {entry.file_path: entry for entry in manifest.entries_for_vault(vault_name)}
+        paths = []
+        for path in scan.eligible:
+            entry = by_path.get(str(path))
+            if (
+                entry is not None
+                and (entry.mtime, entry.size) == scan.file_stats.get(path)
+                and (entry.summary or not summaries)
+            ):
+                total_docs += 1
+                unchanged_docs += 1
+                seen.add(entry.key)
+                seen_paths.add(entry.file_path)
+                if entry.key != entry.file_path:
+                    claimed[entry.key] = entry.file_path
+            else:
+                paths.append(path)
+    documents = load_documents(scan, config.scan_workers, paths)
+
+    def select() -> Iterator[Document]:
+        """Count scanned documents and skip unchanged ones (incremental mode)."""
+        nonlocal total_docs, unchanged_docs
+        for doc in documents:
+            total_docs += 1
+            if incremental:
+                key = document_key(doc, claimed)
+                seen.add(key)
+                seen_paths.add(str(doc.file_path))
+                needs_index, entry = _classify(doc, manifest, summaries, key)
+                if not needs_index:
+                    unchanged_docs += 1
+                    continue
+                if entry is not None:
+                    stale[str(doc.file_path)] = entry
+            yield doc
+
+    def result() -> IndexingResult:
         return IndexingResult(
             total_docs=total_docs,
-            indexed_docs=total_docs,
-            total_chunks=total_chunks,
-            errors=[],
-        )
-
-    # Run indexing pipeline
-    try:
-        pipeline.run({"embedder": {"documents": chunks}})
-    except Exception as e:
-        errors.append(f"Pipeline error: {e}")
-        return IndexingResult(
-            total_docs=total_docs,
-            indexed_docs=0,
+            indexed_docs=indexed_docs,
             total_chunks=total_chunks,
             errors=errors,
+            unchanged_docs=unchanged_docs,
+            deleted_docs=deleted_docs,
+            batches=batches,
+            skipped_files=scan.skipped_files,
+            scan_errors=list(scan.errors),
         )
 
-    return IndexingResult(
-        total_docs=total_docs,
-        indexed_docs=total_docs,
-        total_chunks=total_chunks,
-        errors=[],
+    # Full rebuild: drop the whole vault before streaming
+    if manifest is not None and full:
+        deleted_docs = len(manifest.entries_for_vault(vault_name))
+        if not dry_run:
+            try:
+                vault_filter = {"field": "meta.vault", "operator": "==", "value": vault_name}
+                store.delete_by_filter(vault_filter)
+                if lexical is not None:
+                    lexical.delete_by_filter(vault_filter)
+                if summary_store is not None:
+                    summary_store.delete_by_filter(vault_filter)
+                manifest.clear_vault(vault_name)
+                manifest.save()
+            except Exception as e:
+                errors.append(f"Delete error: {e}")
+                return result()
+
+    chunker = MarkdownChunker(
+        chunk_size=config.chunk_size,
+        overlap=config.chunk_overlap,
+        unit=config.chunk_unit,
     )
 
+    for batch_docs, batch_chunks in iter_chunk_batches(select(), chunker, config.index_batch_size):
+        batch_stale = [stale.pop(str(doc.file_path), None) for doc in batch_docs]
+        batch_stale = [entry for entry in batch_stale if entry is not None]
+
+        if dry_run:
+            indexed_docs += len(batch_docs)
+            total_chunks += len(batch_chunks)
+            deleted_docs += len(batch_stale)
+            continue
+
+        # Delete chunks of modified files before writing new ones
+        try:
+            for entry in batch_stale:
+                delete_document_chunks(store, entry, lexical, summary_store)
+                manifest.remove(entry.key)
+        except Exception as e:
+            errors.append(f"Delete error: {e}")
+            break
+        deleted_docs += len(batch_stale)
+
+        if batch_chunks or summaries:
+            data = {"embedder": {"documents": batch_chunks}}
+            if summaries:
+                data["summary_embedder"] = {
+                    "documents": [summary_document(doc) for doc in batch_docs]
+                }
+            try:
+                pipeline.run(data)
+            except Exception as e:
+                errors.append(f"Pipeline error: {e}")
+                if manifest is not None:
+                    manifest.save()  # Persist deletions of this batch
+                break
+
+        # Commit the batch
+        if manifest is not None:
+            _update_manifest(manifest, batch_docs, batch_chunks, summaries, claimed)
+            manifest.save()
+        batches += 1
+        indexed_docs += len(batch_docs)
+        total_chunks += len(batch_chunks)
+
+        if progress is not None:
+            progress(
+                IndexingProgress(
+                    vault_name=vault_name,
+                    batch=batches,
+                    scanned_docs=total_docs,
+                    indexed_docs=indexed_docs,
+                    total_chunks=total_chunks,
+                )
+            )
+
+    # Files removed from the vault (only known after a complete scan)
+    if incremental and not errors:
+        removed = _removed_entries(manifest, vault_name, seen)
+        deleted_docs += len(removed)
+        if not dry_run and removed:
+            try:
+                for entry in removed:
+                    # A path still present was indexed under another key this run
+                    if entry.file_path not in seen_paths:
+                        delete_document_chunks(store, entry, lexical, summary_store)
+                    manifest.remove(entry.key)
+            except Exception as e:
+                errors.append(f"Delete error: {e}")
+            manifest.save()
+
+    return result()
+
 
 def index_all_vaults(
     pipeline: Pipeline,
     vaults_dir: Path | None = None,
     vault_names: list[str] | None = None,
     dry_run: bool = False,
+    store: QdrantDocumentStore | None = None,
+    manifest: IndexManifest | None = None,
+    full: bool = False,
+    progress: ProgressCallback | None = None,
+    lexical: LexicalIndex | None = None,
+    summary_store: QdrantDocumentStore | None = None,
 ) -> dict[str, IndexingResult]:
     """
     Index all configured vaults.
@@ -405,6 +1060,12 @@ def index_all_vaults(
         vaults_dir: Base directory for vaults (default: VAULTS_DIR).
         vault_names: List of vault names to index (default: from config).
         dry_run: If True, scan and chunk but don't write to store.
+        store: Document store used for deletions (required with manifest).
+        manifest: Optional index manifest enabling incremental indexing.
+        full: If True, rebuild each vault from scratch.
+        progress: Optional callback invoked after each committed batch.
+        lexical: Full-text index kept in sync with the store.
+        summary_store: Summary vector store kept in sync with the store.
 
     Returns:
         Dictionary mapping vault names to IndexingResult.
@@ -417,10 +1078,28 @@ def index_all_vaults(
 
     results: dict[str, IndexingResult] = {}
 
+    # Header scans of all vaults run concurrently; bodies are read while indexing
+    scans = scan_vaults(vaults_dir, vault_names, rag_config.scan_workers)
+
     for vault_name in vault_names:
         vault_path = vaults_dir / vault_name
+        scan = scans[vault_name]
         try:
-            result = index_vault(pipeline, vault_path, vault_name, dry_run=dry_run)
+            if isinstance(scan, IndexingError):
+                raise scan
+            result = index_vault(
+                pipeline,
+                vault_path,
+                vault_name,
+                dry_run=dry_run,
+                store=store,
+                manifest=manifest,
+                full=full,
+                progress=progress,
+                scan=scan,
+                lexical=lexical,
+                summary_store=summary_store,
+            )
             results[vault_name] = result
         except IndexingError as e:
             results[vault_name] = IndexingResult(
@@ -431,3 +1110,136 @@ def index_all_vaults(
             )
 
     return results
+
+
+# =============================================================================
+# Blue/Green Rebuild
+# =============================================================================
+
+
+def _validate_rebuild(
+    results: dict[str, IndexingResult],
+    store: QdrantDocumentStore,
+    lexical: LexicalIndex,
+    summary_store: QdrantDocumentStore | None,
+    live_docs: int,
+) -> dict[str, int]:
+    """Check a rebuilt version before it is switched in; returns its counts."""
+    errors = [f"{name}: {error}" for name, r in results.items() for error in r.errors]
+    if errors:
+        raise IndexingError(f"Rebuild failed: {'; '.join(errors)}", stage="rebuild")
+
+    indexed_docs = sum(r.indexed_docs for r in results.values())
+    if indexed_docs == 0 and live_docs:
+        raise IndexingError(
+            f"Rebuild indexed no documents (active index has {live_docs})", stage="rebuild"
+        )
+
+    expected = {
+        "chunks": sum(r.total_chunks for r in results.values()),
+        "lexical": sum(r.total_chunks for r in results.values()),
+    }
+    counts = {"chunks": store.count_documents(), "lexical": lexical.count_documents()}
+    if summary_store is not None:
+        expected["summaries"] = indexed_docs
+        counts["summaries"] = summary_store.count_documents()
+    mismatched = [
+        f"{k}: expected {expected[k]}, found {counts[k]}"
+        for k in expected
+        if counts[k] != expected[k]
+    ]
+    if mismatched:
+        raise IndexingError(f"Rebuild count mismatch ({', '.join(mismatched)})", stage="rebuild")
+    return counts
+
+
+def rebuild_index(
+    vaults_dir: Path | None = None,
+    vault_names: list[str] | None = None,
+    config: RAGConfig | None = None,
+    cache: EmbeddingCache | None = None,
+    progress: ProgressCallback | None = None,
+    pointer_path: Path | None = None,
+) -> RebuildResult:
+    """
+    Rebuild the whole index as a new version and switch to it (blue/green).
+
+    Chunks, summary vectors, the full-text index and the manifest of the new
+    version are written to their own collections and files while searches
+    keep using the active version. After the document counts of every part
+    match the indexing results, the active index pointer is replaced
+    atomically; the versions beyond RAGConfig.index_versions_kept are then
+    deleted. A failed rebuild is deleted and the active version is untouched.
+
+    Args:
+        vaults_dir: Base directory for vaults (default: VAULTS_DIR).
+        vault_names: Vaults of the new version (default: from config).
+        config: RAG configuration. Uses default if None.
+        cache: Persistent embedding cache (unchanged chunks are not re-embedded).
+        progress: Optional callback invoked after each committed batch.
+        pointer_path: Active index pointer (default: ACTIVE_INDEX_PATH).
+
+    Returns:
+        RebuildResult of the switched-in version.
+
+    Raises:
+        IndexingError: If indexing reported errors, nothing was indexed
+            while the active index has documents, or the counts differ.
+    """
+    from src.rag.stores.qdrant import (
+        activate_index_version,
+        close_document_store,
+        drop_index_version,
+        get_collection_stats,
+        get_document_store,
+        get_summary_store,
+    )
+
+    config = config or rag_config
+    pointer = load_pointer(pointer_path)
+    version = pointer.next_version()
+    replaced = pointer.active
+    live_docs = len(IndexManifest.load(index_manifest_path(pointer.active)).entries)
+
+    # Leftovers of an interrupted rebuild under the same version
+    drop_index_version(version, config)
+
+    store = get_document_store(config, version=version)
+    summary_store = get_summary_store(store, config) if config.summary_vectors else None
+    lexical = LexicalIndex(lexical_index_path(version))
+    try:
+        pipeline = create_indexing_pipeline(
+            store, cache=cache, lexical=lexical, summary_store=summary_store
+        )
+        results = index_all_vaults(
+            pipeline=pipeline,
+            vaults_dir=vaults_dir,
+            vault_names=vault_names,
+            store=store,
+            manifest=IndexManifest(index_manifest_path(version)),
+            progress=progress,
+            lexical=lexical,
+            summary_store=summary_store,
+        )
+        counts = _validate_rebuild(results, store, lexical, summary_store, live_docs)
+        stats = get_collection_stats(store)
+    except Exception:
+        lexical.close()
+        close_document_store(store)
+        drop_index_version(version, config)
+        raise
+
+    # Readers open the new version once the pointer changes (local Qdrant
+    # needs the folder lock released first)
+    lexical.close()
+    close_document_store(store)
+    removed = activate_index_version(version, config, pointer_path)
+
+    return RebuildResult(
+        version=version,
+        replaced=replaced,
+        results=results,
+        counts=counts,
+        stats=stats,
+        removed_versions=removed,
+    )
@@ -0,0 +1,56 @@
+"""
+Query Models - 検索・Q&A のデータモデル
+
+Haystack に依存しないため、CLI やデーモンクライアントから軽量に import できる。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+# =============================================================================
+# Data Models
+# =============================================================================
+
+
+@dataclass
+class QueryFilters:
+    """Filters for search queries"""
+
+    vaults: list[str] | None = None  # Filter by vault names
+    tags: list[str] | None = None  # Filter by tags (AND)
+    date_from: date | None = None  # Filter by created date (>=)
+    date_to: date | None = None  # Filter by created date (<=)
+
+
+@dataclass
+class SearchResult:
+    """Single search result"""
+
+    content: str  # Matched chunk content
+    score: float  # Similarity score 0.0-1.0
+    file_path: str  # Source file path
+    title: str  # Document title
+    vault: str  # Vault name
+    position: int  # Chunk position in document
+
+
+@dataclass
+class SearchResponse:
+    """Response from search query"""
+
+    query: str
+    results: list[SearchResult]
+    total: int
+
+
+@dataclass
+class Answer:
+    """Answer from Q&A query"""
+
+    text: str  # Generated answer
+    sources: list[SearchResult]  # Referenced chunks
+    confidence: float  # 0.0-1.0
+    cached: bool = False  # Served from the answer cache
+    similarity: float | None = None  # Similarity to the cached question (cached only)
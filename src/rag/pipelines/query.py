@@ -4,67 +4,35 @@ Query Pipeline - Semantic search and Q&A functionality
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from datetime import date
-from typing import TYPE_CHECKING, Any
+from collections.abc import Callable
+from typing import Any
 
-from haystack import Pipeline
+from haystack import Document as HaystackDocument
+from haystack import Pipeline, component
 from haystack.components.builders import PromptBuilder
+from haystack.components.joiners import DocumentJoiner
 from haystack_integrations.components.embedders.ollama import OllamaTextEmbedder
 from haystack_integrations.components.generators.ollama import OllamaGenerator
 from haystack_integrations.components.retrievers.qdrant import QdrantEmbeddingRetriever
 from haystack_integrations.document_stores.qdrant import QdrantDocumentStore
 
-from src.rag.config import OllamaConfig, ollama_config
+from src.rag.config import SEARCH_MODES, OllamaConfig, ollama_config, rag_config
 from src.rag.exceptions import QueryError
-
-if TYPE_CHECKING:
-    from haystack import Document as HaystackDocument
-
-
-# =============================================================================
-# Data Models
-# =============================================================================
-
-
-@dataclass
-class QueryFilters:
-    """Filters for search queries"""
-
-    vaults: list[str] | None = None  # Filter by vault names
-    tags: list[str] | None = None  # Filter by tags (AND)
-    date_from: date | None = None  # Filter by created date (>=)
-    date_to: date | None = None  # Filter by created date (<=)
-
-
-@dataclass
-class SearchResult:
-    """Single search result"""
-
-    content: str  # Matched chunk content
-    score: float  # Similarity score 0.0-1.0
-    file_path: str  # Source file path
-    title: str  # Document title
-    vault: str  # Vault name
-    position: int  # Chunk position in document
-
-
-@dataclass
-class SearchResponse:
-    """Response from search query"""
-
-    query: str
-    results: list[SearchResult]
-    total: int
-
-
-@dataclass
-class Answer:
-    """Answer from Q&A query"""
-
-    text: str  # Generated answer
-    sources: list[SearchResult]  # Referenced chunks
-    confidence: float  # 0.0-1.0
+from src.rag.pipelines.context import ContextPacker, context_num_ctx
+from src.rag.pipelines.embedding import CachedTextEmbedder
+from src.rag.pipelines.models import Answer, QueryFilters, SearchResponse, SearchResult
+from src.rag.stores.answer_cache import AnswerCache, answer_scope
+from src.rag.stores.embedding_cache import QueryEmbeddingCache, get_query_cache
+from src.rag.stores.lexical import LexicalIndex
+from src.rag.stores.numpy_store import NumpyDocumentStore, NumpyEmbeddingRetriever
+
+# Pipeline component producing the retrieved documents, per search mode
+RESULT_COMPONENTS = {
+    "dense": "retriever",
+    "lexical": "lexical_retriever",
+    "hybrid": "joiner",
+    "staged": "retriever",
+}
 
 
 # =============================================================================
@@ -176,46 +144,224 @@ def build_qdrant_filters(filters: QueryFilters | None) -> dict[str, Any] | None:
 # =============================================================================
 
 
+def create_retriever(
+    store: QdrantDocumentStore | NumpyDocumentStore,
+) -> QdrantEmbeddingRetriever | NumpyEmbeddingRetriever:
+    """Create the embedding retriever matching the store backend."""
+    if isinstance(store, NumpyDocumentStore):
+        return NumpyEmbeddingRetriever(document_store=store)
+    return QdrantEmbeddingRetriever(document_store=store)
+
+
+@component
+class LexicalRetriever:
+    """Full-text retriever over a LexicalIndex (no embedding server involved)."""
+
+    def __init__(self, index: LexicalIndex, top_k: int = 10) -> None:
+        self.index = index
+        self.top_k = top_k
+
+    @component.output_types(documents=list[HaystackDocument])
+    def run(
+        self,
+        query: str,
+        filters: dict[str, Any] | None = None,
+        top_k: int | None = None,
+    ) -> dict[str, list[HaystackDocument]]:
+        return {"documents": self.index.search(query, filters=filters, top_k=top_k or self.top_k)}
+
+
+@component
+class SourcesTap:
+    """
+    Pass-through of retrieved documents that reports them to a per-run callback.
+
+    Placed between retrieval and the prompt builder of streaming Q&A pipelines,
+    so sources can be shown before the LLM starts generating.
+    """
+
+    @component.output_types(documents=list[HaystackDocument])
+    def run(
+        self,
+        documents: list[HaystackDocument],
+        callback: Callable[[list[HaystackDocument]], None] | None = None,
+    ) -> dict[str, list[HaystackDocument]]:
+        if callback is not None:
+            callback(documents)
+        return {"documents": documents}
+
+
+@component
+class SummaryScope:
+    """
+    Restricts chunk retrieval to the notes found by the summary retriever.
+
+    Outputs the query filters AND-ed with a file_path condition on the
+    matched notes, so the chunk retriever only scores their chunks. On
+    Qdrant the condition is a MatchAny on the file_path keyword index
+    (see to_qdrant_filters), so its cost follows the matched notes. When no
+    summary matches (e.g. the summary store is still empty), the filters are
+    passed unchanged and the chunk search covers the whole collection.
+    The output is declared as a plain dict so it connects to the Qdrant
+    retriever's filters input as well.
+    """
+
+    @component.output_types(filters=dict[str, Any])
+    def run(
+        self, documents: list[HaystackDocument], filters: dict[str, Any] | None = None
+    ) -> dict[str, dict[str, Any] | None]:
+        paths = list(dict.fromkeys(doc.meta.get("file_path") for doc in documents))
+        paths = [path for path in paths if path]
+        if not paths:
+            return {"filters": filters}
+        scope = {"field": "meta.file_path", "operator": "in", "value": paths}
+        if filters is None:
+            return {"filters": scope}
+        return {"filters": {"operator": "AND", "conditions": [filters, scope]}}
+
+
+def _validate_mode(
+    mode: str,
+    lexical: LexicalIndex | None,
+    summary_store: QdrantDocumentStore | NumpyDocumentStore | None = None,
+) -> None:
+    if mode not in SEARCH_MODES:
+        raise QueryError(
+            f"Unknown search mode: {mode}. Valid modes: {list(SEARCH_MODES)}",
+            stage="validation",
+        )
+    if mode in ("lexical", "hybrid") and lexical is None:
+        raise QueryError(f"Search mode '{mode}' requires a lexical index", stage="validation")
+    if mode == "staged" and summary_store is None:
+        raise QueryError("Search mode 'staged' requires a summary store", stage="validation")
+
+
+def _add_retrieval(
+    pipeline: Pipeline,
+    store: QdrantDocumentStore | NumpyDocumentStore | None,
+    config: OllamaConfig,
+    mode: str,
+    lexical: LexicalIndex | None,
+    query_cache: QueryEmbeddingCache | None,
+    summary_store: QdrantDocumentStore | NumpyDocumentStore | None = None,
+) -> str:
+    """
+    Add retrieval components for a search mode.
+
+    The query embedder is wrapped in a CachedTextEmbedder, so repeated
+    queries are answered from the query embedding cache.
+
+    Returns:
+        Name of the component whose `documents` output holds the results.
+    """
+    if mode in ("dense", "hybrid", "staged"):
+        # Query embedder
+        embedder = CachedTextEmbedder(
+            OllamaTextEmbedder(
+                url=config.remote_url,
+                model=config.embedding_model,
+                timeout=config.embedding_timeout,
+            ),
+            cache=query_cache if query_cache is not None else get_query_cache(),
+            model=config.embedding_model,
+        )
+
+        # Retriever
+        retriever = create_retriever(store)
+
+        pipeline.add_component("embedder", embedder)
+        pipeline.add_component("retriever", retriever)
+        pipeline.connect("embedder.embedding", "retriever.query_embedding")
+
+    if mode == "staged":
+        # Coarse stage: best notes by summary vector, then chunks of those notes only
+        pipeline.add_component("summary_retriever", create_retriever(summary_store))
+        pipeline.add_component("scope", SummaryScope())
+        pipeline.connect("embedder.embedding", "summary_retriever.query_embedding")
+        pipeline.connect("summary_retriever.documents", "scope.documents")
+        pipeline.connect("scope.filters", "retriever.filters")
+
+    if mode in ("lexical", "hybrid"):
+        pipeline.add_component("lexical_retriever", LexicalRetriever(lexical))
+
+    if mode == "hybrid":
+        # Reciprocal rank fusion of dense and lexical rankings
+        pipeline.add_component("joiner", DocumentJoiner(join_mode="reciprocal_rank_fusion"))
+        pipeline.connect("retriever.documents", "joiner.documents")
+        pipeline.connect("lexical_retriever.documents", "joiner.documents")
+
+    return RESULT_COMPONENTS[mode]
+
+
 def create_search_pipeline(
-    store: QdrantDocumentStore, config: OllamaConfig | None = None
+    store: QdrantDocumentStore | NumpyDocumentStore | None,
+    config: OllamaConfig | None = None,
+    mode: str = "dense",
+    lexical: LexicalIndex | None = None,
+    query_cache: QueryEmbeddingCache | None = None,
+    summary_store: QdrantDocumentStore | NumpyDocumentStore | None = None,
 ) -> Pipeline:
     """
-    Create Haystack search pipeline with embedding retrieval.
+    Create Haystack search pipeline.
 
-    Pipeline components:
-    1. OllamaTextEmbedder - Embed the query text
-    2. QdrantEmbeddingRetriever - Retrieve similar documents
+    Pipeline components per mode:
+    - dense: OllamaTextEmbedder (cached) → QdrantEmbeddingRetriever / NumpyEmbeddingRetriever
+    - lexical: LexicalRetriever (SQLite FTS5; no embedding server)
+    - hybrid: both, fused by DocumentJoiner (reciprocal rank fusion)
+    - staged: OllamaTextEmbedder (cached) → summary retriever (top notes) →
+      SummaryScope → chunk retriever restricted to those notes
 
     Args:
-        store: QdrantDocumentStore instance.
+        store: Document store (Qdrant or NumPy backend). Unused in lexical mode.
         config: Ollama configuration for embedding server.
+        mode: Search mode ("dense", "lexical", "hybrid", "staged").
+        lexical: Lexical index (required for lexical and hybrid modes).
+        query_cache: Query embedding cache (default: process-wide get_query_cache()).
+        summary_store: Summary vector store (required for staged mode).
 
     Returns:
         Configured Haystack Pipeline for search.
+
+    Raises:
+        QueryError: If the mode is unknown or the lexical index / summary store is missing.
     """
     if config is None:
         config = ollama_config
+    _validate_mode(mode, lexical, summary_store)
 
     pipeline = Pipeline()
+    _add_retrieval(pipeline, store, config, mode, lexical, query_cache, summary_store)
 
-    # Query embedder
-    embedder = OllamaTextEmbedder(
-        url=config.remote_url,
-        model=config.embedding_model,
-        timeout=config.embedding_timeout,
-    )
-
-    # Retriever
-    retriever = QdrantEmbeddingRetriever(document_store=store)
-
-    # Add components
-    pipeline.add_component("embedder", embedder)
-    pipeline.add_component("retriever", retriever)
+    return pipeline
 
-    # Connect components
-    pipeline.connect("embedder.embedding", "retriever.query_embedding")
 
-    return pipeline
+def _retrieval_inputs(
+    query: str, filters: dict[str, Any] | None, top_k: int, mode: str
+) -> dict[str, dict[str, Any]]:
+    """Pipeline run inputs of the retrieval components for a search mode."""
+    if mode == "dense":
+        return {
+            "embedder": {"text": query},
+            "retriever": {"top_k": top_k, "filters": filters},
+        }
+    if mode == "lexical":
+        return {"lexical_retriever": {"query": query, "top_k": top_k, "filters": filters}}
+    if mode == "staged":
+        return {
+            "embedder": {"text": query},
+            "summary_retriever": {"top_k": rag_config.staged_candidate_docs, "filters": filters},
+            "scope": {"filters": filters},
+            "retriever": {"top_k": top_k},
+        }
+
+    # Hybrid: fuse deeper candidate lists from both retrievers
+    candidates = top_k * rag_config.hybrid_candidate_factor
+    return {
+        "embedder": {"text": query},
+        "retriever": {"top_k": candidates, "filters": filters},
+        "lexical_retriever": {"query": query, "top_k": candidates, "filters": filters},
+        "joiner": {"top_k": top_k},
+    }
 
 
 # =============================================================================
@@ -241,15 +387,17 @@ def search(
     query: str,
     filters: QueryFilters | None = None,
     top_k: int = 5,
+    mode: str = "dense",
 ) -> SearchResponse:
     """
-    Execute semantic search query.
+    Execute search query.
 
     Args:
         pipeline: Configured search pipeline from create_search_pipeline().
         query: Search query text.
         filters: Optional filters for vault, tags, date range.
         top_k: Number of results to return (default: 5).
+        mode: Search mode the pipeline was created with.
 
     Returns:
         SearchResponse with results.
@@ -265,15 +413,10 @@ def search(
         qdrant_filters = build_qdrant_filters(filters)
 
         # Run pipeline
-        result = pipeline.run(
-            {
-                "embedder": {"text": query},
-                "retriever": {"top_k": top_k, "filters": qdrant_filters},
-            }
-        )
+        result = pipeline.run(_retrieval_inputs(query, qdrant_filters, top_k, mode))
 
         # Extract documents from result
-        documents = result.get("retriever", {}).get("documents", [])
+        documents = result.get(RESULT_COMPONENTS[mode], {}).get("documents", [])
 
         # Convert to SearchResults
         search_results: list[SearchResult] = []
@@ -302,37 +445,61 @@ def search(
 # =============================================================================
 
 
-def create_qa_pipeline(store: QdrantDocumentStore, config: OllamaConfig | None = None) -> Pipeline:
+def create_qa_pipeline(
+    store: QdrantDocumentStore | NumpyDocumentStore | None,
+    config: OllamaConfig | None = None,
+    mode: str = "dense",
+    lexical: LexicalIndex | None = None,
+    query_cache: QueryEmbeddingCache | None = None,
+    stream: bool = False,
+    context_budget: int | None = None,
+    summary_store: QdrantDocumentStore | NumpyDocumentStore | None = None,
+) -> Pipeline:
     """
     Create Haystack Q&A pipeline with LLM generation.
 
     Pipeline components:
-    1. OllamaTextEmbedder - Embed the query text
-    2. QdrantEmbeddingRetriever - Retrieve relevant documents
-    3. PromptBuilder - Build prompt with context
-    4. OllamaGenerator - Generate answer
+    1. Retrieval components of the search mode (see create_search_pipeline)
+    2. SourcesTap - Report sources before generation (stream=True only)
+    3. ContextPacker - Merge neighbouring chunks, drop duplicates, fit the token budget
+    4. PromptBuilder - Build prompt with context
+    5. OllamaGenerator - Generate answer (num_ctx sized to the budget)
 
     Args:
-        store: QdrantDocumentStore instance.
+        store: Document store (Qdrant or NumPy backend). Unused in lexical mode.
         config: Ollama configuration for embedding and LLM servers.
+        mode: Search mode ("dense", "lexical", "hybrid", "staged").
+        lexical: Lexical index (required for lexical and hybrid modes).
+        query_cache: Query embedding cache (default: process-wide get_query_cache()).
+        stream: Add the SourcesTap used by ask(on_sources=...).
+        context_budget: Context token budget (default: rag_config.context_token_budget;
+            0 passes retrieved chunks unchanged with num_ctx = config.num_ctx).
+        summary_store: Summary vector store (required for staged mode).
 
     Returns:
         Configured Haystack Pipeline for Q&A.
+
+    Raises:
+        QueryError: If the mode is unknown or the lexical index / summary store is missing.
     """
     if config is None:
         config = ollama_config
+    _validate_mode(mode, lexical, summary_store)
 
     pipeline = Pipeline()
 
-    # Query embedder (remote server)
-    embedder = OllamaTextEmbedder(
-        url=config.remote_url,
-        model=config.embedding_model,
-        timeout=config.embedding_timeout,
+    # Retrieval (query embedder on the remote server, and/or lexical index)
+    documents_source = _add_retrieval(
+        pipeline, store, config, mode, lexical, query_cache, summary_store
     )
 
-    # Retriever
-    retriever = QdrantEmbeddingRetriever(document_store=store)
+    if context_budget is None:
+        context_budget = rag_config.context_token_budget
+    num_ctx = (
+        context_num_ctx(context_budget, rag_config.answer_token_reserve, config.num_ctx)
+        if context_budget > 0
+        else config.num_ctx
+    )
 
     # Prompt builder
     prompt_builder = PromptBuilder(template=QA_PROMPT_TEMPLATE)
@@ -342,18 +509,23 @@ def create_qa_pipeline(store: QdrantDocumentStore, config: OllamaConfig | None =
         url=config.local_url,
         model=config.llm_model,
         timeout=config.llm_timeout,
-        generation_kwargs={"num_ctx": config.num_ctx},
+        generation_kwargs={"num_ctx": num_ctx},
     )
 
     # Add components
-    pipeline.add_component("embedder", embedder)
-    pipeline.add_component("retriever", retriever)
     pipeline.add_component("prompt_builder", prompt_builder)
     pipeline.add_component("generator", generator)
 
     # Connect components
-    pipeline.connect("embedder.embedding", "retriever.query_embedding")
-    pipeline.connect("retriever.documents", "prompt_builder.documents")
+    if stream:
+        pipeline.add_component("sources", SourcesTap())
+        pipeline.connect(f"{documents_source}.documents", "sources.documents")
+        documents_source = "sources"
+    if context_budget > 0:
+        pipeline.add_component("context_packer", ContextPacker(context_budget))
+        pipeline.connect(f"{documents_source}.documents", "context_packer.documents")
+        documents_source = "context_packer"
+    pipeline.connect(f"{documents_source}.documents", "prompt_builder.documents")
     pipeline.connect("prompt_builder.prompt", "generator.prompt")
 
     return pipeline
@@ -364,11 +536,36 @@ def create_qa_pipeline(store: QdrantDocumentStore, config: OllamaConfig | None =
 # =============================================================================
 
 
+def _sources(documents: list[HaystackDocument]) -> list[SearchResult]:
+    """Convert retrieved documents to SearchResults."""
+    sources: list[SearchResult] = []
+    for doc in documents:
+        score = doc.score if hasattr(doc, "score") and doc.score is not None else 0.0
+        sources.append(_convert_to_search_result(doc, score))
+    return sources
+
+
+def _question_embedding(pipeline: Pipeline, question: str) -> list[float] | None:
+    """
+    Embedding of the question from the pipeline's (cached) query embedder.
+
+    The embedder caches it, so the pipeline run that follows does not embed
+    the question again. None for lexical pipelines.
+    """
+    if "embedder" not in pipeline.graph.nodes:
+        return None
+    return pipeline.get_component("embedder").run(text=question)["embedding"]
+
+
 def ask(
     pipeline: Pipeline,
     question: str,
     filters: QueryFilters | None = None,
     top_k: int = 5,
+    mode: str = "dense",
+    streaming_callback: Callable[[str], None] | None = None,
+    on_sources: Callable[[list[SearchResult]], None] | None = None,
+    answer_cache: AnswerCache | None = None,
 ) -> Answer:
     """
     Ask a question and get LLM-generated answer with sources.
@@ -378,6 +575,12 @@ def ask(
         question: Question to ask.
         filters: Optional filters for vault, tags, date range.
         top_k: Number of source documents to use (default: 5).
+        mode: Search mode the pipeline was created with.
+        streaming_callback: Called with each answer token as the LLM generates it.
+        on_sources: Called with the sources once retrieval completes, before
+            generation starts (requires create_qa_pipeline(stream=True)).
+        answer_cache: Answer cache; a similar question asked before with the same
+            filters, mode and top_k is answered from it (Answer.cached=True).
 
     Returns:
         Answer with generated text and sources.
@@ -389,30 +592,44 @@ def ask(
         raise QueryError("Empty question provided", query=question, stage="validation")
 
     try:
+        # Answer cache (same scope, similar question, current index version)
+        if answer_cache is not None:
+            generator = pipeline.get_component("generator")
+            scope = answer_scope(filters, mode, top_k, getattr(generator, "model", ""))
+            embedding = _question_embedding(pipeline, question)
+            cached = answer_cache.get(scope, question, embedding)
+            if cached is not None:
+                if on_sources is not None:
+                    on_sources(cached.sources)
+                if streaming_callback is not None:
+                    streaming_callback(cached.text)
+                return cached
+
         # Build Qdrant filters
         qdrant_filters = build_qdrant_filters(filters)
 
-        # Run pipeline
-        result = pipeline.run(
-            {
-                "embedder": {"text": question},
-                "retriever": {"top_k": top_k, "filters": qdrant_filters},
-                "prompt_builder": {"query": question},
+        data: dict[str, dict[str, Any]] = {
+            **_retrieval_inputs(question, qdrant_filters, top_k, mode),
+            "prompt_builder": {"query": question},
+        }
+        if on_sources is not None:
+            data["sources"] = {"callback": lambda documents: on_sources(_sources(documents))}
+        if streaming_callback is not None:
+            data["generator"] = {
+                "streaming_callback": lambda chunk: streaming_callback(chunk.content)
             }
-        )
+
+        # Run pipeline (retrieval output is consumed by the prompt builder,
+        # so it must be requested explicitly to report sources)
+        source_component = RESULT_COMPONENTS[mode]
+        result = pipeline.run(data, include_outputs_from={source_component})
 
         # Extract answer
         replies = result.get("generator", {}).get("replies", [])
         answer_text = replies[0] if replies else ""
 
         # Extract source documents
-        documents = result.get("retriever", {}).get("documents", [])
-
-        # Convert to SearchResults for sources
-        sources: list[SearchResult] = []
-        for doc in documents:
-            score = doc.score if hasattr(doc, "score") and doc.score is not None else 0.0
-            sources.append(_convert_to_search_result(doc, score))
+        sources = _sources(result.get(source_component, {}).get("documents", []))
 
         # Calculate confidence based on source scores
         if sources:
@@ -421,11 +638,14 @@ def ask(
         else:
             confidence = 0.0
 
-        return Answer(
+        answer = Answer(
             text=answer_text,
             sources=sources,
             confidence=confidence,
         )
+        if answer_cache is not None and answer_text:
+            answer_cache.put(scope, question, embedding, answer)
+        return answer
 
     except QueryError:
         raise
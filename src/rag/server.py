@@ -0,0 +1,462 @@
+"""
+RAG Server - 常駐デーモン (serve サブコマンド)
+
+ドキュメントストア・全文検索インデックス・検索 / Q&A パイプラインを
+起動時に一度だけ用意し、Unix ソケットまたは HTTP で search / ask / status に答える。
+リクエストはスレッドごとに並行処理する。
+
+Endpoints (JSON):
+- POST /search  {query, vaults, tags, top_k, mode}
+- POST /ask     {question, vaults, tags, top_k, mode, stream, no_cache}
+- GET  /status
+
+stream=true の ask は NDJSON イベント (sources → token... → done / error) を
+chunked 転送で逐次返す。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import structlog
+from haystack import Pipeline
+from haystack_integrations.document_stores.qdrant import QdrantDocumentStore
+
+from src.rag.config import DAEMON_SOCKET_PATH, rag_config
+from src.rag.exceptions import ConfigurationError, QueryError, RAGError
+from src.rag.pipelines.query import (
+    QueryFilters,
+    ask,
+    create_qa_pipeline,
+    create_search_pipeline,
+    search,
+)
+from src.rag.stores.answer_cache import get_answer_cache
+from src.rag.stores.embedding_cache import get_query_cache
+from src.rag.stores.lexical import LexicalIndex
+from src.rag.stores.numpy_store import NumpyDocumentStore
+from src.rag.stores.qdrant import (
+    close_document_store,
+    get_collection_stats,
+    get_document_store,
+    get_summary_store,
+)
+from src.rag.stores.versions import active_version, lexical_index_path
+
+logger = structlog.get_logger()
+
+# Maximum request body size (bytes)
+MAX_REQUEST_BYTES = 1024**2
+
+
+# =============================================================================
+# Service
+# =============================================================================
+
+
+# Stores of one index version: chunk store, summary store, full-text index
+_Stores = tuple[
+    QdrantDocumentStore | NumpyDocumentStore, QdrantDocumentStore | NumpyDocumentStore, LexicalIndex
+]
+
+
+def _close_stores(stores: _Stores) -> None:
+    store, summary_store, lexical = stores
+    close_document_store(summary_store)
+    close_document_store(store)
+    lexical.close()
+
+
+class RAGService:
+    """
+    Warm store, lexical index and pipelines shared by all requests.
+
+    Pipelines are built once per (kind, mode) and reused; Haystack pipelines
+    keep no per-run state, so requests run them concurrently. The query
+    embedding cache is shared as well.
+
+    Stores opened by the service follow the active index version: after
+    `rag index --rebuild` switches versions, the next request reopens the
+    stores and rebuilds the pipelines. Requests already running finish on
+    the previous version, whose stores are closed when the last of them ends.
+    """
+
+    def __init__(
+        self,
+        store: QdrantDocumentStore | NumpyDocumentStore | None = None,
+        lexical: LexicalIndex | None = None,
+        summary_store: QdrantDocumentStore | NumpyDocumentStore | None = None,
+    ) -> None:
+        self.version = active_version()
+        self._follow_active = store is None
+        self.store = store if store is not None else get_document_store(version=self.version)
+        self.lexical = (
+            lexical if lexical is not None else LexicalIndex(lexical_index_path(self.version))
+        )
+        self.summary_store = (
+            summary_store if summary_store is not None else get_summary_store(self.store)
+        )
+        self.started_at = time.time()
+        self.requests = 0
+        self._pipelines: dict[tuple[str, str], Pipeline] = {}
+        self._lock = threading.Lock()
+        # Requests running per index version, and stores replaced by refresh
+        # that are closed once the requests on their version have finished
+        self._in_flight: Counter[int] = Counter()
+        self._retired: dict[int, list[_Stores]] = {}
+
+    def refresh(self) -> None:
+        """Reopen the stores if another index version became active."""
+        if not self._follow_active:
+            return
+        version = active_version()
+        if version == self.version:
+            return
+        with self._lock:
+            if version == self.version:
+                return
+            logger.info("index_version_switched", previous=self.version, version=version)
+            replaced = (self.store, self.summary_store, self.lexical)
+            self.store = get_document_store(version=version)
+            self.lexical = LexicalIndex(lexical_index_path(version))
+            self.summary_store = get_summary_store(self.store)
+            self._pipelines = {}
+            if self._in_flight[self.version]:
+                self._retired.setdefault(self.version, []).append(replaced)
+                replaced = None
+            self.version = version
+        if replaced is not None:
+            _close_stores(replaced)
+
+    def _pipeline(self, kind: str, mode: str) -> Pipeline:
+        """Pipeline of the current stores (call with self._lock held)."""
+        key = (kind, mode)
+        if key not in self._pipelines:
+            if kind == "search":
+                pipeline = create_search_pipeline(
+                    self.store,
+                    mode=mode,
+                    lexical=self.lexical,
+                    summary_store=self.summary_store,
+                )
+            else:
+                pipeline = create_qa_pipeline(
+                    self.store,
+                    mode=mode,
+                    lexical=self.lexical,
+                    stream=True,
+                    summary_store=self.summary_store,
+                )
+            self._pipelines[key] = pipeline
+        return self._pipelines[key]
+
+    def pipeline(self, kind: str, mode: str) -> Pipeline:
+        """Search ("search") or streaming Q&A ("ask") pipeline for a mode, built on first use."""
+        self.refresh()
+        with self._lock:
+            return self._pipeline(kind, mode)
+
+    @contextmanager
+    def _request(self, kind: str | None = None, mode: str = "") -> Iterator[Pipeline | None]:
+        """
+        Count a request on the current index version while it runs.
+
+        Yields the (kind, mode) pipeline, or None without kind. The stores
+        of the version stay open until the request finishes, even if
+        refresh switches to another version meanwhile.
+        """
+        self.refresh()
+        with self._lock:
+            pipeline = self._pipeline(kind, mode) if kind else None
+            version = self.version
+            self._in_flight[version] += 1
+        try:
+            yield pipeline
+        finally:
+            with self._lock:
+                self._in_flight[version] -= 1
+                retired = []
+                if not self._in_flight[version]:
+                    del self._in_flight[version]
+                    retired = self._retired.pop(version, [])
+            for stores in retired:
+                _close_stores(stores)
+
+    def warm_up(self, mode: str) -> None:
+        """Build the search and Q&A pipelines of a mode ahead of the first request."""
+        self.pipeline("search", mode)
+        self.pipeline("ask", mode)
+
+    def _count(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    @staticmethod
+    def _filters(request: dict[str, Any]) -> QueryFilters | None:
+        vaults = request.get("vaults")
+        tags = request.get("tags")
+        return QueryFilters(vaults=vaults, tags=tags) if vaults or tags else None
+
+    def search(self, request: dict[str, Any]) -> dict[str, Any]:
+        self._count()
+        mode = request.get("mode") or rag_config.search_mode
+        with self._request("search", mode) as pipeline:
+            response = search(
+                pipeline,
+                request.get("query", ""),
+                filters=self._filters(request),
+                top_k=int(request.get("top_k", 5)),
+                mode=mode,
+            )
+        return asdict(response)
+
+    def ask(
+        self, request: dict[str, Any], emit: Callable[[dict[str, Any]], None] | None = None
+    ) -> dict[str, Any]:
+        """
+        Answer a question; with emit, report sources and tokens as events while generating.
+        """
+        self._count()
+        mode = request.get("mode") or rag_config.search_mode
+        with self._request("ask", mode) as pipeline:
+            answer = ask(
+                pipeline,
+                request.get("question", ""),
+                filters=self._filters(request),
+                top_k=int(request.get("top_k", 5)),
+                mode=mode,
+                streaming_callback=(lambda token: emit({"event": "token", "text": token}))
+                if emit
+                else None,
+                on_sources=(
+                    lambda sources: emit(
+                        {"event": "sources", "sources": [asdict(source) for source in sources]}
+                    )
+                )
+                if emit
+                else None,
+                answer_cache=None if request.get("no_cache") else get_answer_cache(),
+            )
+        return asdict(answer)
+
+    def status(self) -> dict[str, Any]:
+        self._count()
+        with self._request():
+            stats = get_collection_stats(self.store)
+        cache = get_query_cache()
+        answer_cache = get_answer_cache()
+        return {
+            **stats,
+            "daemon": {
+                "pid": os.getpid(),
+                "index_version": self.version,
+                "uptime_s": int(time.time() - self.started_at),
+                "requests": self.requests,
+                "pipelines": sorted(f"{kind}:{mode}" for kind, mode in self._pipelines),
+                "query_cache": {"entries": len(cache), "hits": cache.hits, "misses": cache.misses},
+                "answer_cache": {
+                    "entries": len(answer_cache),
+                    "hits": answer_cache.hits,
+                    "misses": answer_cache.misses,
+                }
+                if answer_cache is not None
+                else None,
+            },
+        }
+
+
+# =============================================================================
+# HTTP Handling
+# =============================================================================
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "rag-daemon/0.1"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("daemon_request", request=format % args)
+
+    def _send(self, status: int, data: Any) -> None:
+        body = json.dumps(data, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, error: Exception) -> None:
+        self._send(status, {"error": self._error_payload(error)})
+
+    def _error_payload(self, error: Exception) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            "type": type(error).__name__,
+            "message": getattr(error, "message", str(error)),
+        }
+        if isinstance(error, QueryError):
+            payload["stage"] = error.stage
+        return payload
+
+    def _stream(self, call: Callable[[Callable[[dict[str, Any]], None]], Any]) -> None:
+        """Send NDJSON events with chunked transfer encoding; the result ends the stream."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def emit(event: dict[str, Any]) -> None:
+            line = json.dumps(event, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+            self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            self.wfile.flush()
+
+        try:
+            emit({"event": "done", "result": call(emit)})
+        except Exception as e:
+            if not isinstance(e, RAGError):
+                logger.exception("daemon_request_failed", path=self.path)
+            emit({"event": "error", "error": self._error_payload(e)})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _dispatch(self, call: Any) -> None:
+        try:
+            self._send(200, call())
+        except QueryError as e:
+            self._send_error(400 if e.stage == "validation" else 500, e)
+        except RAGError as e:
+            self._send_error(500, e)
+        except Exception as e:
+            logger.exception("daemon_request_failed", path=self.path)
+            self._send_error(500, e)
+
+    def do_GET(self) -> None:  # noqa: N802
+        service: RAGService = self.server.service  # type: ignore[attr-defined]
+        if self.path == "/status":
+            self._dispatch(service.status)
+        else:
+            self._send(404, {"error": {"type": "NotFound", "message": self.path}})
+
+    def do_POST(self) -> None:  # noqa: N802
+        service: RAGService = self.server.service  # type: ignore[attr-defined]
+        handlers = {"/search": service.search, "/ask": service.ask}
+        handler = handlers.get(self.path)
+        if handler is None:
+            self._send(404, {"error": {"type": "NotFound", "message": self.path}})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            self._send(413, {"error": {"type": "QueryError", "message": "Request too large"}})
+            return
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            self._send(400, {"error": {"type": "QueryError", "message": f"Invalid JSON: {e}"}})
+            return
+        if self.path == "/ask" and request.get("stream"):
+            self._stream(lambda emit: service.ask(request, emit))
+            return
+        self._dispatch(lambda: handler(request))
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded HTTP server on a Unix domain socket."""
+
+    daemon_threads = True
+
+
+def _prepare_socket(path: Path) -> None:
+    """Remove a stale socket file; refuse to start when a daemon already listens on it."""
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+    except OSError:
+        path.unlink()
+    else:
+        raise ConfigurationError(f"RAG daemon is already running on {path}")
+    finally:
+        probe.close()
+
+
+def create_server(
+    service: RAGService,
+    socket_path: Path | None = None,
+    host: str | None = None,
+    port: int | None = None,
+) -> socketserver.BaseServer:
+    """
+    Create the daemon server (not yet serving).
+
+    Listens on host:port when a port is given, otherwise on the Unix socket
+    (default: DAEMON_SOCKET_PATH, owner-only permissions).
+    """
+    server: socketserver.BaseServer
+    if port is not None:
+        server = ThreadingHTTPServer((host or "127.0.0.1", port), _Handler)
+        server.daemon_threads = True
+    else:
+        path = socket_path or DAEMON_SOCKET_PATH
+        _prepare_socket(path)
+        server = UnixHTTPServer(str(path), _Handler)
+        os.chmod(path, 0o600)
+    server.service = service  # type: ignore[attr-defined]
+    return server
+
+
+def serve(
+    socket_path: Path | None = None,
+    host: str | None = None,
+    port: int | None = None,
+    mode: str | None = None,
+) -> None:
+    """
+    Run the daemon until SIGINT / SIGTERM.
+
+    Args:
+        socket_path: Unix socket path (default: DAEMON_SOCKET_PATH).
+        host: Bind address for HTTP (with port).
+        port: HTTP port; listens on TCP instead of the Unix socket.
+        mode: Search mode whose pipelines are built at startup.
+    """
+    service = RAGService()
+    service.warm_up(mode or rag_config.search_mode)
+    server = create_server(service, socket_path=socket_path, host=host, port=port)
+
+    def _stop(signum: int, frame: Any) -> None:
+        # shutdown() blocks until serve_forever returns; call it off the main thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _stop)
+    address = (
+        f"http://{host or '127.0.0.1'}:{port}"
+        if port is not None
+        else str(socket_path or DAEMON_SOCKET_PATH)
+    )
+    logger.info("daemon_started", address=address, pid=os.getpid())
+    print(f"RAG daemon listening on {address} (pid {os.getpid()})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if port is None:
+            Path(socket_path or DAEMON_SOCKET_PATH).unlink(missing_ok=True)
+        service.lexical.close()
+        logger.info("daemon_stopped", requests=service.requests)
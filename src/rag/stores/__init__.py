@@ -1,15 +1,74 @@
 """
-RAG Stores - Qdrant Document Store
+RAG Stores - Qdrant / NumPy Document Stores, Lexical Index, Index Manifest & Embedding Caches
+
+Names are imported on first access (PEP 562), so importing a single
+submodule (e.g. stats) does not load the Qdrant client or Haystack.
 """
 
-from src.rag.stores.qdrant import (
-    COLLECTION_NAME,
-    get_collection_stats,
-    get_document_store,
-)
-
-__all__ = [
-    "COLLECTION_NAME",
-    "get_document_store",
-    "get_collection_stats",
-]
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from src.rag.stores.answer_cache import AnswerCache, get_answer_cache
+    from src.rag.stores.embedding_cache import (
+        EmbeddingCache,
+        QueryEmbeddingCache,
+        get_query_cache,
+    )
+    from src.rag.stores.lexical import LexicalIndex
+    from src.rag.stores.manifest import IndexManifest, ManifestEntry, index_version
+    from src.rag.stores.numpy_store import NumpyDocumentStore, NumpyEmbeddingRetriever
+    from src.rag.stores.precomputed import import_precomputed_embeddings
+    from src.rag.stores.qdrant import (
+        COLLECTION_NAME,
+        ProfiledQdrantDocumentStore,
+        get_collection_stats,
+        get_document_store,
+        get_storage_profile,
+        get_summary_store,
+        migrate_collection,
+    )
+    from src.rag.stores.snapshot import create_snapshot, restore_index, restore_snapshot
+    from src.rag.stores.stats import load_collection_stats, save_collection_stats
+
+_EXPORTS = {
+    "AnswerCache": "answer_cache",
+    "COLLECTION_NAME": "qdrant",
+    "EmbeddingCache": "embedding_cache",
+    "IndexManifest": "manifest",
+    "LexicalIndex": "lexical",
+    "ManifestEntry": "manifest",
+    "NumpyDocumentStore": "numpy_store",
+    "NumpyEmbeddingRetriever": "numpy_store",
+    "get_document_store": "qdrant",
+    "get_collection_stats": "qdrant",
+    "ProfiledQdrantDocumentStore": "qdrant",
+    "QueryEmbeddingCache": "embedding_cache",
+    "create_snapshot": "snapshot",
+    "get_answer_cache": "answer_cache",
+    "get_query_cache": "embedding_cache",
+    "get_storage_profile": "qdrant",
+    "get_summary_store": "qdrant",
+    "import_precomputed_embeddings": "precomputed",
+    "index_version": "manifest",
+    "load_collection_stats": "stats",
+    "migrate_collection": "qdrant",
+    "restore_index": "snapshot",
+    "restore_snapshot": "snapshot",
+    "save_collection_stats": "stats",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f"{__name__}.{module}"), name)
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
@@ -0,0 +1,195 @@
+"""
+Answer Cache - ask の回答を質問の意味的な類似度で再利用するキャッシュ
+
+質問の embedding と生成済みの回答を SQLite に保存し、同じスコープ
+(フィルタ・検索モード・top_k・LLM モデル) で類似度が閾値以上の質問が来たら
+LLM を呼ばずに保存済みの回答を返す。embedding を持たない lexical モードでは
+正規化した質問文の完全一致のみを扱う。
+
+各エントリはインデックスのバージョン (index_version) と共に保存され、
+`rag index` がインデックスを変更するとバージョンが変わり、古い回答は破棄される。
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+import numpy as np
+
+from src.rag.config import ANSWER_CACHE_PATH, rag_config
+from src.rag.pipelines.models import Answer, QueryFilters, SearchResult
+from src.rag.stores.embedding_cache import normalize_query
+from src.rag.stores.manifest import index_version
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    id INTEGER PRIMARY KEY,
+    scope TEXT NOT NULL,
+    index_version TEXT NOT NULL,
+    question TEXT NOT NULL,
+    embedding BLOB,
+    answer TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS answers_scope ON answers(scope);
+"""
+
+
+def answer_scope(filters: QueryFilters | None, mode: str, top_k: int, model: str) -> str:
+    """Key of the answers a question may reuse: same filters, mode, top_k and LLM."""
+    filters = filters or QueryFilters()
+    return json.dumps(
+        {
+            "vaults": sorted(filters.vaults or []),
+            "tags": sorted(filters.tags or []),
+            "date_from": filters.date_from.isoformat() if filters.date_from else None,
+            "date_to": filters.date_to.isoformat() if filters.date_to else None,
+            "mode": mode,
+            "top_k": top_k,
+            "model": model,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+
+
+class AnswerCache:
+    """
+    Persistent semantic answer cache (SQLite).
+
+    Lookups compare the question embedding with the cached questions of the
+    scope (cosine similarity) and return the best answer at or above
+    threshold. Entries of another index version are deleted on lookup.
+
+    Thread-safe (shared by concurrent daemon requests).
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        threshold: float = 0.95,
+        max_entries: int = 1000,
+        version_path: Path | None = None,
+    ) -> None:
+        self.path = path or ANSWER_CACHE_PATH
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.version_path = version_path
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+
+    def get(self, scope: str, question: str, embedding: list[float] | None) -> Answer | None:
+        """
+        Cached answer for a question, or None on a miss.
+
+        Returns:
+            Answer marked cached=True, with the similarity of the matched question.
+        """
+        version = index_version(self.version_path)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM answers WHERE index_version != ?", (version,))
+            rows = self._conn.execute(
+                "SELECT question, embedding, answer FROM answers WHERE scope = ?", (scope,)
+            ).fetchall()
+
+        best: tuple[float, str] | None = None
+        normalized = normalize_query(question)
+        query = _unit(embedding) if embedding is not None else None
+        for cached_question, blob, answer in rows:
+            if cached_question == normalized:
+                similarity = 1.0
+            elif query is not None and blob is not None:
+                similarity = float(np.dot(np.frombuffer(blob, dtype=np.float32), query))
+            else:
+                continue
+            if similarity >= self.threshold and (best is None or similarity > best[0]):
+                best = (similarity, answer)
+
+        if best is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        data = json.loads(best[1])
+        return Answer(
+            text=data["text"],
+            sources=[SearchResult(**source) for source in data["sources"]],
+            confidence=data["confidence"],
+            cached=True,
+            similarity=round(best[0], 4),
+        )
+
+    def put(self, scope: str, question: str, embedding: list[float] | None, answer: Answer) -> None:
+        """Store a generated answer (the oldest entries beyond max_entries are dropped)."""
+        blob = _unit(embedding).tobytes() if embedding is not None else None
+        data = json.dumps(
+            {
+                "text": answer.text,
+                "sources": [asdict(source) for source in answer.sources],
+                "confidence": answer.confidence,
+            },
+            ensure_ascii=False,
+        )
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO answers (scope, index_version, question, embedding, answer, "
+                "created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    scope,
+                    index_version(self.version_path),
+                    normalize_query(question),
+                    blob,
+                    data,
+                    time.time(),
+                ),
+            )
+            self._conn.execute(
+                "DELETE FROM answers WHERE id NOT IN "
+                "(SELECT id FROM answers ORDER BY id DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM answers")
+
+
+def _unit(embedding: list[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+_default_answer_cache: AnswerCache | None = None
+
+
+def get_answer_cache() -> AnswerCache | None:
+    """
+    Process-wide answer cache configured from rag_config, or None when disabled
+    (RAG_ANSWER_CACHE=0).
+    """
+    global _default_answer_cache
+    if not rag_config.answer_cache:
+        return None
+    if _default_answer_cache is None:
+        _default_answer_cache = AnswerCache(
+            threshold=rag_config.answer_cache_threshold,
+            max_entries=rag_config.answer_cache_size,
+        )
+    return _default_answer_cache
@@ -0,0 +1,596 @@
+"""
+Embedding Cache - チャンク本文をキーとした embedding の永続キャッシュ
+
+(embedding モデル, チャンク本文の SHA-256) をキーに、ベクトルを float16 で
+追記専用ファイルへ保存する。チャンクサイズ変更やコレクション再構築時に、
+本文が変わっていないチャンクの再 embedding を避ける。
+
+キー → 行番号のインデックスは SQLite (WAL) に置き、追記・コンパクションは
+SQLite の書き込みロックの中で行うため、複数プロセスが同じキャッシュを
+共有しても行番号が食い違わない。
+
+QueryEmbeddingCache は検索クエリ用: (モデル, 正規化したクエリ文) をキーにした
+インメモリ LRU で、必要に応じて同じ形式のディスクキャッシュへ永続化する。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from src.rag.config import EMBEDDING_CACHE_DIR, QUERY_EMBEDDING_CACHE_DIR, rag_config
+
+CACHE_VERSION = 2
+
+INDEX_FILE = "index.sqlite3"
+LEGACY_INDEX_FILE = "index.json"  # CACHE_VERSION 1 (imported on first open)
+
+# Fraction of max entries kept after eviction (avoid compacting on every put)
+EVICTION_TARGET = 0.9
+
+# Keys per "IN (...)" query (below SQLite's host parameter limit)
+LOOKUP_CHUNK = 500
+
+# Seconds a writer waits for another process holding the write lock (compaction)
+LOCK_TIMEOUT = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    row INTEGER NOT NULL,
+    last_used INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value
+);
+"""
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 hex digest of chunk text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _model_dir_name(model: str) -> str:
+    """Filesystem-safe directory name for a model (e.g., "bge-m3:latest" -> "bge-m3_latest")."""
+    return re.sub(r"[^A-Za-z0-9._-]", "_", model)
+
+
+def _chunks(items: list[str]) -> Iterator[list[str]]:
+    for start in range(0, len(items), LOOKUP_CHUNK):
+        yield items[start : start + LOOKUP_CHUNK]
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache for one embedding model.
+
+    Layout (one directory per model):
+        vectors.<generation>.f16  Append-only float16 rows of `dim` values (np.memmap)
+        index.sqlite3             entries (text_hash -> row, last_used) and meta
+                                  (model, dim, LRU clock, entry count, and the
+                                  current vector file generation)
+
+    Every put appends its rows and inserts their entries in one SQLite write
+    transaction, so processes sharing the cache serialize on the database
+    lock: rows are numbered from the vector file size under the lock, and a
+    crash leaves at most unreferenced rows at the end of the vector file.
+    When the number of entries exceeds the size bound, least recently used
+    entries are dropped and survivors are compacted into a new generation
+    file; the generation switch commits with the new row numbers, so a
+    lookup never pairs an entry with the wrong vector file.
+
+    Hits only update the LRU clock in memory; save() writes the recency of
+    the entries used since the previous save.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        directory: Path | None = None,
+        max_bytes: int = 2 * 1024**3,
+    ) -> None:
+        self.model = model
+        self.directory = (directory or EMBEDDING_CACHE_DIR) / _model_dir_name(model)
+        self.max_bytes = max_bytes
+        self.dim: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self._generation = 0
+        self._touched: OrderedDict[str, None] = OrderedDict()  # Hits since the last save
+        self._mmap: np.memmap | None = None
+        self._mmap_generation = -1
+        self._lock = threading.RLock()
+        self._conn = self._open()
+
+    @property
+    def vectors_path(self) -> Path:
+        return self._vectors_path(self._generation)
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / INDEX_FILE
+
+    @property
+    def max_entries(self) -> int | None:
+        """Maximum number of vectors allowed by max_bytes (None until dim is known)."""
+        if self.dim is None:
+            return None
+        return max(1, self.max_bytes // (self.dim * 2))
+
+    def __len__(self) -> int:
+        with self._lock, self._transaction():
+            return int(self._meta().get("count", 0))
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _vectors_path(self, generation: int) -> Path:
+        return self.directory / f"vectors.{generation}.f16"
+
+    # -------------------------------------------------------------------------
+    # Database
+    # -------------------------------------------------------------------------
+
+    def _open(self) -> sqlite3.Connection:
+        """Open the index. Corrupt or mismatched caches start empty."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        try:
+            return self._connect()
+        except sqlite3.DatabaseError:
+            for suffix in ("", "-wal", "-shm"):
+                Path(f"{self.index_path}{suffix}").unlink(missing_ok=True)
+            return self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.index_path, timeout=LOCK_TIMEOUT, isolation_level=None, check_same_thread=False
+        )
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            with self._transaction(write=True):
+                meta = self._meta()
+                if meta.get("version") != CACHE_VERSION or meta.get("model") != self.model:
+                    self._reset()
+                self._sync(self._meta())
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+
+    @contextmanager
+    def _transaction(self, write: bool = False) -> Iterator[None]:
+        """
+        One SQLite transaction (a consistent snapshot of the index).
+
+        Write transactions take the database write lock up front (BEGIN
+        IMMEDIATE): vector file appends and compaction happen inside them.
+        """
+        self._conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _meta(self) -> dict[str, object]:
+        return dict(self._conn.execute("SELECT name, value FROM meta").fetchall())
+
+    def _set_meta(self, **values: object) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", values.items()
+        )
+
+    def _sync(self, meta: dict[str, object]) -> None:
+        """Adopt dim and generation of the index (another process may have changed them)."""
+        dim = meta.get("dim")
+        self.dim = int(dim) if dim is not None else None
+        self._generation = int(meta.get("generation", 0))
+
+    def _reset(self) -> None:
+        """Start an empty cache (vector files without a valid index are removed)."""
+        self._conn.execute("DELETE FROM entries")
+        self._conn.execute("DELETE FROM meta")
+        self._set_meta(version=CACHE_VERSION, model=self.model, generation=0, clock=0, count=0)
+        kept = self._import_legacy()
+        for path in self.directory.glob("vectors.*.f16"):
+            if path != kept:
+                path.unlink(missing_ok=True)
+
+    def _import_legacy(self) -> Path | None:
+        """
+        Take over the entries of a CACHE_VERSION 1 index.json.
+
+        Returns:
+            The vector file the imported entries point to (generation 0), if any.
+        """
+        path = self.directory / LEGACY_INDEX_FILE
+        if not path.exists():
+            return None
+        kept = None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            data = {}
+        dim = data.get("dim")
+        generation = data.get("generation", 0)
+        vectors = self._vectors_path(generation)
+        if data.get("version") == 1 and data.get("model") == self.model and dim:
+            try:
+                rows = vectors.stat().st_size // (dim * 2)
+            except OSError:
+                rows = 0
+            entries = [
+                (key, row, last_used)
+                for key, (row, last_used) in data.get("entries", {}).items()
+                if row < rows
+            ]
+            if entries:
+                os.rename(vectors, self._vectors_path(0))
+                os.truncate(self._vectors_path(0), rows * dim * 2)
+                self._conn.executemany(
+                    "INSERT INTO entries (key, row, last_used) VALUES (?, ?, ?)", entries
+                )
+                self._set_meta(dim=dim, clock=data.get("clock", 0), count=len(entries))
+                kept = self._vectors_path(0)
+        path.unlink(missing_ok=True)
+        return kept
+
+    def _flush_touched(self, clock: int) -> int:
+        """Write the recency of entries hit since the last save; returns the new clock."""
+        updates = []
+        for key in self._touched:
+            clock += 1
+            updates.append((clock, key))
+        self._conn.executemany("UPDATE entries SET last_used = ? WHERE key = ?", updates)
+        self._touched.clear()
+        return clock
+
+    # -------------------------------------------------------------------------
+    # Read
+    # -------------------------------------------------------------------------
+
+    def _vectors(self, generation: int, row: int) -> np.memmap:
+        """Read-only memory map of a vector file covering `row` (remapped after appends)."""
+        if self._mmap is None or self._mmap_generation != generation or self._mmap.shape[0] <= row:
+            rows = self._vectors_path(generation).stat().st_size // (self.dim * 2)
+            self._mmap = np.memmap(
+                self._vectors_path(generation), dtype=np.float16, mode="r", shape=(rows, self.dim)
+            )
+            self._mmap_generation = generation
+        return self._mmap
+
+    def get_many(self, texts: list[str]) -> list[list[float] | None]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            texts: Chunk texts.
+
+        Returns:
+            Embedding (as float32 list) for each text, or None on a miss.
+        """
+        keys = [text_hash(text) for text in texts]
+        with self._lock:
+            with self._transaction():
+                meta = self._meta()
+                rows: dict[str, int] = {}
+                for chunk in _chunks(list(dict.fromkeys(keys))):
+                    placeholders = ",".join("?" * len(chunk))
+                    rows.update(
+                        self._conn.execute(
+                            f"SELECT key, row FROM entries WHERE key IN ({placeholders})", chunk
+                        ).fetchall()
+                    )
+            self._sync(meta)
+            vectors = None
+            if rows:
+                try:
+                    vectors = self._vectors(self._generation, max(rows.values()))
+                except (OSError, ValueError):
+                    # Compacted by another process after the lookup: count as misses
+                    rows = {}
+
+            results: list[list[float] | None] = []
+            for key in keys:
+                row = rows.get(key)
+                if row is None:
+                    self.misses += 1
+                    results.append(None)
+                    continue
+                self.hits += 1
+                self._touched[key] = None
+                self._touched.move_to_end(key)
+                results.append(vectors[row].astype(np.float32).tolist())
+            return results
+
+    # -------------------------------------------------------------------------
+    # Write
+    # -------------------------------------------------------------------------
+
+    def put_many(self, texts: list[str], embeddings: list[list[float]]) -> None:
+        """
+        Append embeddings to the cache.
+
+        Texts already cached are skipped. Vectors whose dimension differs from
+        the cache dimension are ignored.
+
+        Args:
+            texts: Chunk texts.
+            embeddings: Embeddings for texts (same order).
+        """
+        self.put_hashed([text_hash(text) for text in texts], embeddings)
+
+    def put_hashed(self, keys: list[str], embeddings: list[list[float]] | np.ndarray) -> int:
+        """
+        Append embeddings keyed by text_hash (bulk load of precomputed vectors).
+
+        Args:
+            keys: text_hash of each chunk text.
+            embeddings: Embeddings for keys (same order).
+
+        Returns:
+            Number of vectors added.
+        """
+        if not keys:
+            return 0
+        with self._lock:
+            stale: Path | None = None
+            with self._transaction(write=True):
+                added, stale = self._append(keys, embeddings)
+            # Readers holding the old vector file keep their mapping
+            if stale is not None:
+                stale.unlink(missing_ok=True)
+            return added
+
+    def _append(
+        self, keys: list[str], embeddings: list[list[float]] | np.ndarray
+    ) -> tuple[int, Path | None]:
+        """
+        Append the new keys inside a write transaction.
+
+        Returns:
+            Number of vectors added, and the vector file replaced by a compaction
+            (removed by the caller once the transaction has committed).
+        """
+        meta = self._meta()
+        self._sync(meta)
+        existing: set[str] = set()
+        for chunk in _chunks(list(dict.fromkeys(keys))):
+            placeholders = ",".join("?" * len(chunk))
+            existing.update(
+                key
+                for (key,) in self._conn.execute(
+                    f"SELECT key FROM entries WHERE key IN ({placeholders})", chunk
+                )
+            )
+
+        new_keys: list[str] = []
+        new_rows: list[list[float] | np.ndarray] = []
+        for key, embedding in zip(keys, embeddings, strict=True):
+            if key in existing:
+                continue
+            if self.dim is None:
+                self.dim = len(embedding)
+            if len(embedding) != self.dim:
+                continue
+            existing.add(key)
+            new_keys.append(key)
+            new_rows.append(embedding)
+
+        if not new_rows:
+            return 0, None
+
+        # Rows are numbered from the vector file under the write lock; a
+        # partial row left by an interrupted writer is dropped first
+        row_bytes = self.dim * 2
+        path = self.vectors_path
+        with open(path, "ab") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size % row_bytes:
+                f.truncate(size - size % row_bytes)
+            first = size // row_bytes
+            f.write(np.asarray(new_rows, dtype=np.float16).tobytes())
+
+        clock = self._flush_touched(int(meta.get("clock", 0)))
+        self._conn.executemany(
+            "INSERT INTO entries (key, row, last_used) VALUES (?, ?, ?)",
+            [(key, first + i, clock + 1 + i) for i, key in enumerate(new_keys)],
+        )
+        count = int(meta.get("count", 0)) + len(new_keys)
+        self._set_meta(dim=self.dim, clock=clock + len(new_keys), count=count)
+
+        max_entries = self.max_entries
+        if max_entries is not None and count > max_entries:
+            return len(new_rows), self._evict(int(max_entries * EVICTION_TARGET))
+        return len(new_rows), None
+
+    def _evict(self, keep: int) -> Path:
+        """
+        Keep the `keep` most recently used entries and compact the vector file.
+
+        Returns:
+            The previous vector file (still referenced until the transaction commits).
+        """
+        survivors = self._conn.execute(
+            "SELECT key, row, last_used FROM entries ORDER BY last_used DESC LIMIT ?", (keep,)
+        ).fetchall()
+        survivors.sort(key=lambda entry: entry[1])  # Sequential reads from the old file
+
+        old_path = self.vectors_path
+        rows = np.asarray([entry[1] for entry in survivors], dtype=np.int64)
+        vectors = (
+            self._vectors(self._generation, int(rows[-1]))[rows]
+            if len(rows)
+            else np.empty((0, self.dim), np.float16)
+        )
+
+        # Files of older generations are left over from a crash before their removal
+        for path in self.directory.glob("vectors.*.f16"):
+            generation = path.name.split(".")[1]
+            if generation.isdigit() and int(generation) < self._generation:
+                path.unlink(missing_ok=True)
+
+        self._generation += 1
+        with open(self.vectors_path, "wb") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float16).tobytes())
+        self._mmap = None
+
+        self._conn.execute("DELETE FROM entries")
+        self._conn.executemany(
+            "INSERT INTO entries (key, row, last_used) VALUES (?, ?, ?)",
+            [(key, row, last_used) for row, (key, _, last_used) in enumerate(survivors)],
+        )
+        self._set_meta(generation=self._generation, count=len(survivors))
+        return old_path
+
+    def save(self) -> None:
+        """Write the recency of the entries used since the last save."""
+        with self._lock:
+            if not self._touched:
+                return
+            with self._transaction(write=True):
+                clock = self._flush_touched(int(self._meta().get("clock", 0)))
+                self._set_meta(clock=clock)
+
+
+# =============================================================================
+# Query Cache
+# =============================================================================
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize query text for cache keys.
+
+    NFKC (full-width/half-width variants), trimmed, whitespace runs collapsed.
+    Case is kept: the embedding model is case-sensitive.
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+class QueryEmbeddingCache:
+    """
+    Query embedding cache keyed by (model, normalized query text).
+
+    Lookups hit an in-memory LRU of up to max_entries vectors first. With a
+    directory, entries are also persisted in one EmbeddingCache per model
+    (float16), so repeated queries skip the embedding server across processes.
+    Processes sharing the directory (CLI runs next to the daemon) see each
+    other's queries on a memory miss.
+
+    Thread-safe (shared by concurrently running pipelines).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        directory: Path | None = None,
+        max_bytes: int = 64 * 1024**2,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+        self._disk: dict[str, EmbeddingCache] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def _disk_cache(self, model: str) -> EmbeddingCache | None:
+        if self.directory is None:
+            return None
+        if model not in self._disk:
+            self._disk[model] = EmbeddingCache(model, self.directory, max_bytes=self.max_bytes)
+        return self._disk[model]
+
+    def _remember(self, key: tuple[str, str], embedding: list[float]) -> None:
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, model: str, text: str) -> list[float] | None:
+        """Cached embedding of a query, or None on a miss."""
+        key = (model, normalize_query(text))
+        with self._lock:
+            embedding = self._memory.get(key)
+            if embedding is None:
+                disk = self._disk_cache(model)
+                if disk is not None:
+                    embedding = disk.get_many([key[1]])[0]
+            if embedding is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, embedding)
+            return embedding
+
+    def put(self, model: str, text: str, embedding: list[float]) -> None:
+        """Store the embedding of a query (and persist it when a directory is set)."""
+        key = (model, normalize_query(text))
+        with self._lock:
+            self._remember(key, list(embedding))
+            disk = self._disk_cache(model)
+            if disk is not None:
+                try:
+                    disk.put_many([key[1]], [embedding])
+                    disk.save()
+                except (OSError, sqlite3.Error):
+                    pass  # Persistence is best effort; the in-memory entry is kept
+
+    def put_many(self, model: str, texts: list[str], embeddings: list[list[float]]) -> None:
+        """Store the embeddings of several queries (persisted with one save)."""
+        keys = [normalize_query(text) for text in texts]
+        with self._lock:
+            for key, embedding in zip(keys, embeddings, strict=True):
+                self._remember((model, key), list(embedding))
+            disk = self._disk_cache(model)
+            if disk is not None:
+                try:
+                    disk.put_many(keys, embeddings)
+                    disk.save()
+                except (OSError, sqlite3.Error):
+                    pass
+
+
+_default_query_cache: QueryEmbeddingCache | None = None
+
+
+def get_query_cache() -> QueryEmbeddingCache:
+    """
+    Process-wide query embedding cache configured from rag_config.
+
+    Persisted under QUERY_EMBEDDING_CACHE_DIR when query_cache_persist is set.
+    """
+    global _default_query_cache
+    if _default_query_cache is None:
+        _default_query_cache = QueryEmbeddingCache(
+            max_entries=rag_config.query_cache_size,
+            directory=QUERY_EMBEDDING_CACHE_DIR if rag_config.query_cache_persist else None,
+        )
+    return _default_query_cache
@@ -0,0 +1,325 @@
+"""
+Lexical Index - SQLite FTS5 (trigram) による全文検索インデックス
+
+チャンク本文を trigram トークナイザで索引し、embedding サーバーなしで
+ミリ秒単位のキーワード検索を行う。trigram は分かち書き不要のため日本語にも
+そのまま使える。チャンク ID はベクトルストアと共通 (ハイブリッド検索で統合)。
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+from collections.abc import Iterable
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+from haystack import Document
+from haystack.document_stores.types import DuplicatePolicy
+from haystack.errors import FilterError
+
+from src.rag.stores.versions import lexical_index_path
+
+SCHEMA_VERSION = 1
+
+# Trigram tokenizer: terms shorter than this cannot use the FTS index
+TRIGRAM = 3
+
+# Upper bound of distinct trigrams taken from one query
+MAX_QUERY_TRIGRAMS = 64
+
+# Columns stored outside the JSON meta (used by deletes during indexing)
+INDEXED_META_COLUMNS = ("file_path", "vault")
+
+TERM_SPLIT_PATTERN = re.compile(r"[\s　、。，．,.!?！？「」『』()（）\[\]【】\"']+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    content TEXT NOT NULL,
+    meta TEXT NOT NULL,
+    file_path TEXT,
+    vault TEXT
+);
+CREATE INDEX IF NOT EXISTS chunks_file_path ON chunks(file_path);
+CREATE INDEX IF NOT EXISTS chunks_vault ON chunks(vault);
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+    content, content='chunks', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
+    INSERT INTO chunks_fts(rowid, content) VALUES (new.rowid, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
+    INSERT INTO chunks_fts(chunks_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+END;
+"""
+
+
+# =============================================================================
+# Query / Filter Translation
+# =============================================================================
+
+
+def query_terms(query: str) -> list[str]:
+    """Split a query at whitespace and punctuation."""
+    return [term for term in TERM_SPLIT_PATTERN.split(query) if term]
+
+
+def build_match_query(query: str) -> str | None:
+    """
+    Build an FTS5 MATCH expression from free text.
+
+    Every distinct trigram of the query terms is OR-ed and ranked by BM25,
+    so documents sharing more (and rarer) trigrams with the query rank
+    higher. This tolerates Japanese queries without word boundaries and
+    inflected forms. Returns None when no term is long enough for trigrams.
+    """
+    grams: dict[str, None] = {}
+    for term in query_terms(query.lower()):
+        for i in range(len(term) - TRIGRAM + 1):
+            grams.setdefault(term[i : i + TRIGRAM], None)
+            if len(grams) >= MAX_QUERY_TRIGRAMS:
+                return _or_trigrams(grams)
+    if not grams:
+        return None
+    return _or_trigrams(grams)
+
+
+def _or_trigrams(grams: Iterable[str]) -> str:
+    """OR quoted trigrams into one MATCH expression."""
+    return " OR ".join('"' + gram.replace('"', '""') + '"' for gram in grams)
+
+
+def _field_sql(field: str) -> tuple[str, str]:
+    """
+    SQL for a filter field: (scalar expression, json path).
+
+    The json path is empty for fields stored in their own column (scalars).
+    """
+    key = field.removeprefix("meta.")
+    if not re.fullmatch(r"[A-Za-z0-9_]+", key):
+        raise FilterError(f"Unsupported filter field: {field}")
+    if field == "id":
+        return "chunks.id", ""
+    if key in INDEXED_META_COLUMNS:
+        return f"chunks.{key}", ""
+    return f"json_extract(chunks.meta, '$.{key}')", f"$.{key}"
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, date | datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def build_filter_sql(filters: dict[str, Any]) -> tuple[str, list[Any]]:
+    """
+    Translate a Haystack filter dict into a SQL condition on `chunks`.
+
+    Semantics follow the Qdrant conversion: list fields (tags) match when any
+    element matches, negations exclude rows where any condition matches, and
+    ranges compare numbers or ISO date strings. "contains" tests list membership.
+
+    Returns:
+        (sql, params)
+    """
+    operator = filters.get("operator")
+    if operator is None:
+        raise FilterError("Operator not found in filters")
+
+    if operator in ("AND", "OR", "NOT"):
+        conditions = filters.get("conditions")
+        if not conditions:
+            raise FilterError(f"'conditions' not found for '{operator}'")
+        parts = [build_filter_sql(condition) for condition in conditions]
+        params = [param for _, part_params in parts for param in part_params]
+        joiner = " AND " if operator == "AND" else " OR "
+        sql = "(" + joiner.join(sql for sql, _ in parts) + ")"
+        if operator == "NOT":
+            sql = "NOT (" + " OR ".join(sql for sql, _ in parts) + ")"
+        return sql, params
+
+    field = filters.get("field")
+    value = filters.get("value")
+    if field is None or value is None:
+        raise FilterError(f"'field' or 'value' not found for '{operator}'")
+    scalar, path = _field_sql(field)
+
+    if operator in ("==", "!=", "contains", "in", "not in"):
+        values = value if operator in ("in", "not in") else [value]
+        if not isinstance(values, list):
+            raise FilterError(f"Value {value} is not a list")
+        placeholders = ", ".join("?" for _ in values)
+        if path:
+            # json_each yields the value itself for scalars and each element for arrays
+            sql = (
+                f"EXISTS (SELECT 1 FROM json_each(chunks.meta, '{path}') "
+                f"WHERE json_each.value IN ({placeholders}))"
+            )
+        else:
+            sql = f"COALESCE({scalar} IN ({placeholders}), 0)"
+        if operator in ("!=", "not in"):
+            sql = f"NOT {sql}"
+        return sql, [_value(v) for v in values]
+
+    if operator in (">", ">=", "<", "<="):
+        return f"({scalar} IS NOT NULL AND {scalar} != '' AND {scalar} {operator} ?)", [
+            _value(value)
+        ]
+
+    raise FilterError(f"Unknown operator {operator} used in filters")
+
+
+# =============================================================================
+# Index
+# =============================================================================
+
+
+class LexicalIndex:
+    """
+    Persistent full-text index of chunks (SQLite FTS5, trigram tokenizer).
+
+    Implements the parts of the Haystack DocumentStore protocol used by
+    indexing (write_documents / delete_by_filter / count_documents), so it
+    can be fed by a DocumentWriter next to the vector store.
+
+    The database runs in WAL mode: searches never block on a running
+    indexer and vice versa.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or lexical_index_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"type": f"{__name__}.LexicalIndex", "init_parameters": {"path": str(self.path)}}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> LexicalIndex:
+        return cls(Path(data["init_parameters"]["path"]))
+
+    # -------------------------------------------------------------------------
+    # Write
+    # -------------------------------------------------------------------------
+
+    def write_documents(
+        self, documents: list[Document], policy: DuplicatePolicy = DuplicatePolicy.NONE
+    ) -> int:
+        """
+        Insert or replace chunks (keyed by document id).
+
+        Returns:
+            Number of documents written.
+        """
+        verb = "INSERT OR IGNORE" if policy == DuplicatePolicy.SKIP else "INSERT OR REPLACE"
+        rows = [
+            (
+                doc.id,
+                doc.content or "",
+                json.dumps(doc.meta, ensure_ascii=False, default=str),
+                doc.meta.get("file_path"),
+                doc.meta.get("vault"),
+            )
+            for doc in documents
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                f"{verb} INTO chunks (id, content, meta, file_path, vault) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            return min(self._conn.total_changes - before, len(rows))
+
+    def delete_by_filter(self, filters: dict[str, Any]) -> int:
+        """
+        Delete chunks matching filters.
+
+        Returns:
+            Number of deleted chunks.
+        """
+        sql, params = build_filter_sql(filters)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(f"DELETE FROM chunks WHERE {sql}", params)
+            return cursor.rowcount
+
+    def delete_all_documents(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM chunks")
+
+    # -------------------------------------------------------------------------
+    # Read
+    # -------------------------------------------------------------------------
+
+    def count_documents(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def search(
+        self, query: str, filters: dict[str, Any] | None = None, top_k: int = 10
+    ) -> list[Document]:
+        """
+        Full-text search ranked by BM25.
+
+        Queries with no term of 3+ characters (e.g. a two-character Japanese
+        word) fall back to substring matching ranked by occurrence count.
+
+        Args:
+            query: Free-text query.
+            filters: Haystack filter dict (see build_qdrant_filters).
+            top_k: Number of documents to return.
+
+        Returns:
+            Documents with score (higher is better), best first.
+        """
+        where, params = ("1", []) if not filters else build_filter_sql(filters)
+        match = build_match_query(query)
+
+        if match is not None:
+            sql = (
+                "SELECT chunks.id, chunks.content, chunks.meta, -bm25(chunks_fts) AS score "
+                "FROM chunks_fts JOIN chunks ON chunks.rowid = chunks_fts.rowid "
+                f"WHERE chunks_fts MATCH ? AND {where} ORDER BY score DESC LIMIT ?"
+            )
+            args: list[Any] = [match, *params, top_k]
+        else:
+            terms = query_terms(query.lower())
+            if not terms:
+                return []
+            occurrences = " + ".join(
+                "(length(lower(chunks.content)) - length(replace(lower(chunks.content), ?, '')))"
+                " / length(?)"
+                for _ in terms
+            )
+            likes = " AND ".join("lower(chunks.content) LIKE ?" for _ in terms)
+            sql = (
+                f"SELECT chunks.id, chunks.content, chunks.meta, ({occurrences}) AS score "
+                f"FROM chunks WHERE {likes} AND {where} ORDER BY score DESC LIMIT ?"
+            )
+            args = [
+                *[value for term in terms for value in (term, term)],
+                *[f"%{term}%" for term in terms],
+                *params,
+                top_k,
+            ]
+
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [
+            Document(id=doc_id, content=content, meta=json.loads(meta), score=float(score))
+            for doc_id, content, meta, score in rows
+        ]
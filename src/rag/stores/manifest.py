@@ -0,0 +1,127 @@
+"""
+Index Manifest - インクリメンタルインデックス用のファイルマニフェスト
+
+インデックス済みドキュメントを file_id 単位で記録し、
+新規・変更・削除ファイルの判定に使用する。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from src.rag.stores.versions import index_manifest_path
+
+MANIFEST_VERSION = 1
+
+
+def index_version(path: Path | None = None) -> str:
+    """
+    Version of the indexed content.
+
+    The manifest is rewritten whenever an index run commits changes, so its
+    modification time and size change with the index ("none" before the
+    first run).
+    """
+    try:
+        stat = (path or index_manifest_path()).stat()
+    except OSError:
+        return "none"
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+# =============================================================================
+# Data Models
+# =============================================================================
+
+
+@dataclass
+class ManifestEntry:
+    """Indexed document record"""
+
+    key: str  # file_id (file_path if file_id is missing)
+    file_path: str  # Indexed file path (chunks are stored with this meta.file_path)
+    vault: str  # Vault name
+    content_hash: str  # SHA-256 of file content
+    mtime: float  # File modification time at indexing (with size: skips re-reading)
+    chunk_count: int  # Number of chunks written
+    summary: bool = False  # Summary vector written (summary store)
+    size: int = -1  # File size at indexing (-1: unknown, file is re-read and hashed)
+
+
+# =============================================================================
+# Manifest
+# =============================================================================
+
+
+class IndexManifest:
+    """
+    JSON-backed manifest of indexed documents.
+
+    Keyed by file_id so that renamed/moved files are detected as the same
+    document. Saved atomically (write to temp file + rename).
+    """
+
+    def __init__(self, path: Path | None = None, entries: dict[str, ManifestEntry] | None = None):
+        self.path = path or index_manifest_path()
+        self.entries: dict[str, ManifestEntry] = entries or {}
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> IndexManifest:
+        """
+        Load manifest from disk.
+
+        Args:
+            path: Manifest file path (default: manifest of the active index version).
+
+        Returns:
+            IndexManifest instance. Empty if the file does not exist or is unreadable.
+        """
+        path = path or index_manifest_path()
+        if not path.exists():
+            return cls(path)
+
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return cls(path)
+
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+
+        entries = {key: ManifestEntry(**value) for key, value in data.get("entries", {}).items()}
+        return cls(path, entries)
+
+    def save(self) -> None:
+        """Write manifest to disk atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": MANIFEST_VERSION,
+            "entries": {key: asdict(entry) for key, entry in self.entries.items()},
+        }
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def get(self, key: str) -> ManifestEntry | None:
+        """Get entry by document key."""
+        return self.entries.get(key)
+
+    def set(self, entry: ManifestEntry) -> None:
+        """Add or replace entry."""
+        self.entries[entry.key] = entry
+
+    def remove(self, key: str) -> None:
+        """Remove entry if present."""
+        self.entries.pop(key, None)
+
+    def entries_for_vault(self, vault: str) -> list[ManifestEntry]:
+        """List entries belonging to a vault."""
+        return [entry for entry in self.entries.values() if entry.vault == vault]
+
+    def clear_vault(self, vault: str) -> None:
+        """Remove all entries belonging to a vault."""
+        for entry in self.entries_for_vault(vault):
+            del self.entries[entry.key]
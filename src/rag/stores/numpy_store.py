@@ -0,0 +1,855 @@
+"""
+NumPy Document Store - float16 メモリマップ行列による軽量ベクトルストア
+
+〜20 万チャンク規模の Vault 向け。Qdrant ローカルモードの起動コストと
+プロセス単位のロックを避ける。ベクトルは L2 正規化した float16 行列として
+追記専用ファイルに保存し、ブロック単位の行列積で全件厳密検索する。
+メタデータはフィルタ用の列に展開し、Haystack フィルタをベクトル化して評価する。
+書き込みはマニフェストのアトミック置換でコミットされ、読み取りはロックを取らない。
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from haystack import Document, component, default_from_dict, default_to_dict
+from haystack.document_stores.errors import DuplicateDocumentError
+from haystack.document_stores.types import DuplicatePolicy
+from haystack.errors import FilterError
+
+STORE_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = "write.lock"
+
+# Rows multiplied per block (8192 x 1024 float32 = 32 MiB of scratch memory)
+SEARCH_BLOCK_ROWS = 8192
+
+# float32 copies of search blocks kept in memory (float16 -> float32 conversion
+# dominates search time otherwise). 1 GiB holds ~260k x 1024 rows.
+DEFAULT_RESIDENT_BYTES = 1024**3
+
+# Search only the matching rows when a filter keeps less than this fraction
+SPARSE_FILTER_RATIO = 0.1
+
+# Rewrite live rows into a new generation once deleted rows exceed this fraction
+COMPACT_RATIO = 0.5
+COMPACT_MIN_ROWS = 1024
+
+# Manifest reload attempts when a compaction removes files mid-load
+LOAD_ATTEMPTS = 3
+
+RANGE_OPERATORS = {
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+}
+
+
+# =============================================================================
+# Metadata Table
+# =============================================================================
+
+
+def _hashable(value: Any) -> Any:
+    """Dict/list values are compared by their JSON form."""
+    if isinstance(value, dict | list):
+        return json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return value
+
+
+def _as_datetime(value: Any) -> datetime | None:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _in_range(operator: str, stored: Any, value: Any) -> bool:
+    """Range comparison with Qdrant semantics (numbers or datetime strings)."""
+    compare = RANGE_OPERATORS[operator]
+    if isinstance(value, int | float) and not isinstance(value, bool):
+        if isinstance(stored, int | float) and not isinstance(stored, bool):
+            return compare(stored, value)
+        return False
+    bound = _as_datetime(value)
+    stored_dt = _as_datetime(stored)
+    if bound is None:
+        raise FilterError(f"Value {value} is not an int or float or datetime string")
+    if stored_dt is None:
+        return False
+    try:
+        return compare(stored_dt, bound)
+    except TypeError:  # Naive vs aware datetime
+        return False
+
+
+@dataclass
+class _Column:
+    """
+    One metadata field in categorical form.
+
+    values: distinct values; codes[i] is the value index of entry i and
+    rows[i] its row. List fields contribute one entry per element.
+    """
+
+    values: list[Any]
+    codes: np.ndarray
+    rows: np.ndarray
+
+    @classmethod
+    def build(cls, items: list[Any]) -> _Column:
+        index: dict[Any, int] = {}
+        codes: list[int] = []
+        rows: list[int] = []
+        for row, item in enumerate(items):
+            if item is None:
+                continue
+            for value in item if isinstance(item, list) else (item,):
+                key = _hashable(value)
+                code = index.setdefault(key, len(index))
+                codes.append(code)
+                rows.append(row)
+        return cls(
+            values=list(index),
+            codes=np.asarray(codes, dtype=np.int32),
+            rows=np.asarray(rows, dtype=np.int64),
+        )
+
+    def match_any(self, predicate: Callable[[Any], bool], size: int) -> np.ndarray:
+        """Rows where any value of the field satisfies predicate (evaluated per distinct value)."""
+        ok = np.fromiter((predicate(v) for v in self.values), dtype=bool, count=len(self.values))
+        mask = np.zeros(size, dtype=bool)
+        if len(self.codes):
+            mask[self.rows[ok[self.codes]]] = True
+        return mask
+
+
+@dataclass
+class _Table:
+    """Document ids and metadata of one generation, parsed from the table file."""
+
+    ids: list[str] = field(default_factory=list)
+    metas: list[dict[str, Any]] = field(default_factory=list)
+    parsed_bytes: int = 0
+    columns: dict[str, _Column] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def extended(self, data: bytes) -> _Table:
+        """New table with rows parsed from appended table bytes (columns rebuilt lazily)."""
+        table = _Table(ids=list(self.ids), metas=list(self.metas))
+        # One JSON array parse is much faster than parsing line by line
+        for record in json.loads(b"[" + b",".join(data.splitlines()) + b"]"):
+            table.ids.append(record["id"])
+            table.metas.append(record["meta"])
+        table.parsed_bytes = self.parsed_bytes + len(data)
+        return table
+
+    def column(self, name: str) -> _Column:
+        with self.lock:
+            if name not in self.columns:
+                if name == "id":
+                    items: list[Any] = list(self.ids)
+                else:
+                    key = name.removeprefix("meta.")
+                    items = [meta.get(key) for meta in self.metas]
+                self.columns[name] = _Column.build(items)
+            return self.columns[name]
+
+
+def _filter_mask(filters: dict[str, Any], table: _Table, size: int) -> np.ndarray:
+    """
+    Evaluate a Haystack filter dict as a boolean row mask.
+
+    Semantics follow the Qdrant conversion used by QdrantDocumentStore:
+    list fields match when any element matches, negations (!=, not in, NOT)
+    exclude rows where any condition matches, and ranges accept numbers or
+    ISO datetime strings. "contains" tests list membership.
+    """
+    operator = filters.get("operator")
+    if operator is None:
+        raise FilterError("Operator not found in filters")
+
+    if operator in ("AND", "OR", "NOT"):
+        conditions = filters.get("conditions")
+        if not conditions:
+            raise FilterError(f"'conditions' not found for '{operator}'")
+        masks = [_filter_mask(condition, table, size) for condition in conditions]
+        if operator == "AND":
+            return np.logical_and.reduce(masks)
+        if operator == "OR":
+            return np.logical_or.reduce(masks)
+        return ~np.logical_or.reduce(masks)
+
+    name = filters.get("field")
+    value = filters.get("value")
+    if name is None or value is None:
+        raise FilterError(f"'field' or 'value' not found for '{operator}'")
+    if isinstance(value, date | datetime):
+        value = value.isoformat()
+    column = table.column(name)
+
+    if operator in ("==", "contains"):
+        key = _hashable(value)
+        return column.match_any(lambda v: v == key, size)
+    if operator == "!=":
+        key = _hashable(value)
+        return ~column.match_any(lambda v: v == key, size)
+    if operator in ("in", "not in"):
+        if not isinstance(value, list):
+            raise FilterError(f"Value {value} is not a list")
+        keys = {_hashable(v) for v in value}
+        mask = column.match_any(lambda v: v in keys, size)
+        return mask if operator == "in" else ~mask
+    if operator in RANGE_OPERATORS:
+        _in_range(operator, None, value)  # Validate the bound even on empty columns
+        return column.match_any(lambda v: _in_range(operator, v, value), size)
+
+    raise FilterError(f"Unknown operator {operator} used in filters")
+
+
+# =============================================================================
+# Snapshot
+# =============================================================================
+
+
+@dataclass
+class _Snapshot:
+    """
+    Immutable view of one committed manifest.
+
+    Holds open handles so rows stay readable even after a compaction unlinks
+    the files of this generation.
+    """
+
+    stamp: tuple[int, int, int]
+    generation: int
+    rows: int
+    record_bytes: int
+    table_bytes: int
+    deleted: np.ndarray
+    vectors: np.ndarray
+    offsets: np.ndarray
+    records: Any  # Binary file object
+    table_file: Any  # Binary file object
+    table: _Table | None = None
+
+    @property
+    def live(self) -> np.ndarray:
+        return ~self.deleted
+
+    @property
+    def live_count(self) -> int:
+        return int(self.rows - self.deleted.sum())
+
+    def record(self, row: int) -> dict[str, Any]:
+        start = int(self.offsets[row])
+        end = int(self.offsets[row + 1]) if row + 1 < self.rows else self.record_bytes
+        return json.loads(os.pread(self.records.fileno(), end - start, start))
+
+    def load_table(self, previous: _Table | None) -> _Table:
+        """Parse the table file, reusing rows already parsed for this generation."""
+        if self.table is None:
+            base = previous if previous is not None else _Table()
+            if base.parsed_bytes > self.table_bytes:  # Cached table is from a newer snapshot
+                base = _Table()
+            size = self.table_bytes - base.parsed_bytes
+            data = os.pread(self.table_file.fileno(), size, base.parsed_bytes) if size else b""
+            self.table = base.extended(data) if data else base
+        return self.table
+
+
+# =============================================================================
+# Document Store
+# =============================================================================
+
+
+class NumpyDocumentStore:
+    """
+    Document store backed by a float16 memory-mapped matrix.
+
+    Layout (one directory per collection):
+        manifest.json            Committed generation, row count, file sizes,
+                                 deleted rows (replaced atomically)
+        vectors.<gen>.f16        L2-normalized float16 rows of embedding_dim
+        records.<gen>.jsonl      {"id", "content", "meta"} per row
+        offsets.<gen>.u64        Byte offset of each record line
+        table.<gen>.jsonl        {"id", "meta"} per row (metadata table for filters)
+        write.lock               Writer lock (readers never take it)
+
+    All files are append-only within a generation and readers only look at
+    the prefix recorded in the manifest, so readers in any number of
+    processes see consistent committed state without locking. Writers
+    serialize on write.lock. Deletes mark rows in the manifest; once more
+    than COMPACT_RATIO of the rows are deleted, live rows are rewritten into
+    a new generation.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        embedding_dim: int = 1024,
+        similarity: str = "cosine",
+        resident_bytes: int = DEFAULT_RESIDENT_BYTES,
+    ):
+        if similarity != "cosine":
+            raise ValueError(f"Unsupported similarity '{similarity}'. Only 'cosine' is supported")
+        self.path = Path(path)
+        self.embedding_dim = embedding_dim
+        self.similarity = similarity
+        self.resident_bytes = resident_bytes
+        self._resident: dict[tuple[int, int, int], np.ndarray] = {}  # (gen, start, stop) -> f32
+        self._snapshot: _Snapshot | None = None
+        self._tables: dict[int, _Table] = {}  # Latest parsed table per generation
+        self._load_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    # Serialization
+    # -------------------------------------------------------------------------
+
+    def to_dict(self) -> dict[str, Any]:
+        return default_to_dict(
+            self,
+            path=str(self.path),
+            embedding_dim=self.embedding_dim,
+            similarity=self.similarity,
+            resident_bytes=self.resident_bytes,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> NumpyDocumentStore:
+        return default_from_dict(cls, data)
+
+    # -------------------------------------------------------------------------
+    # Files
+    # -------------------------------------------------------------------------
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.path / MANIFEST_FILE
+
+    def _file(self, kind: str, generation: int) -> Path:
+        suffix = {"vectors": "f16", "records": "jsonl", "offsets": "u64", "table": "jsonl"}[kind]
+        return self.path / f"{kind}.{generation}.{suffix}"
+
+    def _read_manifest(self) -> tuple[dict[str, Any], tuple[int, int, int]] | None:
+        try:
+            with open(self.manifest_path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                data = json.loads(f.read())
+        except FileNotFoundError:
+            return None
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if data.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported vector store version in {self.manifest_path}")
+        if data["dim"] != self.embedding_dim:
+            raise ValueError(
+                f"Vector store dimension {data['dim']} does not match "
+                f"embedding_dim {self.embedding_dim}"
+            )
+        return data, stamp
+
+    def _open_snapshot(self) -> _Snapshot | None:
+        """Open the committed state (None if nothing has been written)."""
+        for attempt in range(LOAD_ATTEMPTS):
+            manifest = self._read_manifest()
+            if manifest is None:
+                return None
+            data, stamp = manifest
+            generation, rows = data["generation"], data["rows"]
+            try:
+                records = open(self._file("records", generation), "rb")  # noqa: SIM115
+                table_file = open(self._file("table", generation), "rb")  # noqa: SIM115
+                if rows:
+                    vectors = np.memmap(
+                        self._file("vectors", generation),
+                        dtype=np.float16,
+                        mode="r",
+                        shape=(rows, self.embedding_dim),
+                    )
+                    offsets = np.memmap(
+                        self._file("offsets", generation), dtype=np.uint64, mode="r", shape=(rows,)
+                    )
+                else:
+                    vectors = np.empty((0, self.embedding_dim), dtype=np.float16)
+                    offsets = np.empty(0, dtype=np.uint64)
+            except FileNotFoundError:
+                # Compacted between reading the manifest and opening its files
+                if attempt == LOAD_ATTEMPTS - 1:
+                    raise
+                continue
+
+            deleted = np.zeros(rows, dtype=bool)
+            deleted[np.asarray(data["deleted"], dtype=np.int64)] = True
+            return _Snapshot(
+                stamp=stamp,
+                generation=generation,
+                rows=rows,
+                record_bytes=data["record_bytes"],
+                table_bytes=data["table_bytes"],
+                deleted=deleted,
+                vectors=vectors,
+                offsets=offsets,
+                records=records,
+                table_file=table_file,
+            )
+        return None
+
+    def _current(self) -> _Snapshot | None:
+        """Latest committed snapshot (one stat call when nothing changed)."""
+        snapshot = self._snapshot
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return None
+        if snapshot is not None and snapshot.stamp == (
+            stat.st_ino,
+            stat.st_mtime_ns,
+            stat.st_size,
+        ):
+            return snapshot
+        with self._load_lock:
+            self._snapshot = self._open_snapshot()
+            return self._snapshot
+
+    def _table(self, snapshot: _Snapshot) -> _Table:
+        table = snapshot.load_table(self._tables.get(snapshot.generation))
+        self._tables = {snapshot.generation: table}
+        return table
+
+    # -------------------------------------------------------------------------
+    # Read
+    # -------------------------------------------------------------------------
+
+    def count_documents(self) -> int:
+        snapshot = self._current()
+        return snapshot.live_count if snapshot else 0
+
+    def _mask(self, snapshot: _Snapshot, filters: dict[str, Any] | None) -> np.ndarray:
+        mask = snapshot.live
+        if filters:
+            mask &= _filter_mask(filters, self._table(snapshot), snapshot.rows)
+        return mask
+
+    def _document(
+        self, snapshot: _Snapshot, row: int, score: float | None, return_embedding: bool
+    ) -> Document:
+        record = snapshot.record(row)
+        embedding = snapshot.vectors[row].astype(np.float32).tolist() if return_embedding else None
+        return Document(
+            id=record["id"],
+            content=record["content"],
+            meta=record["meta"],
+            score=score,
+            embedding=embedding,
+        )
+
+    def filter_documents(self, filters: dict[str, Any] | None = None) -> list[Document]:
+        snapshot = self._current()
+        if snapshot is None:
+            return []
+        rows = np.flatnonzero(self._mask(snapshot, filters))
+        return [self._document(snapshot, int(row), None, False) for row in rows]
+
+    def iter_documents(self) -> Iterator[Document]:
+        """All live documents with embeddings, in row order (streamed from the memory map)."""
+        snapshot = self._current()
+        if snapshot is None:
+            return
+        for row in np.flatnonzero(snapshot.live):
+            yield self._document(snapshot, int(row), None, True)
+
+    def embedding_retrieval(
+        self,
+        query_embedding: list[float],
+        filters: dict[str, Any] | None = None,
+        top_k: int = 10,
+        scale_score: bool = False,
+        return_embedding: bool = False,
+    ) -> list[Document]:
+        """
+        Exact cosine search over all live rows.
+
+        Rows are scored block by block (float16 -> float32 matmul) and the
+        top_k of each block are merged. Selective filters score only the
+        matching rows.
+
+        Args:
+            query_embedding: Query vector.
+            filters: Haystack filter dict (see build_qdrant_filters).
+            top_k: Number of documents to return.
+            scale_score: Scale cosine scores to 0.0-1.0.
+            return_embedding: Include stored (float16) embeddings.
+
+        Returns:
+            Documents sorted by score, highest first.
+        """
+        snapshot = self._current()
+        if snapshot is None or snapshot.rows == 0 or top_k <= 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (self.embedding_dim,):
+            raise ValueError(
+                f"Query embedding dimension {query.shape[-1]} does not match {self.embedding_dim}"
+            )
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        query /= norm
+
+        mask = self._mask(snapshot, filters)
+        selected = int(mask.sum())
+        if selected == 0:
+            return []
+
+        if selected < snapshot.rows * SPARSE_FILTER_RATIO:
+            candidates = np.flatnonzero(mask)
+            blocks: Iterator[tuple[np.ndarray, np.ndarray]] = (
+                (candidates[i : i + SEARCH_BLOCK_ROWS], None)
+                for i in range(0, len(candidates), SEARCH_BLOCK_ROWS)
+            )
+        else:
+            blocks = (
+                (
+                    np.arange(i, min(i + SEARCH_BLOCK_ROWS, snapshot.rows)),
+                    mask[i : i + SEARCH_BLOCK_ROWS],
+                )
+                for i in range(0, snapshot.rows, SEARCH_BLOCK_ROWS)
+            )
+
+        best_rows: list[np.ndarray] = []
+        best_scores: list[np.ndarray] = []
+        for rows, block_mask in blocks:
+            if block_mask is None:
+                block = snapshot.vectors[rows].astype(np.float32)
+            else:
+                block = self._resident_block(snapshot, int(rows[0]), int(rows[-1]) + 1)
+            scores = block @ query
+            if block_mask is not None:
+                scores[~block_mask] = -np.inf
+            if len(scores) > top_k:
+                keep = np.argpartition(scores, -top_k)[-top_k:]
+                rows, scores = rows[keep], scores[keep]
+            best_rows.append(rows)
+            best_scores.append(scores)
+
+        all_rows = np.concatenate(best_rows)
+        all_scores = np.concatenate(best_scores)
+        order = np.argsort(-all_scores, kind="stable")[:top_k]
+
+        documents: list[Document] = []
+        for i in order:
+            score = float(all_scores[i])
+            if score == -np.inf:
+                break
+            if scale_score:
+                score = (score + 1) / 2
+            documents.append(self._document(snapshot, int(all_rows[i]), score, return_embedding))
+        return documents
+
+    def _resident_block(self, snapshot: _Snapshot, start: int, stop: int) -> np.ndarray:
+        """
+        float32 rows [start, stop), kept in memory while within resident_bytes.
+
+        Rows of a generation never change, so cached blocks stay valid until
+        the generation changes (a growing last block is converted again).
+        """
+        key = (snapshot.generation, start, stop)
+        block = self._resident.get(key)
+        if block is not None:
+            return block
+
+        block = snapshot.vectors[start:stop].astype(np.float32)
+        resident = {
+            k: v
+            for k, v in self._resident.items()
+            if k[0] == snapshot.generation and not (k[1] == start and k[2] < stop)
+        }
+        if sum(v.nbytes for v in resident.values()) + block.nbytes <= self.resident_bytes:
+            resident[key] = block
+        self._resident = resident
+        return block
+
+    # -------------------------------------------------------------------------
+    # Write
+    # -------------------------------------------------------------------------
+
+    @contextmanager
+    def _writer(self) -> Iterator[dict[str, Any]]:
+        """
+        Hold the writer lock and yield the current manifest for modification.
+
+        Files are truncated to the committed sizes first (dropping partial
+        appends from an interrupted writer).
+        """
+        with self._write_lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            with open(self.path / LOCK_FILE, "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    manifest = self._read_manifest()
+                    data = manifest[0] if manifest else self._empty_manifest(0)
+                    self._truncate(data)
+                    yield data
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _empty_manifest(self, generation: int) -> dict[str, Any]:
+        return {
+            "version": STORE_VERSION,
+            "dim": self.embedding_dim,
+            "similarity": self.similarity,
+            "generation": generation,
+            "rows": 0,
+            "record_bytes": 0,
+            "table_bytes": 0,
+            "deleted": [],
+        }
+
+    def _truncate(self, data: dict[str, Any]) -> None:
+        generation = data["generation"]
+        sizes = {
+            "vectors": data["rows"] * self.embedding_dim * 2,
+            "offsets": data["rows"] * 8,
+            "records": data["record_bytes"],
+            "table": data["table_bytes"],
+        }
+        for kind, size in sizes.items():
+            path = self._file(kind, generation)
+            if not path.exists():
+                path.touch()
+            if path.stat().st_size != size:
+                os.truncate(path, size)
+
+    def _commit(self, data: dict[str, Any]) -> None:
+        """Atomically publish the manifest."""
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp_path, self.manifest_path)
+
+    def _append(self, data: dict[str, Any], documents: list[Document]) -> None:
+        """Append rows to the current generation files (not yet committed)."""
+        generation = data["generation"]
+        vectors = np.asarray([doc.embedding for doc in documents], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        records: list[bytes] = []
+        tables: list[bytes] = []
+        offsets: list[int] = []
+        position = data["record_bytes"]
+        for doc in documents:
+            record = (
+                json.dumps(
+                    {"id": doc.id, "content": doc.content, "meta": doc.meta}, ensure_ascii=False
+                ).encode("utf-8")
+                + b"\n"
+            )
+            offsets.append(position)
+            position += len(record)
+            records.append(record)
+            tables.append(
+                json.dumps({"id": doc.id, "meta": doc.meta}, ensure_ascii=False).encode("utf-8")
+                + b"\n"
+            )
+
+        table_data = b"".join(tables)
+        with open(self._file("vectors", generation), "ab") as f:
+            f.write(vectors.astype(np.float16).tobytes())
+        with open(self._file("offsets", generation), "ab") as f:
+            f.write(np.asarray(offsets, dtype=np.uint64).tobytes())
+        with open(self._file("records", generation), "ab") as f:
+            f.write(b"".join(records))
+        with open(self._file("table", generation), "ab") as f:
+            f.write(table_data)
+
+        data["rows"] += len(documents)
+        data["record_bytes"] = position
+        data["table_bytes"] += len(table_data)
+
+    def _live_ids(self, data: dict[str, Any]) -> dict[str, int]:
+        """Document id -> row of live rows in the manifest's generation."""
+        snapshot = self._current()
+        if snapshot is None or snapshot.generation != data["generation"]:
+            return {}
+        table = self._table(snapshot)
+        deleted = set(data["deleted"])
+        return {
+            doc_id: row
+            for row, doc_id in enumerate(table.ids[: data["rows"]])
+            if row not in deleted
+        }
+
+    def write_documents(
+        self, documents: list[Document], policy: DuplicatePolicy = DuplicatePolicy.NONE
+    ) -> int:
+        """
+        Write documents with embeddings.
+
+        NONE and OVERWRITE replace documents with the same id; SKIP keeps the
+        stored document; FAIL raises DuplicateDocumentError.
+
+        Returns:
+            Number of documents written.
+        """
+        for doc in documents:
+            if not isinstance(doc, Document):
+                raise ValueError("write_documents() expects a list of Documents")
+            if doc.embedding is None or len(doc.embedding) != self.embedding_dim:
+                raise ValueError(
+                    f"Document {doc.id} has no embedding of dimension {self.embedding_dim}"
+                )
+        if not documents:
+            return 0
+
+        with self._writer() as data:
+            existing = self._live_ids(data)
+            latest: dict[str, Document] = {}
+            for doc in documents:
+                if doc.id in existing or doc.id in latest:
+                    if policy == DuplicatePolicy.FAIL:
+                        raise DuplicateDocumentError(f"ID '{doc.id}' already exists")
+                    if policy == DuplicatePolicy.SKIP:
+                        continue
+                latest[doc.id] = doc
+
+            to_write = list(latest.values())
+            replaced = [existing[doc_id] for doc_id in latest if doc_id in existing]
+            if to_write:
+                self._append(data, to_write)
+                data["deleted"] = sorted(set(data["deleted"]) | set(replaced))
+                self._commit(data)
+            self._maybe_compact(data)
+        return len(to_write)
+
+    def delete_documents(self, document_ids: list[str]) -> None:
+        if not document_ids:
+            return
+        with self._writer() as data:
+            existing = self._live_ids(data)
+            rows = [existing[doc_id] for doc_id in document_ids if doc_id in existing]
+            self._delete_rows(data, rows)
+
+    def delete_by_filter(self, filters: dict[str, Any]) -> int:
+        """
+        Delete all documents matching filters.
+
+        Returns:
+            Number of deleted documents.
+        """
+        with self._writer() as data:
+            snapshot = self._current()
+            if snapshot is None or snapshot.generation != data["generation"]:
+                return 0
+            rows = np.flatnonzero(self._mask(snapshot, filters)).tolist()
+            self._delete_rows(data, rows)
+        return len(rows)
+
+    def delete_all_documents(self) -> None:
+        """Remove every document (starts an empty generation)."""
+        with self._writer() as data:
+            old_generation = data["generation"]
+            new_data = self._empty_manifest(old_generation + 1)
+            self._truncate(new_data)
+            self._commit(new_data)
+            for kind in ("vectors", "records", "offsets", "table"):
+                self._file(kind, old_generation).unlink(missing_ok=True)
+
+    def _delete_rows(self, data: dict[str, Any], rows: list[int]) -> None:
+        if not rows:
+            return
+        data["deleted"] = sorted(set(data["deleted"]) | set(rows))
+        self._commit(data)
+        self._maybe_compact(data)
+
+    def _maybe_compact(self, data: dict[str, Any]) -> None:
+        deleted = len(data["deleted"])
+        if data["rows"] >= COMPACT_MIN_ROWS and deleted > data["rows"] * COMPACT_RATIO:
+            self._compact(data)
+
+    def _compact(self, data: dict[str, Any]) -> None:
+        """Rewrite live rows into a new generation and remove the old files."""
+        snapshot = self._current()
+        if snapshot is None:
+            return
+        old_generation = data["generation"]
+        new_data = self._empty_manifest(old_generation + 1)
+        self._truncate(new_data)
+
+        live = np.flatnonzero(snapshot.live)
+        for i in range(0, len(live), SEARCH_BLOCK_ROWS):
+            rows = live[i : i + SEARCH_BLOCK_ROWS]
+            documents = [self._document(snapshot, int(row), None, True) for row in rows]
+            self._append(new_data, documents)
+
+        self._commit(new_data)
+        for kind in ("vectors", "records", "offsets", "table"):
+            self._file(kind, old_generation).unlink(missing_ok=True)
+        data.clear()
+        data.update(new_data)
+
+
+# =============================================================================
+# Retriever
+# =============================================================================
+
+
+@component
+class NumpyEmbeddingRetriever:
+    """
+    Embedding retriever for NumpyDocumentStore.
+
+    Drop-in replacement for QdrantEmbeddingRetriever (same inputs and
+    outputs). Filters passed to run() replace the init filters.
+    """
+
+    def __init__(
+        self,
+        document_store: NumpyDocumentStore,
+        filters: dict[str, Any] | None = None,
+        top_k: int = 10,
+        scale_score: bool = False,
+        return_embedding: bool = False,
+    ) -> None:
+        if not isinstance(document_store, NumpyDocumentStore):
+            raise ValueError("document_store must be an instance of NumpyDocumentStore")
+        self.document_store = document_store
+        self.filters = filters
+        self.top_k = top_k
+        self.scale_score = scale_score
+        self.return_embedding = return_embedding
+
+    @component.output_types(documents=list[Document])
+    def run(
+        self,
+        query_embedding: list[float],
+        filters: dict[str, Any] | None = None,
+        top_k: int | None = None,
+    ) -> dict[str, list[Document]]:
+        documents = self.document_store.embedding_retrieval(
+            query_embedding,
+            filters=filters or self.filters,
+            top_k=top_k or self.top_k,
+            scale_score=self.scale_score,
+            return_embedding=self.return_embedding,
+        )
+        return {"documents": documents}
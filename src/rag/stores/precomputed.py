@@ -0,0 +1,128 @@
+"""
+Precomputed Embeddings - ETL で事前計算した embedding の保存形式と一括取り込み
+
+ETL の rag_embed パイプラインは整理済みノートをインデックスと同じ方法で
+チャンク分割して embedding し、file_id ごとに 1 ファイル (JSON) へ保存する。
+`rag index` は未取り込みのファイルを EmbeddingCache へ一括登録するので、
+本文が変わっていないチャンクは embedding サーバーを呼ばずに索引される。
+ベクトルは text_hash でチャンクと対応付けるため、ETL 後に Vault で編集された
+チャンクは一致せず、通常どおり embedding される。
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import os
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from src.rag.config import PRECOMPUTED_EMBEDDINGS_DIR, PRECOMPUTED_IMPORT_STATE_PATH
+from src.rag.stores.embedding_cache import EmbeddingCache, text_hash
+
+RECORD_VERSION = 1
+
+
+def encode_record(
+    file_id: str, model: str, texts: list[str], embeddings: Iterable[list[float]]
+) -> dict[str, Any]:
+    """
+    Precomputed embeddings of one note.
+
+    Vectors are stored as base64 float16 (the precision of EmbeddingCache).
+
+    Args:
+        file_id: file_id of the note.
+        model: Embedding model that produced the vectors.
+        texts: Embedded texts (chunks and summary).
+        embeddings: Embeddings for texts (same order).
+    """
+    vectors = np.asarray(list(embeddings), dtype=np.float16)
+    return {
+        "version": RECORD_VERSION,
+        "file_id": file_id,
+        "model": model,
+        "dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+        "hashes": [text_hash(text) for text in texts],
+        "vectors": base64.b64encode(vectors.tobytes()).decode("ascii"),
+    }
+
+
+def decode_vectors(record: dict[str, Any]) -> np.ndarray:
+    """Vectors of a record as a (len(hashes), dim) float16 array."""
+    data = base64.b64decode(record["vectors"])
+    return np.frombuffer(data, dtype=np.float16).reshape(len(record["hashes"]), record["dim"])
+
+
+def record_matches(record: dict[str, Any], model: str, texts: list[str]) -> bool:
+    """Whether a stored record already holds the embeddings of texts."""
+    return (
+        record.get("version") == RECORD_VERSION
+        and record.get("model") == model
+        and record.get("hashes") == [text_hash(text) for text in texts]
+    )
+
+
+@dataclass
+class PrecomputedImport:
+    """Result of import_precomputed_embeddings."""
+
+    files: int = 0  # Records read
+    vectors: int = 0  # Vectors added to the cache
+    skipped: int = 0  # Unreadable records or records of another model
+
+
+def import_precomputed_embeddings(
+    cache: EmbeddingCache,
+    directory: Path | None = None,
+    state_path: Path | None = None,
+) -> PrecomputedImport:
+    """
+    Bulk-load precomputed embeddings into the embedding cache.
+
+    Records already imported (same file and mtime) are not read again.
+
+    Args:
+        cache: Embedding cache of the indexing model.
+        directory: Record directory (default: PRECOMPUTED_EMBEDDINGS_DIR).
+        state_path: Import state file (default: PRECOMPUTED_IMPORT_STATE_PATH).
+    """
+    directory = directory or PRECOMPUTED_EMBEDDINGS_DIR
+    state_path = state_path or PRECOMPUTED_IMPORT_STATE_PATH
+    result = PrecomputedImport()
+    if not directory.is_dir():
+        return result
+
+    try:
+        state: dict[str, int] = json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        state = {}
+
+    for path in sorted(directory.glob("*.json")):
+        if path.name.startswith("."):  # Kedro placeholder
+            continue
+        mtime = path.stat().st_mtime_ns
+        if state.get(path.name) == mtime:
+            continue
+        state[path.name] = mtime
+        result.files += 1
+        try:
+            record = json.loads(path.read_text(encoding="utf-8"))
+            if record.get("version") != RECORD_VERSION or record.get("model") != cache.model:
+                result.skipped += 1
+                continue
+            result.vectors += cache.put_hashed(record["hashes"], decode_vectors(record))
+        except (OSError, ValueError, KeyError):
+            result.skipped += 1
+
+    if result.files:
+        cache.save()
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = state_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp_path, state_path)
+    return result
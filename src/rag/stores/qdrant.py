@@ -4,15 +4,284 @@ Qdrant Document Store - ベクトルストアのファクトリと管理機能
 
 from __future__ import annotations
 
+import shutil
+import sqlite3
+from contextlib import closing
+from dataclasses import replace
+from pathlib import Path
+from typing import Any
+
+from haystack import Document
 from haystack_integrations.document_stores.qdrant import QdrantDocumentStore
+from haystack_integrations.document_stores.qdrant.filters import convert_filters_to_qdrant
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as rest
 
-from src.rag.config import QDRANT_PATH, RAGConfig, rag_config
+from src.rag.config import (
+    COLLECTION_NAME,
+    NUMPY_STORE_PATH,
+    QDRANT_PATH,
+    QDRANT_URL,
+    STORAGE_PROFILES,
+    STORE_BACKENDS,
+    SUMMARY_COLLECTION_NAME,
+    RAGConfig,
+    StorageProfile,
+    rag_config,
+)
+from src.rag.exceptions import ConfigurationError
+from src.rag.stores.numpy_store import NumpyDocumentStore
+from src.rag.stores.versions import (
+    active_version,
+    collection_name,
+    index_manifest_path,
+    lexical_index_path,
+    load_pointer,
+    save_pointer,
+    switch_active_version,
+    versioned_path,
+)
 
 # =============================================================================
 # Constants
 # =============================================================================
 
-COLLECTION_NAME = "obsidian_knowledge"
+MIGRATION_BATCH_SIZE = 256
+
+# Payload indexes of the fields filtered on (build_qdrant_filters, incremental deletes).
+# tags is a list: a keyword index matches any element. created holds ISO dates,
+# which the filter converter compares as DatetimeRange.
+PAYLOAD_INDEXES: dict[str, rest.PayloadSchemaType] = {
+    "meta.vault": rest.PayloadSchemaType.KEYWORD,
+    "meta.tags": rest.PayloadSchemaType.KEYWORD,
+    "meta.created": rest.PayloadSchemaType.DATETIME,
+    "meta.file_path": rest.PayloadSchemaType.KEYWORD,
+}
+
+
+# =============================================================================
+# Storage Profiles
+# =============================================================================
+
+
+def get_storage_profile(name: str) -> StorageProfile:
+    """
+    Look up a storage profile by name.
+
+    Raises:
+        ConfigurationError: If the profile does not exist.
+    """
+    profile = STORAGE_PROFILES.get(name)
+    if profile is None:
+        raise ConfigurationError(
+            f"Unknown storage profile: {name}",
+            config_key="storage_profile",
+            expected=", ".join(STORAGE_PROFILES),
+            actual=name,
+        )
+    return profile
+
+
+def _collection_kwargs(profile: StorageProfile) -> dict[str, Any]:
+    """QdrantDocumentStore collection settings for a profile."""
+    kwargs: dict[str, Any] = {
+        "on_disk": profile.vectors_on_disk,
+        "hnsw_config": {"m": profile.hnsw_m, "ef_construct": profile.hnsw_ef_construct},
+    }
+    if profile.quantization == "int8":
+        # Quantized vectors stay in RAM; originals (possibly on disk) are used for rescoring
+        kwargs["quantization_config"] = {
+            "scalar": {"type": "int8", "quantile": 0.99, "always_ram": True}
+        }
+    return kwargs
+
+
+def _search_params(profile: StorageProfile) -> rest.SearchParams:
+    """Search-time parameters for a profile."""
+    quantization = None
+    if profile.quantization is not None:
+        quantization = rest.QuantizationSearchParams(
+            rescore=profile.rescore, oversampling=profile.oversampling
+        )
+    return rest.SearchParams(hnsw_ef=profile.search_ef, quantization=quantization)
+
+
+def ensure_payload_indexes(client: Any, collection_name: str) -> list[str]:
+    """
+    Create the PAYLOAD_INDEXES missing from a collection.
+
+    Returns:
+        Names of the fields indexed now.
+    """
+    existing = client.get_collection(collection_name).payload_schema or {}
+    created = []
+    for field_name, schema in PAYLOAD_INDEXES.items():
+        if field_name not in existing:
+            client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=schema,
+                wait=True,
+            )
+            created.append(field_name)
+    return created
+
+
+def to_qdrant_filters(filters: dict[str, Any] | None) -> rest.Filter | None:
+    """
+    Convert a filter dict to a Qdrant filter served by the payload indexes.
+
+    The converter has no "contains" operator; a match on a list payload
+    already matches any element, so "contains" becomes "==". The converter
+    also turns "in" over strings without spaces (and "==" on strings with
+    spaces) into MatchText, an unindexed full-text/substring condition.
+    Filter operators compare whole values, so every MatchText becomes an
+    exact keyword match and "in" a single MatchAny on the KEYWORD index.
+    """
+    if filters is None:
+        return None
+    converted = _keyword_matches(convert_filters_to_qdrant(_contains_as_eq(filters)))
+    if isinstance(converted, rest.FieldCondition):
+        return rest.Filter(must=[converted])
+    return converted
+
+
+def _contains_as_eq(filters: dict[str, Any]) -> dict[str, Any]:
+    if "conditions" in filters:
+        return {**filters, "conditions": [_contains_as_eq(c) for c in filters["conditions"]]}
+    if filters.get("operator") == "contains":
+        return {**filters, "operator": "=="}
+    return filters
+
+
+def _keyword_matches(condition: Any) -> Any:
+    """Replace MatchText with MatchValue and OR-ed values of one key with MatchAny."""
+    if isinstance(condition, rest.FieldCondition):
+        if isinstance(condition.match, rest.MatchText):
+            return condition.model_copy(
+                update={"match": rest.MatchValue(value=condition.match.text)}
+            )
+        return condition
+    if not isinstance(condition, rest.Filter):
+        return condition
+
+    clauses: dict[str, list[Any] | None] = {}
+    for name in ("must", "should", "must_not"):
+        value = getattr(condition, name)
+        if value is not None and not isinstance(value, list):
+            value = [value]
+        clauses[name] = None if value is None else [_keyword_matches(c) for c in value]
+
+    should = clauses["should"]
+    if should and not clauses["must"] and not clauses["must_not"]:
+        key = getattr(should[0], "key", None)
+        values = [c.match.value for c in should if _is_keyword_value(c, key)]
+        if len(values) == len(should) and len({type(v) for v in values}) == 1:
+            return rest.FieldCondition(key=key, match=rest.MatchAny(any=values))
+    return condition.model_copy(update=clauses)
+
+
+def _is_keyword_value(condition: Any, key: str | None) -> bool:
+    return (
+        isinstance(condition, rest.FieldCondition)
+        and condition.key == key
+        and isinstance(condition.match, rest.MatchValue)
+        and isinstance(condition.match.value, str | int)
+        and not isinstance(condition.match.value, bool)
+    )
+
+
+class ProfiledQdrantDocumentStore(QdrantDocumentStore):
+    """
+    QdrantDocumentStore that applies storage profile search parameters.
+
+    QdrantEmbeddingRetriever does not expose `hnsw_ef` or quantization
+    rescoring, so dense queries are issued here with the profile's
+    SearchParams (grouped queries fall back to the default behavior).
+
+    With payload_indexes, PAYLOAD_INDEXES are created during collection
+    setup (also on existing collections), so filtered searches use indexed
+    conditions instead of scanning payloads.
+
+    With client_from, the store uses the client of another store (local mode
+    locks its storage folder to a single client).
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        search_params: rest.SearchParams | None = None,
+        payload_indexes: bool = False,
+        client_from: QdrantDocumentStore | None = None,
+        **kwargs: Any,
+    ):
+        super().__init__(*args, **kwargs)
+        self.search_params = search_params
+        self.payload_indexes = payload_indexes
+        self.client_from = client_from
+
+    def _initialize_client(self) -> None:
+        if self._client is None and self.client_from is not None:
+            self.client_from._initialize_client()
+            self._client = self.client_from._client
+            self._set_up_collection(
+                self.index,
+                self.embedding_dim,
+                self.recreate_index,
+                self.similarity,
+                self.use_sparse_embeddings,
+                self.sparse_idf,
+                self.on_disk,
+                self.payload_fields_to_index,
+            )
+        super()._initialize_client()
+
+    def _set_up_collection(self, collection_name: str, *args: Any, **kwargs: Any) -> None:
+        super()._set_up_collection(collection_name, *args, **kwargs)
+        if self.payload_indexes:
+            ensure_payload_indexes(self._client, collection_name)
+
+    def delete_by_filter(self, filters: dict[str, Any]) -> None:
+        super().delete_by_filter(to_qdrant_filters(filters))  # type: ignore[arg-type]
+
+    def _query_by_embedding(
+        self,
+        query_embedding: list[float],
+        filters: dict[str, Any] | rest.Filter | None = None,
+        top_k: int = 10,
+        scale_score: bool = False,
+        return_embedding: bool = False,
+        score_threshold: float | None = None,
+        group_by: str | None = None,
+        group_size: int | None = None,
+    ) -> list[Document]:
+        if isinstance(filters, dict):
+            filters = to_qdrant_filters(filters)
+        if group_by or self.search_params is None or self.use_sparse_embeddings:
+            return super()._query_by_embedding(
+                query_embedding,
+                filters=filters,
+                top_k=top_k,
+                scale_score=scale_score,
+                return_embedding=return_embedding,
+                score_threshold=score_threshold,
+                group_by=group_by,
+                group_size=group_size,
+            )
+
+        self._initialize_client()
+        assert self._client is not None
+
+        points = self._client.query_points(
+            collection_name=self.index,
+            query=query_embedding,
+            query_filter=convert_filters_to_qdrant(filters),
+            search_params=self.search_params,
+            limit=top_k,
+            with_vectors=return_embedding,
+            score_threshold=score_threshold,
+        ).points
+        return self._process_query_point_results(points, scale_score=scale_score)
 
 
 # =============================================================================
@@ -20,58 +289,142 @@ COLLECTION_NAME = "obsidian_knowledge"
 # =============================================================================
 
 
-def get_document_store(config: RAGConfig | None = None) -> QdrantDocumentStore:
+def get_document_store(
+    config: RAGConfig | None = None,
+    collection: str | None = None,
+    client_from: QdrantDocumentStore | None = None,
+    version: int | None = None,
+) -> QdrantDocumentStore | NumpyDocumentStore:
     """
-    Create or get Qdrant document store with local file persistence.
+    Create or get the document store for the configured backend.
 
-    Uses qdrant-haystack integration with local storage path.
+    With store_backend="numpy", returns a NumpyDocumentStore under
+    data/vectors/<collection>. Otherwise connects to QDRANT_URL when set,
+    or uses local Qdrant file storage (sharing the client of client_from
+    when given).
+    The collection belongs to the active index version unless another
+    version is given (see stores.versions). Local Qdrant keeps each version
+    in its own folder, so a rebuild never contends for the folder lock of
+    the version being searched.
+    Collection and search settings come from the storage profile
+    (RAGConfig.storage_profile). Profile changes only take effect for newly
+    created collections; use migrate_collection to rebuild an existing one.
 
     Args:
         config: RAG configuration. Uses default if None.
+        collection: Collection name (default: chunk collection of the version).
+        client_from: Qdrant store whose client is reused.
+        version: Index version (default: the active version).
 
     Returns:
-        QdrantDocumentStore instance configured for local persistence.
+        QdrantDocumentStore or NumpyDocumentStore instance.
+
+    Raises:
+        ConfigurationError: If the backend or storage profile does not exist.
 
     Note:
-        - Collection name: "obsidian_knowledge"
+        - Collection name: "obsidian_knowledge" (version 0), "obsidian_knowledge__v<N>"
         - Vector dimension: 1024 (bge-m3)
         - Distance metric: Cosine
-        - Persistence path: data/qdrant/
+        - Persistence path: data/qdrant/, data/qdrant.v<N>/ (local mode; HNSW and quantization
+          settings are ignored because local mode searches exhaustively)
+        - Payload indexes (server mode): vault, tags, file_path (keyword),
+          created (datetime); created on collection setup if missing
     """
     if config is None:
         config = rag_config
+    if version is None:
+        version = active_version()
+    if collection is None:
+        collection = collection_name(version)
+
+    if config.store_backend not in STORE_BACKENDS:
+        raise ConfigurationError(
+            f"Unknown store backend: {config.store_backend}",
+            config_key="store_backend",
+            expected=", ".join(STORE_BACKENDS),
+            actual=config.store_backend,
+        )
 
-    # Ensure data directory exists
-    QDRANT_PATH.mkdir(parents=True, exist_ok=True)
+    if config.store_backend == "numpy":
+        return NumpyDocumentStore(
+            NUMPY_STORE_PATH / collection,
+            embedding_dim=config.embedding_dim,
+            similarity="cosine",
+            resident_bytes=config.numpy_resident_bytes,
+        )
 
-    store = QdrantDocumentStore(
-        path=str(QDRANT_PATH),
-        index=COLLECTION_NAME,
+    profile = get_storage_profile(config.storage_profile)
+
+    if QDRANT_URL:
+        location: dict[str, Any] = {"url": QDRANT_URL}
+    else:
+        # Ensure data directory exists
+        path = versioned_path(QDRANT_PATH, version)
+        path.mkdir(parents=True, exist_ok=True)
+        location = {"path": str(path)}
+
+    store = ProfiledQdrantDocumentStore(
+        **location,
+        index=collection,
         embedding_dim=config.embedding_dim,
         similarity="cosine",
         recreate_index=False,
         return_embedding=False,
+        search_params=_search_params(profile),
+        # Local mode has no payload indexes (it scans)
+        payload_indexes=bool(QDRANT_URL),
+        client_from=client_from,
+        **_collection_kwargs(profile),
     )
 
     return store
 
 
+def get_summary_store(
+    store: QdrantDocumentStore | NumpyDocumentStore,
+    config: RAGConfig | None = None,
+) -> QdrantDocumentStore | NumpyDocumentStore:
+    """
+    Document store of the per-note summary vectors.
+
+    The collection is "<chunk collection>__docs" (SUMMARY_COLLECTION_NAME for
+    index version 0). Same backend as the chunk store: a NumPy summary store
+    sits next to the chunk store's directory, a Qdrant summary store shares
+    its client.
+    """
+    if isinstance(store, NumpyDocumentStore):
+        return NumpyDocumentStore(
+            store.path.parent / _summary_collection(store.path.name),
+            embedding_dim=store.embedding_dim,
+            similarity=store.similarity,
+            resident_bytes=store.resident_bytes,
+        )
+    if isinstance(store, QdrantDocumentStore):
+        return get_document_store(config, _summary_collection(store.index), client_from=store)
+    return get_document_store(config, SUMMARY_COLLECTION_NAME)
+
+
+def _summary_collection(collection: str) -> str:
+    return f"{collection}{SUMMARY_COLLECTION_NAME.removeprefix(COLLECTION_NAME)}"
+
+
 # =============================================================================
 # Collection Management
 # =============================================================================
 
 
-def get_collection_stats(store: QdrantDocumentStore) -> dict[str, object]:
+def get_collection_stats(store: QdrantDocumentStore | NumpyDocumentStore) -> dict[str, object]:
     """
-    Get collection statistics from Qdrant store.
+    Get collection statistics from the document store.
 
     Args:
-        store: QdrantDocumentStore instance.
+        store: QdrantDocumentStore or NumpyDocumentStore instance.
 
     Returns:
         Dictionary containing:
         - document_count: Number of documents in collection
-        - collection_name: Name of the collection
+        - collection_name: Name of the collection (versioned after a rebuild)
         - embedding_dim: Vector dimension
         - similarity: Distance metric
 
@@ -79,10 +432,212 @@ def get_collection_stats(store: QdrantDocumentStore) -> dict[str, object]:
         Uses store.count_documents() for document count.
     """
     document_count = store.count_documents()
+    name = store.path.name if isinstance(store, NumpyDocumentStore) else store.index
 
     return {
         "document_count": document_count,
-        "collection_name": COLLECTION_NAME,
+        "collection_name": name,
         "embedding_dim": store.embedding_dim,
         "similarity": store.similarity,
     }
+
+
+def _copy_points(client: Any, source: str, target_client: Any, target: str) -> int:
+    """Copy all points (vectors + payloads) between collections page by page."""
+    copied = 0
+    offset = None
+    while True:
+        records, offset = client.scroll(
+            collection_name=source,
+            limit=MIGRATION_BATCH_SIZE,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if records:
+            target_client.upsert(
+                collection_name=target,
+                points=[
+                    rest.PointStruct(id=r.id, vector=r.vector, payload=r.payload) for r in records
+                ],
+                wait=True,
+            )
+            copied += len(records)
+        if offset is None:
+            return copied
+
+
+def migrate_collection(
+    profile_name: str, config: RAGConfig | None = None, pointer_path: Path | None = None
+) -> int:
+    """
+    Rebuild the active index under another storage profile as a new index version.
+
+    Like `rag index --rebuild`, the points of the chunk collection (and of
+    the summary collection "<collection>__docs" when it exists) are copied
+    into the collections of the next index version, created with the new
+    profile; the full-text index and the manifest are copied along. Vectors
+    are reused as-is (no re-embedding). The active index pointer only
+    switches after the copied counts have been verified, so the active
+    version is never modified: an interrupted or failed migration leaves it
+    untouched and its partial version is dropped by the next rebuild.
+
+    Args:
+        profile_name: Target storage profile (STORAGE_PROFILES key).
+        config: RAG configuration. Uses default if None.
+        pointer_path: Active index pointer (default: ACTIVE_INDEX_PATH).
+
+    Returns:
+        Number of migrated chunk points.
+
+    Raises:
+        ConfigurationError: If the profile does not exist or the backend is not Qdrant.
+        RuntimeError: If the copied point count does not match.
+    """
+    config = replace(config or rag_config, storage_profile=profile_name)
+    if config.store_backend != "qdrant":
+        raise ConfigurationError(
+            "Storage profiles apply to the Qdrant backend only",
+            config_key="store_backend",
+            expected="qdrant",
+            actual=config.store_backend,
+        )
+    get_storage_profile(profile_name)
+    pointer = load_pointer(pointer_path)
+    version = pointer.next_version()
+
+    # Leftovers of an interrupted rebuild, restore or migration under the same version
+    drop_index_version(version, config)
+
+    source = get_document_store(config, version=pointer.active)
+    target = get_document_store(config, version=version)
+    try:
+        migrated = _copy_collection(source, target)
+        if source._client.collection_exists(_summary_collection(source.index)):
+            _copy_collection(get_summary_store(source, config), get_summary_store(target, config))
+        _copy_index_files(pointer.active, version)
+    except Exception:
+        close_document_store(source)
+        close_document_store(target)
+        drop_index_version(version, config)
+        raise
+
+    # Local mode: release the folder locks before readers open the new version
+    # (the summary stores share these clients)
+    close_document_store(source)
+    close_document_store(target)
+    activate_index_version(version, config, pointer_path)
+    return migrated
+
+
+def _copy_collection(
+    source: ProfiledQdrantDocumentStore, target: ProfiledQdrantDocumentStore
+) -> int:
+    """Copy the points of source's collection into target's (created with its profile)."""
+    source._initialize_client()
+    target._initialize_client()
+    expected = source._client.count(source.index, exact=True).count
+    copied = _copy_points(source._client, source.index, target._client, target.index)
+    found = target._client.count(target.index, exact=True).count
+    if copied != expected or found != expected:
+        raise RuntimeError(
+            f"Migration copy mismatch in '{target.index}': expected {expected}, "
+            f"copied {copied}, found {found}"
+        )
+    return copied
+
+
+def _copy_index_files(source_version: int, version: int) -> None:
+    """Copy the full-text index (SQLite backup) and the manifest of a version."""
+    lexical = lexical_index_path(source_version)
+    if lexical.exists():
+        target = lexical_index_path(version)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with (
+            closing(sqlite3.connect(lexical)) as source_db,
+            closing(sqlite3.connect(target)) as target_db,
+        ):
+            source_db.backup(target_db)
+    manifest = index_manifest_path(source_version)
+    if manifest.exists():
+        index_manifest_path(version).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(manifest, index_manifest_path(version))
+
+
+# =============================================================================
+# Index Versions
+# =============================================================================
+
+
+def close_document_store(store: QdrantDocumentStore | NumpyDocumentStore) -> None:
+    """
+    Close the client of a Qdrant store (local mode: releases the folder lock).
+
+    A store sharing the client of another store (client_from, e.g. the
+    summary store) only drops its reference; the owner closes the client.
+    """
+    client = getattr(store, "_client", None)
+    if client is not None:
+        if getattr(store, "client_from", None) is None:
+            client.close()
+        store._client = None
+
+
+def drop_index_version(version: int, config: RAGConfig | None = None) -> None:
+    """
+    Delete an index version: chunk and summary collections, full-text index
+    and manifest. Missing parts are skipped.
+
+    Used for versions replaced by a rebuild and for leftovers of an
+    interrupted one; never call it for the active version.
+    """
+    config = config or rag_config
+    collection = collection_name(version)
+    collections = [collection, _summary_collection(collection)]
+
+    if config.store_backend == "numpy":
+        for name in collections:
+            shutil.rmtree(NUMPY_STORE_PATH / name, ignore_errors=True)
+    elif QDRANT_URL:
+        client = QdrantClient(url=QDRANT_URL)
+        try:
+            for name in collections:
+                if client.collection_exists(name):
+                    client.delete_collection(name)
+        finally:
+            client.close()
+    else:
+        # Local mode keeps each version in its own folder
+        shutil.rmtree(versioned_path(QDRANT_PATH, version), ignore_errors=True)
+
+    lexical = lexical_index_path(version)
+    for path in (
+        lexical,
+        lexical.with_name(f"{lexical.name}-wal"),
+        lexical.with_name(f"{lexical.name}-shm"),
+        index_manifest_path(version),
+    ):
+        path.unlink(missing_ok=True)
+
+
+def activate_index_version(
+    version: int, config: RAGConfig | None = None, pointer_path: Path | None = None
+) -> list[int]:
+    """
+    Switch the active index to a completed version and drop the versions
+    beyond RAGConfig.index_versions_kept.
+
+    Close the stores of the new version first (local Qdrant: folder lock).
+
+    Returns:
+        Versions dropped.
+    """
+    config = config or rag_config
+    pointer = switch_active_version(version, pointer_path)
+    kept = max(config.index_versions_kept, 0)
+    removed = pointer.previous[kept:]
+    for old in removed:
+        drop_index_version(old, config)
+    pointer.previous = pointer.previous[:kept]
+    save_pointer(pointer, pointer_path)
+    return removed
@@ -0,0 +1,389 @@
+"""
+Index Snapshot - ベクトルインデックスのエクスポート / 一括リストア
+
+チャンクコレクションと要約コレクションの全ドキュメント (ベクトル・本文・メタデータ)、
+設定 (embedding モデル・次元数・チャンク設定) とインデックスマニフェストを
+1 つの圧縮ファイル (ZIP) に書き出す。リストアは embedding を一切呼ばずに
+ベクトルをそのままストアへ一括書き込みし、全文検索インデックスもチャンクから再構築する。
+ストアのバックエンド (Qdrant / NumPy) をまたいでリストアできる。
+`rag snapshot restore` は `rag index --rebuild` と同様に新しいインデックス版へ書き込み、
+件数を検証してから切り替えるため、失敗してもアクティブ版は変わらない。
+
+Layout:
+    snapshot.json                       version, 作成日時, 設定, コレクションごとの件数
+    index_manifest.json                 インデックスマニフェスト (存在する場合)
+    collections/<name>/<part>.jsonl     {"id", "content", "meta"} per document
+    collections/<name>/<part>.npy       float32 vectors of the same documents
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import zipfile
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from haystack import Document
+from haystack.document_stores.types import DuplicatePolicy
+from haystack_integrations.document_stores.qdrant import QdrantDocumentStore
+
+from src.rag.config import (
+    COLLECTION_NAME,
+    SUMMARY_COLLECTION_NAME,
+    OllamaConfig,
+    RAGConfig,
+    ollama_config,
+    rag_config,
+)
+from src.rag.exceptions import IndexingError
+from src.rag.stores.lexical import LexicalIndex
+from src.rag.stores.numpy_store import NumpyDocumentStore
+from src.rag.stores.qdrant import (
+    activate_index_version,
+    close_document_store,
+    drop_index_version,
+    get_collection_stats,
+    get_document_store,
+    get_summary_store,
+)
+from src.rag.stores.versions import index_manifest_path, lexical_index_path, load_pointer
+
+SNAPSHOT_VERSION = 1
+
+INFO_FILE = "snapshot.json"
+MANIFEST_FILE = "index_manifest.json"
+
+# Documents per part file (bounds memory while writing and restoring)
+SNAPSHOT_PART_SIZE = 2048
+
+DocumentStore = QdrantDocumentStore | NumpyDocumentStore
+
+
+@dataclass
+class SnapshotInfo:
+    """Contents of a snapshot file."""
+
+    path: Path
+    created_at: str
+    embedding_model: str
+    embedding_dim: int
+    collections: dict[str, int] = field(default_factory=dict)  # name -> documents
+    size_bytes: int = 0
+
+
+@dataclass
+class RestoreResult:
+    """Outcome of restore_index."""
+
+    info: SnapshotInfo
+    version: int  # Restored and now active index version
+    replaced: int  # Previously active version
+    stats: dict[str, object]  # get_collection_stats of the restored chunk store
+    removed_versions: list[int] = field(default_factory=list)
+
+
+def _iter_documents(store: DocumentStore) -> Iterator[Document]:
+    if isinstance(store, NumpyDocumentStore):
+        return store.iter_documents()
+    return store._get_documents_generator()
+
+
+def _parts(documents: Iterator[Document]) -> Iterator[list[Document]]:
+    part: list[Document] = []
+    for doc in documents:
+        part.append(doc)
+        if len(part) >= SNAPSHOT_PART_SIZE:
+            yield part
+            part = []
+    if part:
+        yield part
+
+
+def _write_collection(archive: zipfile.ZipFile, name: str, store: DocumentStore) -> int:
+    written = 0
+    for number, part in enumerate(_parts(_iter_documents(store))):
+        records = "".join(
+            json.dumps({"id": doc.id, "content": doc.content, "meta": doc.meta}, ensure_ascii=False)
+            + "\n"
+            for doc in part
+        )
+        archive.writestr(f"collections/{name}/{number:05d}.jsonl", records)
+        vectors = io.BytesIO()
+        np.save(vectors, np.asarray([doc.embedding for doc in part], dtype=np.float32))
+        archive.writestr(f"collections/{name}/{number:05d}.npy", vectors.getvalue())
+        written += len(part)
+    return written
+
+
+def create_snapshot(
+    path: Path,
+    store: DocumentStore,
+    summary_store: DocumentStore | None = None,
+    manifest_path: Path | None = None,
+    config: RAGConfig | None = None,
+    embedding_config: OllamaConfig | None = None,
+) -> SnapshotInfo:
+    """
+    Write the index to a single compressed snapshot file.
+
+    The file is written next to path and renamed into place when complete.
+
+    Args:
+        path: Output file.
+        store: Chunk store.
+        summary_store: Summary store (omitted when None).
+        manifest_path: Index manifest (default: manifest of the active version).
+        config: RAG configuration recorded in the snapshot.
+        embedding_config: Ollama configuration (embedding model) recorded in the snapshot.
+
+    Returns:
+        SnapshotInfo of the written file.
+    """
+    config = config or rag_config
+    embedding_config = embedding_config or ollama_config
+    manifest_path = manifest_path or index_manifest_path()
+    info = SnapshotInfo(
+        path=path,
+        created_at=datetime.now().isoformat(timespec="seconds"),
+        embedding_model=embedding_config.embedding_model,
+        embedding_dim=store.embedding_dim,
+    )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        collections = {COLLECTION_NAME: store, SUMMARY_COLLECTION_NAME: summary_store}
+        for name, collection_store in collections.items():
+            if collection_store is not None:
+                info.collections[name] = _write_collection(archive, name, collection_store)
+        if manifest_path.exists():
+            archive.write(manifest_path, MANIFEST_FILE)
+        archive.writestr(
+            INFO_FILE,
+            json.dumps(
+                {
+                    "version": SNAPSHOT_VERSION,
+                    "created_at": info.created_at,
+                    "embedding_model": info.embedding_model,
+                    "embedding_dim": info.embedding_dim,
+                    "similarity": store.similarity,
+                    "chunk_size": config.chunk_size,
+                    "chunk_overlap": config.chunk_overlap,
+                    "chunk_unit": config.chunk_unit,
+                    "collections": info.collections,
+                },
+                ensure_ascii=False,
+                indent=2,
+            ),
+        )
+    os.replace(tmp_path, path)
+    info.size_bytes = path.stat().st_size
+    return info
+
+
+def read_snapshot_info(path: Path) -> dict[str, Any]:
+    """
+    Read snapshot.json of a snapshot file.
+
+    Raises:
+        IndexingError: If the file is not a snapshot of a supported version.
+    """
+    try:
+        with zipfile.ZipFile(path) as archive:
+            data = json.loads(archive.read(INFO_FILE))
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+        raise IndexingError(
+            f"Not a valid index snapshot: {e}", file_path=str(path), stage="restore"
+        ) from e
+    if data.get("version") != SNAPSHOT_VERSION:
+        raise IndexingError(
+            f"Unsupported snapshot version: {data.get('version')}",
+            file_path=str(path),
+            stage="restore",
+        )
+    return data
+
+
+def _read_collection(archive: zipfile.ZipFile, name: str) -> Iterator[list[Document]]:
+    prefix = f"collections/{name}/"
+    parts = sorted(n for n in archive.namelist() if n.startswith(prefix) and n.endswith(".jsonl"))
+    for records_name in parts:
+        records = archive.read(records_name).decode("utf-8").splitlines()
+        vectors = np.load(io.BytesIO(archive.read(records_name[: -len(".jsonl")] + ".npy")))
+        yield [
+            Document(
+                id=record["id"],
+                content=record["content"],
+                meta=record["meta"],
+                embedding=vector.tolist(),
+            )
+            for record, vector in zip(map(json.loads, records), vectors, strict=True)
+        ]
+
+
+def restore_snapshot(
+    path: Path,
+    store: DocumentStore,
+    summary_store: DocumentStore | None = None,
+    lexical: LexicalIndex | None = None,
+    manifest_path: Path | None = None,
+    embedding_config: OllamaConfig | None = None,
+    force: bool = False,
+) -> SnapshotInfo:
+    """
+    Write the contents of a snapshot file into the given stores.
+
+    Vectors are bulk-written as stored (no embedding calls). The full-text
+    index is rebuilt from the restored chunks, and the index manifest is
+    replaced so the next `rag index` only processes files changed since
+    the snapshot.
+
+    Args:
+        path: Snapshot file.
+        store: Chunk store (emptied first).
+        summary_store: Summary store (emptied first; skipped when None).
+        lexical: Full-text index to rebuild (skipped when None).
+        manifest_path: Index manifest (default: manifest of the active version).
+        embedding_config: Configured embedding model, checked against the snapshot.
+        force: Restore even if the embedding model differs.
+
+    Returns:
+        SnapshotInfo with the restored document counts.
+
+    Raises:
+        IndexingError: If the snapshot is invalid, was built with another
+            embedding model or dimension, or the restored counts differ.
+    """
+    embedding_config = embedding_config or ollama_config
+    manifest_path = manifest_path or index_manifest_path()
+    data = read_snapshot_info(path)
+
+    if data["embedding_dim"] != store.embedding_dim:
+        raise IndexingError(
+            f"Snapshot dimension {data['embedding_dim']} does not match "
+            f"embedding_dim {store.embedding_dim}",
+            file_path=str(path),
+            stage="restore",
+        )
+    if data["embedding_model"] != embedding_config.embedding_model and not force:
+        raise IndexingError(
+            f"Snapshot was built with embedding model '{data['embedding_model']}', "
+            f"but '{embedding_config.embedding_model}' is configured",
+            file_path=str(path),
+            stage="restore",
+        )
+
+    info = SnapshotInfo(
+        path=path,
+        created_at=data["created_at"],
+        embedding_model=data["embedding_model"],
+        embedding_dim=data["embedding_dim"],
+        size_bytes=path.stat().st_size,
+    )
+    targets = {COLLECTION_NAME: store, SUMMARY_COLLECTION_NAME: summary_store}
+
+    with zipfile.ZipFile(path) as archive:
+        for name, expected in data["collections"].items():
+            target = targets.get(name)
+            if target is None:
+                continue
+            target.delete_all_documents()
+            rebuild_lexical = lexical is not None and name == COLLECTION_NAME
+            if rebuild_lexical:
+                lexical.delete_all_documents()
+            for documents in _read_collection(archive, name):
+                target.write_documents(documents, policy=DuplicatePolicy.OVERWRITE)
+                if rebuild_lexical:
+                    lexical.write_documents(documents)
+
+            restored = target.count_documents()
+            if restored != expected:
+                raise IndexingError(
+                    f"Restore of '{name}' mismatch: expected {expected}, restored {restored}",
+                    file_path=str(path),
+                    stage="restore",
+                )
+            info.collections[name] = restored
+
+        if MANIFEST_FILE in archive.namelist():
+            manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = manifest_path.with_suffix(".tmp")
+            tmp_path.write_bytes(archive.read(MANIFEST_FILE))
+            os.replace(tmp_path, manifest_path)
+
+    return info
+
+
+def restore_index(
+    path: Path,
+    config: RAGConfig | None = None,
+    embedding_config: OllamaConfig | None = None,
+    force: bool = False,
+    pointer_path: Path | None = None,
+) -> RestoreResult:
+    """
+    Restore a snapshot as a new index version and switch to it.
+
+    Like `rag index --rebuild`, the snapshot is written next to the active
+    version (chunk and summary collections, full-text index, manifest) and
+    the active index pointer only changes after restore_snapshot has
+    verified the counts. A failed restore drops the new version and leaves
+    the active one untouched.
+
+    Args:
+        path: Snapshot file.
+        config: RAG configuration. Uses default if None.
+        embedding_config: Configured embedding model, checked against the snapshot.
+        force: Restore even if the embedding model differs.
+        pointer_path: Active index pointer (default: ACTIVE_INDEX_PATH).
+
+    Returns:
+        RestoreResult of the switched-in version.
+
+    Raises:
+        IndexingError: See restore_snapshot.
+    """
+    config = config or rag_config
+    pointer = load_pointer(pointer_path)
+    version = pointer.next_version()
+
+    # Leftovers of an interrupted rebuild or restore under the same version
+    drop_index_version(version, config)
+
+    store = get_document_store(config, version=version)
+    summary_store = get_summary_store(store, config) if config.summary_vectors else None
+    lexical = LexicalIndex(lexical_index_path(version))
+    try:
+        info = restore_snapshot(
+            path,
+            store,
+            summary_store=summary_store,
+            lexical=lexical,
+            manifest_path=index_manifest_path(version),
+            embedding_config=embedding_config,
+            force=force,
+        )
+        stats = get_collection_stats(store)
+    except Exception:
+        lexical.close()
+        close_document_store(store)
+        drop_index_version(version, config)
+        raise
+
+    lexical.close()
+    close_document_store(store)
+    removed = activate_index_version(version, config, pointer_path)
+
+    return RestoreResult(
+        info=info,
+        version=version,
+        replaced=pointer.active,
+        stats=stats,
+        removed_versions=removed,
+    )
@@ -0,0 +1,111 @@
+"""
+Collection Stats Cache - コレクション統計のキャッシュ
+
+status コマンドが Qdrant クライアントや Haystack を初期化せずに答えられるよう、
+get_collection_stats の結果をストアのファイル状態 (シグネチャ) と共に保存する。
+ストアのファイルが変わるとシグネチャが変わり、キャッシュは無効になる。
+アクティブなインデックス版が切り替わった場合もキーが変わり無効になる。
+Qdrant サーバー (QDRANT_URL) はファイルを観測できないため、TTL で失効させる。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+
+from src.rag.config import (
+    COLLECTION_STATS_PATH,
+    NUMPY_STORE_PATH,
+    QDRANT_PATH,
+    QDRANT_URL,
+    RAGConfig,
+    rag_config,
+)
+from src.rag.stores.versions import active_version, collection_name, versioned_path
+
+STATS_CACHE_VERSION = 1
+
+# Seconds cached stats of a Qdrant server stay valid
+SERVER_STATS_TTL = 300
+
+
+def _store_dir(config: RAGConfig, version: int) -> Path:
+    if config.store_backend == "numpy":
+        return NUMPY_STORE_PATH / collection_name(version)
+    return versioned_path(QDRANT_PATH, version) / "collection" / collection_name(version)
+
+
+def store_signature(config: RAGConfig | None = None) -> str | None:
+    """
+    Signature of the store files: file count, total size, latest mtime.
+
+    Returns:
+        Signature string, or None for a Qdrant server (files not observable).
+    """
+    config = config or rag_config
+    if config.store_backend != "numpy" and QDRANT_URL:
+        return None
+    try:
+        entries = [
+            entry.stat()
+            for entry in os.scandir(_store_dir(config, active_version()))
+            if entry.is_file()
+        ]
+    except OSError:
+        return "missing"
+    size = sum(stat.st_size for stat in entries)
+    mtime = max((stat.st_mtime_ns for stat in entries), default=0)
+    return f"{len(entries)}:{size}:{mtime}"
+
+
+def _cache_key(config: RAGConfig) -> str:
+    location = QDRANT_URL if config.store_backend != "numpy" and QDRANT_URL else "local"
+    return f"{config.store_backend}:{location}:{collection_name(active_version())}"
+
+
+def load_collection_stats(
+    config: RAGConfig | None = None, path: Path | None = None
+) -> dict[str, object] | None:
+    """
+    Cached collection stats, or None when missing or outdated.
+    """
+    config = config or rag_config
+    path = path or COLLECTION_STATS_PATH
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    if data.get("version") != STATS_CACHE_VERSION or data.get("key") != _cache_key(config):
+        return None
+    signature = store_signature(config)
+    if signature is None:
+        if time.time() - data.get("saved_at", 0) > SERVER_STATS_TTL:
+            return None
+    elif data.get("signature") != signature:
+        return None
+    return data.get("stats")
+
+
+def save_collection_stats(
+    stats: dict[str, object], config: RAGConfig | None = None, path: Path | None = None
+) -> None:
+    """Save collection stats with the current store signature (best effort)."""
+    config = config or rag_config
+    path = path or COLLECTION_STATS_PATH
+    data = {
+        "version": STATS_CACHE_VERSION,
+        "key": _cache_key(config),
+        "signature": store_signature(config),
+        "saved_at": time.time(),
+        "stats": stats,
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
@@ -0,0 +1,110 @@
+"""
+Index Versions - blue/green 再構築用のインデックス版とアクティブ版ポインタ
+
+`rag index --rebuild` はチャンクコレクション・要約コレクション・全文検索インデックス・
+マニフェストの一式を新しい版 (v<N>) として別の場所に構築し、件数を検証してから
+ポインタファイル (ACTIVE_INDEX_PATH) を原子的に書き換えて切り替える。
+検索は常にポインタが指す版を開くため、再構築中も完成済みの版だけを参照する。
+
+版 0 は版管理導入前の場所 (COLLECTION_NAME, QDRANT_PATH, LEXICAL_INDEX_PATH,
+INDEX_MANIFEST_PATH) で、ポインタファイルがない場合のアクティブ版。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from src.rag.config import (
+    ACTIVE_INDEX_PATH,
+    COLLECTION_NAME,
+    INDEX_MANIFEST_PATH,
+    LEXICAL_INDEX_PATH,
+)
+
+POINTER_VERSION = 1
+
+
+@dataclass
+class IndexPointer:
+    """Active index version and the versions it replaced (newest first)."""
+
+    active: int = 0
+    previous: list[int] = field(default_factory=list)
+    switched_at: str | None = None
+
+    def next_version(self) -> int:
+        """Version number of the next rebuild."""
+        return max([self.active, *self.previous]) + 1
+
+
+def versioned_path(path: Path, version: int) -> Path:
+    """Path of a file or directory for an index version (path itself for version 0)."""
+    if not version:
+        return path
+    suffix = "".join(path.suffixes)
+    stem = path.name[: len(path.name) - len(suffix)] if suffix else path.name
+    return path.with_name(f"{stem}.v{version}{suffix}")
+
+
+def collection_name(version: int) -> str:
+    """Chunk collection of an index version (COLLECTION_NAME for version 0)."""
+    return f"{COLLECTION_NAME}__v{version}" if version else COLLECTION_NAME
+
+
+def load_pointer(path: Path | None = None) -> IndexPointer:
+    """Read the active index pointer (version 0 when missing or unreadable)."""
+    try:
+        data = json.loads((path or ACTIVE_INDEX_PATH).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return IndexPointer()
+    if data.get("version") != POINTER_VERSION:
+        return IndexPointer()
+    return IndexPointer(
+        active=int(data.get("active", 0)),
+        previous=[int(v) for v in data.get("previous", [])],
+        switched_at=data.get("switched_at"),
+    )
+
+
+def save_pointer(pointer: IndexPointer, path: Path | None = None) -> None:
+    """Write the pointer atomically (readers see the old or the new version, never a mix)."""
+    path = path or ACTIVE_INDEX_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps({"version": POINTER_VERSION, **asdict(pointer)}), "utf-8")
+    os.replace(tmp_path, path)
+
+
+def switch_active_version(version: int, path: Path | None = None) -> IndexPointer:
+    """
+    Make version the active index.
+
+    The replaced version is recorded first in IndexPointer.previous.
+    """
+    pointer = load_pointer(path)
+    if pointer.active != version:
+        previous = [pointer.active, *pointer.previous]
+        pointer.previous = [v for v in previous if v != version]
+        pointer.active = version
+    pointer.switched_at = datetime.now().isoformat(timespec="seconds")
+    save_pointer(pointer, path)
+    return pointer
+
+
+def active_version(path: Path | None = None) -> int:
+    """Version searched and incrementally indexed by default."""
+    return load_pointer(path).active
+
+
+def lexical_index_path(version: int | None = None) -> Path:
+    """Full-text index of a version (default: the active version)."""
+    return versioned_path(LEXICAL_INDEX_PATH, active_version() if version is None else version)
+
+
+def index_manifest_path(version: int | None = None) -> Path:
+    """Index manifest of a version (default: the active version)."""
+    return versioned_path(INDEX_MANIFEST_PATH, active_version() if version is None else version)
@@ -0,0 +1,100 @@
+"""Tests for RAG Embed pipeline nodes.
+
+Tests verify:
+- Organized notes are chunked and embedded the way `rag index` does (keyed by file_id)
+- Notes without file_id or not normalized are skipped
+- Unchanged notes (existing record with the same texts and model) are skipped
+- Failed embedding requests omit the notes instead of failing the run
+"""
+
+from __future__ import annotations
+
+import unittest
+from unittest.mock import patch
+
+from obsidian_etl.pipelines.rag_embed.nodes import embed_organized_notes
+from src.rag.stores.precomputed import decode_vectors
+
+
+def _note(file_id: str = "a1b2c3d4e5f6", normalized: bool = True) -> str:
+    return (
+        "---\n"
+        "title: Python asyncio の仕組み\n"
+        f"file_id: {file_id}\n"
+        "summary: asyncio の要約\n"
+        f"normalized: {str(normalized).lower()}\n"
+        "---\n"
+        "\n"
+        "## 要約\n"
+        "\n"
+        "asyncio はイベントループベースの非同期フレームワーク。\n"
+    )
+
+
+def _fake_embeddings(texts, **kwargs):
+    return [[float(len(text)), 1.0, 0.0] for text in texts], None
+
+
+class TestEmbedOrganizedNotes(unittest.TestCase):
+    """embed_organized_notes: precompute RAG embeddings of organized notes."""
+
+    def setUp(self):
+        patcher = patch("src.rag.clients.ollama.get_embeddings", side_effect=_fake_embeddings)
+        self.get_embeddings = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.params = {"batch_size": 32, "timeout": 10}
+
+    def test_records_keyed_by_file_id(self):
+        """チャンクと要約の embedding が file_id ごとに保存されること。"""
+        result = embed_organized_notes({"asyncio": _note()}, {}, self.params)
+
+        record = result["a1b2c3d4e5f6"]
+        self.assertEqual(record["file_id"], "a1b2c3d4e5f6")
+        self.assertEqual(record["dim"], 3)
+        texts = self.get_embeddings.call_args[0][0]
+        self.assertEqual(texts[-1], "Python asyncio の仕組み\nasyncio の要約")
+        self.assertEqual(len(record["hashes"]), len(texts))
+        self.assertEqual(decode_vectors(record).shape, (len(texts), 3))
+
+    def test_skips_notes_without_file_id_or_not_normalized(self):
+        """file_id が無いノート・normalized でないノートは embedding しないこと。"""
+        notes = {"a": _note(file_id=""), "b": _note(normalized=False)}
+
+        result = embed_organized_notes(notes, {}, self.params)
+
+        self.assertEqual(result, {})
+        self.get_embeddings.assert_not_called()
+
+    def test_skips_unchanged_notes(self):
+        """既存レコードと本文が同じノートは再 embedding しないこと。"""
+        existing = embed_organized_notes({"asyncio": _note()}, {}, self.params)
+        self.get_embeddings.reset_mock()
+
+        result = embed_organized_notes(
+            {"asyncio": _note()}, {k: (lambda v=v: v) for k, v in existing.items()}, self.params
+        )
+
+        self.assertEqual(result, {})
+        self.get_embeddings.assert_not_called()
+
+    def test_batches_across_notes(self):
+        """複数ノートのテキストを batch_size 単位でまとめて送ること。"""
+        notes = {f"n{i}": _note(file_id=f"id{i:010d}") for i in range(4)}
+
+        result = embed_organized_notes(notes, {}, {"batch_size": 4})
+
+        self.assertEqual(len(result), 4)
+        self.assertEqual(self.get_embeddings.call_count, 2)
+
+    def test_failed_request_omits_notes(self):
+        """embedding に失敗したノートは出力されず、処理は継続すること。"""
+        self.get_embeddings.side_effect = None
+        self.get_embeddings.return_value = (None, "Connection failed")
+
+        result = embed_organized_notes({"asyncio": _note()}, {}, self.params)
+
+        self.assertEqual(result, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
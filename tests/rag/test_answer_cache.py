@@ -0,0 +1,138 @@
+"""
+Tests for Answer Cache - semantic lookup, scopes, index version invalidation, ask integration
+"""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from src.rag.pipelines.models import Answer, QueryFilters, SearchResult
+from src.rag.pipelines.query import ask
+from src.rag.stores.answer_cache import AnswerCache, answer_scope
+
+SOURCE = SearchResult(
+    content="Pod は再起動ポリシーに従う",
+    score=0.9,
+    file_path="/v/k8s.md",
+    title="k8s",
+    vault="エンジニア",
+    position=0,
+)
+ANSWER = Answer(text="Pod は再作成されます", sources=[SOURCE], confidence=0.9)
+
+
+class TestAnswerCache(unittest.TestCase):
+    """Tests for AnswerCache"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.manifest = self.temp_dir / "index_manifest.json"
+        self.manifest.write_text("{}")
+        self.cache = AnswerCache(
+            self.temp_dir / "answers.sqlite3", threshold=0.95, version_path=self.manifest
+        )
+        self.addCleanup(self.cache.close)
+        self.scope = answer_scope(None, "dense", 5, "llm")
+
+    def test_similar_question_hits(self):
+        self.cache.put(self.scope, "Pod が落ちたら?", [1.0, 0.0, 0.1], ANSWER)
+
+        cached = self.cache.get(self.scope, "Pod が落ちたらどうなる?", [1.0, 0.0, 0.12])
+
+        self.assertTrue(cached.cached)
+        self.assertEqual(cached.text, ANSWER.text)
+        self.assertEqual(cached.sources, [SOURCE])
+        self.assertGreater(cached.similarity, 0.95)
+
+    def test_dissimilar_question_misses(self):
+        self.cache.put(self.scope, "Pod が落ちたら?", [1.0, 0.0, 0.0], ANSWER)
+
+        self.assertIsNone(self.cache.get(self.scope, "家計簿の付け方", [0.0, 1.0, 0.0]))
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_exact_question_without_embedding(self):
+        """Lexical mode (no embedding) reuses answers of the same normalized question"""
+        self.cache.put(self.scope, "Pod  が落ちたら?", None, ANSWER)
+
+        self.assertIsNotNone(self.cache.get(self.scope, "Pod が落ちたら?", None))
+
+    def test_scoped_by_filters(self):
+        self.cache.put(self.scope, "q", [1.0, 0.0], ANSWER)
+        other = answer_scope(QueryFilters(vaults=["日常"]), "dense", 5, "llm")
+
+        self.assertIsNone(self.cache.get(other, "q", [1.0, 0.0]))
+
+    def test_scope_ignores_filter_order(self):
+        self.assertEqual(
+            answer_scope(QueryFilters(tags=["a", "b"]), "dense", 5, "llm"),
+            answer_scope(QueryFilters(tags=["b", "a"]), "dense", 5, "llm"),
+        )
+
+    def test_invalidated_by_index_version(self):
+        """Rewriting the index manifest drops cached answers"""
+        self.cache.put(self.scope, "q", [1.0, 0.0], ANSWER)
+        self.manifest.write_text('{"version": 1, "entries": {}}')
+
+        self.assertIsNone(self.cache.get(self.scope, "q", [1.0, 0.0]))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_max_entries(self):
+        self.cache.max_entries = 2
+        for i in range(3):
+            self.cache.put(self.scope, f"q{i}", None, ANSWER)
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get(self.scope, "q0", None))
+
+
+class TestAskWithAnswerCache(unittest.TestCase):
+    """ask() answers repeated questions from the cache"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.cache = AnswerCache(
+            self.temp_dir / "answers.sqlite3", version_path=self.temp_dir / "manifest.json"
+        )
+        self.addCleanup(self.cache.close)
+
+        doc = MagicMock(content="本文", score=0.8, meta={"title": "T", "file_path": "/v/t.md"})
+        self.embedder = MagicMock()
+        self.embedder.run.return_value = {"embedding": [0.6, 0.8]}
+        components = {"embedder": self.embedder, "generator": MagicMock(model="llm")}
+        self.pipeline = MagicMock()
+        self.pipeline.graph.nodes = components
+        self.pipeline.get_component.side_effect = components.get
+        self.pipeline.run.return_value = {
+            "retriever": {"documents": [doc]},
+            "generator": {"replies": ["生成した回答"]},
+        }
+
+    def test_second_ask_is_cached(self):
+        first = ask(self.pipeline, "質問", answer_cache=self.cache)
+        tokens = []
+        second = ask(
+            self.pipeline, "質問", answer_cache=self.cache, streaming_callback=tokens.append
+        )
+
+        self.assertFalse(first.cached)
+        self.assertTrue(second.cached)
+        self.assertEqual(second.text, "生成した回答")
+        self.assertEqual(tokens, ["生成した回答"])
+        self.pipeline.run.assert_called_once()
+
+    def test_other_top_k_not_cached(self):
+        ask(self.pipeline, "質問", answer_cache=self.cache)
+        answer = ask(self.pipeline, "質問", top_k=10, answer_cache=self.cache)
+
+        self.assertFalse(answer.cached)
+        self.assertEqual(self.pipeline.run.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+"""
+Tests for Batch Query - batch file parsing, batched query embedding, concurrent runs, CLI
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from unittest.mock import patch
+
+from haystack import Document
+
+from src.rag.cli import main
+from src.rag.config import OllamaConfig
+from src.rag.exceptions import QueryError
+from src.rag.pipelines.batch import (
+    BatchQuery,
+    load_batch_queries,
+    prime_query_embeddings,
+    run_batch,
+)
+from src.rag.stores.embedding_cache import QueryEmbeddingCache
+from src.rag.stores.lexical import LexicalIndex
+
+
+class TestLoadBatchQueries(unittest.TestCase):
+    """Tests for load_batch_queries"""
+
+    def test_plain_and_json_lines(self):
+        queries = load_batch_queries(
+            [
+                "Kubernetes Pod\n",
+                "\n",
+                '{"id": 7, "question": "家計簿", "vaults": ["日常"], "top_k": 3}\n',
+            ]
+        )
+
+        self.assertEqual(queries[0], BatchQuery(text="Kubernetes Pod"))
+        self.assertEqual(queries[1], BatchQuery(text="家計簿", id="7", vaults=["日常"], top_k=3))
+
+    def test_invalid_json_reports_line(self):
+        with self.assertRaises(QueryError) as ctx:
+            load_batch_queries(["q", "{broken"])
+        self.assertIn("line 2", ctx.exception.message)
+
+    def test_json_without_query(self):
+        with self.assertRaises(QueryError):
+            load_batch_queries(['{"id": 1}'])
+
+
+class TestPrimeQueryEmbeddings(unittest.TestCase):
+    """Tests for prime_query_embeddings"""
+
+    def setUp(self):
+        self.cache = QueryEmbeddingCache()
+        self.config = OllamaConfig(embedding_model="bge-m3")
+
+    @patch("src.rag.pipelines.batch.get_embeddings")
+    def test_embeds_uncached_queries_in_batches(self, mock_get_embeddings):
+        mock_get_embeddings.side_effect = lambda texts, **kwargs: ([[1.0]] * len(texts), None)
+        self.cache.put("bge-m3", "cached", [0.5])
+
+        embedded = prime_query_embeddings(
+            ["a", "b", "a", "cached", "c"], self.cache, self.config, batch_size=2
+        )
+
+        self.assertEqual(embedded, 3)  # Duplicates and cached queries are skipped
+        self.assertEqual(
+            [c.args[0] for c in mock_get_embeddings.call_args_list], [["a", "b"], ["c"]]
+        )
+        self.assertEqual(self.cache.get("bge-m3", "c"), [1.0])
+
+    @patch("src.rag.pipelines.batch.get_embeddings")
+    def test_failure_raises(self, mock_get_embeddings):
+        mock_get_embeddings.return_value = (None, "Connection failed")
+
+        with self.assertRaises(QueryError) as ctx:
+            prime_query_embeddings(["a"], self.cache, self.config)
+        self.assertEqual(ctx.exception.stage, "embedding")
+
+
+class TestRunBatch(unittest.TestCase):
+    """Tests for run_batch"""
+
+    def test_runs_concurrently_and_reports_errors(self):
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def run(query):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+            if query.text == "bad":
+                raise QueryError("Empty query provided", stage="validation")
+            return query.text.upper()
+
+        queries = [BatchQuery(text=t) for t in ("a", "bad", "c", "d", "e")]
+        results = sorted(run_batch(queries, run, concurrency=3), key=lambda r: r.index)
+
+        self.assertEqual([r.result for r in results], ["A", None, "C", "D", "E"])
+        self.assertEqual(results[1].error, "Empty query provided")
+        self.assertLessEqual(peak, 3)
+        self.assertGreater(peak, 1)
+
+
+class TestCLIBatch(unittest.TestCase):
+    """search --batch writes one JSON line per query"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        index = LexicalIndex(self.temp_dir / "lexical.sqlite3")
+        self.addCleanup(index.close)
+        index.write_documents(
+            [
+                Document(
+                    content="Python asyncio で非同期処理を書く",
+                    meta={"title": "async", "file_path": "/v/a.md", "vault": "エンジニア"},
+                )
+            ]
+        )
+        self.index = index
+        self.batch_file = self.temp_dir / "queries.txt"
+        self.batch_file.write_text('非同期処理\n{"id": "q2", "query": "存在しない語句"}\n')
+
+    def test_search_batch_jsonl(self):
+        output = io.StringIO()
+        with (
+            patch("src.rag.stores.lexical.LexicalIndex", return_value=self.index),
+            redirect_stdout(output),
+            redirect_stderr(io.StringIO()),
+        ):
+            exit_code = main(
+                ["search", "--batch", str(self.batch_file), "--mode", "lexical", "--format", "json"]
+            )
+
+        self.assertEqual(exit_code, 0)
+        lines = sorted(
+            (json.loads(line) for line in output.getvalue().splitlines()), key=lambda r: r["index"]
+        )
+        self.assertEqual([line["id"] for line in lines], [None, "q2"])
+        self.assertEqual(lines[0]["results"][0]["title"], "async")
+        self.assertEqual(lines[1]["total"], 0)
+        self.assertIn("elapsed_ms", lines[0])
+
+    def test_failing_query_recorded_and_batch_continues(self):
+        """Any exception is reported on its query line; the other queries still run"""
+        from src.rag.cli import _search_json
+
+        def to_json(response, elapsed_ms):
+            if response.query == "非同期処理":
+                raise ValueError("unexpected response")
+            return _search_json(response, elapsed_ms)
+
+        output = io.StringIO()
+        with (
+            patch("src.rag.stores.lexical.LexicalIndex", return_value=self.index),
+            patch("src.rag.cli._search_json", side_effect=to_json),
+            redirect_stdout(output),
+            redirect_stderr(io.StringIO()),
+        ):
+            exit_code = main(
+                ["search", "--batch", str(self.batch_file), "--mode", "lexical", "--format", "json"]
+            )
+
+        self.assertEqual(exit_code, 1)
+        lines = sorted(
+            (json.loads(line) for line in output.getvalue().splitlines()), key=lambda r: r["index"]
+        )
+        self.assertEqual(lines[0]["error"], "unexpected response")
+        self.assertEqual(lines[1]["total"], 0)
+
+    def test_query_or_batch_required(self):
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            main(["search"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+"""
+Tests for the RAG benchmark - synthetic vault, stub embedding server, report
+"""
+
+from __future__ import annotations
+
+import random
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import requests
+from scripts.bench_rag import (
+    LatencyModel,
+    StubEmbeddingServer,
+    generate_vault,
+    make_queries,
+    percentiles,
+    run_benchmark,
+)
+
+from src.rag.clients.ollama import get_embeddings
+from src.rag.config import SEARCH_MODES
+from src.rag.pipelines.indexing import find_eligible_files, load_documents
+
+
+class TestGenerateVault(unittest.TestCase):
+    """Tests for generate_vault"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def test_deterministic_and_scannable(self):
+        first = generate_vault(self.temp_dir / "a", 40, seed=1)
+        second = generate_vault(self.temp_dir / "b", 40, seed=1)
+
+        files_a = sorted(
+            p.relative_to(self.temp_dir / "a") for p in (self.temp_dir / "a").rglob("*.md")
+        )
+        files_b = sorted(
+            p.relative_to(self.temp_dir / "b") for p in (self.temp_dir / "b").rglob("*.md")
+        )
+        self.assertEqual(files_a, files_b)
+        self.assertEqual(first.bytes, second.bytes)
+        self.assertEqual(first.notes, 40)
+
+        loaded = 0
+        for vault in (self.temp_dir / "a").iterdir():
+            if vault.is_dir():
+                loaded += sum(1 for _ in load_documents(find_eligible_files(vault, vault.name)))
+        self.assertEqual(loaded, first.normalized)
+
+    def test_mixed_languages(self):
+        generate_vault(self.temp_dir, 60, seed=2, ja_ratio=0.5)
+        texts = [p.read_text(encoding="utf-8") for p in self.temp_dir.rglob("*.md")]
+
+        self.assertTrue(any("  - ja" in t for t in texts))
+        self.assertTrue(any("  - en" in t for t in texts))
+
+    def test_reused_when_parameters_match(self):
+        generate_vault(self.temp_dir, 10)
+        extra = next(self.temp_dir.rglob("*.md"))
+        extra.write_text("edited")
+
+        generate_vault(self.temp_dir, 10)
+        self.assertEqual(extra.read_text(), "edited")
+
+        generate_vault(self.temp_dir, 12)
+        self.assertEqual(len(list(self.temp_dir.rglob("*.md"))), 12)
+
+    def test_queries_distinct(self):
+        queries = make_queries(50)
+        self.assertEqual(len(set(queries)), 50)
+
+
+class TestStubEmbeddingServer(unittest.TestCase):
+    """Tests for StubEmbeddingServer"""
+
+    def setUp(self):
+        self.server = StubEmbeddingServer(dim=8, latency=LatencyModel(0, 0, 0)).start()
+        self.addCleanup(self.server.stop)
+
+    def test_batch_embeddings_deterministic(self):
+        first, error = get_embeddings(["a", "b"], url=self.server.url)
+        second, _ = get_embeddings(["b"], url=self.server.url)
+
+        self.assertIsNone(error)
+        self.assertEqual(len(first[0]), 8)
+        self.assertEqual(first[1], second[0])
+        self.assertNotEqual(first[0], first[1])
+        self.assertEqual(self.server.items, 3)
+
+    def test_single_prompt_endpoint(self):
+        response = requests.post(
+            f"{self.server.url}/api/embeddings", json={"model": "m", "prompt": "a"}, timeout=5
+        )
+
+        self.assertEqual(len(response.json()["embedding"]), 8)
+
+    def test_latency_model(self):
+        model = LatencyModel(base_ms=10, per_item_ms=2, jitter=0)
+        self.assertAlmostEqual(model.seconds(5, random.Random(0)), 0.02)
+
+
+class TestBenchmarkReport(unittest.TestCase):
+    """run_benchmark measures every stage against the stub server"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def test_percentiles(self):
+        stats = percentiles([float(i) for i in range(1, 101)])
+
+        self.assertEqual(stats["count"], 100)
+        self.assertAlmostEqual(stats["p50"], 50.5)
+        self.assertAlmostEqual(stats["p99"], 99.01)
+        self.assertEqual(percentiles([]), {"count": 0})
+
+    def test_small_run(self):
+        stats = generate_vault(self.temp_dir / "Vaults", 20)
+        with StubEmbeddingServer(dim=1024, latency=LatencyModel(0, 0, 0)) as server:
+            report = run_benchmark(
+                self.temp_dir / "Vaults",
+                self.temp_dir / "work",
+                server,
+                backend="numpy",
+                queries=make_queries(3),
+                modes=("dense", "lexical"),
+            )
+
+        self.assertEqual(report["scan"]["documents"], stats.normalized)
+        self.assertEqual(report["chunk"]["latency_ms"]["count"], stats.normalized)
+        self.assertEqual(report["store"]["vector_documents"], report["index"]["chunks"])
+        self.assertEqual(report["search"]["dense"]["latency_ms"]["count"], 3)
+        self.assertIn("p95", report["embed"]["latency_ms"])
+        self.assertGreater(report["index"]["peak_rss_bytes"], 0)
+
+    def test_default_modes(self):
+        stats = generate_vault(self.temp_dir / "Vaults", 10)
+        for backend in ("numpy", "qdrant"):
+            with (
+                self.subTest(backend=backend),
+                StubEmbeddingServer(dim=1024, latency=LatencyModel(0, 0, 0)) as server,
+            ):
+                report = run_benchmark(
+                    self.temp_dir / "Vaults",
+                    self.temp_dir / backend,
+                    server,
+                    backend=backend,
+                    queries=make_queries(2),
+                )
+
+                self.assertEqual(set(report["search"]), set(SEARCH_MODES))
+                for mode in SEARCH_MODES:
+                    self.assertEqual(report["search"][mode]["latency_ms"]["count"], 2)
+                self.assertEqual(report["store"]["summary_documents"], stats.normalized)
+                self.assertEqual(report["write_summary"]["documents"], stats.normalized)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+"""
+Tests for Chunking - token estimation, Japanese sentence / heading boundaries, overlap
+"""
+
+from __future__ import annotations
+
+import unittest
+
+from src.rag.pipelines.chunking import (
+    MarkdownChunker,
+    estimate_tokens,
+    split_sections,
+    split_sentences,
+)
+
+
+class TestEstimateTokens(unittest.TestCase):
+    """Tests for estimate_tokens"""
+
+    def test_japanese_counts_characters(self):
+        """Each Japanese character counts as one token"""
+        self.assertEqual(estimate_tokens("日本語の文章。"), 7)
+
+    def test_english_counts_quarter_characters(self):
+        """Non-CJK characters count as one token per 4 characters, ignoring spaces"""
+        self.assertEqual(estimate_tokens("abcd efgh"), 2)
+
+    def test_mixed(self):
+        """Mixed text sums both estimates"""
+        self.assertEqual(estimate_tokens("Python で開発"), 3 + 2)
+
+
+class TestSegmentation(unittest.TestCase):
+    """Tests for split_sections / split_sentences"""
+
+    def test_sections_split_at_headings(self):
+        """Each heading starts a new section"""
+        text = "前文\n# 見出し1\n本文1\n## 見出し2\n本文2\n"
+
+        self.assertEqual(
+            split_sections(text), ["前文\n", "# 見出し1\n本文1\n", "## 見出し2\n本文2\n"]
+        )
+
+    def test_headings_in_code_fence_ignored(self):
+        """Comment lines inside fenced code blocks are not headings"""
+        text = "# 見出し\n```bash\n# comment\n```\n"
+
+        self.assertEqual(len(split_sections(text)), 1)
+
+    def test_sentences_split_at_japanese_endings(self):
+        """Sentences end at 。！？ and keep closing brackets"""
+        text = "晴れです。「本当？」と聞いた。雨！「はい。」 次"
+
+        self.assertEqual(
+            split_sentences(text),
+            ["晴れです。", "「本当？」と聞いた。", "雨！", "「はい。」", " 次"],
+        )
+
+    def test_sentences_preserve_text(self):
+        """Concatenated sentences restore the original text"""
+        text = "First line. Second line.\n次の行です。\n\nEnd"
+
+        self.assertEqual("".join(split_sentences(text)), text)
+
+
+class TestMarkdownChunker(unittest.TestCase):
+    """Tests for MarkdownChunker.split"""
+
+    def test_japanese_text_is_bounded(self):
+        """Japanese text without spaces is split into chunks within chunk_size"""
+        text = "これは日本語の長い文章です。" * 200
+
+        chunker = MarkdownChunker(chunk_size=100, overlap=10)
+        chunks = chunker.split(text)
+
+        self.assertGreater(len(chunks), 20)
+        for chunk in chunks:
+            self.assertLessEqual(estimate_tokens(chunk), 100)
+            self.assertTrue(chunk.endswith("。"))
+
+    def test_long_sentence_is_cut(self):
+        """A single sentence longer than chunk_size is cut"""
+        chunks = MarkdownChunker(chunk_size=50, overlap=5).split("あ" * 500)
+
+        self.assertTrue(all(len(chunk) <= 50 for chunk in chunks))
+        self.assertGreaterEqual(len(chunks), 10)
+
+    def test_long_text_measured_linearly(self):
+        """Cutting a huge boundary-free text measures each character a bounded number of times"""
+        text = "漢" * 100_000 + "abc" * 10_000
+        measured = 0
+
+        def measure(part: str) -> int:
+            nonlocal measured
+            measured += len(part)
+            return estimate_tokens(part)
+
+        chunker = MarkdownChunker(chunk_size=100, overlap=10)
+        chunker.measure = measure
+        pieces = list(chunker._fit(text))
+
+        self.assertEqual("".join(pieces), text)
+        self.assertTrue(all(estimate_tokens(piece) <= 100 for piece in pieces))
+        self.assertLess(measured, 4 * len(text))
+
+    def test_overlap_between_chunks(self):
+        """Consecutive chunks share trailing sentences"""
+        sentences = [f"文{i:03d}です。" for i in range(100)]
+
+        chunks = MarkdownChunker(chunk_size=40, overlap=10).split("".join(sentences))
+
+        self.assertGreater(len(chunks), 2)
+        for previous, current in zip(chunks, chunks[1:], strict=False):
+            first_sentence = current[: current.index("。") + 1]
+            overlap = previous[previous.index(first_sentence) :]
+            self.assertTrue(previous.endswith(overlap))
+            self.assertTrue(current.startswith(overlap))
+            self.assertLessEqual(estimate_tokens(overlap), 10)
+
+    def test_heading_starts_new_chunk(self):
+        """A heading after a half-full chunk starts a new chunk without overlap"""
+        text = "# A\n" + "前半の文です。" * 5 + "\n# B\n後半の文です。"
+
+        chunks = MarkdownChunker(chunk_size=50, overlap=10).split(text)
+
+        self.assertEqual(len(chunks), 2)
+        self.assertTrue(chunks[1].startswith("# B"))
+
+    def test_small_sections_are_merged(self):
+        """Short sections are packed into one chunk"""
+        text = "# A\n短い。\n# B\n短い。\n# C\n短い。\n"
+
+        self.assertEqual(len(MarkdownChunker(chunk_size=100, overlap=10).split(text)), 1)
+
+    def test_char_unit(self):
+        """unit='char' measures length in characters"""
+        chunks = MarkdownChunker(chunk_size=20, overlap=0, unit="char").split("abcde " * 20)
+
+        self.assertTrue(all(len(chunk) <= 20 for chunk in chunks))
+
+    def test_empty_text(self):
+        """Empty or whitespace-only text produces no chunks"""
+        self.assertEqual(MarkdownChunker().split("  \n"), [])
+
+    def test_invalid_settings(self):
+        """Invalid unit or overlap raises ValueError"""
+        with self.assertRaises(ValueError):
+            MarkdownChunker(unit="word")
+        with self.assertRaises(ValueError):
+            MarkdownChunker(chunk_size=10, overlap=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
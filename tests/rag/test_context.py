@@ -0,0 +1,124 @@
+"""
+Tests for Context Packing - chunk merging, near-duplicate removal, token budget
+"""
+
+from __future__ import annotations
+
+import unittest
+
+from haystack import Document
+
+from src.rag.pipelines.chunking import estimate_tokens
+from src.rag.pipelines.context import (
+    ContextPacker,
+    context_num_ctx,
+    drop_near_duplicates,
+    fit_token_budget,
+    join_overlapping,
+    merge_adjacent_chunks,
+)
+
+
+def _chunk(file_path: str, position: int, content: str, score: float) -> Document:
+    return Document(
+        content=content,
+        score=score,
+        meta={"file_path": file_path, "title": file_path, "position": position},
+    )
+
+
+class TestMergeAdjacentChunks(unittest.TestCase):
+    """Tests for merge_adjacent_chunks"""
+
+    def test_overlap_written_once(self):
+        self.assertEqual(
+            join_overlapping("Pod の運用。ログを確認する。", "ログを確認する。再起動する。"),
+            "Pod の運用。ログを確認する。再起動する。",
+        )
+
+    def test_neighbours_merged_at_best_rank(self):
+        documents = [
+            _chunk("/v/b.md", 0, "別のノート", 0.9),
+            _chunk("/v/a.md", 2, "第三段落。", 0.8),
+            _chunk("/v/a.md", 1, "第二段落。", 0.7),
+            _chunk("/v/a.md", 5, "離れた段落。", 0.6),
+        ]
+
+        merged = merge_adjacent_chunks(documents)
+
+        self.assertEqual(
+            [doc.content for doc in merged], ["別のノート", "第二段落。第三段落。", "離れた段落。"]
+        )
+        self.assertEqual(merged[1].score, 0.8)
+        self.assertEqual(merged[1].meta["position"], 1)
+        self.assertNotIn("_merged", merged[1].meta)
+
+    def test_run_of_three_chunks(self):
+        documents = [_chunk("/v/a.md", i, f"段落{i}。", 0.5) for i in (2, 0, 1)]
+
+        merged = merge_adjacent_chunks(documents)
+
+        self.assertEqual([doc.content for doc in merged], ["段落0。段落1。段落2。"])
+
+
+class TestDropNearDuplicates(unittest.TestCase):
+    """Tests for drop_near_duplicates"""
+
+    def test_lower_ranked_copy_dropped(self):
+        text = "Kubernetes の Pod は再起動ポリシーに従って再作成される。"
+        documents = [
+            _chunk("/v/a.md", 0, text, 0.9),
+            _chunk("/v/copy.md", 0, text + " ", 0.8),
+            _chunk("/v/b.md", 0, "家計簿の予算管理について", 0.7),
+        ]
+
+        kept = drop_near_duplicates(documents)
+
+        self.assertEqual([doc.meta["file_path"] for doc in kept], ["/v/a.md", "/v/b.md"])
+
+
+class TestFitTokenBudget(unittest.TestCase):
+    """Tests for fit_token_budget"""
+
+    def test_best_ranked_first_and_truncated(self):
+        documents = [
+            _chunk("/v/a.md", 0, "あ" * 100, 0.9),
+            _chunk("/v/b.md", 0, "い" * 100, 0.8),
+            _chunk("/v/c.md", 0, "う" * 100, 0.7),
+        ]
+
+        packed, tokens = fit_token_budget(documents, budget=180)
+
+        self.assertEqual([doc.meta["file_path"] for doc in packed], ["/v/a.md", "/v/b.md"])
+        self.assertEqual(len(packed[1].content), 80)
+        self.assertEqual(tokens, 180)
+
+    def test_small_remainder_dropped(self):
+        documents = [_chunk("/v/a.md", 0, "あ" * 100, 0.9), _chunk("/v/b.md", 0, "い" * 100, 0.8)]
+
+        packed, tokens = fit_token_budget(documents, budget=120)
+
+        self.assertEqual(len(packed), 1)
+        self.assertEqual(tokens, 100)
+
+
+class TestContextPacker(unittest.TestCase):
+    """Tests for ContextPacker"""
+
+    def test_output_within_budget(self):
+        documents = [_chunk(f"/v/{i}.md", 0, f"ノート{i} " + "本文" * 300, 0.5) for i in range(5)]
+
+        result = ContextPacker(token_budget=1000).run(documents=documents)
+
+        self.assertLessEqual(sum(estimate_tokens(d.content) for d in result["documents"]), 1000)
+        self.assertEqual(result["meta"]["retrieved"], 5)
+        self.assertEqual(result["meta"]["packed"], len(result["documents"]))
+
+    def test_num_ctx(self):
+        self.assertEqual(context_num_ctx(4096, 2048, 65536), 8192)
+        self.assertEqual(context_num_ctx(512, 512, 65536), 2048)
+        self.assertEqual(context_num_ctx(60000, 8192, 65536), 65536)
+
+
+if __name__ == "__main__":
+    unittest.main()
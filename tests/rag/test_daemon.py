@@ -0,0 +1,240 @@
+"""
+Tests for RAG Daemon - server dispatch, client round trips, error mapping, CLI fallback
+
+Servers listen on temporary Unix sockets; no Ollama server required.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from haystack import Document
+
+from src.rag.cli import main
+from src.rag.clients.daemon import DaemonClient, get_daemon_client
+from src.rag.exceptions import ConfigurationError, DaemonUnavailableError, QueryError
+from src.rag.server import RAGService, create_server
+from src.rag.stores.lexical import LexicalIndex
+from src.rag.stores.numpy_store import NumpyDocumentStore
+
+
+class _StubService:
+    """Answers like RAGService without stores or pipelines"""
+
+    def search(self, request):
+        if not request.get("query"):
+            raise QueryError("Empty query provided", stage="validation")
+        return {
+            "query": request["query"],
+            "results": [
+                {
+                    "content": "本文",
+                    "score": 0.9,
+                    "file_path": "/v/a.md",
+                    "title": "A",
+                    "vault": "エンジニア",
+                    "position": 0,
+                }
+            ],
+            "total": 1,
+        }
+
+    def ask(self, request, emit=None):
+        if emit is None:
+            raise QueryError("Q&A failed: LLM offline", stage="generation")
+        source = self.search({"query": request["question"]})["results"][0]
+        emit({"event": "sources", "sources": [source]})
+        for token in ("Pod ", "の", "運用"):
+            emit({"event": "token", "text": token})
+        return {"text": "Pod の運用", "sources": [source], "confidence": 0.9}
+
+    def status(self):
+        return {"collection_name": "obsidian_knowledge", "document_count": 3}
+
+
+class TestDaemonServer(unittest.TestCase):
+    """Client round trips against a server on a Unix socket"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.socket_path = self.temp_dir / "daemon.sock"
+        self.server = create_server(_StubService(), socket_path=self.socket_path)
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.client = DaemonClient(socket_path=self.socket_path, timeout=5)
+
+    def test_search_round_trip(self):
+        data = self.client.search({"query": "非同期", "top_k": 1})
+
+        self.assertEqual(data["query"], "非同期")
+        self.assertEqual(data["results"][0]["vault"], "エンジニア")
+
+    def test_status(self):
+        self.assertEqual(self.client.status()["document_count"], 3)
+
+    def test_errors_are_reraised(self):
+        """Daemon errors keep their type and stage"""
+        with self.assertRaises(QueryError) as ctx:
+            self.client.search({"query": ""})
+        self.assertEqual(ctx.exception.stage, "validation")
+
+        with self.assertRaises(QueryError) as ctx:
+            self.client.ask({"question": "q"})
+        self.assertEqual(ctx.exception.message, "Q&A failed: LLM offline")
+
+    def test_ask_stream_events(self):
+        """Streamed ask yields sources, tokens, then the answer"""
+        events = list(self.client.ask_stream({"question": "運用"}))
+
+        self.assertEqual(
+            [event["event"] for event in events], ["sources", "token", "token", "token", "done"]
+        )
+        self.assertEqual("".join(e["text"] for e in events if e["event"] == "token"), "Pod の運用")
+        self.assertEqual(events[-1]["result"]["sources"][0]["title"], "A")
+
+    def test_ask_stream_error_event(self):
+        with self.assertRaises(QueryError):
+            list(self.client.ask_stream({"question": ""}))
+
+    def test_cli_stream_reports_latency(self):
+        """ask --stream JSON output has time to first token and total latency"""
+        output = io.StringIO()
+        with (
+            patch("src.rag.cli.get_daemon_client", return_value=self.client),
+            redirect_stdout(output),
+        ):
+            exit_code = main(["ask", "運用", "--stream", "--format", "json"])
+
+        self.assertEqual(exit_code, 0)
+        data = json.loads(output.getvalue())
+        self.assertEqual(data["answer"], "Pod の運用")
+        self.assertIsNotNone(data["ttft_ms"])
+        self.assertLessEqual(data["retrieval_ms"], data["ttft_ms"])
+        self.assertLessEqual(data["ttft_ms"], data["total_ms"])
+
+    def test_concurrent_requests(self):
+        results = []
+
+        def run():
+            results.append(self.client.search({"query": "q"})["total"])
+
+        threads = [threading.Thread(target=run) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [1] * 8)
+
+    def test_second_daemon_refused(self):
+        with self.assertRaises(ConfigurationError):
+            create_server(_StubService(), socket_path=self.socket_path)
+
+
+class TestDaemonClient(unittest.TestCase):
+    """Tests for client discovery and unavailable daemons"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def test_stale_socket_unavailable(self):
+        """A socket file without a listening daemon raises DaemonUnavailableError"""
+        path = self.temp_dir / "daemon.sock"
+        path.touch()
+
+        with self.assertRaises(DaemonUnavailableError):
+            DaemonClient(socket_path=path).status()
+
+    def test_no_socket_no_client(self):
+        with patch("src.rag.clients.daemon.DAEMON_SOCKET_PATH", self.temp_dir / "none.sock"):
+            self.assertIsNone(get_daemon_client())
+
+    def test_disabled(self):
+        with (
+            patch("src.rag.clients.daemon.RAG_DAEMON_URL", "http://127.0.0.1:8765"),
+            patch("src.rag.clients.daemon.rag_config") as mock_config,
+        ):
+            mock_config.use_daemon = False
+            self.assertIsNone(get_daemon_client())
+
+
+class TestCLIUsesDaemon(unittest.TestCase):
+    """search goes through the daemon when one is available"""
+
+    @patch("src.rag.stores.qdrant.get_document_store")
+    @patch("src.rag.cli.verify_connections")
+    @patch("src.rag.cli.get_daemon_client")
+    def test_search_via_daemon(self, mock_client_fn, mock_verify, mock_get_store):
+        mock_client_fn.return_value = MagicMock(search=_StubService().search)
+
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            exit_code = main(["search", "非同期", "--format", "json"])
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(json.loads(stdout.getvalue())["results"][0]["title"], "A")
+        mock_verify.assert_not_called()
+        mock_get_store.assert_not_called()
+
+    @patch("src.rag.cli.save_collection_stats")
+    @patch("src.rag.cli.load_collection_stats", return_value=None)
+    @patch("src.rag.stores.qdrant.get_document_store")
+    @patch("src.rag.cli.get_daemon_client")
+    def test_falls_back_when_unavailable(self, mock_client_fn, mock_get_store, *_):
+        client = MagicMock()
+        client.status.side_effect = DaemonUnavailableError("not running")
+        mock_client_fn.return_value = client
+        mock_get_store.return_value = MagicMock()
+
+        with (
+            patch("src.rag.stores.qdrant.get_collection_stats") as mock_stats,
+            redirect_stdout(io.StringIO()),
+        ):
+            mock_stats.return_value = {
+                "collection_name": "c",
+                "document_count": 0,
+                "embedding_dim": 1024,
+                "similarity": "cosine",
+            }
+            exit_code = main(["status"])
+
+        self.assertEqual(exit_code, 0)
+        mock_get_store.assert_called_once()
+
+
+class TestRAGService(unittest.TestCase):
+    """Tests for RAGService"""
+
+    def test_pipelines_built_once(self):
+        """Pipelines are reused across requests"""
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        lexical = LexicalIndex(temp_dir / "lexical.sqlite3")
+        self.addCleanup(lexical.close)
+        lexical.write_documents(
+            [Document(content="Python asyncio の使い方", meta={"title": "py", "vault": "v"})]
+        )
+        service = RAGService(NumpyDocumentStore(temp_dir / "vectors", embedding_dim=4), lexical)
+
+        first = service.search({"query": "asyncio", "mode": "lexical"})
+        service.search({"query": "asyncio", "mode": "lexical"})
+
+        self.assertEqual(first["results"][0]["title"], "py")
+        self.assertEqual(list(service._pipelines), [("search", "lexical")])
+        self.assertEqual(service.requests, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
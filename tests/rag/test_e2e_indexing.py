@@ -252,7 +252,7 @@ created: 2024-01-15
         self.assertIn("Connection timeout", result.errors[0])
 
     @patch("src.rag.pipelines.indexing.Pipeline")
-    @patch("src.rag.pipelines.indexing.OllamaDocumentEmbedder")
+    @patch("src.rag.pipelines.indexing.AdaptiveDocumentEmbedder")
     @patch("src.rag.pipelines.indexing.DocumentWriter")
     def test_create_indexing_pipeline_structure(
         self, mock_writer_cls, mock_embedder_cls, mock_pipeline_cls
@@ -88,7 +88,8 @@ class TestQAPipelineCreation(unittest.TestCase):
             num_ctx=32768,
         )
 
-        pipeline = create_qa_pipeline(mock_store, config=config)
+        # Without context packing, num_ctx is taken from the config as is
+        pipeline = create_qa_pipeline(mock_store, config=config, context_budget=0)
 
         # Check embedder config
         embedder_kwargs = mock_embedder_cls.call_args[1]
@@ -0,0 +1,224 @@
+"""
+Tests for Embedding Stage - adaptive batch sizing, concurrent batches, split retry
+
+All HTTP calls are mocked - no running Ollama server required.
+"""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from haystack import Document
+
+from src.rag.exceptions import IndexingError
+from src.rag.pipelines.embedding import (
+    AdaptiveBatchSizer,
+    AdaptiveDocumentEmbedder,
+    CachedTextEmbedder,
+)
+from src.rag.stores.embedding_cache import EmbeddingCache, QueryEmbeddingCache
+
+
+def _docs(n: int) -> list[Document]:
+    return [Document(content=f"doc {i}", meta={"file_path": f"/v/{i}.md"}) for i in range(n)]
+
+
+def _vector(text: str) -> list[float]:
+    return [float(text.split()[-1])]
+
+
+class TestAdaptiveBatchSizer(unittest.TestCase):
+    """Tests for AdaptiveBatchSizer"""
+
+    def test_initial_size_clamped(self):
+        """Initial size is clamped to [min, max]"""
+        self.assertEqual(AdaptiveBatchSizer(initial=100, max_size=16).size, 16)
+        self.assertEqual(AdaptiveBatchSizer(initial=0, min_size=2).size, 2)
+
+    def test_grows_when_fast(self):
+        """Fast batches grow the size up to max"""
+        sizer = AdaptiveBatchSizer(initial=4, max_size=10, target_latency=10.0)
+        sizer.record_success(4, 1.0)
+        self.assertEqual(sizer.size, 6)
+        for _ in range(5):
+            sizer.record_success(sizer.size, 1.0)
+        self.assertEqual(sizer.size, 10)
+
+    def test_shrinks_when_slow(self):
+        """Slow batches shrink the size proportionally"""
+        sizer = AdaptiveBatchSizer(initial=20, target_latency=10.0)
+        sizer.record_success(20, 40.0)
+        self.assertEqual(sizer.size, 5)
+
+    def test_small_fast_batch_does_not_grow(self):
+        """A fast batch smaller than the current size is not evidence to grow"""
+        sizer = AdaptiveBatchSizer(initial=8, target_latency=10.0)
+        sizer.record_success(2, 1.0)
+        self.assertEqual(sizer.size, 8)
+
+    def test_failure_halves(self):
+        """Failures halve the size, not below min"""
+        sizer = AdaptiveBatchSizer(initial=8, min_size=3)
+        sizer.record_failure()
+        self.assertEqual(sizer.size, 4)
+        sizer.record_failure()
+        self.assertEqual(sizer.size, 3)
+
+    def test_invalid_range(self):
+        """Invalid range raises ValueError"""
+        with self.assertRaises(ValueError):
+            AdaptiveBatchSizer(initial=4, min_size=8, max_size=4)
+
+
+class TestAdaptiveDocumentEmbedder(unittest.TestCase):
+    """Tests for AdaptiveDocumentEmbedder.run"""
+
+    def _embedder(self, **kwargs) -> AdaptiveDocumentEmbedder:
+        defaults = {"url": "http://test:11434", "model": "bge-m3", "batch_size": 3}
+        defaults.update(kwargs)
+        return AdaptiveDocumentEmbedder(**defaults)
+
+    @patch("src.rag.pipelines.embedding.get_embeddings")
+    def test_embeds_all_documents_in_order(self, mock_get):
+        """Every document receives its own embedding"""
+        mock_get.side_effect = lambda texts, **kw: ([_vector(t) for t in texts], None)
+
+        result = self._embedder().run(documents=_docs(10))
+
+        embeddings = [doc.embedding for doc in result["documents"]]
+        self.assertEqual(embeddings, [[float(i)] for i in range(10)])
+        self.assertEqual(result["meta"]["retries"], 0)
+
+    @patch("src.rag.pipelines.embedding.get_embeddings")
+    def test_empty_documents(self, mock_get):
+        """No documents means no requests"""
+        result = self._embedder().run(documents=[])
+
+        self.assertEqual(result["documents"], [])
+        mock_get.assert_not_called()
+
+    @patch("src.rag.pipelines.embedding.get_embeddings")
+    def test_batches_in_flight_concurrently(self, mock_get):
+        """Several batches are sent at the same time"""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def embed(texts, **kwargs):
+            barrier.wait()  # Deadlocks (BrokenBarrierError) unless 3 batches are in flight
+            return ([_vector(t) for t in texts], None)
+
+        mock_get.side_effect = embed
+
+        embedder = self._embedder(batch_size=2, max_concurrency=3)
+        result = embedder.run(documents=_docs(6))
+
+        self.assertEqual(len(result["documents"]), 6)
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch("src.rag.pipelines.embedding.get_embeddings")
+    def test_failed_batch_is_split(self, mock_get):
+        """A failing batch is retried as two halves and the batch size shrinks"""
+        calls: list[int] = []
+
+        def embed(texts, **kwargs):
+            calls.append(len(texts))
+            if len(texts) > 2:
+                return (None, "Embedding timeout after 300s")
+            return ([_vector(t) for t in texts], None)
+
+        mock_get.side_effect = embed
+
+        embedder = self._embedder(batch_size=4, max_concurrency=1)
+        result = embedder.run(documents=_docs(4))
+
+        self.assertEqual(calls, [4, 2, 2])
+        self.assertEqual([d.embedding for d in result["documents"]], [[0.0], [1.0], [2.0], [3.0]])
+        self.assertEqual(result["meta"]["retries"], 1)
+        self.assertLess(embedder.sizer.size, 4)
+
+    @patch("src.rag.pipelines.embedding.get_embeddings")
+    def test_single_document_failure_raises(self, mock_get):
+        """A document that keeps failing alone raises IndexingError"""
+
+        def embed(texts, **kwargs):
+            if "doc 1" in texts:
+                return (None, "HTTP error: 500")
+            return ([_vector(t) for t in texts], None)
+
+        mock_get.side_effect = embed
+
+        embedder = self._embedder(batch_size=2, max_concurrency=1, max_retries=1)
+        with self.assertRaises(IndexingError) as ctx:
+            embedder.run(documents=_docs(2))
+
+        self.assertEqual(ctx.exception.stage, "embed")
+        self.assertEqual(ctx.exception.file_path, "/v/1.md")
+
+    @patch("src.rag.pipelines.embedding.get_embeddings")
+    def test_failure_does_not_wait_for_other_batches(self, mock_get):
+        """IndexingError is raised without waiting for batches still in flight"""
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def embed(texts, **kwargs):
+            if "doc 0" in texts:
+                return (None, "HTTP error: 500")
+            release.wait(timeout=5)
+            return ([_vector(t) for t in texts], None)
+
+        mock_get.side_effect = embed
+
+        embedder = self._embedder(batch_size=1, max_concurrency=2, max_retries=0)
+        with self.assertRaises(IndexingError):
+            embedder.run(documents=_docs(4))
+
+        self.assertFalse(release.is_set())
+        self.assertLessEqual(mock_get.call_count, 2)
+
+    @patch("src.rag.pipelines.embedding.get_embeddings")
+    def test_cache_hits_skip_requests(self, mock_get):
+        """Cached chunks are not sent; new embeddings are added to the cache"""
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        cache = EmbeddingCache("bge-m3", directory=temp_dir)
+        cache.put_many(["doc 0", "doc 2"], [[0.0], [2.0]])
+
+        sent: list[str] = []
+
+        def embed(texts, **kwargs):
+            sent.extend(texts)
+            return ([_vector(t) for t in texts], None)
+
+        mock_get.side_effect = embed
+
+        result = self._embedder(cache=cache).run(documents=_docs(4))
+
+        self.assertEqual(sorted(sent), ["doc 1", "doc 3"])
+        self.assertEqual([d.embedding for d in result["documents"]], [[0.0], [1.0], [2.0], [3.0]])
+        self.assertEqual(result["meta"]["cache_hits"], 2)
+        self.assertEqual(EmbeddingCache("bge-m3", directory=temp_dir).get_many(["doc 3"]), [[3.0]])
+
+
+class TestCachedTextEmbedder(unittest.TestCase):
+    """Tests for CachedTextEmbedder"""
+
+    def test_repeated_query_skips_embedder(self):
+        """Only the first of repeated queries reaches the embedding server"""
+        embedder = MagicMock()
+        embedder.run.return_value = {"embedding": [0.1, 0.2], "meta": {}}
+        cached = CachedTextEmbedder(embedder, cache=QueryEmbeddingCache(), model="bge-m3")
+
+        first = cached.run(text="Python 非同期")
+        second = cached.run(text="Python  非同期 ")
+
+        embedder.run.assert_called_once_with(text="Python 非同期")
+        self.assertEqual(first["embedding"], second["embedding"])
+        self.assertEqual((first["meta"]["cached"], second["meta"]["cached"]), (False, True))
+
+
+if __name__ == "__main__":
+    unittest.main()
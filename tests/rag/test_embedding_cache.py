@@ -0,0 +1,260 @@
+"""
+Tests for Embedding Cache - persistence, float16 storage, LRU eviction, query cache
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from src.rag.stores.embedding_cache import (
+    EmbeddingCache,
+    QueryEmbeddingCache,
+    normalize_query,
+    text_hash,
+)
+
+WORKER_PUTS = 50
+
+
+def _vector(text: str) -> list[float]:
+    return [float(ord(text[0])), float(text[1:])]
+
+
+def _put_worker(directory: Path, name: str) -> None:
+    cache = EmbeddingCache("bge-m3", directory=directory)
+    for i in range(WORKER_PUTS):
+        cache.put_many([f"{name}{i}"], [_vector(f"{name}{i}")])
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    """Tests for EmbeddingCache"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _cache(self, model: str = "bge-m3", max_bytes: int = 1024**2) -> EmbeddingCache:
+        return EmbeddingCache(model, directory=self.temp_dir, max_bytes=max_bytes)
+
+    def test_miss_then_hit(self):
+        """Stored vectors are returned for the same text"""
+        cache = self._cache()
+        self.assertEqual(cache.get_many(["a"]), [None])
+
+        cache.put_many(["a", "b"], [[0.5, 0.25], [1.0, -2.0]])
+
+        self.assertEqual(cache.get_many(["b", "a", "c"]), [[1.0, -2.0], [0.5, 0.25], None])
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 2)
+
+    def test_persists_across_instances(self):
+        """Saved cache is reloaded from disk"""
+        cache = self._cache()
+        cache.put_many(["a"], [[0.5, 0.25]])
+        cache.save()
+
+        reloaded = self._cache()
+
+        self.assertEqual(len(reloaded), 1)
+        self.assertEqual(reloaded.get_many(["a"]), [[0.5, 0.25]])
+
+    def test_vectors_stored_as_float16(self):
+        """Each vector takes dim * 2 bytes on disk"""
+        cache = self._cache()
+        cache.put_many(["a", "b", "c"], [[0.1] * 8, [0.2] * 8, [0.3] * 8])
+
+        self.assertEqual(cache.vectors_path.stat().st_size, 3 * 8 * 2)
+        self.assertAlmostEqual(cache.get_many(["a"])[0][0], 0.1, places=3)
+
+    def test_keyed_by_model(self):
+        """Different models do not share entries"""
+        cache = self._cache("bge-m3")
+        cache.put_many(["a"], [[1.0]])
+        cache.save()
+
+        other = self._cache("nomic-embed-text:latest")
+
+        self.assertEqual(other.get_many(["a"]), [None])
+
+    def test_duplicate_texts_not_appended(self):
+        """Texts already cached are not written again"""
+        cache = self._cache()
+        cache.put_many(["a"], [[1.0, 2.0]])
+        cache.put_many(["a"], [[3.0, 4.0]])
+
+        self.assertEqual(cache.vectors_path.stat().st_size, 2 * 2)
+        self.assertEqual(cache.get_many(["a"]), [[1.0, 2.0]])
+
+    def test_interrupted_appends_are_ignored_on_reload(self):
+        """Rows of a put that never committed are not referenced after a crash"""
+        cache = self._cache()
+        cache.put_many(["a"], [[1.0, 1.0]])
+        with open(cache.vectors_path, "ab") as f:
+            f.write(b"\x00" * 6)  # One unreferenced row and half of another
+
+        reloaded = self._cache()
+
+        self.assertEqual(len(reloaded), 1)
+        reloaded.put_many(["c"], [[3.0, 3.0]])
+        self.assertEqual(reloaded.get_many(["a", "c"]), [[1.0, 1.0], [3.0, 3.0]])
+        self.assertEqual(reloaded.vectors_path.stat().st_size, 3 * 4)
+
+    def test_shared_by_two_instances(self):
+        """Instances on one directory append after each other's rows"""
+        first = self._cache()
+        second = self._cache()
+        first.put_many(["a"], [[1.0]])
+        second.put_many(["b", "a"], [[2.0], [9.0]])
+        first.put_many(["c"], [[3.0]])
+
+        for cache in (first, second, self._cache()):
+            self.assertEqual(cache.get_many(["a", "b", "c"]), [[1.0], [2.0], [3.0]])
+        self.assertEqual(len(first), 3)
+
+    def test_compaction_seen_by_other_instance(self):
+        """Lookups follow a compaction done by another instance"""
+        reader = self._cache(max_bytes=4 * 2)
+        reader.put_many(["a", "b", "c"], [[1.0], [2.0], [3.0]])
+        self.assertEqual(reader.get_many(["a"]), [[1.0]])  # Maps the vector file
+        reader.save()
+
+        writer = self._cache(max_bytes=4 * 2)
+        writer.put_many(["d", "e"], [[4.0], [5.0]])
+
+        self.assertEqual(reader.get_many(["a", "b", "e"]), [[1.0], None, [5.0]])
+        self.assertEqual(reader.vectors_path, writer.vectors_path)
+
+    def test_concurrent_processes(self):
+        """Processes appending at the same time never mix up rows"""
+        context = multiprocessing.get_context("spawn")
+        workers = [
+            context.Process(target=_put_worker, args=(self.temp_dir, name))
+            for name in ("p", "q", "r")
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(60)
+            self.assertEqual(worker.exitcode, 0)
+
+        cache = self._cache()
+        for name in ("p", "q", "r"):
+            texts = [f"{name}{i}" for i in range(WORKER_PUTS)]
+            self.assertEqual(cache.get_many(texts), [_vector(text) for text in texts])
+
+    def test_legacy_index_imported(self):
+        """Entries of a version 1 index.json are kept"""
+        directory = self.temp_dir / "bge-m3"
+        directory.mkdir()
+        (directory / "vectors.2.f16").write_bytes(np.asarray([[1.0], [2.0]], np.float16).tobytes())
+        index = {
+            "version": 1,
+            "model": "bge-m3",
+            "dim": 1,
+            "clock": 2,
+            "generation": 2,
+            "entries": {text_hash("a"): [0, 1], text_hash("b"): [1, 2], text_hash("c"): [5, 3]},
+        }
+        (directory / "index.json").write_text(json.dumps(index), encoding="utf-8")
+
+        cache = self._cache()
+
+        self.assertEqual(cache.get_many(["a", "b", "c"]), [[1.0], [2.0], None])
+        self.assertEqual(len(cache), 2)
+        self.assertFalse((directory / "index.json").exists())
+
+    def test_eviction_keeps_recently_used(self):
+        """Exceeding max_bytes evicts least recently used entries and compacts"""
+        cache = self._cache(max_bytes=4 * 2)  # 4 vectors of dim 1
+        cache.put_many(["a", "b", "c", "d"], [[1.0], [2.0], [3.0], [4.0]])
+        cache.get_many(["a"])  # a is now most recently used
+
+        cache.put_many(["e"], [[5.0]])
+
+        self.assertLessEqual(len(cache), 4)
+        self.assertEqual(cache.get_many(["a", "e"]), [[1.0], [5.0]])
+        self.assertEqual(cache.get_many(["b"]), [None])
+        self.assertEqual(cache.vectors_path.stat().st_size, len(cache) * 2)
+
+        reloaded = self._cache(max_bytes=4 * 2)
+        self.assertEqual(reloaded.get_many(["a", "e"]), [[1.0], [5.0]])
+        self.assertEqual(len(list(cache.directory.glob("vectors.*.f16"))), 1)
+
+    def test_corrupt_index_starts_empty(self):
+        """Unreadable index is treated as an empty cache"""
+        cache = self._cache()
+        cache.put_many(["a"], [[1.0]])
+        cache.close()
+        cache.index_path.write_text("{broken", encoding="utf-8")
+
+        reloaded = self._cache()
+
+        self.assertEqual(len(reloaded), 0)
+        reloaded.put_many(["b"], [[2.0]])
+        self.assertEqual(reloaded.get_many(["b"]), [[2.0]])
+
+
+class TestQueryEmbeddingCache(unittest.TestCase):
+    """Tests for QueryEmbeddingCache"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def test_normalized_query_hits(self):
+        """Whitespace and full-width variants share one entry"""
+        cache = QueryEmbeddingCache()
+        cache.put("bge-m3", "  Ｐｙｔｈｏｎ　非同期 ", [0.5, 1.0])
+
+        self.assertEqual(normalize_query("  Ｐｙｔｈｏｎ　非同期 "), "Python 非同期")
+        self.assertEqual(cache.get("bge-m3", "Python 非同期"), [0.5, 1.0])
+        self.assertIsNone(cache.get("other-model", "Python 非同期"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_lru_eviction(self):
+        """Least recently used queries are dropped from memory"""
+        cache = QueryEmbeddingCache(max_entries=2)
+        cache.put("m", "a", [1.0])
+        cache.put("m", "b", [2.0])
+        cache.get("m", "a")
+        cache.put("m", "c", [3.0])
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("m", "b"))
+        self.assertEqual(cache.get("m", "a"), [1.0])
+
+    def test_persisted_across_instances(self):
+        """With a directory, queries are reloaded by a new cache"""
+        QueryEmbeddingCache(directory=self.temp_dir).put("bge-m3", "query", [0.5, -2.0])
+
+        cache = QueryEmbeddingCache(directory=self.temp_dir)
+
+        self.assertEqual(cache.get("bge-m3", " query"), [0.5, -2.0])
+        self.assertEqual(len(cache), 1)  # Promoted to memory
+
+    def test_shared_directory(self):
+        """Caches on one directory (e.g. CLI and daemon) see each other's queries"""
+        first = QueryEmbeddingCache(directory=self.temp_dir)
+        second = QueryEmbeddingCache(directory=self.temp_dir)
+        first.put("bge-m3", "a", [1.0, 0.0])
+        second.put_many("bge-m3", ["b"], [[2.0, 0.0]])
+        first.put("bge-m3", "c", [3.0, 0.0])
+
+        for cache in (first, second, QueryEmbeddingCache(directory=self.temp_dir)):
+            self.assertEqual(
+                [cache.get("bge-m3", text) for text in ("a", "b", "c")],
+                [[1.0, 0.0], [2.0, 0.0], [3.0, 0.0]],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 """
-Tests for Indexing Pipeline - scan_vault, chunk_document, create_indexing_pipeline, index_vault
+Tests for Indexing Pipeline - scan_vault, chunk_document, create_indexing_pipeline, index_vault,
+streaming batches
 """
 
 from __future__ import annotations
@@ -16,15 +17,22 @@ from src.rag.exceptions import IndexingError
 from src.rag.pipelines.indexing import (
     Document,
     DocumentMeta,
+    IndexingProgress,
     IndexingResult,
+    _load_document,
     chunk_document,
     chunk_documents,
     create_indexing_pipeline,
     extract_metadata,
+    find_eligible_files,
     index_vault,
+    is_normalized_header,
+    iter_chunk_batches,
     parse_frontmatter,
     scan_vault,
+    scan_vaults,
 )
+from src.rag.stores.manifest import IndexManifest
 
 
 class TestParseFrontmatter(unittest.TestCase):
@@ -291,6 +299,87 @@ Body content only.
         self.assertNotIn("---", docs[0].content)
 
 
+class TestParallelScan(unittest.TestCase):
+    """Tests for header-first parallel scanning"""
+
+    def setUp(self):
+        """Create temporary vault"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.vault_path = Path(self.temp_dir) / "vault"
+        self.vault_path.mkdir()
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_is_normalized_header(self):
+        """Header decides eligibility without YAML parsing"""
+        self.assertTrue(is_normalized_header(b"---\ntitle: A\nnormalized: true\n---\nbody"))
+        self.assertTrue(is_normalized_header(b"---\nnormalized: True  # done\n---\n"))
+        self.assertFalse(is_normalized_header(b"---\nnormalized: false\n---\nbody"))
+        self.assertFalse(is_normalized_header(b"---\ntitle: A\n---\nnormalized: true\n"))
+        self.assertFalse(is_normalized_header(b"# No frontmatter\nnormalized: true\n"))
+        # Frontmatter not closed within the header: undecided
+        self.assertIsNone(is_normalized_header(b"---\ntitle: A\nsummary: long"))
+
+    def test_skips_without_reading_body(self):
+        """Non-normalized files are counted as skipped; bodies read only for candidates"""
+        (self.vault_path / "yes.md").write_text(
+            "---\ntitle: Yes\nnormalized: true\n---\n\nBody\n", encoding="utf-8"
+        )
+        (self.vault_path / "no.md").write_text(
+            "---\ntitle: No\nnormalized: false\n---\n\n" + "x" * 100000, encoding="utf-8"
+        )
+        (self.vault_path / "plain.md").write_text("No frontmatter\n", encoding="utf-8")
+
+        scan = find_eligible_files(self.vault_path, "test-vault", workers=4)
+
+        self.assertEqual(scan.scanned_files, 3)
+        self.assertEqual(scan.skipped_files, 2)
+        self.assertEqual([p.name for p in scan.eligible], ["yes.md"])
+
+    def test_long_frontmatter_falls_back_to_full_parse(self):
+        """Frontmatter larger than the header is confirmed by YAML"""
+        summary = "長い要約。" * 2000
+        (self.vault_path / "long.md").write_text(
+            f"---\nsummary: {summary}\nnormalized: true\n---\n\nBody\n", encoding="utf-8"
+        )
+
+        docs = scan_vault(self.vault_path, "test-vault")
+
+        self.assertEqual(len(docs), 1)
+
+    def test_unreadable_files_are_reported(self):
+        """Read failures are reported instead of silently dropped"""
+        (self.vault_path / "dir.md").mkdir()
+        (self.vault_path / "bad.md").write_bytes(b"---\nnormalized: true\n---\n\xff\xfe")
+        (self.vault_path / "ok.md").write_text(
+            "---\nnormalized: true\n---\n\nBody\n", encoding="utf-8"
+        )
+
+        result = index_vault(MagicMock(), self.vault_path, "test-vault", dry_run=True)
+
+        self.assertEqual(result.total_docs, 1)
+        self.assertEqual(len(result.scan_errors), 2)
+        self.assertTrue(any("bad.md" in e for e in result.scan_errors))
+        self.assertEqual(result.errors, [])
+
+    def test_scan_vaults_concurrently(self):
+        """All vaults are scanned; missing vaults return IndexingError"""
+        for name in ("a", "b"):
+            vault = Path(self.temp_dir) / name
+            vault.mkdir()
+            (vault / "n.md").write_text("---\nnormalized: true\n---\n\nx\n", encoding="utf-8")
+
+        scans = scan_vaults(Path(self.temp_dir), ["a", "b", "missing"])
+
+        self.assertEqual(len(scans["a"].eligible), 1)
+        self.assertEqual(len(scans["b"].eligible), 1)
+        self.assertIsInstance(scans["missing"], IndexingError)
+
+
 class TestChunkDocument(unittest.TestCase):
     """Tests for chunk_document function"""
 
@@ -431,7 +520,7 @@ class TestCreateIndexingPipeline(unittest.TestCase):
     """Tests for create_indexing_pipeline function"""
 
     @patch("src.rag.pipelines.indexing.Pipeline")
-    @patch("src.rag.pipelines.indexing.OllamaDocumentEmbedder")
+    @patch("src.rag.pipelines.indexing.AdaptiveDocumentEmbedder")
     @patch("src.rag.pipelines.indexing.DocumentWriter")
     def test_pipeline_has_components(self, mock_writer_cls, mock_embedder_cls, mock_pipeline_cls):
         """Pipeline adds embedder and writer components"""
@@ -448,7 +537,7 @@ class TestCreateIndexingPipeline(unittest.TestCase):
         self.assertEqual(add_calls[1][0][0], "writer")
 
     @patch("src.rag.pipelines.indexing.Pipeline")
-    @patch("src.rag.pipelines.indexing.OllamaDocumentEmbedder")
+    @patch("src.rag.pipelines.indexing.AdaptiveDocumentEmbedder")
     @patch("src.rag.pipelines.indexing.DocumentWriter")
     def test_pipeline_uses_config(self, mock_writer_cls, mock_embedder_cls, mock_pipeline_cls):
         """Pipeline uses provided config"""
@@ -468,7 +557,7 @@ class TestCreateIndexingPipeline(unittest.TestCase):
         )
 
     @patch("src.rag.pipelines.indexing.Pipeline")
-    @patch("src.rag.pipelines.indexing.OllamaDocumentEmbedder")
+    @patch("src.rag.pipelines.indexing.AdaptiveDocumentEmbedder")
     @patch("src.rag.pipelines.indexing.DocumentWriter")
     def test_pipeline_uses_default_config(
         self, mock_writer_cls, mock_embedder_cls, mock_pipeline_cls
@@ -484,7 +573,7 @@ class TestCreateIndexingPipeline(unittest.TestCase):
         self.assertEqual(call_kwargs["model"], "bge-m3")
 
     @patch("src.rag.pipelines.indexing.Pipeline")
-    @patch("src.rag.pipelines.indexing.OllamaDocumentEmbedder")
+    @patch("src.rag.pipelines.indexing.AdaptiveDocumentEmbedder")
     @patch("src.rag.pipelines.indexing.DocumentWriter")
     def test_pipeline_connects_components(
         self, mock_writer_cls, mock_embedder_cls, mock_pipeline_cls
@@ -651,6 +740,275 @@ Skip this.
         self.assertEqual(result.total_docs, 1)
 
 
+class TestIncrementalIndexing(unittest.TestCase):
+    """Tests for incremental indexing with IndexManifest"""
+
+    def setUp(self):
+        """Create temporary vault and manifest"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.vault_path = Path(self.temp_dir) / "vault"
+        self.vault_path.mkdir()
+        self.manifest = IndexManifest(Path(self.temp_dir) / "index_manifest.json")
+        self.store = MagicMock()
+        self.pipeline = MagicMock()
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, name: str, file_id: str, body: str) -> Path:
+        path = self.vault_path / f"{name}.md"
+        path.write_text(
+            f"---\ntitle: {name}\nfile_id: {file_id}\nnormalized: true\n---\n\n{body}\n",
+            encoding="utf-8",
+        )
+        return path
+
+    def _index(self, **kwargs) -> IndexingResult:
+        return index_vault(
+            self.pipeline,
+            self.vault_path,
+            "test-vault",
+            store=self.store,
+            manifest=self.manifest,
+            **kwargs,
+        )
+
+    def _embedded_paths(self) -> set[str]:
+        chunks = self.pipeline.run.call_args[0][0]["embedder"]["documents"]
+        return {Path(c.meta["file_path"]).name for c in chunks}
+
+    def test_first_run_indexes_all_and_saves_manifest(self):
+        """First run indexes every document and persists the manifest"""
+        self._write("a", "id-a", "Alpha")
+        self._write("b", "id-b", "Beta")
+
+        result = self._index()
+
+        self.assertEqual(result.indexed_docs, 2)
+        self.assertEqual(result.unchanged_docs, 0)
+        self.assertEqual(set(self.manifest.entries), {"id-a", "id-b"})
+        self.assertTrue(self.manifest.path.exists())
+        self.assertEqual(self.manifest.get("id-a").chunk_count, 1)
+
+    def test_second_run_skips_unchanged(self):
+        """Unchanged documents are not re-embedded"""
+        self._write("a", "id-a", "Alpha")
+        self._index()
+        self.pipeline.reset_mock()
+
+        result = self._index()
+
+        self.assertEqual(result.total_docs, 1)
+        self.assertEqual(result.indexed_docs, 0)
+        self.assertEqual(result.unchanged_docs, 1)
+        self.pipeline.run.assert_not_called()
+        self.store.delete_by_filter.assert_not_called()
+
+    def test_modified_file_is_reindexed_and_old_chunks_deleted(self):
+        """Modified documents have old chunks deleted and are re-embedded"""
+        path = self._write("a", "id-a", "Alpha")
+        self._write("b", "id-b", "Beta")
+        self._index()
+        self.pipeline.reset_mock()
+
+        self._write("a", "id-a", "Alpha v2")
+        result = self._index()
+
+        self.assertEqual(result.indexed_docs, 1)
+        self.assertEqual(result.unchanged_docs, 1)
+        self.assertEqual(result.deleted_docs, 1)
+        self.assertEqual(self._embedded_paths(), {"a.md"})
+        self.store.delete_by_filter.assert_called_once_with(
+            {"field": "meta.file_path", "operator": "==", "value": str(path)}
+        )
+
+    def test_removed_file_chunks_are_deleted(self):
+        """Files removed from the vault are deleted from the store and manifest"""
+        self._write("a", "id-a", "Alpha")
+        path_b = self._write("b", "id-b", "Beta")
+        self._index()
+        self.pipeline.reset_mock()
+
+        path_b.unlink()
+        result = self._index()
+
+        self.assertEqual(result.deleted_docs, 1)
+        self.pipeline.run.assert_not_called()
+        self.assertIsNone(self.manifest.get("id-b"))
+        self.store.delete_by_filter.assert_called_once_with(
+            {"field": "meta.file_path", "operator": "==", "value": str(path_b)}
+        )
+
+    def test_full_rebuild_reindexes_everything(self):
+        """full=True deletes the vault's chunks and re-embeds every document"""
+        self._write("a", "id-a", "Alpha")
+        self._write("b", "id-b", "Beta")
+        self._index()
+        self.pipeline.reset_mock()
+
+        result = self._index(full=True)
+
+        self.assertEqual(result.indexed_docs, 2)
+        self.assertEqual(self._embedded_paths(), {"a.md", "b.md"})
+        self.store.delete_by_filter.assert_called_once_with(
+            {"field": "meta.vault", "operator": "==", "value": "test-vault"}
+        )
+
+    def test_unchanged_files_not_read(self):
+        """Files whose mtime and size match the manifest are not read or hashed"""
+        self._write("a", "id-a", "Alpha")
+        self._index()
+
+        with patch("src.rag.pipelines.indexing._load_document", wraps=_load_document) as mock_load:
+            result = self._index()
+
+        self.assertEqual(result.unchanged_docs, 1)
+        mock_load.assert_not_called()
+
+    def test_duplicate_file_id_copies_are_stable(self):
+        """Copies sharing a file_id are indexed separately and never delete each other"""
+        self._write("a", "id-x", "Alpha")
+        copy = self._write("a_1", "id-x", "Alpha copy")
+
+        self.assertEqual(self._index().indexed_docs, 2)
+        self.assertEqual(set(self.manifest.entries), {"id-x", str(copy)})
+
+        for _ in range(2):
+            self.pipeline.reset_mock()
+            self.store.reset_mock()
+            result = self._index()
+            self.assertEqual((result.indexed_docs, result.unchanged_docs), (0, 2))
+            self.store.delete_by_filter.assert_not_called()
+
+        self._write("a_1", "id-x", "Alpha copy v2")
+        self._index()
+
+        self.assertEqual(self._embedded_paths(), {"a_1.md"})
+        self.store.delete_by_filter.assert_called_once_with(
+            {"field": "meta.file_path", "operator": "==", "value": str(copy)}
+        )
+
+    def test_pipeline_error_keeps_manifest_for_retry(self):
+        """Failed embedding does not record documents as indexed"""
+        self._write("a", "id-a", "Alpha")
+        self.pipeline.run.side_effect = RuntimeError("timeout")
+
+        result = self._index()
+
+        self.assertEqual(result.indexed_docs, 0)
+        self.assertIsNone(self.manifest.get("id-a"))
+
+
+class TestStreamingIndexing(unittest.TestCase):
+    """Tests for batched (streaming) indexing with per-batch commit"""
+
+    def setUp(self):
+        """Create temporary vault with three documents"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.vault_path = Path(self.temp_dir) / "vault"
+        self.vault_path.mkdir()
+        self.manifest = IndexManifest(Path(self.temp_dir) / "index_manifest.json")
+        self.store = MagicMock()
+        self.pipeline = MagicMock()
+        self.config = RAGConfig(index_batch_size=1)
+        for name in ("a", "b", "c"):
+            (self.vault_path / f"{name}.md").write_text(
+                f"---\ntitle: {name}\nfile_id: id-{name}\nnormalized: true\n---\n\n{name}\n",
+                encoding="utf-8",
+            )
+
+    def tearDown(self):
+        """Clean up temporary directory"""
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _index(self, **kwargs) -> IndexingResult:
+        return index_vault(
+            self.pipeline,
+            self.vault_path,
+            "test-vault",
+            rag_config_override=self.config,
+            store=self.store,
+            manifest=self.manifest,
+            **kwargs,
+        )
+
+    def test_one_pipeline_run_per_batch(self):
+        """Each batch is embedded and written separately"""
+        progress: list[IndexingProgress] = []
+
+        result = self._index(progress=progress.append)
+
+        self.assertEqual(self.pipeline.run.call_count, 3)
+        self.assertEqual(result.batches, 3)
+        self.assertEqual(result.indexed_docs, 3)
+        self.assertEqual([p.batch for p in progress], [1, 2, 3])
+        self.assertEqual(progress[-1].indexed_docs, 3)
+        self.assertEqual(progress[-1].total_chunks, 3)
+
+    def test_failure_keeps_committed_batches(self):
+        """A failed batch loses only itself; earlier batches stay in the manifest"""
+        self.pipeline.run.side_effect = [None, RuntimeError("Connection timeout"), None]
+
+        result = self._index()
+
+        self.assertEqual(result.indexed_docs, 1)
+        self.assertEqual(result.batches, 1)
+        self.assertIn("Connection timeout", result.errors[0])
+        self.assertEqual(len(IndexManifest.load(self.manifest.path).entries), 1)
+
+        # The next incremental run resumes with the remaining documents
+        self.pipeline.run.side_effect = None
+        result = self._index()
+
+        self.assertEqual(result.indexed_docs, 2)
+        self.assertEqual(result.unchanged_docs, 1)
+        self.assertEqual(len(self.manifest.entries), 3)
+
+    def test_removed_files_not_deleted_after_failure(self):
+        """Removed-file cleanup is skipped when the scan did not complete"""
+        self._index()
+        self.store.reset_mock()
+        (self.vault_path / "a.md").unlink()
+        (self.vault_path / "b.md").write_text(
+            "---\ntitle: b\nfile_id: id-b\nnormalized: true\n---\n\nb v2\n", encoding="utf-8"
+        )
+        self.pipeline.run.side_effect = RuntimeError("down")
+
+        result = self._index()
+
+        self.assertEqual(len(result.errors), 1)
+        self.assertIsNotNone(self.manifest.get("id-a"))
+        self.assertIsNone(self.manifest.get("id-b"))  # Deleted before the failed write
+
+    def test_iter_chunk_batches_keeps_documents_whole(self):
+        """Batches close after reaching batch_size chunks without splitting a document"""
+        from src.rag.pipelines.chunking import MarkdownChunker
+
+        docs = [
+            Document(
+                file_path=Path(f"/test/doc{i}.md"),
+                title=f"Doc {i}",
+                content="文です。" * 30,
+                metadata=DocumentMeta(),
+                vault_name="test",
+            )
+            for i in range(5)
+        ]
+
+        batches = list(iter_chunk_batches(iter(docs), MarkdownChunker(50, 0), batch_size=4))
+
+        for batch_docs, batch_chunks in batches:
+            paths = {c.meta["file_path"] for c in batch_chunks}
+            self.assertEqual(paths, {str(d.file_path) for d in batch_docs})
+        self.assertEqual(sum(len(b[0]) for b in batches), 5)
+        self.assertGreater(len(batches), 1)
+
+
 class TestIndexingResult(unittest.TestCase):
     """Tests for IndexingResult dataclass"""
 
@@ -0,0 +1,186 @@
+"""
+Tests for Lexical Index - FTS5 trigram search, filters, deletes, hybrid pipelines
+"""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+from haystack import Document, component
+
+from src.rag.exceptions import QueryError
+from src.rag.pipelines.query import (
+    QueryFilters,
+    build_qdrant_filters,
+    create_search_pipeline,
+    search,
+)
+from src.rag.stores.embedding_cache import QueryEmbeddingCache
+from src.rag.stores.lexical import LexicalIndex, build_match_query
+from src.rag.stores.numpy_store import NumpyDocumentStore
+
+
+def _doc(i: int, content: str, vault: str, tags: list[str], created: str) -> Document:
+    return Document(
+        content=content,
+        embedding=[1.0, float(i), 0.0, 0.0],
+        meta={
+            "title": f"note{i}",
+            "file_path": f"/v/{i}.md",
+            "vault": vault,
+            "tags": tags,
+            "created": created,
+            "position": 0,
+        },
+    )
+
+
+DOCS = [
+    _doc(0, "Kubernetes の Pod 運用についてのメモ", "エンジニア", ["k8s"], "2024-01-10"),
+    _doc(1, "Python asyncio で非同期処理を書く", "エンジニア", ["python"], "2024-03-01"),
+    _doc(2, "家計簿の運用ルールと予算管理", "日常", [], "2024-02-15"),
+]
+
+
+class TestBuildMatchQuery(unittest.TestCase):
+    """Tests for build_match_query"""
+
+    def test_trigrams_are_ored(self):
+        self.assertEqual(build_match_query("Kuber"), '"kub" OR "ube" OR "ber"')
+
+    def test_short_terms_have_no_trigrams(self):
+        self.assertIsNone(build_match_query("運用 Go"))
+
+    def test_duplicate_trigrams_once(self):
+        self.assertEqual(build_match_query("運用運用"), '"運用運" OR "用運用"')
+
+    def test_trigram_cap_spans_terms(self):
+        with patch("src.rag.stores.lexical.MAX_QUERY_TRIGRAMS", 3):
+            self.assertEqual(build_match_query("abcd efgh"), '"abc" OR "bcd" OR "efg"')
+
+
+class TestLexicalIndex(unittest.TestCase):
+    """Tests for LexicalIndex"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.index = LexicalIndex(self.temp_dir / "lexical.sqlite3")
+        self.addCleanup(self.index.close)
+        self.index.write_documents(DOCS)
+
+    def _titles(self, documents: list[Document]) -> list[str]:
+        return [doc.meta["title"] for doc in documents]
+
+    def test_japanese_substring_search(self):
+        """Japanese text is found without word segmentation"""
+        self.assertEqual(self._titles(self.index.search("非同期処理")), ["note1"])
+
+    def test_bm25_ranking(self):
+        """Documents matching more of the query rank first"""
+        results = self.index.search("Kubernetes Pod")
+
+        self.assertEqual(results[0].meta["title"], "note0")
+        self.assertGreater(results[0].score, 0)
+
+    def test_short_query_falls_back_to_substring(self):
+        """Two-character Japanese words are matched by substring"""
+        self.assertEqual(sorted(self._titles(self.index.search("運用"))), ["note0", "note2"])
+
+    def test_filters_from_query_filters(self):
+        """Filters built by build_qdrant_filters are applied"""
+        filters = build_qdrant_filters(QueryFilters(vaults=["日常"]))
+        self.assertEqual(self._titles(self.index.search("運用", filters=filters)), ["note2"])
+
+        filters = build_qdrant_filters(
+            QueryFilters(tags=["k8s"], date_from=date(2024, 1, 1), date_to=date(2024, 1, 31))
+        )
+        self.assertEqual(self._titles(self.index.search("運用", filters=filters)), ["note0"])
+
+    def test_rewrite_replaces_by_id(self):
+        """Writing the same document id again does not duplicate it"""
+        self.index.write_documents(DOCS)
+
+        self.assertEqual(self.index.count_documents(), 3)
+
+    def test_delete_by_filter(self):
+        """Deleted chunks disappear from the full-text index"""
+        deleted = self.index.delete_by_filter(
+            {"field": "meta.file_path", "operator": "==", "value": "/v/0.md"}
+        )
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(self._titles(self.index.search("運用")), ["note2"])
+        self.assertEqual(self.index.search("Kubernetes"), [])
+
+    def test_persists(self):
+        """Index is reopened from disk"""
+        self.index.close()
+        reopened = LexicalIndex(self.temp_dir / "lexical.sqlite3")
+
+        self.assertEqual(reopened.count_documents(), 3)
+        reopened.close()
+
+
+@component
+class _FakeTextEmbedder:
+    """Stands in for OllamaTextEmbedder (no embedding server)"""
+
+    def __init__(self, **kwargs):
+        pass
+
+    @component.output_types(embedding=list[float])
+    def run(self, text: str):
+        return {"embedding": [1.0, 1.0, 0.0, 0.0]}
+
+
+class TestSearchModes(unittest.TestCase):
+    """Search pipelines in lexical and hybrid modes"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.store = NumpyDocumentStore(self.temp_dir / "vectors", embedding_dim=4)
+        self.store.write_documents(DOCS)
+        self.index = LexicalIndex(self.temp_dir / "lexical.sqlite3")
+        self.addCleanup(self.index.close)
+        self.index.write_documents(DOCS)
+
+    def test_lexical_mode_needs_no_embedder(self):
+        """Lexical pipeline has no embedder and returns full-text matches"""
+        with patch("src.rag.pipelines.query.OllamaTextEmbedder") as mock_embedder:
+            pipeline = create_search_pipeline(None, mode="lexical", lexical=self.index)
+            response = search(pipeline, "非同期処理", mode="lexical")
+
+        mock_embedder.assert_not_called()
+        self.assertEqual([r.title for r in response.results], ["note1"])
+
+    @patch("src.rag.pipelines.query.OllamaTextEmbedder", _FakeTextEmbedder)
+    def test_hybrid_fuses_rankings(self):
+        """Hybrid results contain documents found by either retriever, deduplicated"""
+        pipeline = create_search_pipeline(
+            self.store, mode="hybrid", lexical=self.index, query_cache=QueryEmbeddingCache()
+        )
+
+        response = search(pipeline, "家計簿の運用", top_k=3, mode="hybrid")
+
+        titles = [r.title for r in response.results]
+        self.assertEqual(len(titles), len(set(titles)))
+        self.assertEqual(titles[0], "note2")  # Top lexical match, also a dense candidate
+
+    def test_lexical_mode_requires_index(self):
+        with self.assertRaises(QueryError):
+            create_search_pipeline(self.store, mode="lexical")
+
+    def test_unknown_mode(self):
+        with self.assertRaises(QueryError):
+            create_search_pipeline(self.store, mode="sparse", lexical=self.index)
+
+
+if __name__ == "__main__":
+    unittest.main()
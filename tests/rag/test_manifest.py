@@ -0,0 +1,77 @@
+"""
+Tests for Index Manifest - load/save, vault filtering
+"""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.rag.stores.manifest import IndexManifest, ManifestEntry
+
+
+def _entry(key: str, vault: str = "エンジニア", content_hash: str = "h") -> ManifestEntry:
+    return ManifestEntry(
+        key=key,
+        file_path=f"/vaults/{vault}/{key}.md",
+        vault=vault,
+        content_hash=content_hash,
+        mtime=1.0,
+        chunk_count=2,
+    )
+
+
+class TestIndexManifest(unittest.TestCase):
+    """Tests for IndexManifest"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = Path(self.temp_dir) / "rag" / "index_manifest.json"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_load_missing_file_returns_empty(self):
+        """Missing manifest file yields empty manifest"""
+        manifest = IndexManifest.load(self.path)
+
+        self.assertEqual(manifest.entries, {})
+        self.assertEqual(manifest.path, self.path)
+
+    def test_save_and_load_roundtrip(self):
+        """Saved entries are restored on load"""
+        manifest = IndexManifest(self.path)
+        manifest.set(_entry("abc123"))
+        manifest.save()
+
+        loaded = IndexManifest.load(self.path)
+
+        self.assertEqual(loaded.get("abc123"), _entry("abc123"))
+
+    def test_load_corrupted_file_returns_empty(self):
+        """Corrupted manifest is treated as empty (forces full reindex)"""
+        self.path.parent.mkdir(parents=True)
+        self.path.write_text("{not json", encoding="utf-8")
+
+        manifest = IndexManifest.load(self.path)
+
+        self.assertEqual(manifest.entries, {})
+
+    def test_entries_for_vault_and_clear(self):
+        """Entries can be listed and cleared per vault"""
+        manifest = IndexManifest(self.path)
+        manifest.set(_entry("a", vault="エンジニア"))
+        manifest.set(_entry("b", vault="ビジネス"))
+
+        self.assertEqual([e.key for e in manifest.entries_for_vault("エンジニア")], ["a"])
+
+        manifest.clear_vault("エンジニア")
+
+        self.assertIsNone(manifest.get("a"))
+        self.assertIsNotNone(manifest.get("b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
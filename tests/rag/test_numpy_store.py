@@ -0,0 +1,257 @@
+"""
+Tests for NumPy Document Store - exact search, vectorized filters, persistence, lock-free readers
+"""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+from haystack import Document
+from haystack.document_stores.errors import DuplicateDocumentError
+from haystack.document_stores.types import DuplicatePolicy
+
+from src.rag.pipelines.query import QueryFilters, build_qdrant_filters
+from src.rag.stores.numpy_store import NumpyDocumentStore, NumpyEmbeddingRetriever
+
+DIM = 4
+
+
+def _doc(
+    i: int, vault: str = "エンジニア", tags: list[str] | None = None, created: str = ""
+) -> Document:
+    return Document(
+        content=f"chunk {i}",
+        embedding=[1.0, float(i), 0.0, 0.0],
+        meta={
+            "file_path": f"/v/{i}.md",
+            "vault": vault,
+            "tags": tags or [],
+            "created": created,
+            "position": i,
+        },
+    )
+
+
+class TestNumpyDocumentStore(unittest.TestCase):
+    """Tests for NumpyDocumentStore"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def _store(self) -> NumpyDocumentStore:
+        return NumpyDocumentStore(self.temp_dir / "collection", embedding_dim=DIM)
+
+    def test_empty_store(self):
+        """A store without files has no documents"""
+        store = self._store()
+
+        self.assertEqual(store.count_documents(), 0)
+        self.assertEqual(store.embedding_retrieval([1.0, 0.0, 0.0, 0.0]), [])
+
+    def test_exact_cosine_search(self):
+        """Results are ordered by cosine similarity"""
+        store = self._store()
+        store.write_documents([_doc(i) for i in range(10)])
+
+        results = store.embedding_retrieval([1.0, 3.0, 0.0, 0.0], top_k=3)
+
+        self.assertEqual([doc.content for doc in results], ["chunk 3", "chunk 4", "chunk 5"])
+        self.assertAlmostEqual(results[0].score, 1.0, places=3)
+        self.assertEqual(results[0].meta["file_path"], "/v/3.md")
+
+    def test_blocked_search_matches_full_matmul(self):
+        """Block-wise top-k equals top-k of a single matrix product"""
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(300, DIM)).astype(np.float32)
+        store = self._store()
+        store.write_documents(
+            [Document(content=f"d{i}", embedding=v.tolist()) for i, v in enumerate(vectors)]
+        )
+        query = rng.normal(size=DIM).astype(np.float32)
+
+        with patch("src.rag.stores.numpy_store.SEARCH_BLOCK_ROWS", 32):
+            results = store.embedding_retrieval(query.tolist(), top_k=10)
+
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        expected = np.argsort(-(normalized.astype(np.float16).astype(np.float32) @ query))[:10]
+        self.assertEqual([doc.content for doc in results], [f"d{i}" for i in expected])
+
+    def test_persists_across_instances(self):
+        """Committed documents are visible to a new instance"""
+        self._store().write_documents([_doc(i) for i in range(5)])
+
+        store = self._store()
+
+        self.assertEqual(store.count_documents(), 5)
+        self.assertEqual(
+            store.embedding_retrieval([0.0, 1.0, 0.0, 0.0], top_k=1)[0].content, "chunk 4"
+        )
+
+    def test_duplicate_policies(self):
+        """Same id overwrites by default, SKIP keeps, FAIL raises"""
+        store = self._store()
+        store.write_documents([_doc(1)])
+
+        self.assertEqual(store.write_documents([_doc(1)], policy=DuplicatePolicy.SKIP), 0)
+        with self.assertRaises(DuplicateDocumentError):
+            store.write_documents([_doc(1)], policy=DuplicatePolicy.FAIL)
+        store.write_documents([_doc(1)])
+
+        self.assertEqual(store.count_documents(), 1)
+
+    def test_missing_embedding_rejected(self):
+        """Documents without an embedding of the store dimension are rejected"""
+        with self.assertRaises(ValueError):
+            self._store().write_documents([Document(content="x")])
+
+    def test_delete_by_filter(self):
+        """Matching documents are removed from search results"""
+        store = self._store()
+        store.write_documents([_doc(i) for i in range(6)])
+
+        deleted = store.delete_by_filter(
+            {"field": "meta.file_path", "operator": "==", "value": "/v/5.md"}
+        )
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(store.count_documents(), 5)
+        results = store.embedding_retrieval([0.0, 1.0, 0.0, 0.0], top_k=1)
+        self.assertEqual(results[0].content, "chunk 4")
+
+    def test_compaction_keeps_live_rows(self):
+        """Deleting most rows rewrites live rows into a new generation"""
+        store = self._store()
+        store.write_documents([_doc(i) for i in range(20)])
+
+        with patch("src.rag.stores.numpy_store.COMPACT_MIN_ROWS", 10):
+            store.delete_by_filter({"field": "meta.position", "operator": "<", "value": 15})
+
+        self.assertEqual(store.count_documents(), 5)
+        self.assertEqual(len(list(store.path.glob("vectors.*.f16"))), 1)
+        self.assertTrue((store.path / "vectors.1.f16").exists())
+        self.assertEqual(
+            self._store().embedding_retrieval([0.0, 1.0, 0.0, 0.0], top_k=1)[0].content, "chunk 19"
+        )
+
+    def test_reader_sees_writes_without_locking(self):
+        """A second instance reads committed batches while another instance writes"""
+        writer = self._store()
+        reader = self._store()
+        writer.write_documents([_doc(i) for i in range(3)])
+        self.assertEqual(reader.count_documents(), 3)
+
+        writer.write_documents([_doc(i) for i in range(3, 6)])
+
+        self.assertEqual(reader.count_documents(), 6)
+        self.assertEqual(
+            reader.embedding_retrieval([0.0, 1.0, 0.0, 0.0], top_k=1)[0].content, "chunk 5"
+        )
+
+    def test_uncommitted_appends_ignored(self):
+        """Rows past the committed manifest are invisible and truncated by the next writer"""
+        store = self._store()
+        store.write_documents([_doc(0)])
+        with open(store.path / "vectors.0.f16", "ab") as f:
+            f.write(b"\x00" * 5)  # Interrupted append
+
+        self.assertEqual(self._store().count_documents(), 1)
+        store.write_documents([_doc(1)])
+        self.assertEqual(self._store().count_documents(), 2)
+        self.assertEqual((store.path / "vectors.0.f16").stat().st_size, 2 * DIM * 2)
+
+    def test_dimension_mismatch(self):
+        """Opening a store with another dimension fails"""
+        self._store().write_documents([_doc(0)])
+
+        with self.assertRaises(ValueError):
+            NumpyDocumentStore(self.temp_dir / "collection", embedding_dim=8).count_documents()
+
+
+class TestNumpyFilters(unittest.TestCase):
+    """Filters built by build_qdrant_filters"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.store = NumpyDocumentStore(self.temp_dir / "collection", embedding_dim=DIM)
+        self.store.write_documents(
+            [
+                _doc(0, "エンジニア", ["python", "ai"], "2024-01-10"),
+                _doc(1, "エンジニア", ["python"], "2024-03-01"),
+                _doc(2, "ビジネス", ["ai"], "2024-02-15"),
+                _doc(3, "日常", [], ""),
+            ]
+        )
+
+    def _search(self, filters: QueryFilters) -> list[int]:
+        results = self.store.embedding_retrieval(
+            [1.0, 0.0, 0.0, 0.0], filters=build_qdrant_filters(filters), top_k=10
+        )
+        return sorted(doc.meta["position"] for doc in results)
+
+    def test_single_vault(self):
+        self.assertEqual(self._search(QueryFilters(vaults=["エンジニア"])), [0, 1])
+
+    def test_multiple_vaults(self):
+        self.assertEqual(self._search(QueryFilters(vaults=["ビジネス", "日常"])), [2, 3])
+
+    def test_tags_are_anded(self):
+        self.assertEqual(self._search(QueryFilters(tags=["python"])), [0, 1])
+        self.assertEqual(self._search(QueryFilters(tags=["python", "ai"])), [0])
+
+    def test_date_range(self):
+        filters = QueryFilters(date_from=date(2024, 2, 1), date_to=date(2024, 3, 1))
+        self.assertEqual(self._search(filters), [1, 2])
+
+    def test_combined(self):
+        filters = QueryFilters(vaults=["エンジニア"], tags=["ai"], date_to=date(2024, 1, 31))
+        self.assertEqual(self._search(filters), [0])
+
+    def test_logical_operators(self):
+        """OR and NOT combine conditions"""
+        filters = {
+            "operator": "OR",
+            "conditions": [
+                {"field": "meta.vault", "operator": "==", "value": "日常"},
+                {
+                    "operator": "NOT",
+                    "conditions": [
+                        {"field": "meta.vault", "operator": "in", "value": ["エンジニア", "日常"]}
+                    ],
+                },
+            ],
+        }
+        results = self.store.filter_documents(filters)
+        self.assertEqual(sorted(doc.meta["position"] for doc in results), [2, 3])
+
+
+class TestNumpyEmbeddingRetriever(unittest.TestCase):
+    """Tests for NumpyEmbeddingRetriever"""
+
+    def test_run(self):
+        """Retriever returns top_k documents for the query embedding"""
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        store = NumpyDocumentStore(temp_dir, embedding_dim=DIM)
+        store.write_documents([_doc(i) for i in range(5)])
+
+        result = NumpyEmbeddingRetriever(document_store=store).run(
+            query_embedding=[0.0, 1.0, 0.0, 0.0], top_k=2
+        )
+
+        self.assertEqual([doc.content for doc in result["documents"]], ["chunk 4", "chunk 3"])
+
+    def test_rejects_other_stores(self):
+        with self.assertRaises(ValueError):
+            NumpyEmbeddingRetriever(document_store=object())
+
+
+if __name__ == "__main__":
+    unittest.main()
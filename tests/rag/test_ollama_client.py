@@ -224,6 +224,66 @@ class TestGetEmbedding(unittest.TestCase):
         self.assertIn("No embeddings", error)
 
 
+class TestGetEmbeddings(unittest.TestCase):
+    """get_embeddings() tests"""
+
+    @patch("src.rag.clients.ollama.requests.post")
+    def test_success(self, mock_post):
+        """Batch embedding returns one vector per text"""
+        from src.rag.clients.ollama import get_embeddings
+
+        mock_response = MagicMock()
+        mock_response.raise_for_status = MagicMock()
+        mock_response.json.return_value = {"embeddings": [[0.1], [0.2]]}
+        mock_post.return_value = mock_response
+
+        embeddings, error = get_embeddings(["a", "b"])
+
+        self.assertIsNone(error)
+        self.assertEqual(embeddings, [[0.1], [0.2]])
+        self.assertEqual(mock_post.call_args[1]["json"]["input"], ["a", "b"])
+
+    def test_empty_list(self):
+        """Empty input returns ([], None) without a request"""
+        from src.rag.clients.ollama import get_embeddings
+
+        self.assertEqual(get_embeddings([]), ([], None))
+
+    @patch("src.rag.clients.ollama.requests.post")
+    def test_count_mismatch(self, mock_post):
+        """Fewer embeddings than texts is an error"""
+        from src.rag.clients.ollama import get_embeddings
+
+        mock_response = MagicMock()
+        mock_response.raise_for_status = MagicMock()
+        mock_response.json.return_value = {"embeddings": [[0.1]]}
+        mock_post.return_value = mock_response
+
+        embeddings, error = get_embeddings(["a", "b"])
+
+        self.assertIsNone(embeddings)
+        self.assertIn("Expected 2 embeddings", error)
+
+    def test_uses_session(self):
+        """Provided session is used instead of requests.post"""
+        import requests
+
+        from src.rag.clients.ollama import get_embeddings
+
+        session = MagicMock()
+        session.post.return_value.json.return_value = {"embeddings": [[0.1]]}
+
+        embeddings, error = get_embeddings(["a"], session=session)
+
+        self.assertIsNone(error)
+        session.post.assert_called_once()
+
+        session.post.side_effect = requests.exceptions.Timeout()
+        embeddings, error = get_embeddings(["a"], session=session, timeout=5)
+        self.assertIsNone(embeddings)
+        self.assertIn("timeout", error)
+
+
 class TestGenerateResponse(unittest.TestCase):
     """generate_response() tests"""
 
@@ -9,12 +9,17 @@ Tests for Success Criteria validation:
 Edge Cases:
 - Mixed ja/en document search
 - Search during indexing
+
+These tests use mocked pipelines; measured latencies of the real components
+on synthetic 1k/10k/100k vaults come from scripts/bench_rag.py (make rag-bench).
 """
 
 from __future__ import annotations
 
 import os
 import shutil
+import subprocess
+import sys
 import tempfile
 import time
 import unittest
@@ -440,6 +445,58 @@ Content
         self.assertEqual(response.results[0].title, "Existing Doc")
 
 
+class TestCLIStartup(unittest.TestCase):
+    """CLI startup: heavy dependencies load only in the commands that need them."""
+
+    ROOT = Path(__file__).resolve().parents[2]
+    HEAVY_MODULES = ("haystack", "qdrant_client", "numpy")
+
+    def _run(self, code: str, env: dict[str, str] | None = None) -> tuple[float, str]:
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=self.ROOT,
+            capture_output=True,
+            text=True,
+            env={**os.environ, **(env or {})},
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        return time.perf_counter() - start, proc.stdout.strip().splitlines()[-1]
+
+    def test_cli_import_is_light(self):
+        """Importing the CLI (--help, argument errors) loads no heavy module"""
+        _, loaded = self._run(
+            "import sys, src.rag.cli; "
+            f"print([m for m in {self.HEAVY_MODULES!r} if m in sys.modules])"
+        )
+        self.assertEqual(loaded, "[]")
+
+    def test_status_uses_cached_stats(self):
+        """status answers from the stats cache without Haystack"""
+        base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, base_dir)
+        code = (
+            "import sys\n"
+            "from src.rag.stores.stats import save_collection_stats\n"
+            "save_collection_stats({'document_count': 7, 'collection_name': 'c', "
+            "'embedding_dim': 1024, 'similarity': 'cosine'})\n"
+            "from src.rag.cli import main\n"
+            "assert main(['status']) == 0\n"
+            f"print([m for m in {self.HEAVY_MODULES!r} if m in sys.modules])\n"
+        )
+        env = {"OBSIDIAN_BASE_DIR": base_dir, "RAG_STORE_BACKEND": "numpy", "RAG_USE_DAEMON": "0"}
+
+        _, loaded = self._run(code, env)
+
+        self.assertEqual(loaded, "[]")
+
+    @unittest.skipIf(SKIP_PERF_TESTS, SKIP_REASON)
+    def test_help_under_1_second(self):
+        """--version / --help return in well under a second"""
+        elapsed, _ = self._run("from src.rag.cli import main; main(['--version'])")
+        self.assertLess(elapsed, 1.0)
+
+
 class TestSuccessCriteriaValidation(unittest.TestCase):
     """
     Summary tests validating Success Criteria requirements.
@@ -0,0 +1,130 @@
+"""
+Tests for Precomputed Embeddings - record format, bulk import into the embedding cache
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.rag.config import rag_config
+from src.rag.pipelines.chunking import MarkdownChunker
+from src.rag.pipelines.indexing import embedding_texts, iter_vault
+from src.rag.stores.embedding_cache import EmbeddingCache, text_hash
+from src.rag.stores.precomputed import (
+    decode_vectors,
+    encode_record,
+    import_precomputed_embeddings,
+    record_matches,
+)
+
+NOTE = (
+    "---\n"
+    "title: Pod の再起動\n"
+    "file_id: a1b2c3d4e5f6\n"
+    "summary: Pod の再起動ポリシー\n"
+    "normalized: true\n"
+    "---\n"
+    "\n"
+    "## 概要\n"
+    "\n"
+    "Pod は再起動ポリシーに従って再作成される。\n"
+)
+
+
+class TestRecord(unittest.TestCase):
+    """Tests for encode_record / decode_vectors / record_matches"""
+
+    def test_round_trip(self):
+        record = encode_record("id", "bge-m3", ["a", "b"], [[0.5, 1.0], [0.25, -1.0]])
+
+        self.assertEqual(record["hashes"], [text_hash("a"), text_hash("b")])
+        self.assertEqual(decode_vectors(record).tolist(), [[0.5, 1.0], [0.25, -1.0]])
+        self.assertTrue(record_matches(record, "bge-m3", ["a", "b"]))
+        self.assertFalse(record_matches(record, "bge-m3", ["a", "c"]))
+        self.assertFalse(record_matches(record, "other", ["a", "b"]))
+
+
+class TestImportPrecomputedEmbeddings(unittest.TestCase):
+    """Tests for import_precomputed_embeddings"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.records = self.temp_dir / "rag_embeddings"
+        self.records.mkdir()
+        (self.records / ".placeholder.json").write_text('{"_placeholder": true}')
+        self.state = self.temp_dir / "state.json"
+        self.cache = EmbeddingCache("bge-m3", directory=self.temp_dir / "cache")
+
+    def _write(self, file_id: str, record: dict) -> None:
+        (self.records / f"{file_id}.json").write_text(json.dumps(record))
+
+    def _import(self, cache: EmbeddingCache | None = None):
+        return import_precomputed_embeddings(cache or self.cache, self.records, self.state)
+
+    def test_vectors_become_cache_hits(self):
+        self._write("a", encode_record("a", "bge-m3", ["x", "y"], [[1.0, 0.0], [0.0, 1.0]]))
+
+        result = self._import()
+
+        self.assertEqual((result.files, result.vectors, result.skipped), (1, 2, 0))
+        reopened = EmbeddingCache("bge-m3", directory=self.temp_dir / "cache")
+        self.assertEqual(reopened.get_many(["x", "y"]), [[1.0, 0.0], [0.0, 1.0]])
+
+    def test_imported_records_not_read_again(self):
+        self._write("a", encode_record("a", "bge-m3", ["x"], [[1.0, 0.0]]))
+        self._import()
+
+        self.assertEqual(self._import().files, 0)
+
+        self._write("b", encode_record("b", "bge-m3", ["z"], [[0.0, 1.0]]))
+        self.assertEqual(self._import().files, 1)
+
+    def test_other_model_skipped(self):
+        self._write("a", encode_record("a", "nomic-embed-text", ["x"], [[1.0, 0.0]]))
+
+        result = self._import()
+
+        self.assertEqual((result.files, result.vectors, result.skipped), (1, 0, 1))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_missing_directory(self):
+        result = import_precomputed_embeddings(self.cache, self.temp_dir / "none", self.state)
+
+        self.assertEqual(result.files, 0)
+        self.assertFalse(self.state.exists())
+
+    def test_matches_indexer_chunks(self):
+        """Vectors computed by the ETL node are hits for the chunks rag index builds"""
+        from obsidian_etl.pipelines.rag_embed.nodes import embed_organized_notes
+
+        def fake_embeddings(texts, **kwargs):
+            return [[float(i), 1.0] for i in range(len(texts))], None
+
+        with patch("src.rag.clients.ollama.get_embeddings", side_effect=fake_embeddings):
+            records = embed_organized_notes({"Pod の再起動": NOTE}, {}, {})
+        for file_id, record in records.items():
+            self._write(file_id, record)
+        self._import()
+
+        vault = self.temp_dir / "Vaults" / "エンジニア"
+        vault.mkdir(parents=True)
+        (vault / "Pod の再起動.md").write_text(NOTE, encoding="utf-8")
+        (doc,) = iter_vault(vault, "エンジニア")
+        chunker = MarkdownChunker(
+            chunk_size=rag_config.chunk_size,
+            overlap=rag_config.chunk_overlap,
+            unit=rag_config.chunk_unit,
+        )
+
+        texts = embedding_texts(doc, chunker)
+        self.assertNotIn(None, self.cache.get_many(texts))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,14 +4,17 @@ Tests for Qdrant Document Store module
 All Qdrant operations are mocked - no running Qdrant server required.
 """
 
+import shutil
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 
 class TestGetDocumentStore(unittest.TestCase):
     """get_document_store() tests"""
 
-    @patch("src.rag.stores.qdrant.QdrantDocumentStore")
+    @patch("src.rag.stores.qdrant.ProfiledQdrantDocumentStore")
     @patch("src.rag.stores.qdrant.QDRANT_PATH")
     def test_returns_qdrant_document_store(self, mock_path, mock_store_class):
         """Returns QdrantDocumentStore instance"""
@@ -26,7 +29,7 @@ class TestGetDocumentStore(unittest.TestCase):
         self.assertEqual(result, mock_store)
         mock_store_class.assert_called_once()
 
-    @patch("src.rag.stores.qdrant.QdrantDocumentStore")
+    @patch("src.rag.stores.qdrant.ProfiledQdrantDocumentStore")
     @patch("src.rag.stores.qdrant.QDRANT_PATH")
     def test_uses_default_config(self, mock_path, mock_store_class):
         """Uses default RAGConfig when config is None"""
@@ -42,7 +45,7 @@ class TestGetDocumentStore(unittest.TestCase):
         # Default config has embedding_dim=1024
         self.assertEqual(call_kwargs["embedding_dim"], 1024)
 
-    @patch("src.rag.stores.qdrant.QdrantDocumentStore")
+    @patch("src.rag.stores.qdrant.ProfiledQdrantDocumentStore")
     @patch("src.rag.stores.qdrant.QDRANT_PATH")
     def test_uses_custom_config(self, mock_path, mock_store_class):
         """Uses provided RAGConfig"""
@@ -59,7 +62,7 @@ class TestGetDocumentStore(unittest.TestCase):
         call_kwargs = mock_store_class.call_args[1]
         self.assertEqual(call_kwargs["embedding_dim"], 768)
 
-    @patch("src.rag.stores.qdrant.QdrantDocumentStore")
+    @patch("src.rag.stores.qdrant.ProfiledQdrantDocumentStore")
     @patch("src.rag.stores.qdrant.QDRANT_PATH")
     def test_collection_name(self, mock_path, mock_store_class):
         """Uses correct collection name (obsidian_knowledge)"""
@@ -75,7 +78,7 @@ class TestGetDocumentStore(unittest.TestCase):
         self.assertEqual(call_kwargs["index"], COLLECTION_NAME)
         self.assertEqual(COLLECTION_NAME, "obsidian_knowledge")
 
-    @patch("src.rag.stores.qdrant.QdrantDocumentStore")
+    @patch("src.rag.stores.qdrant.ProfiledQdrantDocumentStore")
     @patch("src.rag.stores.qdrant.QDRANT_PATH")
     def test_cosine_similarity(self, mock_path, mock_store_class):
         """Uses cosine similarity metric"""
@@ -90,7 +93,7 @@ class TestGetDocumentStore(unittest.TestCase):
         call_kwargs = mock_store_class.call_args[1]
         self.assertEqual(call_kwargs["similarity"], "cosine")
 
-    @patch("src.rag.stores.qdrant.QdrantDocumentStore")
+    @patch("src.rag.stores.qdrant.ProfiledQdrantDocumentStore")
     @patch("src.rag.stores.qdrant.QDRANT_PATH")
     def test_local_persistence_path(self, mock_path, mock_store_class):
         """Uses local file path for persistence"""
@@ -105,7 +108,7 @@ class TestGetDocumentStore(unittest.TestCase):
         call_kwargs = mock_store_class.call_args[1]
         self.assertIn("qdrant", call_kwargs["path"])
 
-    @patch("src.rag.stores.qdrant.QdrantDocumentStore")
+    @patch("src.rag.stores.qdrant.ProfiledQdrantDocumentStore")
     @patch("src.rag.stores.qdrant.QDRANT_PATH")
     def test_creates_data_directory(self, mock_path, mock_store_class):
         """Creates data directory if not exists"""
@@ -118,7 +121,7 @@ class TestGetDocumentStore(unittest.TestCase):
 
         mock_path.mkdir.assert_called_once_with(parents=True, exist_ok=True)
 
-    @patch("src.rag.stores.qdrant.QdrantDocumentStore")
+    @patch("src.rag.stores.qdrant.ProfiledQdrantDocumentStore")
     @patch("src.rag.stores.qdrant.QDRANT_PATH")
     def test_recreate_index_false(self, mock_path, mock_store_class):
         """Does not recreate index by default"""
@@ -132,7 +135,7 @@ class TestGetDocumentStore(unittest.TestCase):
         call_kwargs = mock_store_class.call_args[1]
         self.assertFalse(call_kwargs["recreate_index"])
 
-    @patch("src.rag.stores.qdrant.QdrantDocumentStore")
+    @patch("src.rag.stores.qdrant.ProfiledQdrantDocumentStore")
     @patch("src.rag.stores.qdrant.QDRANT_PATH")
     def test_return_embedding_false(self, mock_path, mock_store_class):
         """Does not return embeddings in queries by default"""
@@ -147,6 +150,445 @@ class TestGetDocumentStore(unittest.TestCase):
         self.assertFalse(call_kwargs["return_embedding"])
 
 
+class TestStorageProfiles(unittest.TestCase):
+    """Storage profile tests"""
+
+    @patch("src.rag.stores.qdrant.ProfiledQdrantDocumentStore")
+    @patch("src.rag.stores.qdrant.QDRANT_PATH")
+    def test_lean_profile_enables_quantization_and_on_disk(self, mock_path, mock_store_class):
+        """Lean profile passes int8 quantization and on-disk vectors"""
+        from src.rag.config import RAGConfig
+        from src.rag.stores.qdrant import get_document_store
+
+        mock_path.mkdir = MagicMock()
+        mock_store_class.return_value = MagicMock()
+
+        get_document_store(config=RAGConfig(storage_profile="lean"))
+
+        call_kwargs = mock_store_class.call_args[1]
+        self.assertTrue(call_kwargs["on_disk"])
+        self.assertEqual(call_kwargs["quantization_config"]["scalar"]["type"], "int8")
+        self.assertTrue(call_kwargs["search_params"].quantization.rescore)
+
+    @patch("src.rag.stores.qdrant.ProfiledQdrantDocumentStore")
+    @patch("src.rag.stores.qdrant.QDRANT_PATH")
+    def test_default_profile_has_no_quantization(self, mock_path, mock_store_class):
+        """Default profile keeps full-precision vectors in RAM"""
+        from src.rag.stores.qdrant import get_document_store
+
+        mock_path.mkdir = MagicMock()
+        mock_store_class.return_value = MagicMock()
+
+        get_document_store()
+
+        call_kwargs = mock_store_class.call_args[1]
+        self.assertFalse(call_kwargs["on_disk"])
+        self.assertNotIn("quantization_config", call_kwargs)
+        self.assertEqual(call_kwargs["hnsw_config"], {"m": 16, "ef_construct": 100})
+        self.assertEqual(call_kwargs["search_params"].hnsw_ef, 128)
+
+    def test_unknown_profile_raises(self):
+        """Unknown profile raises ConfigurationError"""
+        from src.rag.exceptions import ConfigurationError
+        from src.rag.stores.qdrant import get_storage_profile
+
+        with self.assertRaises(ConfigurationError):
+            get_storage_profile("tiny")
+
+    @patch("src.rag.stores.qdrant.ProfiledQdrantDocumentStore")
+    @patch("src.rag.stores.qdrant.QDRANT_URL", "http://qdrant:6333")
+    def test_server_url(self, mock_store_class):
+        """QDRANT_URL connects to a server instead of local storage"""
+        from src.rag.stores.qdrant import get_document_store
+
+        mock_store_class.return_value = MagicMock()
+
+        get_document_store()
+
+        call_kwargs = mock_store_class.call_args[1]
+        self.assertEqual(call_kwargs["url"], "http://qdrant:6333")
+        self.assertNotIn("path", call_kwargs)
+        self.assertTrue(call_kwargs["payload_indexes"])
+
+
+class TestPayloadIndexes(unittest.TestCase):
+    """Payload indexes and filter adaptation for filtered vector search"""
+
+    def test_missing_indexes_created(self):
+        """Only fields without an index are indexed"""
+        from qdrant_client.http import models as rest
+
+        from src.rag.stores.qdrant import ensure_payload_indexes
+
+        client = MagicMock()
+        client.get_collection.return_value.payload_schema = {"meta.vault": MagicMock()}
+
+        created = ensure_payload_indexes(client, "c")
+
+        self.assertEqual(created, ["meta.tags", "meta.created", "meta.file_path"])
+        schemas = {
+            c.kwargs["field_name"]: c.kwargs["field_schema"]
+            for c in client.create_payload_index.call_args_list
+        }
+        self.assertEqual(schemas["meta.created"], rest.PayloadSchemaType.DATETIME)
+        self.assertEqual(schemas["meta.tags"], rest.PayloadSchemaType.KEYWORD)
+
+    def test_existing_collection_gets_indexes(self):
+        """Indexes are ensured during setup of an already existing collection"""
+        from src.rag.stores.qdrant import ProfiledQdrantDocumentStore
+
+        store = ProfiledQdrantDocumentStore(
+            location=":memory:", index="c", embedding_dim=4, payload_indexes=True
+        )
+        with patch("src.rag.stores.qdrant.ensure_payload_indexes") as mock_ensure:
+            store._initialize_client()
+
+        mock_ensure.assert_called_once_with(store._client, "c")
+
+    def test_contains_becomes_match(self):
+        from qdrant_client.http import models as rest
+
+        from src.rag.stores.qdrant import to_qdrant_filters
+
+        filters = {
+            "operator": "AND",
+            "conditions": [
+                {"field": "meta.tags", "operator": "contains", "value": "k8s"},
+                {"field": "meta.created", "operator": ">=", "value": "2024-01-01"},
+            ],
+        }
+
+        converted = to_qdrant_filters(filters)
+
+        self.assertEqual(
+            converted.must[0],
+            rest.FieldCondition(key="meta.tags", match=rest.MatchValue(value="k8s")),
+        )
+        self.assertEqual(converted.must[1].key, "meta.created")
+
+    def test_in_becomes_keyword_match_any(self):
+        """Vaults from build_qdrant_filters use the KEYWORD index (MatchAny, not MatchText)"""
+        from qdrant_client.http import models as rest
+
+        from src.rag.pipelines.query import QueryFilters, build_qdrant_filters
+        from src.rag.stores.qdrant import to_qdrant_filters
+
+        converted = to_qdrant_filters(
+            build_qdrant_filters(QueryFilters(vaults=["エンジニア", "ビジネス"]))
+        )
+
+        self.assertEqual(
+            converted,
+            rest.Filter(
+                must=[
+                    rest.FieldCondition(
+                        key="meta.vault", match=rest.MatchAny(any=["エンジニア", "ビジネス"])
+                    )
+                ]
+            ),
+        )
+
+    def test_staged_scope_and_spaced_values_match_exactly(self):
+        """SummaryScope's file_path "in" and "==" on values with spaces are exact keyword matches"""
+        from haystack import Document as HaystackDocument
+        from qdrant_client.http import models as rest
+
+        from src.rag.pipelines.query import SummaryScope
+        from src.rag.stores.qdrant import to_qdrant_filters
+
+        documents = [
+            HaystackDocument(content="", meta={"file_path": path})
+            for path in ("/v/a.md", "/v/my note.md")
+        ]
+        user_filters = {"field": "meta.file_path", "operator": "==", "value": "/v/my note.md"}
+        scope = SummaryScope().run(documents, filters=user_filters)["filters"]
+
+        converted = to_qdrant_filters(scope)
+
+        self.assertEqual(
+            converted.must,
+            [
+                rest.FieldCondition(
+                    key="meta.file_path", match=rest.MatchValue(value="/v/my note.md")
+                ),
+                rest.FieldCondition(
+                    key="meta.file_path", match=rest.MatchAny(any=["/v/a.md", "/v/my note.md"])
+                ),
+            ],
+        )
+
+    def test_in_filter_and_delete_against_qdrant(self):
+        """Converted filters select exactly the matching points"""
+        from haystack import Document
+
+        from src.rag.stores.qdrant import ProfiledQdrantDocumentStore
+
+        store = ProfiledQdrantDocumentStore(location=":memory:", index="c", embedding_dim=4)
+        store.write_documents(
+            [
+                Document(
+                    content=path,
+                    embedding=[1.0, float(i), 0.0, 0.0],
+                    meta={"file_path": path, "vault": vault},
+                )
+                for i, (path, vault) in enumerate(
+                    [
+                        ("/v/my note.md", "エンジニア"),
+                        ("/v/my note.md.bak", "エンジニア"),
+                        ("/v/b.md", "ビジネス"),
+                        ("/v/c.md", "日常"),
+                    ]
+                )
+            ]
+        )
+        vaults = {"field": "meta.vault", "operator": "in", "value": ["エンジニア", "ビジネス"]}
+
+        results = store._query_by_embedding([1.0, 0.0, 0.0, 0.0], filters=vaults, top_k=10)
+        self.assertEqual(len(results), 3)
+
+        store.delete_by_filter(
+            {"field": "meta.file_path", "operator": "==", "value": "/v/my note.md"}
+        )
+        remaining = sorted(doc.content for doc in store.filter_documents())
+        self.assertEqual(remaining, ["/v/b.md", "/v/c.md", "/v/my note.md.bak"])
+
+    def test_tag_and_date_filtered_search(self):
+        """Tag and date filters from build_qdrant_filters work against Qdrant"""
+        from datetime import date
+
+        from haystack import Document
+
+        from src.rag.pipelines.query import QueryFilters, build_qdrant_filters
+        from src.rag.stores.qdrant import (
+            ProfiledQdrantDocumentStore,
+            _search_params,
+            get_storage_profile,
+        )
+
+        store = ProfiledQdrantDocumentStore(
+            location=":memory:",
+            index="c",
+            embedding_dim=4,
+            search_params=_search_params(get_storage_profile("default")),
+        )
+        store.write_documents(
+            [
+                Document(
+                    content="k8s",
+                    embedding=[1.0, 0.0, 0.0, 0.0],
+                    meta={"tags": ["k8s", "infra"], "created": "2024-01-10"},
+                ),
+                Document(
+                    content="python",
+                    embedding=[1.0, 0.1, 0.0, 0.0],
+                    meta={"tags": ["python"], "created": "2024-03-01"},
+                ),
+            ]
+        )
+        filters = build_qdrant_filters(
+            QueryFilters(tags=["infra"], date_from=date(2024, 1, 1), date_to=date(2024, 1, 31))
+        )
+
+        results = store._query_by_embedding([1.0, 0.0, 0.0, 0.0], filters=filters, top_k=5)
+
+        self.assertEqual([doc.content for doc in results], ["k8s"])
+
+
+class TestStoreBackend(unittest.TestCase):
+    """store_backend selection tests"""
+
+    @patch("src.rag.stores.qdrant.NUMPY_STORE_PATH", Path("/tmp/vectors"))
+    @patch("src.rag.stores.qdrant.ProfiledQdrantDocumentStore")
+    def test_numpy_backend(self, mock_store_class):
+        """store_backend='numpy' returns a NumpyDocumentStore without touching Qdrant"""
+        from src.rag.config import RAGConfig
+        from src.rag.stores.numpy_store import NumpyDocumentStore
+        from src.rag.stores.qdrant import COLLECTION_NAME, get_document_store
+
+        store = get_document_store(config=RAGConfig(store_backend="numpy", embedding_dim=8))
+
+        self.assertIsInstance(store, NumpyDocumentStore)
+        self.assertEqual(store.path, Path("/tmp/vectors") / COLLECTION_NAME)
+        self.assertEqual(store.embedding_dim, 8)
+        mock_store_class.assert_not_called()
+
+    def test_unknown_backend_raises(self):
+        """Unknown backend raises ConfigurationError"""
+        from src.rag.config import RAGConfig
+        from src.rag.exceptions import ConfigurationError
+        from src.rag.stores.qdrant import get_document_store
+
+        with self.assertRaises(ConfigurationError):
+            get_document_store(config=RAGConfig(store_backend="faiss"))
+
+
+class TestMigrateCollection(unittest.TestCase):
+    """migrate_collection() tests (local Qdrant storage in a temp directory)"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        state = self.temp_dir / "rag"
+        for target, value in (
+            ("src.rag.stores.qdrant.QDRANT_PATH", self.temp_dir / "qdrant"),
+            ("src.rag.stores.qdrant.QDRANT_URL", None),
+            ("src.rag.stores.versions.ACTIVE_INDEX_PATH", state / "active_index.json"),
+            ("src.rag.stores.versions.LEXICAL_INDEX_PATH", state / "lexical.sqlite3"),
+            ("src.rag.stores.versions.INDEX_MANIFEST_PATH", state / "index_manifest.json"),
+        ):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _write_points(self, store, count: int) -> None:
+        from haystack import Document
+
+        store.write_documents(
+            [
+                Document(content=f"doc {i}", embedding=[1.0, float(i), 0.0, 0.5], meta={"n": i})
+                for i in range(count)
+            ]
+        )
+
+    def _collections(self, version: int) -> dict[str, tuple[int, bool]]:
+        """Point count and on_disk setting of each collection of a local version folder"""
+        from qdrant_client import QdrantClient
+
+        from src.rag.stores.versions import versioned_path
+
+        client = QdrantClient(path=str(versioned_path(self.temp_dir / "qdrant", version)))
+        try:
+            return {
+                c.name: (
+                    client.count(c.name, exact=True).count,
+                    bool(client.get_collection(c.name).config.params.vectors.on_disk),
+                )
+                for c in client.get_collections().collections
+            }
+        finally:
+            client.close()
+
+    def test_migration_builds_new_version(self):
+        """Points, full-text index and manifest are copied into the next version"""
+        from haystack import Document
+
+        from src.rag.config import RAGConfig
+        from src.rag.stores.lexical import LexicalIndex
+        from src.rag.stores.qdrant import (
+            close_document_store,
+            get_document_store,
+            migrate_collection,
+        )
+        from src.rag.stores.versions import active_version, index_manifest_path, load_pointer
+
+        config = RAGConfig(embedding_dim=4)
+        store = get_document_store(config)
+        self._write_points(store, 10)
+        close_document_store(store)
+        lexical = LexicalIndex()
+        lexical.write_documents([Document(id="c1", content="本文", meta={"file_path": "/a.md"})])
+        lexical.close()
+        index_manifest_path(0).write_text('{"version": 1, "entries": {}}')
+
+        migrated = migrate_collection("lean", config)
+
+        self.assertEqual(migrated, 10)
+        self.assertEqual(active_version(), 1)
+        self.assertEqual(load_pointer().previous, [0])
+        self.assertEqual(self._collections(1), {"obsidian_knowledge__v1": (10, True)})
+        # The replaced version is kept as it was
+        self.assertEqual(self._collections(0), {"obsidian_knowledge": (10, False)})
+        lexical = LexicalIndex()
+        self.addCleanup(lexical.close)
+        self.assertEqual(lexical.count_documents(), 1)
+        self.assertEqual(index_manifest_path(1).read_text(), '{"version": 1, "entries": {}}')
+
+    def test_migrates_active_version_and_summaries(self):
+        """After a rebuild the versioned chunk and summary collections are migrated"""
+        from src.rag.config import RAGConfig
+        from src.rag.stores.qdrant import (
+            close_document_store,
+            get_document_store,
+            get_summary_store,
+            migrate_collection,
+        )
+        from src.rag.stores.versions import active_version, switch_active_version
+
+        switch_active_version(2)
+        config = RAGConfig(embedding_dim=4)
+        store = get_document_store(config)
+        self._write_points(store, 6)
+        self._write_points(get_summary_store(store, config), 2)
+        close_document_store(store)
+
+        migrated = migrate_collection("lean", config)
+
+        self.assertEqual(migrated, 6)
+        self.assertEqual(active_version(), 3)
+        self.assertEqual(
+            self._collections(3),
+            {"obsidian_knowledge__v3": (6, True), "obsidian_knowledge__v3__docs": (2, True)},
+        )
+
+    def test_failed_migration_keeps_active_version(self):
+        """A failed copy drops the partial version; the active collections are untouched"""
+        from qdrant_client.http import models as rest
+
+        from src.rag.config import RAGConfig
+        from src.rag.stores.qdrant import (
+            close_document_store,
+            get_document_store,
+            migrate_collection,
+        )
+        from src.rag.stores.versions import active_version
+
+        config = RAGConfig(embedding_dim=4)
+        store = get_document_store(config)
+        self._write_points(store, 5)
+        # Temporary collection left by an interrupted migration of an older release
+        store._client.create_collection(
+            "obsidian_knowledge__migrate",
+            vectors_config=rest.VectorParams(size=4, distance=rest.Distance.COSINE),
+        )
+        close_document_store(store)
+
+        with (
+            patch("src.rag.stores.qdrant._copy_points", return_value=3),
+            self.assertRaises(RuntimeError),
+        ):
+            migrate_collection("lean", config)
+
+        self.assertEqual(active_version(), 0)
+        self.assertFalse((self.temp_dir / "qdrant.v1").exists())
+        self.assertEqual(
+            self._collections(0),
+            {"obsidian_knowledge": (5, False), "obsidian_knowledge__migrate": (0, False)},
+        )
+
+        # Rerun after the failure
+        self.assertEqual(migrate_collection("lean", config), 5)
+        self.assertEqual(active_version(), 1)
+
+    @patch("src.rag.cli.save_collection_stats")
+    @patch("src.rag.stores.qdrant.get_document_store")
+    @patch("src.rag.stores.qdrant.migrate_collection", return_value=10)
+    def test_cli_refreshes_stats_cache(self, mock_migrate, mock_store, mock_save):
+        """rag migrate replaces the cached stats of the recreated collection"""
+        import io
+        from contextlib import redirect_stderr, redirect_stdout
+
+        from src.rag.cli import main
+
+        mock_store.return_value.count_documents.return_value = 10
+
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            exit_code = main(["migrate", "--profile", "lean"])
+
+        self.assertEqual(exit_code, 0)
+        mock_migrate.assert_called_once_with("lean")
+        self.assertEqual(mock_save.call_args.args[0]["document_count"], 10)
+
+
 class TestGetCollectionStats(unittest.TestCase):
     """get_collection_stats() tests"""
 
@@ -164,17 +606,29 @@ class TestGetCollectionStats(unittest.TestCase):
         self.assertEqual(stats["document_count"], 42)
 
     def test_returns_collection_name(self):
-        """Returns collection name"""
-        from src.rag.stores.qdrant import COLLECTION_NAME, get_collection_stats
+        """Returns the store's collection (versioned after a rebuild)"""
+        from src.rag.stores.qdrant import get_collection_stats
 
         mock_store = MagicMock()
         mock_store.count_documents.return_value = 0
         mock_store.embedding_dim = 1024
         mock_store.similarity = "cosine"
+        mock_store.index = "obsidian_knowledge__v3"
 
         stats = get_collection_stats(mock_store)
 
-        self.assertEqual(stats["collection_name"], COLLECTION_NAME)
+        self.assertEqual(stats["collection_name"], "obsidian_knowledge__v3")
+
+    def test_numpy_collection_name(self):
+        """NumPy stores report the collection directory"""
+        from src.rag.stores.numpy_store import NumpyDocumentStore
+        from src.rag.stores.qdrant import get_collection_stats
+
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        store = NumpyDocumentStore(temp_dir / "obsidian_knowledge__v2", embedding_dim=3)
+
+        self.assertEqual(get_collection_stats(store)["collection_name"], "obsidian_knowledge__v2")
 
     def test_returns_embedding_dim(self):
         """Returns embedding dimension from store"""
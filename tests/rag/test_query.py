@@ -17,6 +17,7 @@ from src.rag.pipelines.query import (
     QueryFilters,
     SearchResponse,
     SearchResult,
+    SourcesTap,
     ask,
     build_qdrant_filters,
     create_qa_pipeline,
@@ -406,7 +407,7 @@ class TestCreateQAPipeline(unittest.TestCase):
     @patch("src.rag.pipelines.query.QdrantEmbeddingRetriever")
     @patch("src.rag.pipelines.query.PromptBuilder")
     @patch("src.rag.pipelines.query.OllamaGenerator")
-    def test_pipeline_has_four_components(
+    def test_pipeline_has_five_components(
         self,
         mock_generator_cls,
         mock_prompt_cls,
@@ -414,7 +415,7 @@ class TestCreateQAPipeline(unittest.TestCase):
         mock_embedder_cls,
         mock_pipeline_cls,
     ):
-        """Q&A pipeline adds four components"""
+        """Q&A pipeline adds five components"""
         mock_store = MagicMock()
         mock_pipeline = MagicMock()
         mock_pipeline_cls.return_value = mock_pipeline
@@ -423,11 +424,12 @@ class TestCreateQAPipeline(unittest.TestCase):
 
         # Check add_component calls
         add_calls = mock_pipeline.add_component.call_args_list
-        self.assertEqual(len(add_calls), 4)
+        self.assertEqual(len(add_calls), 5)
 
         component_names = [call[0][0] for call in add_calls]
         self.assertIn("embedder", component_names)
         self.assertIn("retriever", component_names)
+        self.assertIn("context_packer", component_names)
         self.assertIn("prompt_builder", component_names)
         self.assertIn("generator", component_names)
 
@@ -456,7 +458,7 @@ class TestCreateQAPipeline(unittest.TestCase):
             num_ctx=32768,
         )
 
-        pipeline = create_qa_pipeline(mock_store, config)
+        pipeline = create_qa_pipeline(mock_store, config, context_budget=0)
 
         # Check embedder config (remote)
         embedder_kwargs = mock_embedder_cls.call_args[1]
@@ -470,6 +472,32 @@ class TestCreateQAPipeline(unittest.TestCase):
         self.assertEqual(generator_kwargs["timeout"], 180)
         self.assertEqual(generator_kwargs["generation_kwargs"]["num_ctx"], 32768)
 
+    @patch("src.rag.pipelines.query.Pipeline")
+    @patch("src.rag.pipelines.query.OllamaTextEmbedder")
+    @patch("src.rag.pipelines.query.QdrantEmbeddingRetriever")
+    @patch("src.rag.pipelines.query.PromptBuilder")
+    @patch("src.rag.pipelines.query.OllamaGenerator")
+    def test_num_ctx_sized_to_context_budget(
+        self,
+        mock_generator_cls,
+        mock_prompt_cls,
+        mock_retriever_cls,
+        mock_embedder_cls,
+        mock_pipeline_cls,
+    ):
+        """num_ctx fits the context budget, capped at config.num_ctx"""
+        config = OllamaConfig(num_ctx=65536)
+
+        with patch("src.rag.pipelines.query.rag_config") as mock_rag_config:
+            mock_rag_config.answer_token_reserve = 2048
+            create_qa_pipeline(MagicMock(), config, context_budget=4096)
+            sized = mock_generator_cls.call_args[1]["generation_kwargs"]["num_ctx"]
+            create_qa_pipeline(MagicMock(), OllamaConfig(num_ctx=4096), context_budget=4096)
+            capped = mock_generator_cls.call_args[1]["generation_kwargs"]["num_ctx"]
+
+        self.assertEqual(sized, 8192)
+        self.assertEqual(capped, 4096)
+
     @patch("src.rag.pipelines.query.Pipeline")
     @patch("src.rag.pipelines.query.OllamaTextEmbedder")
     @patch("src.rag.pipelines.query.QdrantEmbeddingRetriever")
@@ -492,11 +520,12 @@ class TestCreateQAPipeline(unittest.TestCase):
 
         # Check connect calls
         connect_calls = mock_pipeline.connect.call_args_list
-        self.assertEqual(len(connect_calls), 3)
+        self.assertEqual(len(connect_calls), 4)
 
         connections = [(call[0][0], call[0][1]) for call in connect_calls]
         self.assertIn(("embedder.embedding", "retriever.query_embedding"), connections)
-        self.assertIn(("retriever.documents", "prompt_builder.documents"), connections)
+        self.assertIn(("retriever.documents", "context_packer.documents"), connections)
+        self.assertIn(("context_packer.documents", "prompt_builder.documents"), connections)
         self.assertIn(("prompt_builder.prompt", "generator.prompt"), connections)
 
     @patch("src.rag.pipelines.query.Pipeline")
@@ -672,6 +701,37 @@ class TestAsk(unittest.TestCase):
         # Average of 0.8 and 0.6 = 0.7
         self.assertAlmostEqual(answer.confidence, 0.7, places=2)
 
+    def test_ask_stream_passes_callbacks(self):
+        """Streaming callbacks reach the sources tap and the generator"""
+        mock_pipeline = MagicMock()
+        mock_pipeline.run.return_value = {
+            "retriever": {"documents": []},
+            "generator": {"replies": ["answer"]},
+        }
+        tokens = []
+        on_sources = MagicMock()
+
+        ask(mock_pipeline, "question", streaming_callback=tokens.append, on_sources=on_sources)
+
+        data = mock_pipeline.run.call_args[0][0]
+        data["sources"]["callback"]([HaystackDocument(content="c", meta={"title": "T"})])
+        self.assertEqual(on_sources.call_args[0][0][0].title, "T")
+        data["generator"]["streaming_callback"](MagicMock(content="tok"))
+        self.assertEqual(tokens, ["tok"])
+
+
+class TestSourcesTap(unittest.TestCase):
+    """Tests for SourcesTap"""
+
+    def test_reports_sources_and_passes_documents(self):
+        doc = HaystackDocument(content="c", score=0.5, meta={"title": "T", "file_path": "/t.md"})
+        received = []
+
+        result = SourcesTap().run(documents=[doc], callback=received.append)
+
+        self.assertEqual(result["documents"], [doc])
+        self.assertEqual(received, [[doc]])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,239 @@
+"""
+Tests for Index Snapshot - export to one file, bulk restore without re-embedding
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+from haystack import Document
+
+from src.rag.config import COLLECTION_NAME, SUMMARY_COLLECTION_NAME, OllamaConfig, RAGConfig
+from src.rag.exceptions import IndexingError
+from src.rag.stores.lexical import LexicalIndex
+from src.rag.stores.numpy_store import NumpyDocumentStore
+from src.rag.stores.qdrant import ProfiledQdrantDocumentStore, get_document_store
+from src.rag.stores.snapshot import (
+    create_snapshot,
+    read_snapshot_info,
+    restore_index,
+    restore_snapshot,
+)
+from src.rag.stores.versions import active_version
+
+BGE_M3 = OllamaConfig(embedding_model="bge-m3")
+
+
+def _chunk(i: int) -> Document:
+    return Document(
+        id=f"chunk-{i}",
+        content=f"Pod の再起動 {i}",
+        embedding=[1.0, float(i), 0.0],
+        meta={"file_path": f"/v/{i % 3}.md", "vault": "エンジニア", "position": i},
+    )
+
+
+class TestSnapshot(unittest.TestCase):
+    """create_snapshot / restore_snapshot"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.store = NumpyDocumentStore(self.temp_dir / "src" / "chunks", embedding_dim=3)
+        self.summaries = NumpyDocumentStore(self.temp_dir / "src" / "docs", embedding_dim=3)
+        self.store.write_documents([_chunk(i) for i in range(5)])
+        self.summaries.write_documents(
+            [
+                Document(
+                    id="s", content="Pod", embedding=[0.0, 1.0, 0.0], meta={"file_path": "/v/0.md"}
+                )
+            ]
+        )
+        self.manifest = self.temp_dir / "src" / "index_manifest.json"
+        self.manifest.write_text('{"version": 1, "entries": {}}')
+        self.file = self.temp_dir / "snap" / "index.zip"
+
+    def _create(self, store=None) -> None:
+        create_snapshot(
+            self.file,
+            store or self.store,
+            summary_store=self.summaries,
+            manifest_path=self.manifest,
+            embedding_config=BGE_M3,
+        )
+
+    def _target(self, name: str) -> NumpyDocumentStore:
+        return NumpyDocumentStore(self.temp_dir / "dst" / name, embedding_dim=3)
+
+    def test_single_file_with_settings(self):
+        with patch("src.rag.stores.snapshot.SNAPSHOT_PART_SIZE", 2):
+            self._create()
+
+        info = read_snapshot_info(self.file)
+        self.assertEqual(info["embedding_model"], "bge-m3")
+        self.assertEqual(info["embedding_dim"], 3)
+        self.assertEqual(info["collections"], {COLLECTION_NAME: 5, SUMMARY_COLLECTION_NAME: 1})
+        with zipfile.ZipFile(self.file) as archive:
+            names = archive.namelist()
+        self.assertIn("index_manifest.json", names)
+        self.assertEqual(sum(n.startswith(f"collections/{COLLECTION_NAME}/") for n in names), 6)
+
+    def test_restore_round_trip(self):
+        """Documents, vectors, full-text index and manifest come back without embedding"""
+        self._create()
+        store, summaries = self._target("chunks"), self._target("docs")
+        store.write_documents([_chunk(99)])  # Replaced by the snapshot
+        lexical = LexicalIndex(self.temp_dir / "dst" / "lexical.sqlite3")
+        self.addCleanup(lexical.close)
+        manifest = self.temp_dir / "dst" / "index_manifest.json"
+
+        info = restore_snapshot(
+            self.file,
+            store,
+            summary_store=summaries,
+            lexical=lexical,
+            manifest_path=manifest,
+            embedding_config=BGE_M3,
+        )
+
+        self.assertEqual(info.collections, {COLLECTION_NAME: 5, SUMMARY_COLLECTION_NAME: 1})
+        restored = {doc.id: doc for doc in store.iter_documents()}
+        original = {doc.id: doc for doc in self.store.iter_documents()}
+        self.assertEqual(restored.keys(), original.keys())
+        self.assertEqual(restored["chunk-3"].meta, original["chunk-3"].meta)
+        self.assertEqual(restored["chunk-3"].embedding, original["chunk-3"].embedding)
+        self.assertEqual(summaries.count_documents(), 1)
+        self.assertEqual(lexical.count_documents(), 5)
+        self.assertEqual(json.loads(manifest.read_text()), {"version": 1, "entries": {}})
+
+    def test_qdrant_to_numpy(self):
+        """Snapshots are portable across store backends"""
+        qdrant = ProfiledQdrantDocumentStore(location=":memory:", index="c", embedding_dim=3)
+        qdrant.write_documents([_chunk(i) for i in range(5)])
+        self._create(store=qdrant)
+        store = self._target("chunks")
+
+        restore_snapshot(
+            self.file, store, manifest_path=self.temp_dir / "m.json", embedding_config=BGE_M3
+        )
+
+        self.assertEqual(
+            sorted(doc.id for doc in store.iter_documents()), [f"chunk-{i}" for i in range(5)]
+        )
+
+    def test_other_embedding_model_needs_force(self):
+        self._create()
+        other = OllamaConfig(embedding_model="nomic-embed-text")
+        store = self._target("chunks")
+        manifest = self.temp_dir / "m.json"
+
+        with self.assertRaises(IndexingError):
+            restore_snapshot(self.file, store, manifest_path=manifest, embedding_config=other)
+        self.assertEqual(store.count_documents(), 0)
+
+        restore_snapshot(
+            self.file, store, manifest_path=manifest, embedding_config=other, force=True
+        )
+        self.assertEqual(store.count_documents(), 5)
+
+    def test_dimension_mismatch(self):
+        self._create()
+        store = NumpyDocumentStore(self.temp_dir / "dst" / "wide", embedding_dim=4)
+
+        with self.assertRaises(IndexingError):
+            restore_snapshot(self.file, store, embedding_config=BGE_M3)
+
+    def test_not_a_snapshot(self):
+        path = self.temp_dir / "broken.zip"
+        path.write_text("not a zip")
+
+        with self.assertRaises(IndexingError):
+            read_snapshot_info(path)
+
+
+class TestRestoreIndex(unittest.TestCase):
+    """restore_index restores into a new index version and switches to it"""
+
+    CONFIG = RAGConfig(store_backend="numpy", embedding_dim=3, summary_vectors=True)
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        state = self.temp_dir / "rag"
+        self.vectors = self.temp_dir / "vectors"
+        for target, value in (
+            ("src.rag.stores.qdrant.NUMPY_STORE_PATH", self.vectors),
+            ("src.rag.stores.versions.ACTIVE_INDEX_PATH", state / "active_index.json"),
+            ("src.rag.stores.versions.LEXICAL_INDEX_PATH", state / "lexical.sqlite3"),
+            ("src.rag.stores.versions.INDEX_MANIFEST_PATH", state / "index_manifest.json"),
+        ):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        source = NumpyDocumentStore(self.temp_dir / "src" / "chunks", embedding_dim=3)
+        source.write_documents([_chunk(i) for i in range(5)])
+        manifest = self.temp_dir / "src" / "index_manifest.json"
+        manifest.write_text('{"version": 1, "entries": {}}')
+        self.file = self.temp_dir / "index.zip"
+        create_snapshot(self.file, source, manifest_path=manifest, embedding_config=BGE_M3)
+
+        # Live index (version 0)
+        get_document_store(self.CONFIG).write_documents([_chunk(i) for i in range(90, 93)])
+
+    def _restore(self, **kwargs):
+        return restore_index(self.file, config=self.CONFIG, **kwargs)
+
+    def test_switches_to_restored_version(self):
+        result = self._restore(embedding_config=BGE_M3)
+
+        self.assertEqual((result.replaced, result.version), (0, 1))
+        self.assertEqual(result.stats["document_count"], 5)
+        self.assertEqual(active_version(), 1)
+        self.assertEqual(get_document_store(self.CONFIG).count_documents(), 5)
+        lexical = LexicalIndex()
+        self.addCleanup(lexical.close)
+        self.assertEqual(lexical.count_documents(), 5)
+        self.assertTrue((self.temp_dir / "rag" / "index_manifest.v1.json").exists())
+        # The replaced version is kept for readers still on it
+        self.assertEqual(get_document_store(self.CONFIG, version=0).count_documents(), 3)
+
+    def test_failed_restore_keeps_active_index(self):
+        other = OllamaConfig(embedding_model="nomic-embed-text")
+
+        with self.assertRaises(IndexingError):
+            self._restore(embedding_config=other)
+
+        self.assertEqual(active_version(), 0)
+        self.assertEqual(get_document_store(self.CONFIG).count_documents(), 3)
+        self.assertFalse((self.vectors / "obsidian_knowledge__v1").exists())
+
+
+class TestNumpyStoreBulkAccess(unittest.TestCase):
+    """NumpyDocumentStore.iter_documents / delete_all_documents"""
+
+    def test_iterate_and_clear(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        store = NumpyDocumentStore(temp_dir / "chunks", embedding_dim=3)
+        store.write_documents([_chunk(i) for i in range(3)])
+        store.delete_documents(["chunk-1"])
+
+        documents = list(store.iter_documents())
+        self.assertEqual([doc.id for doc in documents], ["chunk-0", "chunk-2"])
+        self.assertEqual(len(documents[0].embedding), 3)
+
+        store.delete_all_documents()
+        self.assertEqual(store.count_documents(), 0)
+        store.write_documents([_chunk(5)])
+        self.assertEqual([doc.id for doc in store.iter_documents()], ["chunk-5"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,250 @@
+"""
+Tests for Staged Search - document summary vectors, summary indexing, two-stage retrieval
+"""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from haystack import Document as HaystackDocument
+
+from src.rag.config import OllamaConfig, rag_config
+from src.rag.exceptions import QueryError
+from src.rag.pipelines.indexing import (
+    Document,
+    DocumentMeta,
+    extract_metadata,
+    index_vault,
+    summary_document,
+)
+from src.rag.pipelines.models import QueryFilters
+from src.rag.pipelines.query import SummaryScope, create_search_pipeline, search
+from src.rag.stores.embedding_cache import QueryEmbeddingCache
+from src.rag.stores.manifest import IndexManifest
+from src.rag.stores.numpy_store import NumpyDocumentStore
+from src.rag.stores.qdrant import get_summary_store
+
+
+def _note(name: str, summary: str = "", body: str = "本文") -> Document:
+    return Document(
+        file_path=Path(f"/vault/{name}.md"),
+        title=name,
+        content=body,
+        metadata=DocumentMeta(tags=["k8s"], file_id=f"id-{name}", summary=summary),
+        vault_name="エンジニア",
+    )
+
+
+class TestSummaryDocument(unittest.TestCase):
+    """Tests for summary_document"""
+
+    def test_title_and_summary(self):
+        doc = summary_document(_note("Pod", summary="Pod の再起動について"))
+
+        self.assertEqual(doc.content, "Pod\nPod の再起動について")
+        self.assertEqual(doc.meta["file_path"], "/vault/Pod.md")
+        self.assertEqual(doc.meta["file_id"], "id-Pod")
+        self.assertNotIn("position", doc.meta)
+
+    def test_body_stands_in_for_missing_summary(self):
+        doc = summary_document(_note("Pod", body="あ" * 1000))
+
+        self.assertEqual(doc.content, "Pod\n" + "あ" * 500)
+
+    def test_summary_from_frontmatter(self):
+        self.assertEqual(extract_metadata({"summary": "要約"}).summary, "要約")
+        self.assertEqual(extract_metadata({"summary": None}).summary, "")
+
+
+class TestSummaryIndexing(unittest.TestCase):
+    """index_vault writes one summary per note and keeps the summary store in sync"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.vault_path = self.temp_dir / "vault"
+        self.vault_path.mkdir()
+        for name in ("a", "b"):
+            (self.vault_path / f"{name}.md").write_text(
+                f"---\ntitle: {name}\nfile_id: id-{name}\nsummary: {name} の要約\n"
+                f"normalized: true\n---\n\n{name} 本文\n",
+                encoding="utf-8",
+            )
+        self.manifest = IndexManifest(self.temp_dir / "index_manifest.json")
+        self.store = MagicMock()
+        self.summary_store = MagicMock()
+        self.pipeline = MagicMock()
+
+    def _index(self, **kwargs):
+        return index_vault(
+            self.pipeline,
+            self.vault_path,
+            "test-vault",
+            store=self.store,
+            manifest=self.manifest,
+            **kwargs,
+        )
+
+    def test_summaries_embedded_with_chunks(self):
+        self._index(summary_store=self.summary_store)
+
+        data = self.pipeline.run.call_args[0][0]
+        summaries = data["summary_embedder"]["documents"]
+        self.assertEqual(sorted(d.content for d in summaries), ["a\na の要約", "b\nb の要約"])
+        self.assertTrue(all(entry.summary for entry in self.manifest.entries.values()))
+
+    def test_without_summary_store(self):
+        self._index()
+
+        self.assertNotIn("summary_embedder", self.pipeline.run.call_args[0][0])
+        self.assertFalse(self.manifest.get("id-a").summary)
+
+    def test_backfill_of_notes_indexed_without_summary(self):
+        """Enabling summaries re-indexes notes whose entries have none"""
+        self._index()
+        self.pipeline.reset_mock()
+
+        result = self._index(summary_store=self.summary_store)
+
+        self.assertEqual(result.indexed_docs, 2)
+        self.assertEqual(result.unchanged_docs, 0)
+        self.assertEqual(self.summary_store.delete_by_filter.call_count, 2)
+
+        self.pipeline.reset_mock()
+        result = self._index(summary_store=self.summary_store)
+        self.assertEqual(result.unchanged_docs, 2)
+        self.pipeline.run.assert_not_called()
+
+    def test_removed_note_deleted_from_summary_store(self):
+        self._index(summary_store=self.summary_store)
+        (self.vault_path / "b.md").unlink()
+
+        self._index(summary_store=self.summary_store)
+
+        self.summary_store.delete_by_filter.assert_called_once_with(
+            {"field": "meta.file_path", "operator": "==", "value": str(self.vault_path / "b.md")}
+        )
+
+
+class TestSummaryScope(unittest.TestCase):
+    """Tests for SummaryScope"""
+
+    def test_restricts_to_matched_files(self):
+        documents = [
+            HaystackDocument(content="a", meta={"file_path": "/v/a.md"}),
+            HaystackDocument(content="b", meta={"file_path": "/v/b.md"}),
+            HaystackDocument(content="a2", meta={"file_path": "/v/a.md"}),
+        ]
+        vault = {"field": "meta.vault", "operator": "==", "value": "日常"}
+
+        filters = SummaryScope().run(documents=documents, filters=vault)["filters"]
+
+        self.assertEqual(
+            filters,
+            {
+                "operator": "AND",
+                "conditions": [
+                    vault,
+                    {"field": "meta.file_path", "operator": "in", "value": ["/v/a.md", "/v/b.md"]},
+                ],
+            },
+        )
+
+    def test_no_match_keeps_filters(self):
+        self.assertIsNone(SummaryScope().run(documents=[])["filters"])
+
+
+class TestStagedSearch(unittest.TestCase):
+    """Two-stage retrieval over NumPy chunk and summary stores"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.store = NumpyDocumentStore(self.temp_dir / "chunks", embedding_dim=3)
+        self.summaries = get_summary_store(self.store)
+        self.config = OllamaConfig(embedding_model="bge-m3")
+        self.cache = QueryEmbeddingCache()
+        self.cache.put("bge-m3", "Pod", [1.0, 0.0, 0.0])
+
+        def chunk(path, content, embedding, vault="エンジニア"):
+            meta = {"file_path": path, "title": path, "vault": vault, "position": 0}
+            return HaystackDocument(content=content, embedding=embedding, meta=meta)
+
+        self.store.write_documents(
+            [
+                chunk("/v/pod.md", "Pod の概要", [0.7, 0.7, 0.0]),
+                chunk("/v/pod.md", "Pod の再起動", [0.8, 0.6, 0.0]),
+                # Closest chunk to the query, but its note is about something else
+                chunk("/v/misc.md", "Pod という単語", [1.0, 0.0, 0.0], vault="日常"),
+            ]
+        )
+
+    def _search(self, **kwargs):
+        pipeline = create_search_pipeline(
+            self.store,
+            self.config,
+            mode="staged",
+            query_cache=self.cache,
+            summary_store=self.summaries,
+        )
+        return search(pipeline, "Pod", top_k=5, mode="staged", **kwargs)
+
+    def test_chunks_of_best_notes_only(self):
+        self.summaries.write_documents(
+            [
+                HaystackDocument(
+                    content="Pod\nPod の運用",
+                    embedding=[1.0, 0.0, 0.0],
+                    meta={"file_path": "/v/pod.md"},
+                ),
+                HaystackDocument(
+                    content="雑記\n日記",
+                    embedding=[0.0, 0.0, 1.0],
+                    meta={"file_path": "/v/misc.md"},
+                ),
+            ]
+        )
+
+        with patch.object(rag_config, "staged_candidate_docs", 1):
+            response = self._search()
+
+        self.assertEqual({r.file_path for r in response.results}, {"/v/pod.md"})
+        self.assertEqual(response.total, 2)
+
+    def test_user_filters_apply_to_both_stages(self):
+        self.summaries.write_documents(
+            [
+                HaystackDocument(
+                    content="Pod",
+                    embedding=[1.0, 0.0, 0.0],
+                    meta={"file_path": "/v/pod.md", "vault": "エンジニア"},
+                ),
+                HaystackDocument(
+                    content="雑記",
+                    embedding=[0.9, 0.1, 0.0],
+                    meta={"file_path": "/v/misc.md", "vault": "日常"},
+                ),
+            ]
+        )
+
+        response = self._search(filters=QueryFilters(vaults=["日常"]))
+
+        self.assertEqual([r.file_path for r in response.results], ["/v/misc.md"])
+
+    def test_empty_summary_store_searches_all_chunks(self):
+        response = self._search()
+
+        self.assertEqual(response.results[0].file_path, "/v/misc.md")
+        self.assertEqual(response.total, 3)
+
+    def test_requires_summary_store(self):
+        with self.assertRaises(QueryError):
+            create_search_pipeline(self.store, self.config, mode="staged")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Tests for Collection Stats Cache - store signatures, invalidation, server TTL
+"""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.rag.config import RAGConfig
+from src.rag.stores.stats import load_collection_stats, save_collection_stats
+
+STATS = {
+    "document_count": 3,
+    "collection_name": "obsidian_knowledge",
+    "embedding_dim": 1024,
+    "similarity": "cosine",
+}
+
+
+class TestCollectionStatsCache(unittest.TestCase):
+    """Tests for load_collection_stats / save_collection_stats"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.cache_path = self.temp_dir / "collection_stats.json"
+        self.store_dir = self.temp_dir / "vectors" / "obsidian_knowledge"
+        self.store_dir.mkdir(parents=True)
+        (self.store_dir / "manifest.json").write_text("{}")
+        self.config = RAGConfig(store_backend="numpy")
+        patcher = patch("src.rag.stores.stats.NUMPY_STORE_PATH", self.temp_dir / "vectors")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_round_trip(self):
+        save_collection_stats(STATS, self.config, self.cache_path)
+
+        self.assertEqual(load_collection_stats(self.config, self.cache_path), STATS)
+
+    def test_missing_cache(self):
+        self.assertIsNone(load_collection_stats(self.config, self.cache_path))
+
+    def test_invalidated_by_store_change(self):
+        """Writing to the store files invalidates cached stats"""
+        save_collection_stats(STATS, self.config, self.cache_path)
+
+        (self.store_dir / "manifest.json").write_text('{"rows": 4}')
+
+        self.assertIsNone(load_collection_stats(self.config, self.cache_path))
+
+    def test_other_backend_not_used(self):
+        save_collection_stats(STATS, self.config, self.cache_path)
+
+        self.assertIsNone(load_collection_stats(RAGConfig(store_backend="qdrant"), self.cache_path))
+
+    def test_server_stats_expire(self):
+        """Stats of a Qdrant server are kept for SERVER_STATS_TTL seconds"""
+        config = RAGConfig(store_backend="qdrant")
+        with patch("src.rag.stores.stats.QDRANT_URL", "http://qdrant:6333"):
+            save_collection_stats(STATS, config, self.cache_path)
+            self.assertEqual(load_collection_stats(config, self.cache_path), STATS)
+
+            with patch("src.rag.stores.stats.time.time", return_value=time.time() + 3600):
+                self.assertIsNone(load_collection_stats(config, self.cache_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,255 @@
+"""
+Tests for Index Versions - active index pointer, blue/green rebuild, garbage collection
+"""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from haystack import Document as HaystackDocument
+
+from src.rag.config import RAGConfig
+from src.rag.exceptions import IndexingError
+from src.rag.pipelines.indexing import rebuild_index
+from src.rag.server import RAGService
+from src.rag.stores.lexical import LexicalIndex
+from src.rag.stores.manifest import IndexManifest, ManifestEntry
+from src.rag.stores.qdrant import get_document_store
+from src.rag.stores.versions import (
+    IndexPointer,
+    active_version,
+    collection_name,
+    load_pointer,
+    save_pointer,
+    switch_active_version,
+    versioned_path,
+)
+
+CONFIG = RAGConfig(store_backend="numpy", embedding_dim=3, summary_vectors=True)
+
+
+def _embeddings(texts, **kwargs):
+    return [[1.0, float(len(text)), 0.0] for text in texts], None
+
+
+class TestPointer(unittest.TestCase):
+    """Version naming and the active index pointer"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.path = self.temp_dir / "active_index.json"
+
+    def test_version_zero_keeps_legacy_names(self):
+        path = Path("/data/rag/lexical.sqlite3")
+
+        self.assertEqual(versioned_path(path, 0), path)
+        self.assertEqual(versioned_path(path, 3), Path("/data/rag/lexical.v3.sqlite3"))
+        self.assertEqual(versioned_path(Path("/data/qdrant"), 3), Path("/data/qdrant.v3"))
+        self.assertEqual(collection_name(0), "obsidian_knowledge")
+        self.assertEqual(collection_name(3), "obsidian_knowledge__v3")
+
+    def test_missing_pointer_is_version_zero(self):
+        self.assertEqual(active_version(self.path), 0)
+        self.assertEqual(load_pointer(self.path).next_version(), 1)
+
+    def test_switch_records_previous(self):
+        switch_active_version(1, self.path)
+        pointer = switch_active_version(2, self.path)
+
+        self.assertEqual((pointer.active, pointer.previous), (2, [1, 0]))
+        self.assertEqual(load_pointer(self.path), pointer)
+        self.assertEqual(pointer.next_version(), 3)
+
+    def test_switch_back_to_previous(self):
+        save_pointer(IndexPointer(active=2, previous=[1]), self.path)
+
+        pointer = switch_active_version(1, self.path)
+
+        self.assertEqual((pointer.active, pointer.previous), (1, [2]))
+
+
+class TestRebuildIndex(unittest.TestCase):
+    """rebuild_index builds a new version next to the active one and switches to it"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        state = self.temp_dir / "rag"
+        self.vectors = self.temp_dir / "vectors"
+        for target, value in (
+            ("src.rag.stores.qdrant.NUMPY_STORE_PATH", self.vectors),
+            ("src.rag.stores.versions.ACTIVE_INDEX_PATH", state / "active_index.json"),
+            ("src.rag.stores.versions.LEXICAL_INDEX_PATH", state / "lexical.sqlite3"),
+            ("src.rag.stores.versions.INDEX_MANIFEST_PATH", state / "index_manifest.json"),
+        ):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        embed = patch("src.rag.pipelines.embedding.get_embeddings", side_effect=_embeddings)
+        self.get_embeddings = embed.start()
+        self.addCleanup(embed.stop)
+
+        self.vault = self.temp_dir / "Vaults" / "エンジニア"
+        self.vault.mkdir(parents=True)
+        for name in ("a", "b"):
+            self._write_note(name)
+
+    def _write_note(self, name: str) -> None:
+        (self.vault / f"{name}.md").write_text(
+            f"---\ntitle: {name}\nfile_id: id-{name}\nnormalized: true\n---\n\n{name} の本文\n",
+            encoding="utf-8",
+        )
+
+    def _rebuild(self, **kwargs):
+        return rebuild_index(
+            vaults_dir=self.vault.parent, vault_names=["エンジニア"], config=CONFIG, **kwargs
+        )
+
+    def _write_live(self, count: int) -> None:
+        """Active version 0 with documents and a manifest"""
+        store = get_document_store(CONFIG)
+        store.write_documents(
+            [
+                HaystackDocument(id=f"old-{i}", content="old", embedding=[0.0, 1.0, 0.0])
+                for i in range(count)
+            ]
+        )
+        manifest = IndexManifest.load()
+        manifest.entries = {
+            "old": ManifestEntry("old", "/v/old.md", "エンジニア", "", 0.0, count),
+        }
+        manifest.save()
+
+    def test_switches_to_validated_version(self):
+        result = self._rebuild()
+
+        self.assertEqual((result.version, result.replaced), (1, 0))
+        self.assertEqual(result.counts, {"chunks": 2, "lexical": 2, "summaries": 2})
+        self.assertEqual(active_version(), 1)
+        # Default locations now resolve to version 1
+        store = get_document_store(CONFIG)
+        self.assertEqual(store.path, self.vectors / "obsidian_knowledge__v1")
+        self.assertEqual(store.count_documents(), 2)
+        lexical = LexicalIndex()
+        self.addCleanup(lexical.close)
+        self.assertEqual(lexical.path.name, "lexical.v1.sqlite3")
+        self.assertEqual(lexical.count_documents(), 2)
+        self.assertEqual(set(IndexManifest.load().entries), {"id-a", "id-b"})
+
+    def test_active_version_served_while_rebuilding(self):
+        self._write_live(3)
+        during = []
+
+        self._rebuild(
+            progress=lambda p: during.append(get_document_store(CONFIG).count_documents())
+        )
+
+        self.assertEqual(during, [3])
+        self.assertEqual(get_document_store(CONFIG).count_documents(), 2)
+
+    def test_old_versions_garbage_collected(self):
+        self._write_live(1)
+        self._rebuild()
+        self.assertTrue((self.vectors / "obsidian_knowledge").exists())  # Kept for readers
+
+        result = self._rebuild()
+
+        self.assertEqual(result.removed_versions, [0])
+        self.assertEqual(load_pointer().previous, [1])
+        self.assertFalse((self.vectors / "obsidian_knowledge").exists())
+        self.assertFalse((self.vectors / "obsidian_knowledge__docs").exists())
+        self.assertTrue((self.vectors / "obsidian_knowledge__v1").exists())
+
+    def test_failed_rebuild_keeps_active_version(self):
+        self._write_live(3)
+        self.get_embeddings.side_effect = lambda texts, **kwargs: (None, "connection refused")
+
+        with self.assertRaises(IndexingError):
+            self._rebuild()
+
+        self.assertEqual(active_version(), 0)
+        self.assertEqual(get_document_store(CONFIG).count_documents(), 3)
+        self.assertFalse((self.vectors / "obsidian_knowledge__v1").exists())
+
+    def test_empty_rebuild_refused(self):
+        self._write_live(3)
+        for path in self.vault.iterdir():
+            path.unlink()
+
+        with self.assertRaises(IndexingError):
+            self._rebuild()
+
+        self.assertEqual(active_version(), 0)
+
+
+class TestServiceFollowsActiveVersion(unittest.TestCase):
+    """RAGService reopens its stores after a version switch"""
+
+    @patch("src.rag.server.get_summary_store")
+    @patch("src.rag.server.LexicalIndex")
+    @patch("src.rag.server.get_document_store")
+    @patch("src.rag.server.create_search_pipeline")
+    def test_reopens_after_switch(self, mock_pipeline, mock_store, mock_lexical, mock_summary):
+        with patch("src.rag.server.active_version", return_value=0) as mock_version:
+            service = RAGService()
+            first = service.pipeline("search", "dense")
+            self.assertIs(service.pipeline("search", "dense"), first)
+
+            mock_version.return_value = 1
+            mock_pipeline.return_value = MagicMock()
+            second = service.pipeline("search", "dense")
+
+        self.assertIsNot(second, first)
+        self.assertEqual(service.version, 1)
+        self.assertEqual(mock_store.call_args.kwargs, {"version": 1})
+
+    @patch("src.rag.server.close_document_store")
+    @patch("src.rag.server.get_summary_store")
+    @patch("src.rag.server.LexicalIndex")
+    @patch("src.rag.server.get_document_store")
+    @patch("src.rag.server.create_search_pipeline")
+    def test_replaced_stores_closed_after_requests(
+        self, mock_pipeline, mock_store, mock_lexical, mock_summary, mock_close
+    ):
+        """Stores of the previous version stay open until its running requests finish"""
+        with patch("src.rag.server.active_version", return_value=0) as mock_version:
+            service = RAGService()
+            old = (service.store, service.summary_store, service.lexical)
+            mock_store.return_value = MagicMock()
+            mock_lexical.return_value = MagicMock()
+
+            with service._request("search", "dense"):
+                mock_version.return_value = 1
+                service.refresh()  # Another request picks up the switch
+                mock_close.assert_not_called()
+                old[2].close.assert_not_called()
+
+            self.assertEqual([c.args[0] for c in mock_close.call_args_list], [old[1], old[0]])
+            old[2].close.assert_called_once()
+
+            # Without requests running, replaced stores are closed right away
+            mock_close.reset_mock()
+            replaced = service.store
+            mock_version.return_value = 2
+            service.refresh()
+
+        self.assertIn(replaced, [c.args[0] for c in mock_close.call_args_list])
+        self.assertEqual(service._in_flight, {})
+
+    def test_injected_stores_are_kept(self):
+        store = MagicMock()
+        with patch("src.rag.server.active_version", return_value=0) as mock_version:
+            service = RAGService(store, MagicMock(), MagicMock())
+            mock_version.return_value = 1
+            service.refresh()
+
+        self.assertIs(service.store, store)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,7 +17,7 @@ import unittest
 import zipfile
 from pathlib import Path
 
-from obsidian_etl.datasets import BinaryDataset
+from obsidian_etl.datasets import BinaryDataset, FilePathDataset
 
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
 
@@ -115,5 +115,34 @@ class TestBinaryDatasetDescribe(unittest.TestCase):
         self.assertEqual(desc["filepath"], "/tmp/test.zip")
 
 
+class TestFilePathDataset(unittest.TestCase):
+    """FilePathDataset: load() returns the file path without reading content."""
+
+    def test_load_returns_path(self):
+        """load すると内容ではなく Path が返ること。"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = Path(tmpdir) / "note.md"
+            filepath.write_text("---\ntitle: t\n---\n", encoding="utf-8")
+            ds = FilePathDataset(filepath=str(filepath))
+            self.assertEqual(ds._load(), filepath)
+
+    def test_exists(self):
+        """ファイルの存在を _exists で判定できること。"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = Path(tmpdir) / "note.md"
+            ds = FilePathDataset(filepath=str(filepath))
+            self.assertFalse(ds._exists())
+            filepath.write_text("x", encoding="utf-8")
+            self.assertTrue(ds._exists())
+
+    def test_save_is_not_supported(self):
+        """読み取り専用のため save でエラーになること。"""
+        from kedro.io import DatasetError
+
+        ds = FilePathDataset(filepath="/tmp/note.md")
+        with self.assertRaises(DatasetError):
+            ds._save(None)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -218,6 +218,38 @@ class TestDispatchPipeline(unittest.TestCase):
             )
 
 
+class TestRagEmbedPipeline(unittest.TestCase):
+    """rag_embed.enabled で import パイプラインに embed_organized_notes が追加されるテスト。"""
+
+    def _register(self, rag_embed: dict) -> dict[str, Pipeline]:
+        sections = {"import": {"provider": "claude"}, "rag_embed": rag_embed}
+        mock_config = MagicMock()
+        mock_config.get.side_effect = lambda key, default=None: sections.get(key, default)
+        mock_config.__getitem__ = lambda self_inner, key: sections[key]
+        with patch("obsidian_etl.pipeline_registry.OmegaConf.load", return_value=mock_config):
+            return register_pipelines()
+
+    def test_disabled_by_default(self):
+        """rag_embed.enabled=false の場合、import パイプラインに含まれないこと。"""
+        pipelines = self._register({"enabled": False})
+
+        node_names = {n.name for n in pipelines["import_claude"].nodes}
+        self.assertNotIn("embed_organized_notes", node_names)
+        self.assertIn("rag_embed", pipelines)
+
+    def test_enabled_after_organize(self):
+        """rag_embed.enabled=true の場合、全 import パイプラインの organize 後に実行されること。"""
+        pipelines = self._register({"enabled": True})
+
+        for name in ["import_claude", "import_openai", "import_github", "__default__"]:
+            node_names = [n.name for n in pipelines[name].nodes]
+            self.assertIn("embed_organized_notes", node_names)
+            self.assertLess(
+                node_names.index("embed_frontmatter_fields"),
+                node_names.index("embed_organized_notes"),
+            )
+
+
 class TestDispatchError(unittest.TestCase):
     """Phase 4: 無効な provider 指定時のエラーテスト。
 
@@ -24,14 +24,33 @@ Phase 5 (US5 Increment) tests verify:
 - find_incremented_path returns file_1.md when file.md exists
 - find_incremented_path returns file_2.md when file.md and file_1.md exist
 - Increment mode creates file_1.md when original exists
+
+Sync mode tests verify:
+- Unchanged destination is not rewritten (mtime preserved)
+- Changed destination is rewritten with "updated" status
+- Copy summary reports unchanged/updated counts
+
+File-level publish mode tests verify:
+- copy mode publishes the source file byte-for-byte without loading str
+- sync + copy mode skips unchanged destinations
+- invalid publish_mode raises ValueError
+
+Publish journal tests verify:
+- Incremental selection skips journaled, unchanged notes
+- Changed content and missing destinations are re-selected
+- Journal update records hash/destination/time
+- Moved notes (genre/topic change) remove the stale destination
+- Stale destinations edited in the Vault are kept
 """
 
 from __future__ import annotations
 
+import errno
 import os
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 from obsidian_etl.pipelines.vault_output.nodes import (
     check_conflicts,
@@ -41,6 +60,8 @@ from obsidian_etl.pipelines.vault_output.nodes import (
     log_preview_summary,
     resolve_vault_destination,
     sanitize_topic,
+    select_changed_partitions,
+    update_publish_journal,
 )
 
 
@@ -581,5 +602,289 @@ class TestCopyToVaultIncrement(unittest.TestCase):
         self.assertEqual(preserved_content, old_content)
 
 
+class TestCopyToVaultSync(unittest.TestCase):
+    """copy_to_vault with sync mode (content-hash idempotent copy)."""
+
+    def setUp(self):
+        """Set up temp vault directory."""
+        self.vault_dir = tempfile.mkdtemp()
+        self.params = _make_vault_params()
+        self.params["vault_base_path"] = self.vault_dir
+        self.params["conflict_handling"] = "sync"
+
+    def tearDown(self):
+        """Clean up temp directories."""
+        import shutil
+
+        shutil.rmtree(self.vault_dir, ignore_errors=True)
+
+    def test_copy_to_vault_sync_new_file_copied(self):
+        """sync モードで新規ファイルは copied として書き込まれること。"""
+        content = _make_organized_content(title="New Note")
+        organized_files = {"note1": content}
+        destinations = resolve_vault_destination(organized_files, self.params)
+
+        results = copy_to_vault(organized_files, destinations, self.params)
+
+        self.assertEqual(results[0]["status"], "copied")
+        dest_path = Path(destinations["note1"]["full_path"])
+        self.assertEqual(dest_path.read_text(encoding="utf-8"), content)
+
+    def test_copy_to_vault_sync_unchanged_not_rewritten(self):
+        """sync モードで同一内容の既存ファイルは書き込まれないこと。"""
+        content = _make_organized_content(title="Same Note")
+        organized_files = {"note1": content}
+        destinations = resolve_vault_destination(organized_files, self.params)
+
+        dest_path = Path(destinations["note1"]["full_path"])
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        dest_path.write_text(content, encoding="utf-8")
+        os.utime(dest_path, (1_000_000, 1_000_000))
+
+        results = copy_to_vault(organized_files, destinations, self.params)
+
+        self.assertEqual(results[0]["status"], "unchanged")
+        self.assertEqual(results[0]["destination"], str(dest_path))
+        # mtime must be preserved (no write happened)
+        self.assertEqual(dest_path.stat().st_mtime, 1_000_000)
+
+    def test_copy_to_vault_sync_changed_updated(self):
+        """sync モードで内容が異なる既存ファイルは updated として上書きされること。"""
+        content = _make_organized_content(title="Changed Note")
+        organized_files = {"note1": content}
+        destinations = resolve_vault_destination(organized_files, self.params)
+
+        dest_path = Path(destinations["note1"]["full_path"])
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        dest_path.write_text(content.replace("python", "rust"), encoding="utf-8")
+
+        results = copy_to_vault(organized_files, destinations, self.params)
+
+        self.assertEqual(results[0]["status"], "updated")
+        self.assertEqual(dest_path.read_text(encoding="utf-8"), content)
+
+    def test_log_copy_summary_sync_counts(self):
+        """コピーサマリーに unchanged / updated カウントが含まれること。"""
+        copy_results = [
+            {"source": "a", "destination": "/v/a.md", "status": "copied", "error_message": None},
+            {"source": "b", "destination": "/v/b.md", "status": "unchanged", "error_message": None},
+            {"source": "c", "destination": "/v/c.md", "status": "unchanged", "error_message": None},
+            {"source": "d", "destination": "/v/d.md", "status": "updated", "error_message": None},
+        ]
+
+        result = log_copy_summary(copy_results)
+
+        self.assertEqual(result["total"], 4)
+        self.assertEqual(result["copied"], 1)
+        self.assertEqual(result["unchanged"], 2)
+        self.assertEqual(result["updated"], 1)
+
+
+class TestCopyToVaultPublishMode(unittest.TestCase):
+    """copy_to_vault with file-level publish modes (source_paths)."""
+
+    def setUp(self):
+        """Set up organized source dir and vault dir."""
+        self.source_dir = Path(tempfile.mkdtemp())
+        self.vault_dir = tempfile.mkdtemp()
+        self.params = _make_vault_params()
+        self.params["vault_base_path"] = self.vault_dir
+        self.params["publish_mode"] = "copy"
+
+    def tearDown(self):
+        """Clean up temp directories."""
+        import shutil
+
+        shutil.rmtree(self.source_dir, ignore_errors=True)
+        shutil.rmtree(self.vault_dir, ignore_errors=True)
+
+    def _setup_note(self, title: str = "Fast Note"):
+        content = _make_organized_content(title=title)
+        src = self.source_dir / "note1.md"
+        src.write_text(content, encoding="utf-8")
+
+        def _fail_load() -> str:
+            raise AssertionError("organized_files must not be loaded in file copy mode")
+
+        destinations = resolve_vault_destination({"note1": content}, self.params)
+        return src, {"note1": _fail_load}, {"note1": lambda: src}, destinations
+
+    def test_copy_mode_publishes_file_without_loading(self):
+        """copy モードでは TextDataset をロードせずファイル単位でコピーされること。"""
+        src, organized_files, source_paths, destinations = self._setup_note()
+
+        results = copy_to_vault(organized_files, destinations, self.params, source_paths)
+
+        self.assertEqual(results[0]["status"], "copied")
+        dest_path = Path(destinations["note1"]["full_path"])
+        self.assertEqual(dest_path.read_bytes(), src.read_bytes())
+
+    def test_sync_copy_mode_unchanged(self):
+        """sync + copy モードで同一内容なら書き込まれないこと。"""
+        src, organized_files, source_paths, destinations = self._setup_note()
+        self.params["conflict_handling"] = "sync"
+        dest_path = Path(destinations["note1"]["full_path"])
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        dest_path.write_bytes(src.read_bytes())
+
+        results = copy_to_vault(organized_files, destinations, self.params, source_paths)
+
+        self.assertEqual(results[0]["status"], "unchanged")
+
+    def test_os_error_recorded_and_publish_continues(self):
+        """ENOSPC などの OSError はそのノートのエラーとして記録し、残りを続行すること。"""
+        src, organized_files, source_paths, destinations = self._setup_note()
+        second = self._setup_note(title="Second Note")
+        organized_files["note2"] = second[1]["note1"]
+        source_paths["note2"] = second[2]["note1"]
+        destinations["note2"] = second[3]["note1"]
+        full = OSError(errno.ENOSPC, "No space left on device")
+
+        with patch(
+            "obsidian_etl.pipelines.vault_output.nodes.copy_file",
+            side_effect=[full, "copy_file_range"],
+        ):
+            results = copy_to_vault(organized_files, destinations, self.params, source_paths)
+
+        self.assertEqual([r["status"] for r in results], ["error", "copied"])
+        self.assertIn("No space left", results[0]["error_message"])
+
+    def test_invalid_publish_mode_raises(self):
+        """不正な publish_mode で ValueError となること。"""
+        _, organized_files, source_paths, destinations = self._setup_note()
+        self.params["publish_mode"] = "rsync"
+
+        with self.assertRaises(ValueError):
+            copy_to_vault(organized_files, destinations, self.params, source_paths)
+
+
+class TestPublishJournal(unittest.TestCase):
+    """select_changed_partitions / update_publish_journal (incremental publish)."""
+
+    def setUp(self):
+        """Set up organized source dir and vault dir."""
+        self.source_dir = Path(tempfile.mkdtemp())
+        self.vault_dir = tempfile.mkdtemp()
+        self.params = _make_vault_params()
+        self.params["vault_base_path"] = self.vault_dir
+        self.params["conflict_handling"] = "sync"
+        self.params["incremental"] = True
+
+    def tearDown(self):
+        """Clean up temp directories."""
+        import shutil
+
+        shutil.rmtree(self.source_dir, ignore_errors=True)
+        shutil.rmtree(self.vault_dir, ignore_errors=True)
+
+    def _write_note(self, key: str, **kwargs) -> None:
+        (self.source_dir / f"{key}.md").write_text(
+            _make_organized_content(**kwargs), encoding="utf-8"
+        )
+
+    def _inputs(self):
+        organized_files = {}
+        source_paths = {}
+        for path in sorted(self.source_dir.glob("*.md")):
+            organized_files[path.stem] = lambda p=path: p.read_text(encoding="utf-8")
+            source_paths[path.stem] = lambda p=path: p
+        return organized_files, source_paths
+
+    def _publish(self, journal: dict) -> tuple[dict, list, dict]:
+        organized_files, source_paths = self._inputs()
+        selected, states = select_changed_partitions(
+            organized_files, source_paths, journal, self.params
+        )
+        destinations = resolve_vault_destination(selected, self.params)
+        results = copy_to_vault(selected, destinations, self.params)
+        new_journal = update_publish_journal(journal, states, destinations, results)
+        return new_journal, results, destinations
+
+    def test_first_publish_selects_all_and_records_journal(self):
+        """初回はすべて選択され、journal に hash・出力先・時刻が記録されること。"""
+        self._write_note("note1", title="A")
+        self._write_note("note2", title="B")
+
+        journal, results, destinations = self._publish({})
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(set(journal), {"note1", "note2"})
+        entry = journal["note1"]
+        self.assertEqual(entry["destination"], destinations["note1"]["full_path"])
+        self.assertEqual(len(entry["content_hash"]), 64)
+        self.assertIn("published_at", entry)
+
+    def test_republish_unchanged_selects_nothing(self):
+        """変更がなければ 2 回目は何も選択されないこと。"""
+        self._write_note("note1", title="A")
+        journal, _, _ = self._publish({})
+
+        journal2, results, _ = self._publish(journal)
+
+        self.assertEqual(results, [])
+        self.assertEqual(journal2, journal)
+
+    def test_changed_and_new_notes_are_selected(self):
+        """内容変更・新規ノートのみ選択されること。"""
+        self._write_note("note1", title="A")
+        self._write_note("note2", title="B")
+        journal, _, _ = self._publish({})
+
+        self._write_note("note2", title="B", topic="rust")
+        self._write_note("note3", title="C")
+        organized_files, source_paths = self._inputs()
+        selected, _ = select_changed_partitions(organized_files, source_paths, journal, self.params)
+
+        self.assertEqual(set(selected), {"note2", "note3"})
+
+    def test_missing_destination_is_reselected(self):
+        """Vault 側のファイルが削除されていれば再選択されること。"""
+        self._write_note("note1", title="A")
+        journal, _, _ = self._publish({})
+        Path(journal["note1"]["destination"]).unlink()
+
+        organized_files, source_paths = self._inputs()
+        selected, _ = select_changed_partitions(organized_files, source_paths, journal, self.params)
+
+        self.assertEqual(set(selected), {"note1"})
+
+    def test_non_incremental_selects_all(self):
+        """incremental=False の場合は全件選択されること。"""
+        self._write_note("note1", title="A")
+        journal, _, _ = self._publish({})
+        self.params["incremental"] = False
+
+        organized_files, source_paths = self._inputs()
+        selected, _ = select_changed_partitions(organized_files, source_paths, journal, self.params)
+
+        self.assertEqual(set(selected), {"note1"})
+
+    def test_moved_note_removes_stale_destination(self):
+        """genre/topic 変更で出力先が変わった場合、旧ファイルが削除されること。"""
+        self._write_note("note1", title="A", genre="ai", topic="python")
+        journal, _, _ = self._publish({})
+        old_dest = Path(journal["note1"]["destination"])
+
+        self._write_note("note1", title="A", genre="business", topic="management")
+        journal2, _, _ = self._publish(journal)
+
+        new_dest = Path(journal2["note1"]["destination"])
+        self.assertNotEqual(old_dest, new_dest)
+        self.assertTrue(new_dest.exists())
+        self.assertFalse(old_dest.exists())
+
+    def test_moved_note_keeps_stale_destination_edited_in_vault(self):
+        """旧ファイルが Vault 上で編集されていれば削除しないこと。"""
+        self._write_note("note1", title="A", topic="python")
+        journal, _, _ = self._publish({})
+        old_dest = Path(journal["note1"]["destination"])
+        old_dest.write_text("edited in Obsidian", encoding="utf-8")
+
+        self._write_note("note1", title="A", topic="rust")
+        self._publish(journal)
+
+        self.assertTrue(old_dest.exists())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,112 @@
+"""Tests for fast_copy module.
+
+These tests verify:
+- copy mode copies bytes verbatim (no re-encoding)
+- copy mode overwrites existing destination
+- hardlink mode shares the inode with the source
+- reflink mode falls back to a regular copy when unsupported
+- cross-device hardlinks / unsupported clones fall back to a byte copy
+- invalid mode raises ValueError
+"""
+
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from obsidian_etl.utils.fast_copy import copy_file
+
+
+class TestCopyFile(unittest.TestCase):
+    """copy_file: file-level copy strategies."""
+
+    def setUp(self):
+        self.tmpdir = Path(tempfile.mkdtemp())
+        self.src = self.tmpdir / "src.md"
+        # Mixed Japanese text and CRLF must survive byte-for-byte
+        self.data = "---\ntitle: テスト\n---\r\n本文\n".encode()
+        self.src.write_bytes(self.data)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_copy_mode_copies_bytes(self):
+        """copy モードでバイト列がそのままコピーされること。"""
+        dst = self.tmpdir / "dst.md"
+        method = copy_file(self.src, dst, mode="copy")
+
+        self.assertIn(method, ("copy_file_range", "copyfile"))
+        self.assertEqual(dst.read_bytes(), self.data)
+
+    def test_copy_mode_overwrites_existing(self):
+        """既存ファイルが上書きされること。"""
+        dst = self.tmpdir / "dst.md"
+        dst.write_bytes(b"old content that is longer than the new one" * 10)
+
+        copy_file(self.src, dst, mode="copy")
+
+        self.assertEqual(dst.read_bytes(), self.data)
+
+    def test_hardlink_mode_shares_inode(self):
+        """hardlink モードで同一 inode を共有すること。"""
+        dst = self.tmpdir / "dst.md"
+        dst.write_bytes(b"old")
+
+        method = copy_file(self.src, dst, mode="hardlink")
+
+        self.assertEqual(method, "hardlink")
+        self.assertEqual(dst.stat().st_ino, self.src.stat().st_ino)
+        self.assertEqual(dst.read_bytes(), self.data)
+
+    def test_reflink_mode_result_matches_source(self):
+        """reflink モードは非対応 FS でも通常コピーにフォールバックすること。"""
+        dst = self.tmpdir / "dst.md"
+        method = copy_file(self.src, dst, mode="reflink")
+
+        self.assertIn(method, ("reflink", "copy_file_range", "copyfile"))
+        self.assertEqual(dst.read_bytes(), self.data)
+
+    def test_cross_device_hardlink_falls_back_to_copy(self):
+        """別デバイスへの hardlink (EXDEV) はバイトコピーにフォールバックすること。"""
+        dst = self.tmpdir / "dst.md"
+        with patch("os.link", side_effect=OSError(errno.EXDEV, "Invalid cross-device link")):
+            method = copy_file(self.src, dst, mode="hardlink")
+
+        self.assertIn(method, ("copy_file_range", "copyfile"))
+        self.assertEqual(dst.read_bytes(), self.data)
+        self.assertEqual(list(self.tmpdir.glob(".*.link")), [])
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "FICLONE is Linux only")
+    def test_unsupported_reflink_falls_back_to_copy(self):
+        """FICLONE 非対応 (EOPNOTSUPP) はバイトコピーにフォールバックすること。"""
+        dst = self.tmpdir / "dst.md"
+        with patch("fcntl.ioctl", side_effect=OSError(errno.EOPNOTSUPP, "Not supported")):
+            method = copy_file(self.src, dst, mode="reflink")
+
+        self.assertIn(method, ("copy_file_range", "copyfile"))
+        self.assertEqual(dst.read_bytes(), self.data)
+
+    @unittest.skipUnless(hasattr(os, "copy_file_range"), "needs copy_file_range")
+    def test_short_copy_file_range_falls_back_to_copy(self):
+        """copy_file_range が途中で 0 を返した場合は copyfile でコピーし直すこと。"""
+        dst = self.tmpdir / "dst.md"
+        with patch("os.copy_file_range", return_value=0):
+            method = copy_file(self.src, dst, mode="copy")
+
+        self.assertEqual(method, "copyfile")
+        self.assertEqual(dst.read_bytes(), self.data)
+
+    def test_invalid_mode_raises(self):
+        """不正なモードで ValueError となること。"""
+        with self.assertRaises(ValueError):
+            copy_file(self.src, self.tmpdir / "dst.md", mode="rsync")
+
+
+if __name__ == "__main__":
+    unittest.main()